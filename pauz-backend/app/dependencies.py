@@ -1,3 +1,4 @@
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel import Session, select
@@ -26,3 +27,16 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(bearer_
         raise credentials_exception
 
     return user
+
+
+optional_bearer_scheme = HTTPBearer(auto_error=False)
+
+def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_bearer_scheme),
+                      db: Session = Depends(get_session)) -> Optional[User]:
+    """The signed-in user, or None for anonymous or invalid credentials (for routes that work either way)"""
+    if credentials is None:
+        return None
+    try:
+        return get_current_user(credentials, db)
+    except HTTPException:
+        return None
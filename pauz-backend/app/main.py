@@ -3,15 +3,26 @@ PAUZ Backend - Main FastAPI Application
 Clean, professional API for journaling application
 """
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 from fastapi.responses import JSONResponse
+from sqlmodel import Session, select
 import uvicorn
 
 # Import routes
 from app.routes import auth, free_journal, guided_journal, garden, stats
 from app.database import engine, create_db_and_tables
+from app.models import User
+from app.services import jwt_service
+from app.services.circuit_breaker import circuit_breakers
+from app.services.inference_service import inference_service
+from app.services.llm_telemetry import llm_telemetry
+from app.services.request_deadline import request_deadline, DeadlineExceeded
+from app.services.idempotency_service import idempotency_service, IdempotencyKeyReused, IdempotentRequestInProgress
+from app.services.structured_output import structured_output_stats
+from app.services.guided_journal_service import guided_journal_service
+from app.services.smart_sql_service import smart_sql_service
 
 # Import configuration
 import os
@@ -54,6 +65,45 @@ app.add_middleware(
 # Security
 security = HTTPBearer()
 
+# Token email -> user id, so attributing AI calls does not query the database on every request
+_requester_ids = {}
+MAX_CACHED_REQUESTER_IDS = 10000
+
+def _requester_id(token: str):
+    """Id of the user the bearer token belongs to, the same key the routes and INFERENCE_USER_WEIGHTS use"""
+    email = jwt_service.verify_token(token, ValueError("invalid token")).email
+    if email not in _requester_ids:
+        with Session(engine) as db:
+            user = db.exec(select(User).where(User.email == email)).first()
+        if user is None:
+            return None
+        if len(_requester_ids) >= MAX_CACHED_REQUESTER_IDS:
+            _requester_ids.clear()
+        _requester_ids[email] = user.id
+    return _requester_ids[email]
+
+@app.middleware("http")
+async def attribute_ai_calls(request: Request, call_next):
+    """Queue the AI calls a request makes under its signed-in user, so the dispatcher can share slots fairly"""
+    requester = None
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        try:
+            requester = _requester_id(authorization[7:])
+        except Exception:
+            # Unauthenticated requests are rejected by the route itself; queue them as anonymous
+            requester = None
+    with inference_service.on_behalf_of(requester):
+        return await call_next(request)
+
+@app.middleware("http")
+async def apply_deadline(request: Request, call_next):
+    """Give the request its route class's time budget; outbound calls it makes are bounded by what is left"""
+    with request_deadline.start(request_deadline.route_class(request.url.path)):
+        # For streaming responses this covers the time until the response starts
+        with request_deadline.stage("request"):
+            return await call_next(request)
+
 # Include routers
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(free_journal.router, prefix="/freejournal", tags=["Free Journal"])
@@ -68,6 +118,10 @@ app.include_router(voice_assistant.router, prefix="/voice-assistant", tags=["Voi
 async def startup_event():
     """Initialize database on startup"""
     create_db_and_tables()
+    # Fill guided prompt pools in the background so category prompts are served instantly
+    guided_journal_service.warm_prompt_pools()
+    # Keep the dashboard's rollup tables fresh (ANALYTICS_ROLLUP_INTERVAL_SECONDS=0 to use the cron job instead)
+    smart_sql_service.start_rollup_refresh()
 
 @app.get("/")
 async def root():
@@ -87,6 +141,26 @@ async def health_check():
         "database": "connected"
     }
 
+@app.get("/health/providers")
+async def provider_health():
+    """Circuit breaker state and health score for each AI provider"""
+    return {"providers": circuit_breakers.snapshot()}
+
+@app.get("/health/ai-latency")
+def ai_latency(hours: int = 24):
+    """
+    LLM call latency percentiles per provider and prompt type over the last hours,
+    plus JSON parse outcomes, queueing, request deadline misses per stage and duplicate requests coalesced
+    """
+    return {
+        "hours": hours,
+        "latency": llm_telemetry.percentiles(hours),
+        "structured_output": structured_output_stats.snapshot(),
+        "inference_queue": inference_service.snapshot(),
+        "deadlines": request_deadline.snapshot(),
+        "idempotency": idempotency_service.stats()
+    }
+
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
@@ -95,6 +169,29 @@ async def not_found_handler(request, exc):
         content={"error": "Endpoint not found"}
     )
 
+@app.exception_handler(IdempotencyKeyReused)
+async def idempotency_key_reused_handler(request, exc):
+    return JSONResponse(
+        status_code=422,
+        content={"error": str(exc)}
+    )
+
+@app.exception_handler(IdempotentRequestInProgress)
+async def idempotent_request_in_progress_handler(request, exc):
+    return JSONResponse(
+        status_code=409,
+        content={"error": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded_handler(request, exc):
+    return JSONResponse(
+        status_code=503,
+        content={"error": str(exc)},
+        headers={"Retry-After": "1"}
+    )
+
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
     return JSONResponse(
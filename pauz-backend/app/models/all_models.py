@@ -1,6 +1,7 @@
 from typing import List, Optional
 from datetime import datetime
 from uuid import uuid4
+from sqlalchemy import Index
 from sqlmodel import Field, Relationship, SQLModel
 
 
@@ -24,6 +25,11 @@ class FreeJournal(SQLModel, table=True):
     session_id: str = Field(index=True)
     content: str = ""
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
+    # Text stats maintained at save time (see app.utils.text_stats)
+    word_count: int = 0
+    char_count: int = 0
+    reading_time_seconds: int = 0
 
     user: User = Relationship(back_populates="free_journals")
 
@@ -59,6 +65,9 @@ class GuidedJournalEntry(SQLModel, table=True):
 
 
 class Garden(SQLModel, table=True):
+    # Serves per-user date-range scans (calendar, trends)
+    __table_args__ = (Index("ix_garden_user_id_created_at", "user_id", "created_at"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: str = Field(foreign_key="users.id", index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -9,6 +9,7 @@ from app.dependencies import get_current_user
 from app.models import User
 from app.services import auth_service
 from app.services.jwt_service import create_access_token
+from app.services.guided_journal_service import guided_journal_service
 
 from pydantic import BaseModel
 
@@ -88,6 +89,9 @@ def callback(request: Request, code: str, state: str, db: Session = Depends(get_
             auth_logger.error("❌ No user returned from OAuth processing")
             return redirect_with_error("Failed to authenticate user")
 
+        # Warm personalised guided prompts in the background while the frontend loads
+        guided_journal_service.prefetch_prompts(user.id)
+
         # Step 3: Create JWT token
         auth_logger.info("🔑 Creating JWT token...")
         token_start = time.time()
@@ -168,6 +172,9 @@ def get_token(token_request: TokenRequest, db: Session = Depends(get_session)):
                 headers={"WWW-Authenticate": "Bearer"},
             )
 
+        # Warm personalised guided prompts in the background while the frontend loads
+        guided_journal_service.prefetch_prompts(user.id)
+
         # Create access token
         auth_logger.info("🔑 Creating access token...")
         token_start = time.time()
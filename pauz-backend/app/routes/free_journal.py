@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status, Query
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status, Query, Header
+from fastapi.responses import Response, StreamingResponse
 from sqlmodel import Session
 from app.services.free_journal_service import free_journal_service
 from app.services.voice_service import voice_service
 from app.services.stats_service import stats_service
 from app.services.journal_loading_service import journal_loading_service
+from app.services.idempotency_service import idempotency_service
 from app.models import FreeJournal, Hint, User
 from pydantic import BaseModel
 from typing import Optional, List, Dict
@@ -13,11 +15,16 @@ from app.database import get_session
 
 router = APIRouter()
 
+# Stop proxies from buffering server-sent events
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 class SaveContentRequest(BaseModel):
     content: str
 
 class HintsRequest(BaseModel):
     current_content: str
+    # Ask for a fresh hint even if the content barely changed since the last one
+    another: bool = False
 
 class FreeJournalResponse(BaseModel):
     id: Optional[int]
@@ -164,13 +171,37 @@ def get_hints_route(
     session_id: str, 
     data: HintsRequest, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None)
 ):
     """
     Generates hints for the user based on current content and saves them.
+    Duplicate clicks and retries (same Idempotency-Key) get the same hint.
+    """
+    def generate():
+        hint = free_journal_service.generate_hints(session_id, data.current_content, current_user.id, db,
+                                                   another=data.another)
+        return HintResponse.model_validate(hint)
+
+    return idempotency_service.run("hints", current_user.id, generate, idempotency_key,
+                                   fingerprint=f"{session_id}\n{data.another}\n{data.current_content}")
+
+@router.post("/{session_id}/hints/stream")
+def stream_hints_route(
+    session_id: str,
+    data: HintsRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None)
+):
     """
-    hint = free_journal_service.generate_hints(session_id, data.current_content, current_user.id, db)
-    return hint
+    Streams a hint as server-sent events ('token' per chunk, then 'done' with the saved hint).
+    Duplicate clicks and retries (same Idempotency-Key) get the same events.
+    """
+    events = free_journal_service.stream_hints(session_id, data.current_content, current_user.id, db, another=data.another)
+    events = idempotency_service.stream("hints_stream", current_user.id, events, idempotency_key,
+                                        fingerprint=f"{session_id}\n{data.another}\n{data.current_content}")
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
 
 @router.get("/{session_id}/hints", response_model=List[HintResponse])
 def get_session_hints_route(
@@ -381,12 +412,14 @@ async def transcribe_voice_route(
 def reflect_with_ai_route(
     session_id: str, 
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_session)
+    db: Session = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None)
 ):
     """
     Analyzes the journal content with AI and updates the garden entry.
+    Duplicate clicks and retries (same Idempotency-Key) share one reflection and garden entry.
     """
-    try:
+    def reflect():
         reflection = free_journal_service.reflect_with_ai(session_id, current_user.id, db)
         
         # Invalidate both stats and journal loading cache for this user
@@ -394,9 +427,40 @@ def reflect_with_ai_route(
         journal_loading_service.invalidate_user_cache(current_user.id)
         
         return reflection
+
+    try:
+        return idempotency_service.run("reflect", current_user.id, reflect, idempotency_key, fingerprint=session_id)
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
 
+@router.post("/{session_id}/reflect/stream")
+def stream_reflection_route(
+    session_id: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_session),
+    idempotency_key: Optional[str] = Header(None)
+):
+    """
+    Streams the AI reflection as server-sent events ('status' as soon as analysis starts,
+    'insight' per sentence when the AI reflects, then 'reflection' with the analysis once
+    the garden entry is saved). Duplicate clicks and retries (same Idempotency-Key) share
+    one reflection and garden entry.
+    """
+    try:
+        events = free_journal_service.stream_reflection(session_id, current_user.id, db)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+    def events_then_invalidate():
+        yield from events
+        # Invalidate both stats and journal loading cache for this user
+        stats_service.invalidate_user_cache(current_user.id)
+        journal_loading_service.invalidate_user_cache(current_user.id)
+
+    events = idempotency_service.stream("reflect_stream", current_user.id, events_then_invalidate(),
+                                        idempotency_key, fingerprint=session_id)
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
 @router.post("/{session_id}/export")
 def export_free_journal_route(
     session_id: str, 
@@ -404,10 +468,14 @@ def export_free_journal_route(
     db: Session = Depends(get_session)
 ):
     """
-    Exports a free journal to PDF.
+    Exports a free journal to PDF. Returns its URL, or the PDF itself when the request
+    ran out of time to upload it.
     """
     try:
-        pdf_url = free_journal_service.export_to_pdf(session_id, current_user.id, db)
+        pdf_url, pdf_bytes = free_journal_service.export_to_pdf(session_id, current_user.id, db)
+        if not pdf_url:
+            return Response(content=pdf_bytes, media_type="application/pdf",
+                            headers={"Content-Disposition": f'attachment; filename="free_journal_{session_id}.pdf"'})
         return {"pdfUrl": pdf_url}
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
\ No newline at end of file
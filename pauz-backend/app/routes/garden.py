@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 from sqlmodel import Session
 from app.services.garden_service import garden_service
+from app.services.garden_trends_service import garden_trends_service
 from app.services.stats_service import stats_service
 from app.models import Garden, User
 from pydantic import BaseModel
 from typing import List, Optional
 from app.dependencies import get_current_user
 from app.database import get_session
-from datetime import datetime
+from datetime import datetime, date
 
 router = APIRouter()
 
@@ -84,6 +88,51 @@ def get_garden_entries_route(
     
     return response_data
 
+@router.get("/trends")
+def get_garden_trends_route(
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_session),
+    start: Optional[date] = Query(None, alias="from", description="Start of range (YYYY-MM-DD), defaults to 90 days before 'to'"),
+    end: Optional[date] = Query(None, alias="to", description="End of range (YYYY-MM-DD), defaults to today"),
+    window: int = Query(7, ge=1, le=365, description="Rolling window size in days")
+):
+    """
+    Returns mood trends for the current user's garden: rolling mood distributions,
+    streaks, per-weekday patterns and mood-transition probabilities.
+    """
+    try:
+        return garden_trends_service.get_trends(current_user.id, db, start=start, end=end, window=window)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/calendar")
+def get_garden_calendar_route(
+    request: Request,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_session),
+    start: Optional[date] = Query(None, alias="from", description="Start of range (YYYY-MM-DD), defaults to the start of the current period"),
+    end: Optional[date] = Query(None, alias="to", description="End of range (YYYY-MM-DD), defaults to the end of the period containing 'from'"),
+    granularity: str = Query("month", description="Calendar view: week, month or year")
+):
+    """
+    Returns per-day flower counts and dominant mood for the calendar view,
+    plus totals per week/month/year. Supports conditional requests via ETag.
+    """
+    try:
+        calendar_data = garden_service.get_calendar(current_user.id, start, end, granularity, db)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    body = json.dumps(calendar_data, separators=(",", ":"), sort_keys=True)
+    etag = f'"{hashlib.md5(body.encode()).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(content=calendar_data, headers=headers)
+
 @router.delete("/{flower_id}")
 def delete_garden_entry_route(
     flower_id: int,
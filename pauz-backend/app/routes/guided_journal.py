@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import Response
 from app.services.guided_journal_service import guided_journal_service
 from app.models import GuidedJournal, GuidedJournalEntry, Prompt, User
 from app.services.storage_service import storage_service
@@ -6,8 +7,8 @@ from app.utils import pdf_generator
 from app.services.stats_service import stats_service
 from app.services.journal_loading_service import journal_loading_service
 from pydantic import BaseModel
-from typing import List, Dict
-from app.dependencies import get_current_user
+from typing import List, Dict, Optional
+from app.dependencies import get_current_user, get_optional_user
 
 
 router = APIRouter()
@@ -33,15 +34,29 @@ class GuidedJournalUpdate(BaseModel):
     entries: List[dict]
 
 @router.post("/prompts", response_model=List[Prompt])
-def generate_prompts_route(topic: Topic):
+def generate_prompts_route(topic: Topic, current_user: Optional[User] = Depends(get_optional_user)):
     """
     Generates a list of prompts based on a given topic.
+    Signed-in users get their prefetched personalised set when one is ready.
     """
-    prompts_dicts = guided_journal_service.generate_prompts(topic.topic)
+    if current_user:
+        prompts_dicts = guided_journal_service.generate_prompts(topic.topic, user_id=current_user.id)
+    else:
+        prompts_dicts = guided_journal_service.generate_prompts(topic.topic)
     # Convert dicts to Prompt objects for response model validation
     prompts = [Prompt(**p) for p in prompts_dicts]
     return prompts
 
+@router.get("/categories", response_model=dict)
+def get_categories_route(current_user: Optional[User] = Depends(get_optional_user)):
+    """
+    Lists the life categories. For signed-in users this also starts warming
+    personalised prompts for the categories they are likely to pick.
+    """
+    if current_user:
+        guided_journal_service.prefetch_prompts(current_user.id)
+    return guided_journal_service.get_available_categories()
+
 @router.post("/", response_model=dict)
 def create_journal_route(
     guided_journal_create: dict, 
@@ -192,7 +207,8 @@ def export_journal_route(
     current_user: User = Depends(get_current_user)
 ):
     """
-    Exports a journal as a PDF and uploads it to Vultr S3, returning the URL.
+    Exports a journal as a PDF and uploads it to Vultr S3, returning the URL
+    (or the PDF itself when the request ran out of time to upload it).
     """
     guided_journal = guided_journal_service.get_guided_journal_by_id(
         user_id=current_user.id, 
@@ -203,26 +219,13 @@ def export_journal_route(
         
     pdf_bytes = pdf_generator.generate_pdf_guided_journal(guided_journal)
     
-    # Upload to Vultr S3 directly - NO FALLBACKS
-    import boto3
-    import os
-    
-    vultr_access_key = os.getenv("VULTR_ACCESS_KEY")
-    vultr_secret_key = os.getenv("VULTR_SECRET_KEY")
-    vultr_region = os.getenv("VULTR_REGION")
-    vultr_bucket_name = os.getenv("VULTR_BUCKET_NAME")
-    
-    if not all([vultr_access_key, vultr_secret_key, vultr_region, vultr_bucket_name]):
-        raise HTTPException(status_code=500, detail="Vultr S3 credentials required for PDF export")
-    
-    s3 = boto3.client('s3',
-                     aws_access_key_id=vultr_access_key,
-                     aws_secret_access_key=vultr_secret_key,
-                     region_name=vultr_region,
-                     endpoint_url=f'https://{vultr_region}.vultrobjects.com')
-    
+    # Upload to Vultr S3 directly; the PDF only goes back inline when time runs out
     file_name = f"guided_journal_{journal_id}.pdf"
-    s3.put_object(Bucket=vultr_bucket_name, Key=file_name, Body=pdf_bytes, ACL='public-read')
-    
-    pdf_url = f"https://{vultr_bucket_name}.{vultr_region}.vultrobjects.com/{file_name}"
+    try:
+        pdf_url = storage_service.upload_pdf(file_name, pdf_bytes)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not pdf_url:
+        return Response(content=pdf_bytes, media_type="application/pdf",
+                        headers={"Content-Disposition": f'attachment; filename="{file_name}"'})
     return {"pdf_url": pdf_url}
\ No newline at end of file
@@ -3,7 +3,8 @@ Voice Assistant Routes
 Handles welcome greetings, guidance, and interactive voice features using PAUZ Voice Service with ongoing conversation
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Header
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
@@ -13,12 +14,21 @@ import base64
 
 from app.services.voice_service import voice_service
 from app.services.pauz_voice_service import pauz_voice_service
+from app.services.idempotency_service import idempotency_service, IdempotencyKeyReused, IdempotentRequestInProgress
+from app.services.llm_streaming import sse_event
+from app.utils.keyword_matcher import KeywordMatcher
 from app.models import User
 from app.database import get_session
 from app.dependencies import get_current_user
 
 router = APIRouter()
 
+# Cues for the emergency guidance replies
+GUIDANCE_KEYWORDS = KeywordMatcher({
+    "question": ["what can i do", "help", "options", "features"],
+    "stuck": ["stuck", "blocked", "don't know"]
+})
+
 class WelcomeRequest(BaseModel):
     user_context: Optional[Dict[str, Any]] = None
     time_of_day: Optional[str] = None
@@ -81,30 +91,32 @@ def get_guidance_response(question: str, context: Optional[str] = None, user_con
     except Exception as e:
         print(f"❌ PAUZ Voice response failed, using fallback: {e}")
         # Emergency fallback with basic app knowledge
-        question_lower = question.lower().strip()
-        if any(word in question_lower for word in ["what can i do", "help", "options", "features"]):
+        hits = GUIDANCE_KEYWORDS.scan(question)
+        if "question" in hits:
             return "You can choose FreeJournal to write freely with hints and voice recording, or GuidedJournal for category-based prompts in Mind, Body, Heart, Friends, Family, Romance, Growth, Mission, Money, or Joy. What interests you?"
-        elif any(word in question_lower for word in ["stuck", "blocked", "don't know"]):
+        elif "stuck" in hits:
             return "Try FreeJournal with the Hint button for ideas, or pick a GuidedJournal category. You can also record yourself talking instead of writing!"
         else:
             return "I'm here to help with your PAUZ journaling journey. You can ask me about FreeJournal, GuidedJournal categories, the Garden feature, or get writing hints!"
 
 @router.post("/welcome", response_model=VoiceResponse)
-async def welcome_voice_route(
+def welcome_voice_route(
     request: WelcomeRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None)
 ):
     """
-    Generate personalized welcome voice greeting for the user
+    Generate personalized welcome voice greeting for the user.
+    Duplicate requests and retries (same Idempotency-Key) share one greeting.
     """
-    try:
-        # Check if voice service is available
-        if not voice_service.is_available():
-            raise HTTPException(
-                status_code=503,
-                detail="Voice service not available. Please check your configuration."
-            )
-        
+    # Check if voice service is available
+    if not voice_service.is_available():
+        raise HTTPException(
+            status_code=503,
+            detail="Voice service not available. Please check your configuration."
+        )
+
+    def generate_welcome() -> VoiceResponse:
         # Generate personalized welcome text
         welcome_text = get_personalized_welcome(current_user, request.user_context)
         
@@ -132,8 +144,11 @@ async def welcome_voice_route(
                 "user_id": current_user.id
             }
         )
-        
-    except HTTPException:
+
+    try:
+        return idempotency_service.run("welcome", current_user.id, generate_welcome, idempotency_key,
+                                       fingerprint=json.dumps(request.model_dump(), sort_keys=True, default=str))
+    except (HTTPException, IdempotencyKeyReused, IdempotentRequestInProgress):
         raise
     except Exception as e:
         raise HTTPException(
@@ -322,6 +337,37 @@ async def guidance_voice_route(
             detail=f"Guidance voice generation failed: {str(e)}"
         )
 
+@router.post("/guidance/stream")
+async def stream_guidance_route(
+    request: GuidanceRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_session)
+):
+    """
+    Streams the guidance text as server-sent events, one 'sentence' event per sentence
+    so the client can start speaking early, then 'done' with the full text.
+    Audio is not included; send sentences to /freejournal/text-to-voice as they arrive.
+    """
+    try:
+        user_context_data = await get_user_context_route(current_user, db)
+        user_context = {
+            "total_journals": user_context_data["total_journals"],
+            "is_returning_user": user_context_data["is_returning_user"],
+            "last_journal_days_ago": user_context_data["last_journal_days_ago"]
+        }
+    except:
+        user_context = None
+
+    def events():
+        spoken = []
+        for sentence in pauz_voice_service.stream_response(request.question, str(current_user.id), user_context):
+            spoken.append(sentence)
+            yield sse_event("sentence", {"text": sentence})
+        yield sse_event("done", {"text": " ".join(spoken), "voice_profile": "guide"})
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 @router.get("/user-context")
 async def get_user_context_route(
     current_user: User = Depends(get_current_user),
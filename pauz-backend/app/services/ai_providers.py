@@ -0,0 +1,453 @@
+"""
+AI Providers
+Registry for the Gemini, OpenAI and ElevenLabs clients used by the services.
+Each client is created lazily on first use and shared by every service, and
+Gemini models are requested by capability rather than by model name.
+AI_PROVIDERS=live (default) builds the real SDK clients; AI_PROVIDERS=stub swaps in
+deterministic local stubs that return canned text and audio with configurable
+latency and error rates, so every AI route can be load-tested offline.
+
+Stub timing per provider comes from AI_STUB_PROFILE (JSON), e.g.
+    {"gemini": {"median_ms": 700, "p95_ms": 2000, "error_rate": 0.02}}
+Latencies are log-normal, fitted to the median and p95. AI_STUB_SEED fixes the
+sequence of latencies and errors; canned text depends only on the prompt.
+"""
+import hashlib
+import importlib.util
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from app.services.llm_telemetry import llm_telemetry
+
+PROVIDERS = ("gemini", "openai", "elevenlabs")
+
+API_KEY_ENV = {
+    "gemini": "GEMINI_API_KEY",
+    "openai": "OPENAI_API_KEY",
+    "elevenlabs": "ELEVENLABS_API_KEY",
+}
+
+SDK_MODULES = {
+    "gemini": "google.generativeai",
+    "openai": "openai",
+    "elevenlabs": "elevenlabs",
+}
+
+# Generation settings shared by the voice assistants: short, spoken-length replies
+VOICE_GENERATION = {"temperature": 0.7, "max_output_tokens": 150, "candidate_count": 1}
+
+RELAXED_SAFETY = [
+    {"category": category, "threshold": "BLOCK_NONE"}
+    for category in ("HARM_CATEGORY_HARASSMENT", "HARM_CATEGORY_HATE_SPEECH",
+                     "HARM_CATEGORY_SEXUALLY_EXPLICIT", "HARM_CATEGORY_DANGEROUS_CONTENT")
+]
+
+# Capability -> Gemini model and settings; GEMINI_MODEL_<CAPABILITY> overrides the model
+GEMINI_CAPABILITIES = {
+    "text": {"model": "gemini-2.5-flash"},
+    "chat": {"model": "gemini-1.5-flash"},
+    "voice": {"model": "gemini-2.5-flash", "generation_config": VOICE_GENERATION},
+    "voice_relaxed": {"model": "gemini-2.5-flash", "generation_config": VOICE_GENERATION,
+                      "safety_settings": RELAXED_SAFETY},
+}
+
+PLACEHOLDER_KEYS = {"your-gemini-api-key-here", "your-openai-api-key-here", "your-elevenlabs-api-key-here"}
+
+# Roughly what the hosted APIs showed in production logs
+DEFAULT_PROFILES = {
+    "gemini": {"median_ms": 700, "p95_ms": 2000, "error_rate": 0.01, "chunk_ms": 30},
+    "openai": {"median_ms": 900, "p95_ms": 2500, "error_rate": 0.01, "chunk_ms": 30},
+    "elevenlabs": {"median_ms": 500, "p95_ms": 1500, "error_rate": 0.01, "chunk_ms": 0},
+}
+
+# z-score of the 95th percentile of a standard normal
+Z_95 = 1.645
+
+STUB_HINTS = [
+    "What feels most alive in you as you write this?",
+    "Perhaps you could gently notice what this moment is asking of you?",
+    "What might you want to say to yourself right now, softly and kindly?",
+    "Which part of today would you like to understand a little better?",
+    "What would it feel like to give yourself permission to rest here?",
+    "Who or what brought you a small moment of comfort recently?",
+    "What are you carrying today that you might be ready to set down?",
+    "If this feeling could speak, what do you think it would gently ask for?",
+]
+
+STUB_REPLIES = [
+    "That sounds like a lot to hold. Would you like to write a little more about it in your Free Journal?",
+    "I'm glad you shared that. A guided journal on Mind might be a gentle place to start today.",
+    "It makes sense to feel that way. What would help you feel a bit lighter right now?",
+    "Thank you for telling me. Taking a quiet moment to write can help untangle those thoughts.",
+]
+
+STUB_TRANSCRIPTS = [
+    "Today was quieter than I expected and I finally had some time to think.",
+    "I keep coming back to the conversation I had with my sister this morning.",
+    "Work was stressful but I managed to take a walk at lunch and that helped.",
+    "I'm grateful for the small things today, like coffee with a friend.",
+]
+
+STUB_MOODS = ["happy", "sad", "anxious", "calm", "reflective", "excited", "grateful"]
+
+# Silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz, ~26 ms): valid audio/mpeg for players
+MP3_SILENT_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+MP3_FRAME_SECONDS = 0.026
+
+
+class StubProviderError(Exception):
+    """Injected provider failure (the stub equivalent of a 503 or a dropped connection)"""
+
+    status_code = 503
+
+
+def _sdk_installed(module: str) -> bool:
+    """Whether an SDK can be imported, without paying for the import"""
+    if module in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ModuleNotFoundError, ValueError):
+        return False
+
+
+def _digest(text: str) -> int:
+    return int.from_bytes(hashlib.sha1(text.encode("utf-8", "ignore")).digest()[:8], "big")
+
+
+def _pick(options, key: str):
+    return options[_digest(key) % len(options)]
+
+
+def canned_text(prompt: str, json_mode: bool = False) -> str:
+    """Deterministic response for a prompt, shaped like what the calling service expects"""
+    lowered = prompt.lower()
+    if "json format with keys: mood" in lowered:
+        return json.dumps({
+            "mood": _pick(STUB_MOODS, prompt),
+            "insights": [_pick(STUB_REPLIES, prompt), "Writing it down is already a way of caring for yourself."],
+            "summary": "You wrote about what is on your mind today and how it is affecting you.",
+            "nextQuestions": [_pick(STUB_HINTS, prompt), _pick(STUB_HINTS, prompt + "2")]
+        })
+    if "journal prompts" in lowered:
+        count = re.search(r"exactly (\d+)", lowered)
+        count = int(count.group(1)) if count else 9
+        if json_mode:
+            sections = ["going_well", "needs_improvement", "boundaries"]
+            return json.dumps({"prompts": [
+                {"section": sections[min(2, (i - 1) * 3 // count)], "text": _pick(STUB_HINTS, f"{prompt}{i}")}
+                for i in range(1, count + 1)
+            ]})
+        return "\n".join(f"{i}. {_pick(STUB_HINTS, f'{prompt}{i}')}" for i in range(1, count + 1))
+    if "running summary" in lowered:
+        return "You have been writing about your day, what has been weighing on you and what helped."
+    if "question" in lowered or "prompt" in lowered or "hint" in lowered:
+        return _pick(STUB_HINTS, prompt)
+    return _pick(STUB_REPLIES, prompt)
+
+
+def canned_audio(text: str) -> bytes:
+    """Silent MP3 lasting about as long as reading text aloud would (~0.4 s per word)"""
+    seconds = max(1, len(text.split())) * 0.4
+    return MP3_SILENT_FRAME * int(seconds / MP3_FRAME_SECONDS)
+
+
+class LatencyProfile:
+    """Log-normal latency and error-rate injection for one stubbed provider"""
+
+    def __init__(self, provider: str, median_ms: float, p95_ms: float, error_rate: float = 0.0,
+                 chunk_ms: float = 0.0, seed: int = 0):
+        self.provider = provider
+        self.median_ms = median_ms
+        self.p95_ms = max(p95_ms, median_ms)
+        self.error_rate = error_rate
+        self.chunk_ms = chunk_ms
+        self.mu = math.log(max(median_ms, 0.001))
+        self.sigma = (math.log(max(self.p95_ms, 0.001)) - self.mu) / Z_95
+        self._random = random.Random(f"{seed}:{provider}")
+        self._lock = threading.Lock()
+
+    def sample(self):
+        """(latency seconds, whether this call fails)"""
+        with self._lock:
+            latency_ms = self._random.lognormvariate(self.mu, self.sigma) if self.median_ms > 0 else 0.0
+            fails = self._random.random() < self.error_rate
+        return latency_ms / 1000, fails
+
+    def wait(self, timeout: Optional[float] = None):
+        """Sleep for one sampled latency, then raise if this call was picked to fail"""
+        latency, fails = self.sample()
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"{self.provider} stub timed out after {timeout:.2f}s")
+        time.sleep(latency)
+        if fails:
+            raise StubProviderError(f"{self.provider} stub injected failure")
+
+    def stream(self, text: str, make_chunk, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Word chunks of text, chunk_ms apart; the first-token latency is spent before returning, like the SDKs"""
+        self.wait(timeout)
+        return self._chunks(text, make_chunk)
+
+    def _chunks(self, text: str, make_chunk) -> Iterator[Any]:
+        words = text.split(" ")
+        for i, word in enumerate(words):
+            if i and self.chunk_ms:
+                time.sleep(self.chunk_ms / 1000)
+            yield make_chunk(word if i == len(words) - 1 else word + " ")
+
+
+class StubGeminiModel:
+    """Stands in for google.generativeai.GenerativeModel"""
+
+    def __init__(self, model_name: str, profile: LatencyProfile, system_instruction: Optional[str] = None, **kwargs):
+        self.model_name = model_name
+        self.profile = profile
+        self.system_instruction = system_instruction
+
+    def generate_content(self, prompt, stream: bool = False, request_options: Optional[dict] = None, **kwargs):
+        timeout = (request_options or {}).get("timeout")
+        json_mode = (kwargs.get("generation_config") or {}).get("response_mime_type") == "application/json"
+        text = canned_text(str(prompt), json_mode)
+        if stream:
+            return self.profile.stream(text, lambda chunk: SimpleNamespace(text=chunk), timeout)
+        self.profile.wait(timeout)
+        return SimpleNamespace(text=text)
+
+
+class _StubCompletions:
+    def __init__(self, profile: LatencyProfile):
+        self.profile = profile
+
+    def create(self, model: str = "", messages=None, stream: bool = False, timeout: Optional[float] = None, **kwargs):
+        prompt = "\n\n".join(message.get("content", "") for message in messages or [])
+        text = canned_text(prompt, (kwargs.get("response_format") or {}).get("type") == "json_object")
+        if stream:
+            return self.profile.stream(
+                text,
+                lambda chunk: SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))]),
+                timeout
+            )
+        self.profile.wait(timeout)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))], model=model)
+
+
+class StubOpenAIClient:
+    """Stands in for openai.OpenAI (chat completions only)"""
+
+    def __init__(self, profile: LatencyProfile):
+        self.chat = SimpleNamespace(completions=_StubCompletions(profile))
+
+
+class _StubSpeechToText:
+    def __init__(self, profile: LatencyProfile):
+        self.profile = profile
+
+    def convert(self, file=None, model_id: str = "scribe_v1", request_options: Optional[dict] = None, **kwargs):
+        audio = file.read() if hasattr(file, "read") else (file or b"")
+        self.profile.wait((request_options or {}).get("timeout_in_seconds"))
+        return SimpleNamespace(text=_pick(STUB_TRANSCRIPTS, audio.hex()[:4096]), language_code="eng")
+
+
+class _StubTextToSpeech:
+    def __init__(self, profile: LatencyProfile):
+        self.profile = profile
+
+    def convert(self, voice_id: str = "", text: str = "", **kwargs) -> Iterator[bytes]:
+        self.profile.wait()
+        return iter([canned_audio(text)])
+
+
+class StubElevenLabsClient:
+    """Stands in for elevenlabs.client.ElevenLabs (speech-to-text and text-to-speech)"""
+
+    def __init__(self, profile: LatencyProfile):
+        self.speech_to_text = _StubSpeechToText(profile)
+        self.text_to_speech = _StubTextToSpeech(profile)
+
+
+class StubResponse:
+    """The parts of requests.Response that the voice service reads"""
+
+    def __init__(self, status_code: int, content: bytes = b"", data: Optional[dict] = None):
+        self.status_code = status_code
+        self.content = content if data is None else json.dumps(data).encode()
+        self.text = self.content.decode("utf-8", "ignore") if data is not None else ""
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class StubElevenLabsHTTP:
+    """Stands in for the requests module on ElevenLabs REST endpoints"""
+
+    def __init__(self, profile: LatencyProfile):
+        self.profile = profile
+
+    def _respond(self, handler, timeout: Optional[float] = None) -> StubResponse:
+        # Like requests, a call slower than its timeout raises instead of returning a response
+        try:
+            self.profile.wait(timeout)
+        except StubProviderError as e:
+            return StubResponse(e.status_code, data={"detail": str(e)})
+        return handler()
+
+    def post(self, url: str, headers=None, json: Optional[dict] = None, files=None, data=None,
+             timeout: Optional[float] = None, **kwargs):
+        if "/text-to-speech/" in url:
+            return self._respond(lambda: StubResponse(200, canned_audio((json or {}).get("text", ""))), timeout)
+        if url.endswith("/speech-to-text"):
+            audio = files["file"][1] if files else b""
+            return self._respond(lambda: StubResponse(200, data={
+                "text": _pick(STUB_TRANSCRIPTS, bytes(audio).hex()[:4096]),
+                "language_code": "eng",
+                "duration_seconds": len(audio) / 16000,
+                "confidence": 0.95
+            }), timeout)
+        return StubResponse(404, data={"detail": "Not found"})
+
+    def get(self, url: str, headers=None, timeout: Optional[float] = None, **kwargs):
+        if url.endswith("/voices"):
+            return self._respond(lambda: StubResponse(200, data={"voices": [
+                {"voice_id": "EXAVITQu4vr4xnSDxMaL", "name": "Bella (stub)"}
+            ]}), timeout)
+        return StubResponse(404, data={"detail": "Not found"})
+
+
+class LazyClient:
+    """Builds a client on first attribute access, once, shared by every service holding it"""
+
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        self._name = name
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    started = time.monotonic()
+                    self._client = self._factory()
+                    print(f"✅ {self._name} client ready ({(time.monotonic() - started) * 1000:.0f} ms)")
+        return self._client
+
+    @property
+    def ready(self) -> bool:
+        return self._client is not None
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
+
+class AIProviderRegistry:
+    def __init__(self):
+        self.mode = os.getenv("AI_PROVIDERS", "live").strip().lower()
+        if self.mode not in ("live", "stub"):
+            print(f"⚠️ Unknown AI_PROVIDERS={self.mode!r}, using live providers")
+            self.mode = "live"
+        self.seed = int(os.getenv("AI_STUB_SEED", "0"))
+        self.profiles = self._load_profiles(os.getenv("AI_STUB_PROFILE", ""))
+        self._clients: Dict[str, LazyClient] = {}
+        self._lock = threading.Lock()
+        if self.stubbed:
+            print(f"🧪 AI providers stubbed locally (seed {self.seed})")
+
+    @property
+    def stubbed(self) -> bool:
+        return self.mode == "stub"
+
+    def _load_profiles(self, raw: str) -> Dict[str, LatencyProfile]:
+        overrides = {}
+        if raw:
+            try:
+                overrides = json.loads(raw)
+            except json.JSONDecodeError as e:
+                print(f"❌ Invalid AI_STUB_PROFILE, using defaults: {e}")
+        profiles = {}
+        for provider, defaults in DEFAULT_PROFILES.items():
+            settings = {**defaults, **overrides.get(provider, {})}
+            profiles[provider] = LatencyProfile(provider, seed=self.seed, **settings)
+        return profiles
+
+    def api_key(self, provider: str) -> Optional[str]:
+        key = (os.getenv(API_KEY_ENV[provider]) or "").strip()
+        return key if key and key not in PLACEHOLDER_KEYS else None
+
+    def available(self, provider: str) -> bool:
+        """Whether a client for provider can be built: always when stubbed, otherwise when its key and SDK are there"""
+        if self.stubbed:
+            return True
+        return self.api_key(provider) is not None and _sdk_installed(SDK_MODULES[provider])
+
+    def _shared(self, name: str, factory: Callable[[], Any]) -> LazyClient:
+        with self._lock:
+            if name not in self._clients:
+                self._clients[name] = LazyClient(name, factory)
+            return self._clients[name]
+
+    def model_name(self, capability: str) -> str:
+        return os.getenv(f"GEMINI_MODEL_{capability.upper()}", GEMINI_CAPABILITIES[capability]["model"])
+
+    def model(self, capability: str, system_instruction: Optional[str] = None) -> LazyClient:
+        """
+        Shared Gemini model for a capability ("text", "chat", "voice", "voice_relaxed").
+        A system_instruction is set on the model once instead of being resent inside every
+        prompt; models are shared per capability and instruction.
+        """
+        settings = {key: value for key, value in GEMINI_CAPABILITIES[capability].items() if key != "model"}
+        name = f"gemini:{capability}"
+        if system_instruction:
+            settings["system_instruction"] = system_instruction
+            name += f":{_digest(system_instruction):016x}"
+        model_name = self.model_name(capability)
+        return self._shared(name, lambda: self._build_gemini(model_name, settings))
+
+    def _build_gemini(self, model_name: str, settings: Dict[str, Any]):
+        if self.stubbed:
+            return llm_telemetry.instrument_gemini(StubGeminiModel(model_name, self.profiles["gemini"], **settings),
+                                                   model_name)
+        import google.generativeai as genai
+        # configure() is process-wide, so it runs once no matter how many models are built
+        with self._lock:
+            if "gemini:configured" not in self._clients:
+                genai.configure(api_key=self.api_key("gemini"))
+                self._clients["gemini:configured"] = None
+        return llm_telemetry.instrument_gemini(genai.GenerativeModel(model_name, **settings), model_name)
+
+    def openai_client(self) -> LazyClient:
+        def build():
+            if self.stubbed:
+                return llm_telemetry.instrument_openai(StubOpenAIClient(self.profiles["openai"]))
+            import openai
+            return llm_telemetry.instrument_openai(openai.OpenAI(api_key=self.api_key("openai")))
+        return self._shared("openai", build)
+
+    def elevenlabs_client(self) -> LazyClient:
+        def build():
+            if self.stubbed:
+                return StubElevenLabsClient(self.profiles["elevenlabs"])
+            from elevenlabs.client import ElevenLabs
+            return ElevenLabs(api_key=self.api_key("elevenlabs"))
+        return self._shared("elevenlabs", build)
+
+    def elevenlabs_http(self) -> LazyClient:
+        """requests.Session (pooled keep-alive connections) for the ElevenLabs REST API"""
+        def build():
+            if self.stubbed:
+                return StubElevenLabsHTTP(self.profiles["elevenlabs"])
+            import requests
+            return requests.Session()
+        return self._shared("elevenlabs-http", build)
+
+
+# Create singleton instance
+ai_providers = AIProviderRegistry()
@@ -0,0 +1,129 @@
+"""
+App Knowledge
+Keyword index over the PAUZ feature descriptions the voice assistants rely on.
+The short core (who PAUZ is, what exists, what not to mix up) is set once as the
+model's system instruction; each turn's prompt then carries only the detailed
+sections the message is about instead of the whole description every time.
+"""
+import math
+import re
+from typing import Dict, Iterable, List, Tuple
+
+from app.services.pauz_app_context import PAUZ_APP_DESCRIPTION, PAUZ_APP_KNOWLEDGE
+from app.utils.keyword_matcher import TOKEN_RE
+
+HEADING_RE = re.compile(r"^\s*#{2,3}\s+(.+?)\s*$", re.MULTILINE)
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "can", "do", "for", "from", "how", "i", "i'm", "in",
+    "is", "it", "me", "my", "of", "on", "or", "so", "that", "the", "this", "to", "want", "what",
+    "when", "with", "you", "your",
+}
+
+# Everyday words for features that the descriptions themselves rarely use
+SYNONYMS = {
+    "stuck": "hint",
+    "blank": "hint",
+    "inspiration": "hint",
+    "idea": "hint",
+    "feel": "mood",
+    "feeling": "mood",
+    "emotion": "mood",
+    "emotional": "mood",
+    "flower": "garden",
+    "topic": "guided",
+    "category": "guided",
+    "structure": "guided",
+    "record": "voice",
+    "talk": "voice",
+    "speak": "voice",
+    "pdf": "export",
+    "download": "export",
+}
+
+# Section titles score this many times their body, so "Garden" finds the Garden section first
+TITLE_WEIGHT = 3
+
+# Sections scoring below this share of the best match are noise, not context
+MIN_RELATIVE_SCORE = 0.5
+
+
+def _terms(text: str) -> Iterable[str]:
+    for token in TOKEN_RE.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        # Plural and singular share a term ("hints" -> "hint", "categories" -> "category")
+        if len(token) > 4 and token.endswith("ies"):
+            term = token[:-3] + "y"
+        elif len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            term = token[:-1]
+        else:
+            term = token
+        yield term
+        if term in SYNONYMS:
+            yield SYNONYMS[term]
+
+
+def _clean_title(title: str) -> str:
+    return title.replace("**", "").replace("`", "").strip(" :")
+
+
+class AppKnowledge:
+    def __init__(self, text: str, core_titles: Iterable[str] = (), overview: str = ""):
+        parts = HEADING_RE.split(text)
+        preamble = parts[0].strip()
+        self.sections: List[Tuple[str, str]] = []
+        core = [preamble] if preamble else []
+        if overview:
+            core.append(overview)
+        for title, body in zip(parts[1::2], parts[2::2]):
+            body = body.strip()
+            if not body:
+                # Group headings ("## CONVERSATION GUIDELINES") only hold subsections
+                continue
+            section = f"{_clean_title(title)}:\n{body}"
+            if any(core_title.lower() in title.lower() for core_title in core_titles):
+                core.append(section)
+            else:
+                self.sections.append((title, section))
+        self.core = "\n\n".join(core)
+
+        # term -> {section index: weighted term frequency}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        for index, (title, section) in enumerate(self.sections):
+            for term in _terms(title):
+                postings = self._postings.setdefault(term, {})
+                postings[index] = postings.get(index, 0) + TITLE_WEIGHT
+            for term in _terms(section):
+                postings = self._postings.setdefault(term, {})
+                postings[index] = postings.get(index, 0) + 1
+        self._idf = {term: math.log(1 + len(self.sections) / len(postings))
+                     for term, postings in self._postings.items()}
+
+    def relevant(self, query: str, limit: int = 2) -> List[str]:
+        """Up to limit sections matching the query, best first; none when nothing matches"""
+        scores: Dict[int, float] = {}
+        for term in set(_terms(query)):
+            for index, frequency in self._postings.get(term, {}).items():
+                scores[index] = scores.get(index, 0.0) + self._idf[term] * (1 + math.log(frequency))
+        best = sorted(scores, key=lambda index: (-scores[index], index))[:limit]
+        return [self.sections[index][1] for index in best
+                if scores[index] >= scores[best[0]] * MIN_RELATIVE_SCORE]
+
+    def context_for(self, query: str, limit: int = 2) -> str:
+        """Prompt block with the sections relevant to query ("" when the core covers it)"""
+        sections = self.relevant(query, limit)
+        if not sections:
+            return ""
+        return "RELEVANT PAUZ DETAILS:\n" + "\n\n".join(sections)
+
+
+# Create singleton instances, one per description the assistants use
+pauz_knowledge = AppKnowledge(PAUZ_APP_KNOWLEDGE)
+app_description = AppKnowledge(
+    PAUZ_APP_DESCRIPTION,
+    core_titles=("DO NOT Confuse", "COMMON MISTAKES", "YOUR ROLE"),
+    overview="PAUZ features: Free Journaling (open writing, with AI hints when stuck), Guided Journaling "
+             "(AI prompts on a chosen topic), the Garden (mood tracking with flowers, not hints) and "
+             "journaling statistics."
+)
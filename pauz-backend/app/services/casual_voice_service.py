@@ -3,34 +3,46 @@ Casual Friendly Voice Assistant
 Actually conversational - like talking to a friend who knows the app
 """
 
-import os
 import json
 from typing import Optional, Dict, Any
-import google.generativeai as genai
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from app.services.smart_memory_service import smart_memory_service
 from app.services.voice_cache import response_cache
+from app.services.inference_service import inference_service
+from app.services.request_deadline import request_deadline
+from app.services.ai_providers import ai_providers
+from app.utils.keyword_matcher import KeywordMatcher
+
+# Cues for the friendly fallback replies, matched in one pass over the input
+FALLBACK_KEYWORDS = KeywordMatcher({
+    "stress": ["tough day", "bad day", "work stress", "stressful", "overwhelmed"],
+    "relationship": ["argument", "fight", "partner", "relationship", "broke up"],
+    "anxiety": ["anxious", "worried", "scared", "nervous", "panic"],
+    "happy": ["excited", "happy", "proud", "accomplished", "great"],
+    "gratitude": ["grateful", "thankful", "blessed"],
+    "stuck": ["stuck", "don't know", "blank", "confused", "lost"],
+    "question": ["what can i do", "help", "how does", "features"],
+    "greeting": ["hi", "hello", "hey", "what's up"],
+    "existential": ["meaning", "purpose", "who am i", "understand myself"],
+    "topic:work": ["work", "job"],
+    "topic:relationship": ["partner", "relationship"],
+    "topic:anxiety": ["anxious", "worry"]
+})
 
 class CasualVoiceService:
     """Voice assistant that sounds like a friend, not a robot"""
     
     def __init__(self):
         # Initialize Gemini with minimal restrictions
-        self.gemini_api_key = os.getenv('GEMINI_API_KEY')
-        if not self.gemini_api_key or self.gemini_api_key == 'your-gemini-api-key-here':
+        if not ai_providers.available("gemini"):
             raise ValueError("GEMINI_API_KEY not configured")
         
-        try:
-            genai.configure(api_key=self.gemini_api_key)
-            # Use gemini-1.5-flash which is available
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
-            print("✅ Casual Voice Assistant initialized")
-        except Exception as e:
-            print(f"⚠️ Gemini failed, using fallback mode: {e}")
-            self.model = None
+        # Shared conversational model, created on first use
+        self.model = ai_providers.model("chat")
+        print("✅ Casual Voice Assistant initialized")
     
     def generate_casual_response(
         self, 
@@ -108,7 +120,8 @@ Keep it short and sweet (1-2 sentences). If they ask for help, mention the optio
         simple_prompt = random.choice(prompt_variations)
         
         try:
-            response = self.model.generate_content(simple_prompt)
+            response = inference_service.call("gemini", self.model.generate_content, simple_prompt,
+                                              request_options={"timeout": request_deadline.timeout()})
             
             # Handle the response properly
             if response.text and response.text.strip():
@@ -124,10 +137,10 @@ Keep it short and sweet (1-2 sentences). If they ask for help, mention the optio
         """Actually friendly fallback responses - super casual with VARIETY"""
         
         import random
-        input_lower = user_input.lower()
+        hits = FALLBACK_KEYWORDS.scan(user_input)
         
         # Stress/work stuff - multiple options
-        if any(word in input_lower for word in ["tough day", "bad day", "work stress", "stressful", "overwhelmed"]):
+        if "stress" in hits:
             responses = [
                 "Ugh, sounds rough. Wanna just vent about it? Free writing can help get it all out of your head.",
                 "Oh no, tough days are the worst. Sometimes just writing it all out helps you breathe again.",
@@ -137,7 +150,7 @@ Keep it short and sweet (1-2 sentences). If they ask for help, mention the optio
             return random.choice(responses)
         
         # Relationship stuff
-        if any(word in input_lower for word in ["argument", "fight", "partner", "relationship", "broke up"]):
+        if "relationship" in hits:
             responses = [
                 "Oh no, relationship stuff is the worst. Writing it down sometimes helps you see it clearer. Want to try?",
                 "Ugh, I'm sorry. Relationships can be so complicated. Want to write through what happened?",
@@ -147,7 +160,7 @@ Keep it short and sweet (1-2 sentences). If they ask for help, mention the optio
             return random.choice(responses)
         
         # Anxiety/worry
-        if any(word in input_lower for word in ["anxious", "worried", "scared", "nervous", "panic"]):
+        if "anxiety" in hits:
             responses = [
                 "Anxiety is awful, but you've got this. Sometimes just writing the spinning thoughts helps them slow down.",
                 "Ugh, that anxious feeling is the worst. Want to try writing whatever's bouncing around in your head?",
@@ -157,7 +170,7 @@ Keep it short and sweet (1-2 sentences). If they ask for help, mention the optio
             return random.choice(responses)
         
         # Happy/excited
-        if any(word in input_lower for word in ["excited", "happy", "proud", "accomplished", "great"]):
+        if "happy" in hits:
             responses = [
                 "OMG that's amazing! You should totally write about this while the feeling is fresh - capture that good stuff!",
                 "Yesss! I love that for you! Want to save this feeling? Writing it down helps you remember it later.",
@@ -167,7 +180,7 @@ Keep it short and sweet (1-2 sentences). If they ask for help, mention the optio
             return random.choice(responses)
         
         # Gratitude
-        if any(word in input_lower for word in ["grateful", "thankful", "blessed"]):
+        if "gratitude" in hits:
             responses = [
                 "I love that energy! Writing down what you're grateful for is like sunshine for your brain. Want to free write about it?",
                 "That's such a beautiful mindset! Want to list out what you're grateful for? It's like collecting happy moments.",
@@ -177,7 +190,7 @@ Keep it short and sweet (1-2 sentences). If they ask for help, mention the optio
             return random.choice(responses)
         
         # Stuck/confused
-        if any(word in input_lower for word in ["stuck", "don't know", "blank", "confused", "lost"]):
+        if "stuck" in hits:
             responses = [
                 "Totally happens to everyone! Sometimes I just start with 'blah I have no idea what to write but...' and then it flows.",
                 "Ugh, blank page syndrome is real! Want to try just writing 'I don't know what to write' over and over until something comes?",
@@ -187,7 +200,7 @@ Keep it short and sweet (1-2 sentences). If they ask for help, mention the optio
             return random.choice(responses)
         
         # General questions
-        if any(word in input_lower for word in ["what can i do", "help", "how does", "features"]):
+        if "question" in hits:
             responses = [
                 "Oh! So you can either free write about whatever's on your mind, do some guided prompts if you want structure, or track your mood. What feels good?",
                 "Hey! So we've got free writing for whatever's happening, guided prompts when you want direction, or mood tracking. What's calling to you?",
@@ -197,7 +210,7 @@ Keep it short and sweet (1-2 sentences). If they ask for help, mention the optio
             return random.choice(responses)
         
         # Greetings - be more varied
-        if any(word in input_lower for word in ["hi", "hello", "hey", "what's up"]):
+        if "greeting" in hits:
             responses = [
                 "Hey! I'm your journaling buddy - what's on your mind?",
                 "Hi there! Ready to write something or just chat?",
@@ -207,7 +220,7 @@ Keep it short and sweet (1-2 sentences). If they ask for help, mention the optio
             return random.choice(responses)
         
         # Existential stuff
-        if any(word in input_lower for word in ["meaning", "purpose", "who am i", "understand myself"]):
+        if "existential" in hits:
             responses = [
                 "Whoa, deep questions! I love it. You could either free write and see what comes up, or try some self-discovery prompts. What's your vibe?",
                 "Ooh, the big stuff! Want to free write and see what emerges, or try some prompts that explore identity?",
@@ -238,14 +251,14 @@ Keep it short and sweet (1-2 sentences). If they ask for help, mention the optio
             # Track conversation topics
             topics = smart_memory_service.get_user_preference(user_id, "topics_discussed") or []
             
-            input_lower = user_input.lower()
-            if "work" in input_lower or "job" in input_lower:
+            hits = FALLBACK_KEYWORDS.scan(user_input)
+            if "topic:work" in hits:
                 if "work_stress" not in topics:
                     topics.append("work_stress")
-            if "partner" in input_lower or "relationship" in input_lower:
+            if "topic:relationship" in hits:
                 if "relationship" not in topics:
                     topics.append("relationship")
-            if "anxious" in input_lower or "worry" in input_lower:
+            if "topic:anxiety" in hits:
                 if "anxiety" not in topics:
                     topics.append("anxiety")
             
@@ -0,0 +1,237 @@
+"""
+Circuit Breaker
+Shared per-provider breakers for Gemini, OpenAI and ElevenLabs so a dead provider
+is skipped immediately instead of costing a full timeout on every request.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose circuit is open"""
+
+    def __init__(self, provider: str, retry_in: float):
+        super().__init__(f"{provider} circuit is open (retry in {retry_in:.1f}s)")
+        self.provider = provider
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    def __init__(self, name: str,
+                 window_seconds: float = 60.0,
+                 min_calls: int = 5,
+                 error_rate_threshold: float = 0.5,
+                 slow_call_seconds: float = 10.0,
+                 slow_rate_threshold: float = 0.8,
+                 open_seconds: float = 30.0):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate_threshold = slow_rate_threshold
+        self.open_seconds = open_seconds
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.times_opened = 0
+        # (finished_at, succeeded, latency_seconds)
+        self._calls: Deque[Tuple[float, bool, float]] = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window_seconds:
+            self._calls.popleft()
+
+    def _open(self, now: float):
+        self.state = OPEN
+        self.opened_at = now
+        self.probe_in_flight = False
+        self.times_opened += 1
+        print(f"🔌 Circuit opened for {self.name}")
+
+    def is_available(self) -> bool:
+        """Cheap check without claiming a half-open probe slot"""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() - self.opened_at >= self.open_seconds
+            if self.state == HALF_OPEN:
+                return not self.probe_in_flight
+            return True
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; in half-open only one probe is let through"""
+        with self._lock:
+            now = time.monotonic()
+            if self.state == OPEN:
+                if now - self.opened_at < self.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+                self.probe_in_flight = False
+                print(f"🔎 Circuit half-open for {self.name}, probing")
+            if self.state == HALF_OPEN:
+                if self.probe_in_flight:
+                    return False
+                self.probe_in_flight = True
+            return True
+
+    def record(self, succeeded: bool, latency: float):
+        with self._lock:
+            now = time.monotonic()
+            if self.state == HALF_OPEN:
+                if succeeded and latency < self.slow_call_seconds:
+                    self.state = CLOSED
+                    self._calls.clear()
+                    print(f"✅ Circuit closed for {self.name}")
+                else:
+                    self._open(now)
+                    return
+            elif self.state == OPEN:
+                # A call that started before the circuit opened
+                return
+
+            self._calls.append((now, succeeded, latency))
+            self._trim(now)
+            if len(self._calls) < self.min_calls:
+                return
+            error_rate, slow_rate = self._rates()
+            if error_rate >= self.error_rate_threshold or slow_rate >= self.slow_rate_threshold:
+                self._open(now)
+
+    def _rates(self) -> Tuple[float, float]:
+        if not self._calls:
+            return 0.0, 0.0
+        total = len(self._calls)
+        failures = sum(1 for _, ok, _ in self._calls if not ok)
+        slow = sum(1 for _, _, latency in self._calls if latency >= self.slow_call_seconds)
+        return failures / total, slow / total
+
+    def call(self, fn: Callable[..., Any], *args,
+             is_failure: Optional[Callable[[Any], bool]] = None, **kwargs) -> Any:
+        """
+        Run fn through the breaker. Raises CircuitOpenError without calling fn when open.
+        is_failure lets callers count a returned value (e.g. an HTTP 503) as a failure.
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name, max(0.0, self.open_seconds - (time.monotonic() - self.opened_at)))
+
+        started = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            self.record(False, time.monotonic() - started)
+            raise
+        self.record(not (is_failure and is_failure(result)), time.monotonic() - started)
+        return result
+
+    def stream(self, fn: Callable[..., Iterable[Any]], *args, **kwargs) -> Iterator[Any]:
+        """
+        Like call for a streaming response: fn is called (and may fail) right away, but
+        the outcome is recorded when the stream ends, not when it opens
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name, max(0.0, self.open_seconds - (time.monotonic() - self.opened_at)))
+
+        started = time.monotonic()
+        try:
+            chunks = fn(*args, **kwargs)
+        except Exception:
+            self.record(False, time.monotonic() - started)
+            raise
+        return self._recorded(chunks, started)
+
+    def _recorded(self, chunks: Iterable[Any], started: float) -> Iterator[Any]:
+        succeeded = None
+        try:
+            yield from chunks
+            succeeded = True
+        except Exception:
+            succeeded = False
+            raise
+        finally:
+            if succeeded is None:
+                # Dropped by the consumer: says nothing about the provider, but frees a half-open probe
+                self.abandon()
+            else:
+                self.record(succeeded, time.monotonic() - started)
+
+    def abandon(self):
+        """Give back a half-open probe slot for a call whose outcome is unknown"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self.probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state and health score (1.0 = healthy) for the provider"""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            error_rate, slow_rate = self._rates()
+            latencies = sorted(latency for _, _, latency in self._calls)
+            state = self.state
+            if state == OPEN and now - self.opened_at >= self.open_seconds:
+                state = HALF_OPEN
+            return {
+                "provider": self.name,
+                "state": state,
+                "health_score": 0.0 if state == OPEN else round((1 - error_rate) * (1 - slow_rate), 3),
+                "calls_in_window": len(self._calls),
+                "error_rate": round(error_rate, 3),
+                "slow_call_rate": round(slow_rate, 3),
+                "p95_latency_seconds": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3) if latencies else None,
+                "retry_in_seconds": round(max(0.0, self.open_seconds - (now - self.opened_at)), 1) if state == OPEN else 0.0,
+                "times_opened": self.times_opened
+            }
+
+    def reset(self):
+        with self._lock:
+            self.state = CLOSED
+            self.probe_in_flight = False
+            self._calls.clear()
+
+
+class CircuitBreakerRegistry:
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str) -> CircuitBreaker:
+        with self._lock:
+            if provider not in self._breakers:
+                self._breakers[provider] = CircuitBreaker(
+                    provider,
+                    window_seconds=float(os.getenv("CIRCUIT_WINDOW_SECONDS", "60")),
+                    min_calls=int(os.getenv("CIRCUIT_MIN_CALLS", "5")),
+                    error_rate_threshold=float(os.getenv("CIRCUIT_ERROR_RATE", "0.5")),
+                    slow_call_seconds=float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "10")),
+                    open_seconds=float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+                )
+            return self._breakers[provider]
+
+    def call(self, provider: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return self.get(provider).call(fn, *args, **kwargs)
+
+    def stream(self, provider: str, fn: Callable[..., Iterable[Any]], *args, **kwargs) -> Iterator[Any]:
+        return self.get(provider).stream(fn, *args, **kwargs)
+
+    def is_available(self, provider: str) -> bool:
+        return self.get(provider).is_available()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+# Create singleton instance with the providers the app talks to
+circuit_breakers = CircuitBreakerRegistry()
+for _provider in ("gemini", "openai", "elevenlabs"):
+    circuit_breakers.get(_provider)
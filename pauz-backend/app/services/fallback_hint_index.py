@@ -0,0 +1,142 @@
+"""
+Fallback Hint Index
+TF-IDF index over the hand-written fallback hints, built once at startup as
+NumPy arrays (sparse columns per term). When no AI provider answers, the hint
+that best matches the recent writing and that the session has not seen yet is
+picked in well under a millisecond, instead of a random one.
+"""
+import random
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from app.services.fallback_hints import FALLBACK_HINTS
+
+TOKEN_RE = re.compile(r"[a-z']+")
+
+# Words every hint or entry uses; they only blur the ranking
+STOPWORDS = frozenset(
+    "i me my myself we our you your he she it they them his her the a an and or but so to of in on at "
+    "for with is am are was were be been have has had do did does this that these those just really very "
+    "all about from as by it's i'm i've up out what how when then there than too can could would might "
+    "will if right now today".split()
+)
+SUFFIXES = ("ingly", "ness", "ing", "ed", "ly", "es", "s")
+
+# Theme keywords count this many times a hint's own words
+KEYWORD_WEIGHT = 2
+
+# Only the recent writing is matched; what the writer is on now matters most
+QUERY_CHARS = 1500
+
+
+def _stem(word: str) -> str:
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def _terms(text: str) -> List[str]:
+    words = [_stem(word) for word in TOKEN_RE.findall((text or "").lower().replace("’", "'"))
+             if word not in STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class FallbackHintIndex:
+    def __init__(self, bank: Dict[str, dict] = FALLBACK_HINTS, general_theme: str = "general",
+                 max_sessions: int = 10000):
+        self.hints: List[str] = []
+        self.themes: List[str] = []
+        documents: List[List[str]] = []
+        for theme, group in bank.items():
+            keyword_terms = [term for keyword in group.get("keywords", []) for term in _terms(keyword)]
+            for hint in group["hints"]:
+                self.hints.append(hint)
+                self.themes.append(theme)
+                documents.append(_terms(hint) + keyword_terms * KEYWORD_WEIGHT)
+        self._general = np.array([theme == general_theme for theme in self.themes])
+
+        # Sparse term-document weights stored by term (CSC layout): the docs of term t are
+        # _doc_ids[_term_ptr[t]:_term_ptr[t + 1]] with weights _weights[...] in the same slice
+        self.vocabulary: Dict[str, int] = {}
+        rows, cols, counts = [], [], []
+        for doc, terms in enumerate(documents):
+            term_counts: Dict[int, int] = {}
+            for term in terms:
+                column = self.vocabulary.setdefault(term, len(self.vocabulary))
+                term_counts[column] = term_counts.get(column, 0) + 1
+            rows.extend([doc] * len(term_counts))
+            cols.extend(term_counts.keys())
+            counts.extend(term_counts.values())
+        rows = np.array(rows, dtype=np.int32)
+        cols = np.array(cols, dtype=np.int32)
+        document_frequency = np.bincount(cols, minlength=len(self.vocabulary))
+        self.idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1.0
+        weights = (1 + np.log(np.array(counts, dtype=np.float64))) * self.idf[cols]
+        # Unit-length documents, so long hints do not win just by having more words
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=len(documents)))
+        weights /= norms[rows]
+
+        order = np.argsort(cols, kind="stable")
+        self._doc_ids = rows[order]
+        self._weights = weights[order]
+        self._term_ptr = np.concatenate(([0], np.cumsum(document_frequency)))
+
+        self.max_sessions = max_sessions
+        # session_id -> hint indices already shown in that session (LRU-bounded)
+        self.seen: "OrderedDict[str, Set[int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def scores(self, text: str) -> np.ndarray:
+        """Cosine-style similarity of every hint to the recent part of text"""
+        query: Dict[int, int] = {}
+        for term in _terms(text[-QUERY_CHARS:]):
+            column = self.vocabulary.get(term)
+            if column is not None:
+                query[column] = query.get(column, 0) + 1
+        if not query:
+            return np.zeros(len(self.hints))
+        columns = np.fromiter(query.keys(), dtype=np.int64, count=len(query))
+        frequencies = np.fromiter(query.values(), dtype=np.float64, count=len(query))
+        query_weights = (1 + np.log(frequencies)) * self.idf[columns]
+        starts = self._term_ptr[columns]
+        lengths = self._term_ptr[columns + 1] - starts
+        # Positions of every posting of the query terms, gathered without a Python loop
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        postings = np.arange(lengths.sum()) + offsets
+        return np.bincount(self._doc_ids[postings],
+                           weights=self._weights[postings] * np.repeat(query_weights, lengths),
+                           minlength=len(self.hints))
+
+    def best(self, text: str, session_id: Optional[str] = None) -> str:
+        """Best-matching hint the session has not seen; a general hint when nothing matches"""
+        scores = self.scores(text)
+        with self._lock:
+            seen = self.seen.pop(session_id, set()) if session_id else set()
+            if len(seen) >= len(self.hints):
+                # The session has seen every hint: start the rotation over
+                seen = set()
+            available = np.ones(len(self.hints), dtype=bool)
+            available[list(seen)] = False
+
+            candidates = np.where(available, scores, -1.0)
+            choice = int(candidates.argmax())
+            if candidates[choice] <= 0:
+                general = np.flatnonzero(available & self._general)
+                pool = general if len(general) else np.flatnonzero(available)
+                choice = int(random.choice(pool))
+
+            if session_id:
+                seen.add(choice)
+                self.seen[session_id] = seen
+                while len(self.seen) > self.max_sessions:
+                    self.seen.popitem(last=False)
+        return self.hints[choice]
+
+
+# Create singleton instance
+fallback_hint_index = FallbackHintIndex()
@@ -0,0 +1,473 @@
+"""
+Fallback Hints
+Hand-written writing hints served when no AI provider answers, grouped by what
+the writer is talking about. Each theme's keywords are indexed along with its
+hints so short entries still find a match (see fallback_hint_index.py).
+The "general" theme is used when nothing in the entry matches.
+"""
+
+FALLBACK_HINTS = {
+    "sadness": {
+        "keywords": ["sad", "down", "blue", "cry", "crying", "tears", "hurt", "heavy", "low", "depressed", "empty", "numb"],
+        "hints": [
+            "What gentle comfort might this tender part of you need right now?",
+            "If this sadness could speak, what would it want you to understand?",
+            "Where in your body do you feel this heaviness, and what does it ask for?",
+            "What would you say to a close friend who felt exactly this way?",
+            "What small kindness could you offer yourself in the next hour?",
+            "When did this feeling first arrive today, and what was happening then?",
+            "What are you missing right now that this sadness is pointing toward?",
+            "What has helped you, even a little, the last time you felt this low?",
+            "What would it feel like to let these tears be welcome here?",
+            "Is there someone you wish knew how you are feeling right now?",
+            "What part of this feels too heavy to carry alone?",
+            "What is one thing, however small, that still feels steady today?",
+        ],
+    },
+    "anxiety": {
+        "keywords": ["anxious", "anxiety", "worried", "worry", "stressed", "stress", "nervous", "panic", "overwhelmed", "scared", "afraid", "fear", "tense", "overthinking"],
+        "hints": [
+            "What might happen if you gently breathed into this feeling instead of away from it?",
+            "What is the worry saying, word for word, if you let it finish its sentence?",
+            "Which part of this is in your hands today, and which part is not?",
+            "What is the most likely outcome, rather than the scariest one?",
+            "What would help your shoulders drop even a little right now?",
+            "If you wrote every worry down in a list, which one feels loudest?",
+            "What is one small next step that would make this feel more manageable?",
+            "When have you handled something that felt this overwhelming before?",
+            "What does your nervous system need from you in this moment?",
+            "What would you tell yourself if you were your own calm friend?",
+            "What are you trying to protect by worrying about this?",
+            "What can wait until tomorrow, so today can be a little lighter?",
+        ],
+    },
+    "anger": {
+        "keywords": ["angry", "anger", "mad", "furious", "frustrated", "frustration", "annoyed", "irritated", "rage", "unfair", "resent"],
+        "hints": [
+            "What gentle boundary or loving need might this anger be protecting?",
+            "What exactly crossed a line for you, and what line was it?",
+            "If your anger had a message for someone, what would it say without holding back?",
+            "What did you need in that moment that you did not get?",
+            "What part of this frustration is about now, and what part is older?",
+            "What would standing up for yourself look like here, kindly but clearly?",
+            "What is underneath the anger: hurt, fear, tiredness, or something else?",
+            "How would you like this situation to be different next time?",
+            "What would let some of this heat move through you safely today?",
+            "What value of yours feels ignored or stepped on right now?",
+            "What would you need to hear to feel understood about this?",
+            "Is there a request hiding inside this frustration?",
+        ],
+    },
+    "happiness": {
+        "keywords": ["happy", "joy", "joyful", "glad", "smile", "smiling", "laugh", "laughed", "fun", "great", "wonderful", "amazing", "good day"],
+        "hints": [
+            "What makes this moment feel so sweet and precious to you?",
+            "What exactly sparked this good feeling? Describe it in detail.",
+            "Who or what made today brighter, and have you told them?",
+            "How does this happiness feel in your body right now?",
+            "What would help you remember this moment on a harder day?",
+            "What did you do that helped this good day happen?",
+            "How could you invite a little more of this into your week?",
+            "What are you enjoying about yourself today?",
+            "If you could save one image from today, what would it be?",
+            "What does this joy tell you about what matters to you?",
+            "Who would you love to share this feeling with?",
+            "What small detail from today made you smile the most?",
+        ],
+    },
+    "gratitude": {
+        "keywords": ["grateful", "gratitude", "thankful", "thanks", "appreciate", "blessed", "lucky", "fortunate"],
+        "hints": [
+            "What else are you quietly thankful for today that is easy to overlook?",
+            "Who made a difference to you recently, and how did they do it?",
+            "What ordinary thing would you miss most if it disappeared?",
+            "How could you express this gratitude to someone this week?",
+            "What challenge are you grateful for, looking back on it now?",
+            "What part of yourself are you thankful for today?",
+            "What simple comfort made today easier?",
+            "What did someone do for you that they may not know mattered?",
+            "How does gratitude change the way you see today?",
+            "What is a place you are grateful to have in your life?",
+            "What lesson from this year are you thankful to have learned?",
+            "What would a thank-you letter to this season of your life say?",
+        ],
+    },
+    "calm": {
+        "keywords": ["calm", "peace", "peaceful", "relaxed", "relax", "quiet", "still", "rest", "serene", "slow", "content", "meditate", "breathe"],
+        "hints": [
+            "What helped you arrive at this calm today?",
+            "What do you notice around you when everything slows down like this?",
+            "How could you return to this feeling when things get busy again?",
+            "What does your mind wander to when it is this quiet?",
+            "What is this stillness making room for?",
+            "What does contentment look like for you right now?",
+            "Which sounds, smells or textures are part of this peaceful moment?",
+            "What did you let go of to feel this settled?",
+            "What would a whole day of feeling like this include?",
+            "What is your breath telling you about how you are?",
+            "What thoughts can simply pass by today without needing an answer?",
+            "Who or what helps you feel this grounded?",
+        ],
+    },
+    "excitement": {
+        "keywords": ["excited", "exciting", "thrilled", "can't wait", "looking forward", "eager", "energized", "pumped", "new opportunity"],
+        "hints": [
+            "What are you most looking forward to, and why does it matter to you?",
+            "How can you channel this energy into something meaningful today?",
+            "What do you imagine happening when this finally arrives?",
+            "What part of this excitement also carries a little nervousness?",
+            "What would make this experience even better than you hope?",
+            "Who do you want beside you when this happens?",
+            "What does this excitement say about what you want more of?",
+            "How do you want to remember this anticipation later?",
+            "What step could you take today to move toward it?",
+            "What surprised you about how excited you feel?",
+            "What would your younger self think about this?",
+            "What do you want to notice and savour when the moment comes?",
+        ],
+    },
+    "loneliness": {
+        "keywords": ["lonely", "alone", "isolated", "left out", "nobody", "no one", "disconnected", "invisible", "miss people"],
+        "hints": [
+            "What kind of connection are you longing for right now?",
+            "When did you last feel truly seen by someone, and what made it so?",
+            "Who is one person you could reach out to, even with a small message?",
+            "What would being a good companion to yourself look like tonight?",
+            "What makes it hard to reach out when you feel this way?",
+            "Where do you feel most at home around other people?",
+            "What do you wish someone would ask you today?",
+            "What is the difference between being alone and feeling lonely for you?",
+            "What small shared activity might feel manageable this week?",
+            "What would you want a friend to know about how today has been?",
+            "What parts of you feel unseen at the moment?",
+            "What places or communities have made you feel welcome before?",
+        ],
+    },
+    "grief": {
+        "keywords": ["grief", "grieving", "loss", "lost", "died", "death", "passed away", "funeral", "gone", "mourning", "miss him", "miss her"],
+        "hints": [
+            "What do you most want to remember about who or what you lost?",
+            "What would you say to them if you could speak one more time?",
+            "How is your grief showing up today, in your body or your days?",
+            "What small ritual might help you honour this loss?",
+            "What do you wish people understood about what you are carrying?",
+            "Which memory keeps returning to you lately?",
+            "What has this loss changed about how you see your life?",
+            "Who else is grieving alongside you, and how are they?",
+            "What do you need on the hardest days, practically and emotionally?",
+            "What did they teach you that you still carry with you?",
+            "What would it mean to let both love and sadness be here together?",
+            "What feels unfinished, and how might you tend to it gently?",
+        ],
+    },
+    "work": {
+        "keywords": ["work", "job", "boss", "manager", "office", "meeting", "deadline", "project", "career", "coworker", "colleague", "promotion", "shift"],
+        "hints": [
+            "How might your work gently connect to your deeper values and purpose?",
+            "What part of your work day gave you energy, and what drained it?",
+            "What would you change about work tomorrow if you could change one thing?",
+            "What are you proud of accomplishing at work lately?",
+            "What conversation at work have you been putting off, and why?",
+            "Where is the line between work and rest for you right now?",
+            "What does your ideal work week look like, honestly?",
+            "What skill are you quietly growing through this job?",
+            "How do you want to feel when you close your laptop today?",
+            "What would you tell a friend who described your work situation to you?",
+            "Which expectations at work are yours, and which belong to others?",
+            "What is one boundary that would make work feel lighter?",
+        ],
+    },
+    "study": {
+        "keywords": ["study", "studying", "exam", "exams", "school", "class", "university", "college", "homework", "grades", "teacher", "lecture", "assignment"],
+        "hints": [
+            "What are you learning right now that genuinely interests you?",
+            "What makes studying hard today, and what would make it a little easier?",
+            "How do you want to feel walking out of this exam?",
+            "What does success in school mean to you, apart from grades?",
+            "What is one topic you understand better now than a month ago?",
+            "Who helps you learn best, and how do they do it?",
+            "What pressure are you carrying about school, and where does it come from?",
+            "What would a kind study plan for this week look like?",
+            "What did you learn about yourself while studying lately?",
+            "How could you rest without feeling guilty about it?",
+            "What question do you wish you had time to explore properly?",
+            "What would you tell first-year you about this stage?",
+        ],
+    },
+    "money": {
+        "keywords": ["money", "rent", "bills", "salary", "debt", "budget", "afford", "expensive", "savings", "pay", "broke", "financial"],
+        "hints": [
+            "What feelings come up when you think about money right now?",
+            "What would feeling financially safe look like for you?",
+            "What is one small step that would ease your money worries this month?",
+            "What did you learn about money growing up?",
+            "What do you spend on that truly makes your life better?",
+            "What money decision are you weighing, and what matters most in it?",
+            "Who could you talk to honestly about this financial stress?",
+            "What would you do differently if money were less of a worry?",
+            "What are you proud of in how you have handled money lately?",
+            "Which money fears are facts, and which are what-ifs?",
+            "What does enough mean to you?",
+            "How does money stress affect the rest of your day?",
+        ],
+    },
+    "family": {
+        "keywords": ["family", "mom", "mum", "dad", "mother", "father", "parents", "brother", "sister", "siblings", "kids", "children", "son", "daughter", "grandma", "grandpa"],
+        "hints": [
+            "What role do you usually play in your family, and does it still fit?",
+            "What do you wish your family understood about you right now?",
+            "Which family memory has been on your mind lately?",
+            "What do you appreciate about your family, even when it is complicated?",
+            "What conversation would you like to have with a family member?",
+            "What family pattern would you like to keep, and which would you change?",
+            "How do you take care of yourself around family tension?",
+            "What did you learn from your parents that you are grateful for?",
+            "What boundary with family would protect your peace?",
+            "How do you want your own home to feel?",
+            "Who in your family feels easiest to be yourself around?",
+            "What would you like to tell your family that is hard to say?",
+        ],
+    },
+    "friends": {
+        "keywords": ["friend", "friends", "friendship", "hang out", "party", "met", "talked", "conversation", "group chat", "bestie"],
+        "hints": [
+            "What do these friendships give you that nothing else does?",
+            "Which friend have you been thinking about, and why?",
+            "What kind of friend do you want to be this season?",
+            "What made that conversation stay with you?",
+            "Which friendships feel nourishing, and which feel draining?",
+            "What would you like to do with a friend that you have not done in a while?",
+            "What do you wish a friend knew about what you are going through?",
+            "How have your friendships changed over the past year?",
+            "What is something a friend said that you keep coming back to?",
+            "What makes you feel truly at ease with someone?",
+            "How could you reach out to someone you have lost touch with?",
+            "What do you need from your friends right now?",
+        ],
+    },
+    "romance": {
+        "keywords": ["love", "partner", "relationship", "boyfriend", "girlfriend", "husband", "wife", "dating", "date", "crush", "romantic"],
+        "hints": [
+            "How might this connection gently help you understand yourself better?",
+            "What do you love most about how this person sees you?",
+            "What do you need more of in this relationship right now?",
+            "What is one thing you admire about your partner today?",
+            "What would feeling truly cared for look like for you?",
+            "What conversation would bring the two of you closer?",
+            "What are you learning about love through this relationship?",
+            "What part of you do you hold back, and why?",
+            "How do you show love, and how do you like to receive it?",
+            "What moment with them recently made you feel close?",
+            "What hopes do you have for this relationship over the next year?",
+            "What would a kind, honest check-in with them include?",
+        ],
+    },
+    "heartbreak": {
+        "keywords": ["breakup", "broke up", "heartbroken", "ex", "divorce", "rejected", "rejection", "cheated", "left me", "moving on"],
+        "hints": [
+            "What do you miss most, and what do you not miss at all?",
+            "What did this relationship teach you about what you need?",
+            "What part of the ending still feels unresolved?",
+            "How are you taking care of your heart this week?",
+            "What would you like to believe about yourself after this?",
+            "What story are you telling yourself about why it ended?",
+            "Who helps you feel like yourself again?",
+            "What would you want from your next relationship that was missing here?",
+            "What part of your life do you want to reclaim for yourself now?",
+            "What feelings are hardest to admit about this ending?",
+            "What would healing look like a month from now?",
+            "What did you give in this relationship that you want to keep giving yourself?",
+        ],
+    },
+    "health": {
+        "keywords": ["health", "sick", "ill", "doctor", "pain", "body", "exercise", "gym", "workout", "run", "walk", "diet", "eating", "hospital", "injury"],
+        "hints": [
+            "How is your body feeling today, and what is it asking for?",
+            "What does caring for your health look like this week, realistically?",
+            "What kind of movement actually feels good to you?",
+            "What has your body carried you through lately?",
+            "How do you talk to yourself about your body?",
+            "What small habit would make tomorrow feel better physically?",
+            "What worries about your health are on your mind?",
+            "How does your mood change when you move your body?",
+            "What does rest mean for your body right now?",
+            "What would you like to thank your body for today?",
+            "What support do you need to take care of your health?",
+            "How do you feel after the meals that nourish you most?",
+        ],
+    },
+    "sleep": {
+        "keywords": ["sleep", "tired", "exhausted", "insomnia", "awake", "nap", "fatigue", "drained", "burnout", "can't sleep", "night"],
+        "hints": [
+            "What keeps your mind busy when you try to rest?",
+            "What would a gentle evening routine look like for you?",
+            "What is draining your energy most at the moment?",
+            "What would you drop from your week if you gave yourself permission?",
+            "How does tiredness change the way you see your day?",
+            "What helps you wind down, even a little?",
+            "What could you set down on this page so it does not follow you to bed?",
+            "When did you last feel truly rested, and what made it possible?",
+            "What is your body telling you through this tiredness?",
+            "What would real rest look like, beyond just sleeping?",
+            "What thoughts tend to visit you in the middle of the night?",
+            "What is one thing you could do tonight to be kinder to tomorrow's you?",
+        ],
+    },
+    "self_worth": {
+        "keywords": ["not enough", "failure", "failed", "worthless", "confidence", "insecure", "compare", "comparing", "ashamed", "guilty", "imposter", "proud"],
+        "hints": [
+            "What would you say to a friend who spoke about themselves this way?",
+            "What evidence do you have that you are more capable than you feel today?",
+            "Where did this harsh inner voice first come from?",
+            "What is something you did well recently, however small?",
+            "What would self-respect look like in this situation?",
+            "Who are you comparing yourself to, and what do you not see of their life?",
+            "What do the people who love you see in you?",
+            "What mistake can you forgive yourself for today?",
+            "What quality of yours do you quietly like?",
+            "How would you treat yourself if you believed you were enough?",
+            "What are you proud of that nobody else noticed?",
+            "What would it feel like to be on your own side today?",
+        ],
+    },
+    "decisions": {
+        "keywords": ["decide", "decision", "choice", "choose", "options", "unsure", "confused", "dilemma", "should i", "torn", "crossroads"],
+        "hints": [
+            "If you already knew the answer, what would it be?",
+            "What matters most to you in this decision, in one sentence?",
+            "What are you afraid will happen if you choose wrong?",
+            "How would each option feel a year from now?",
+            "What would you advise someone you love in this same position?",
+            "What information are you still missing, and how could you get it?",
+            "Which option feels more like you?",
+            "What would you choose if nobody else's opinion counted?",
+            "What is the smallest step that would make this clearer?",
+            "What does your gut keep telling you, quietly?",
+            "What are you giving up with each choice, and can you accept that?",
+            "What would make this decision feel less final?",
+        ],
+    },
+    "future": {
+        "keywords": ["future", "goal", "goals", "dream", "plan", "plans", "someday", "next year", "hope", "ambition", "purpose", "direction"],
+        "hints": [
+            "What might your future self gently tell you about this?",
+            "What does a good life look like to you five years from now?",
+            "What small step this week would move you toward that dream?",
+            "What is holding you back from starting?",
+            "Which goal feels truly yours, and which one feels borrowed?",
+            "What would you attempt if you knew you could not fail?",
+            "How do you want to feel when you look back on this year?",
+            "What does purpose mean to you at this point in your life?",
+            "What are you hoping for that you have not said out loud yet?",
+            "What would progress look like, even if it is slow?",
+            "What habits would your future self thank you for?",
+            "What can you let go of to make room for what is next?",
+        ],
+    },
+    "change": {
+        "keywords": ["change", "changes", "moving", "moved", "new job", "new city", "transition", "starting over", "different", "leaving", "fresh start"],
+        "hints": [
+            "What is this change asking you to let go of?",
+            "What are you hoping this new chapter will bring?",
+            "What feels uncertain right now, and what feels steady?",
+            "How have you handled big changes in the past?",
+            "What parts of your old routine do you want to bring with you?",
+            "What would help you feel more at home in this new situation?",
+            "What are you grieving, even about a change you wanted?",
+            "What surprises you about how you are adapting?",
+            "Who could support you through this transition?",
+            "What would you like this change to teach you?",
+            "What does a good first month look like in this new chapter?",
+            "What is one thing you are curious about now that things are different?",
+        ],
+    },
+    "creativity": {
+        "keywords": ["create", "creative", "art", "draw", "drawing", "paint", "music", "song", "write", "writing", "poem", "idea", "ideas", "build", "make"],
+        "hints": [
+            "What are you itching to create right now, even if it is messy?",
+            "What inspired this idea, and where could it go next?",
+            "What gets in the way of your creative time?",
+            "How do you feel while you are making something?",
+            "What would you create if nobody would ever see it?",
+            "Which artist or creator has moved you lately, and why?",
+            "What small creative act could you do in the next ten minutes?",
+            "What does your inner critic say, and what does your inner child say?",
+            "What are you learning through this creative project?",
+            "When did you last lose track of time making something?",
+            "What would it feel like to share this work with someone?",
+            "What colours, sounds or words describe your mood right now?",
+        ],
+    },
+    "nature": {
+        "keywords": ["nature", "park", "outside", "outdoors", "trees", "sky", "sun", "rain", "beach", "ocean", "sea", "hike", "garden", "forest", "mountains"],
+        "hints": [
+            "What did you notice outside today that made you pause?",
+            "How does being outdoors change your mood?",
+            "What place in nature feels most like home to you?",
+            "What did the weather feel like, and how did it match your mood?",
+            "What small living thing caught your attention lately?",
+            "How could you spend a little more time outside this week?",
+            "What does the sky look like right now, and what does it stir in you?",
+            "What memory do you have of a place in nature that calmed you?",
+            "What seasons of nature feel like seasons in your own life?",
+            "What would a slow walk today help you think through?",
+            "What sounds do you hear when you step outside?",
+            "What is growing in your life, the way things grow in a garden?",
+        ],
+    },
+    "home": {
+        "keywords": ["home", "house", "apartment", "room", "roommate", "cleaning", "chores", "cook", "cooked", "dinner", "kitchen", "cozy", "messy"],
+        "hints": [
+            "What makes your space feel like home to you?",
+            "What small change would make your home feel calmer?",
+            "What did you cook or eat today that comforted you?",
+            "How does the state of your space reflect how you feel inside?",
+            "What part of your home do you love being in most?",
+            "What would an ideal evening at home look like tonight?",
+            "What chore have you been avoiding, and what is behind that?",
+            "Who do you love welcoming into your home?",
+            "What does cozy mean to you?",
+            "What routines at home help you feel steady?",
+            "What would you like your home to say about you?",
+            "What could you clear away, inside or out, to feel lighter?",
+        ],
+    },
+    "memories": {
+        "keywords": ["remember", "memory", "memories", "childhood", "past", "used to", "back then", "years ago", "nostalgic", "old photos", "growing up"],
+        "hints": [
+            "What does this memory still teach you today?",
+            "What would you tell your younger self in that moment?",
+            "Which details of this memory are the most vivid?",
+            "What has changed in you since then, and what has stayed the same?",
+            "Why do you think this memory is surfacing now?",
+            "Who was with you then, and where are they now?",
+            "What part of that time do you miss?",
+            "What did that version of you need that they did not get?",
+            "How does remembering this make you feel in your body?",
+            "What would you like to carry forward from that time?",
+            "What do you understand now that you could not then?",
+            "What memory would you like to create this year?",
+        ],
+    },
+    "general": {
+        "keywords": [],
+        "hints": [
+            "What else might gently want to be expressed about this?",
+            "How might this gently resonate in your body and breath?",
+            "What gentle wisdom might be hidden beneath these words?",
+            "If you could speak gently to this part of yourself, what might you ask?",
+            "What unexpected gentle insight might be emerging here?",
+            "How might this connect to your larger life journey with grace?",
+            "What gentle medicine does this experience offer you?",
+            "How might you meet this with more gentle compassion?",
+            "What gentle transformation is this moment softly inviting?",
+            "What have you not written yet that you are circling around?",
+            "What would you write if you knew nobody would ever read this?",
+            "What is the feeling underneath the last thing you wrote?",
+            "What question would you most like answered right now?",
+            "What are you noticing about yourself as you write this?",
+            "If this page could give you one piece of advice, what would it be?",
+            "What would make the rest of today feel meaningful?",
+        ],
+    },
+}
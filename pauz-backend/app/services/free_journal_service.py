@@ -3,12 +3,12 @@ Free Journal Service with FREE Google Gemini AI Generation
 Uses Gemini for unique hint generation while using Raindrop for storage
 """
 import os
+import re
 import uuid
 import base64
 import json
 from datetime import datetime
-from typing import Optional, List
-from elevenlabs.client import ElevenLabs
+from typing import Iterator, Optional, List
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -19,21 +19,57 @@ from app.database import get_session
 from fastapi import Depends
 from app.services.garden_service import garden_service
 from app.utils import pdf_generator
+from app.utils.text_stats import update_text_stats
+from app.utils.keyword_matcher import KeywordMatcher
+from app.services.mood_samples import MOOD_KEYWORDS
+from app.services.mood_classifier import MOODS, mood_classifier
 from app.services.smart_storage_service import smart_storage_service
-
-# Import Google Gemini for FREE AI generation
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-
-# Import OpenAI as backup
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+from app.services.hedged_executor import hedged_executor
+from app.services.starter_hint_pool import starter_hint_pool, STARTER_HINTS
+from app.services.session_summary_service import session_summary_service
+from app.services.hint_cache import hint_cache
+from app.services.fallback_hint_index import fallback_hint_index
+from app.services.personalization_service import personalization_service
+from app.services.llm_streaming import sentences, sse_event, stream_gemini, stream_openai
+from app.services.circuit_breaker import circuit_breakers
+from app.services.inference_service import inference_service, INTERACTIVE, BACKGROUND
+from app.services.request_deadline import request_deadline
+from app.services.ai_providers import ai_providers
+from app.services.structured_output import MOOD_ANALYSIS_SCHEMA, gemini_json_config, parse_structured
+
+
+# Every keyword list used on journal text, scanned in a single pass per entry
+CONTENT_KEYWORDS = KeywordMatcher({
+    **{f"mood:{mood}": keywords for mood, keywords in MOOD_KEYWORDS.items()},
+    "insight:feeling": ["feel", "feeling", "emotion"],
+    "insight:thinking": ["think", "realize", "understand"],
+    "insight:gratitude": ["grateful", "thankful", "appreciate"],
+    "note:friend": ["met", "meet", "friend", "talked", "conversation", "chat"],
+    "note:family": ["family", "mom", "dad", "brother", "sister"],
+    "note:reach_out": ["call", "phone", "texted"],
+    "note:shower": ["shower", "bath", "clean"],
+    "note:movement": ["walk", "exercise", "gym", "workout"],
+    "note:rest": ["sleep", "rest", "nap"],
+    "note:breathe": ["meditate", "breathe", "quiet"],
+    "note:work": ["work", "job", "office", "meeting"],
+    "note:learning": ["study", "learn", "read", "book"],
+    "note:creating": ["create", "write", "make", "build"],
+    "note:meal": ["cook", "cooked", "meal", "food", "eat", "dinner", "lunch", "breakfast"],
+    "note:drink": ["coffee", "tea", "drink"],
+    "note:watching": ["movie", "show", "watch", "netflix"],
+    "note:music": ["music", "song", "listen"],
+    "note:play": ["game", "play"],
+    "note:outdoors": ["park", "nature", "outside", "sun", "rain"],
+    "note:errands": ["shop", "buy", "store", "grocery"],
+    "emotion:happy": ["happy", "joy", "excited", "great"],
+    "emotion:sad": ["sad", "cry", "down", "hurt"],
+    "emotion:anxious": ["anxious", "worry", "stress", "nervous"],
+    "emotion:grateful": ["grateful", "thankful", "blessed"],
+    "emotion:calm": ["calm", "peace", "relax"]
+})
+
+# Last line of a streamed reflection, naming the entry's mood
+REFLECTION_MOOD_LINE = re.compile(r"MOOD:\s*([a-z]+)", re.IGNORECASE)
 
 
 class FreeJournalService:
@@ -54,71 +90,110 @@ class FreeJournalService:
         
         print(f"✅ Raindrop SmartBucket client initialized for free journals: {self.application_name}")
         
-        # Try Gemini first (FREE)
-        self.gemini_api_key = os.getenv('GEMINI_API_KEY')
-        if self.gemini_api_key and GEMINI_AVAILABLE and self.gemini_api_key != 'your-gemini-api-key-here':
-            try:
-                genai.configure(api_key=self.gemini_api_key)
-                # Use gemini-2.5-flash which is available and powerful
-                self.gemini_model = genai.GenerativeModel('gemini-2.5-flash')
-                print("✅ Google Gemini client initialized for FREE AI hints")
-            except Exception as e:
-                print(f"⚠️ Gemini initialization failed: {e}")
-                self.gemini_model = None
+        # Try Gemini first (FREE); the model is shared and created on first use
+        if ai_providers.available("gemini"):
+            self.gemini_model = ai_providers.model("text")
+            print("✅ Google Gemini client ready for FREE AI hints")
         else:
             self.gemini_model = None
         
         # Fallback to OpenAI
-        self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        if self.openai_api_key and OPENAI_AVAILABLE and self.openai_api_key != 'your-openai-api-key-here':
-            try:
-                self.openai_client = openai.OpenAI(api_key=self.openai_api_key)
-                print("✅ OpenAI client initialized as backup for hints")
-            except Exception as e:
-                print(f"⚠️ OpenAI initialization failed: {e}")
-                self.openai_client = None
+        if ai_providers.available("openai"):
+            self.openai_client = ai_providers.openai_client()
+            print("✅ OpenAI client ready as backup for hints")
         else:
             self.openai_client = None
         
         # ElevenLabs for transcription
-        self.elevenlabs_client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
+        self.elevenlabs_client = ai_providers.elevenlabs_client()
 
-    def generate_real_hint(self, current_content: str = "") -> str:
+        # Overall budget for a hint before falling back to the keyword hints
+        self.hint_deadline_seconds = float(os.getenv("HINT_DEADLINE_SECONDS", "4.0"))
+
+    def generate_real_hint(self, current_content: str = "", session_id: Optional[str] = None) -> str:
         """
         Generate unique, contextual writing hints using FREE Google Gemini
         Every call generates a different, thoughtful suggestion
         """
-        print("💡 Generating unique AI hint...")
-        
-        # Try Gemini first (FREE)
-        if self.gemini_model:
-            try:
-                hint = self._generate_hint_with_gemini(current_content)
-                if hint:
-                    self._store_generated_hint(hint, current_content, "gemini")
-                    return hint
-            except Exception as e:
-                print(f"❌ Gemini hint failed: {e}")
+        # An empty page gets the same prompt for everyone: serve from the warm pool
+        if not current_content:
+            return starter_hint_pool.take(session_id, self._generate_starter_hint)
         
-        # Fallback to OpenAI
-        if self.openai_client:
-            try:
-                hint = self._generate_hint_with_openai(current_content)
-                if hint:
-                    self._store_generated_hint(hint, current_content, "openai")
-                    return hint
-            except Exception as e:
-                print(f"❌ OpenAI hint failed: {e}")
+        print("💡 Generating unique AI hint...")
+        provider, hint = self._race_hint_providers(self._prompt_context(current_content, session_id))
+        if hint:
+            self._store_generated_hint(hint, current_content, provider)
+            return hint
         
         # Intelligent fallback
-        hint = self._generate_intelligent_fallback_hint(current_content)
+        hint = self._generate_intelligent_fallback_hint(current_content, session_id)
         self._store_generated_hint(hint, current_content, "intelligent_fallback")
         return hint
 
-    def _generate_hint_with_gemini(self, current_content: str = "") -> str:
-        """Generate hint using Google Gemini"""
-        print("🤖 Using Google Gemini for hints...")
+    def _generate_starter_hint(self) -> Optional[str]:
+        """Background generator for the starter hint pool"""
+        with inference_service.on_behalf_of(priority=BACKGROUND):
+            provider, hint = self._race_hint_providers("")
+        if hint:
+            self._store_generated_hint(hint, "", provider)
+        return hint
+
+    def _race_hint_providers(self, current_content: str):
+        """Race Gemini (FREE) against a hedged OpenAI request, bounded by the hint budget"""
+        providers = []
+        # Providers with an open circuit are skipped without a network round trip
+        if self.gemini_model and circuit_breakers.is_available("gemini"):
+            providers.append(("gemini", lambda timeout: self._generate_hint_with_gemini(current_content, timeout)))
+        if self.openai_client and circuit_breakers.is_available("openai"):
+            providers.append(("openai", lambda timeout: self._generate_hint_with_openai(current_content, timeout)))
         
+        if not providers:
+            return None, None
+        return hedged_executor.race(providers, request_deadline.timeout(self.hint_deadline_seconds))
+
+    def _prompt_context(self, content: str, session_id: Optional[str] = None) -> str:
+        """Journal text for a prompt: the whole entry while short, then rolling summary plus recent writing"""
+        return session_summary_service.prompt_context(content, session_id, self._fold_session_summary)
+
+    def _fold_session_summary(self, summary: str, passage: str) -> Optional[str]:
+        """Background fold of a new passage into a session's running summary"""
+        prompt = f"""Update the running summary of someone's private journal entry.
+Keep it under 150 words, written in second person ("you"), covering the main events, feelings and themes.
+
+Summary so far: {summary or "(none yet)"}
+
+New writing:
+{passage}
+
+Return only the updated summary."""
+
+        if self.gemini_model and circuit_breakers.is_available("gemini"):
+            try:
+                response = inference_service.call("gemini", self.gemini_model.generate_content, prompt,
+                                                  request_options={"timeout": request_deadline.timeout()})
+                return response.text.strip()
+            except Exception as e:
+                print(f"❌ Gemini summary fold failed: {e}")
+
+        if self.openai_client and circuit_breakers.is_available("openai"):
+            try:
+                response = inference_service.call(
+                    "openai",
+                    self.openai_client.chat.completions.create,
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=250,
+                    temperature=0.3,
+                    timeout=request_deadline.timeout()
+                )
+                return response.choices[0].message.content.strip()
+            except Exception as e:
+                print(f"❌ OpenAI summary fold failed: {e}")
+
+        return None
+
+    def _hint_prompts(self, current_content: str = ""):
+        """System and user prompt for a hint, shared by every provider"""
         if not current_content:
             system_prompt = "You are a warm, gentle friend who creates cozy, inviting prompts for journaling. Your voice is like a soft blanket - comforting, safe, and encouraging. Create prompts that feel like a gentle invitation to share from the heart. Use words like 'perhaps', 'maybe', 'gentle', 'soft', 'inviting'. Make it feel safe and welcoming. Keep it to one warm sentence."
             user_prompt = "Generate one warm, gentle writing prompt that feels like a soft invitation to begin journaling. Make it feel safe and comforting."
@@ -128,103 +203,60 @@ class FreeJournalService:
 
 Respond with ONE gentle question that feels like a soft invitation to explore more deeply. Make it sound like a caring friend gently wondering alongside them."""
 
-        response = self.gemini_model.generate_content(f"{system_prompt}\n\n{user_prompt}")
+        return system_prompt, user_prompt
+
+    def _generate_hint_with_gemini(self, current_content: str = "", timeout: Optional[float] = None) -> str:
+        """Generate hint using Google Gemini"""
+        print("🤖 Using Google Gemini for hints...")
+        
+        system_prompt, user_prompt = self._hint_prompts(current_content)
+
+        request_options = {"timeout": timeout} if timeout else None
+        response = inference_service.call("gemini", self.gemini_model.generate_content,
+                                          f"{system_prompt}\n\n{user_prompt}", request_options=request_options,
+                                          max_wait=timeout)
         hint_text = response.text.strip()
         
         print(f"✅ Gemini hint: {hint_text}")
         return hint_text
 
-    def _generate_hint_with_openai(self, current_content: str = "") -> str:
+    def _generate_hint_with_openai(self, current_content: str = "", timeout: Optional[float] = None) -> str:
         """Generate hint using OpenAI"""
         print("🤖 Using OpenAI for hints...")
         
-        if not current_content:
-            system_prompt = "You are a warm, gentle friend who creates cozy, inviting prompts for journaling. Your voice is like a soft blanket - comforting, safe, and encouraging. Create prompts that feel like a gentle invitation to share from the heart. Use words like 'perhaps', 'maybe', 'gentle', 'soft', 'inviting'. Make it feel safe and welcoming. Keep to one warm sentence."
-            user_prompt = "Generate one warm, gentle writing prompt that feels like a soft invitation to begin journaling. Make it feel safe and comforting."
-        else:
-            system_prompt = "You are a deeply compassionate journaling companion who speaks with a soft, nurturing voice. Your questions should feel like gentle curiosity from a caring friend - never demanding, always inviting. Use words that create safety: 'perhaps', 'might', 'gentle', 'softly', 'inviting'. Your questions should feel like a warm hand on the shoulder, encouraging deeper sharing. Keep to one tender sentence."
-            user_prompt = f"""Someone is sharing their heart in their journal and has written: "{current_content}"
-
-Respond with ONE gentle question that feels like a soft invitation to explore more deeply. Make it sound like a caring friend gently wondering alongside them."""
+        system_prompt, user_prompt = self._hint_prompts(current_content)
 
-        response = self.openai_client.chat.completions.create(
+        response = inference_service.call(
+            "openai",
+            self.openai_client.chat.completions.create,
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
             max_tokens=100,
-            temperature=0.7
+            temperature=0.7,
+            timeout=timeout,
+            max_wait=timeout
         )
 
         hint_text = response.choices[0].message.content.strip()
         print(f"✅ OpenAI hint: {hint_text}")
         return hint_text
 
-    def _generate_intelligent_fallback_hint(self, current_content: str = "") -> str:
-        """Generate intelligent hints without AI based on context"""
+    def _generate_intelligent_fallback_hint(self, current_content: str = "", session_id: Optional[str] = None) -> str:
+        """Best-matching hand-written hint for the recent writing that this session has not seen yet"""
         import random
         
         if not current_content:
-            starter_hints = [
-                "Perhaps you might gently notice what's present in your heart right now?",
-                "What soft whisper is wanting to be heard through you today?",
-                "If your breath could share a story, what might it lovingly say?",
-                "What gentle emotion is gently asking for your warm attention?",
-                "What tender truth is softly waiting to be discovered here?",
-                "What part of you might benefit from a little extra compassion right now?",
-                "How might you meet this moment with gentle kindness?",
-                "What warm wisdom is your heart gently holding?",
-                "What does your soft intuition want you to know?",
-                "How are you really, beneath all the gentle shoulds and musts?"
-            ]
-            return random.choice(starter_hints)
-        
-        # Analyze content for intelligent contextual hints
-        content_lower = current_content.lower()
-        
-        # Emotional cues with softer language
-        if any(word in content_lower for word in ["sad", "depressed", "down", "blue"]):
-            return "What gentle comfort might this tender part of you need right now?"
-        
-        if any(word in content_lower for word in ["happy", "joy", "grateful", "excited"]):
-            return "What makes this moment feel so sweet and precious to you?"
-        
-        if any(word in content_lower for word in ["anxious", "worried", "stressed", "nervous"]):
-            return "What might happen if you gently breathed into this feeling instead of away from it?"
-        
-        if any(word in content_lower for word in ["angry", "frustrated", "annoyed", "mad"]):
-            return "What gentle boundary or loving need might this anger be protecting?"
-        
-        # Content cues with softer approach
-        if "work" in content_lower or "job" in content_lower:
-            return "How might your work gently connect to your deeper values and purpose?"
-        
-        if "family" in content_lower or "friend" in content_lower:
-            return "What gentle role do these relationships play in your growth right now?"
-        
-        if "love" in content_lower or "relationship" in content_lower:
-            return "How might this connection gently help you understand yourself better?"
-        
-        # General continuation hints with softer voice
-        continuation_hints = [
-            "What else might gently want to be expressed about this?",
-            "How might this gently resonate in your body and breath?",
-            "What gentle wisdom might be hidden beneath these words?",
-            "If you could speak gently to this part of yourself, what might you ask?",
-            "What unexpected gentle insight might be emerging here?",
-            "How might this connect to your larger life journey with grace?",
-            "What might your future self gently tell you about this?",
-            "What gentle medicine does this experience offer you?",
-            "How might you meet this with more gentle compassion?",
-            "What gentle transformation is this moment softly inviting?"
-        ]
-        
-        return random.choice(continuation_hints)
+            return random.choice(STARTER_HINTS)
+        
+        return fallback_hint_index.best(current_content, session_id)
 
     def _store_generated_hint(self, hint_text: str, context: str, ai_type: str):
         """Store generated hint in Raindrop for tracking"""
-        if not self.client:
+        # Tracking only: not worth delaying the hint past its deadline
+        if not self.client or request_deadline.nearly_spent("hint_store"):
             return
         
         try:
@@ -245,7 +277,8 @@ Respond with ONE gentle question that feels like a soft invitation to explore mo
                 },
                 key=hint_data["id"],
                 content=base64.b64encode(json.dumps(hint_data).encode()).decode(),
-                content_type="application/json"
+                content_type="application/json",
+                timeout=request_deadline.timeout()
             )
             
         except Exception as e:
@@ -259,14 +292,12 @@ Respond with ONE gentle question that feels like a soft invitation to explore mo
         
         db.delete(free_journal)
         db.commit()
+        session_summary_service.forget(session_id)
+        hint_cache.forget(session_id)
         return True
 
-    def analyze_mood_with_gemini(self, content: str) -> dict:
-        """Use Gemini for advanced mood analysis and reflection"""
-        if self.gemini_model:
-            print("🧠 Analyzing mood with Gemini...")
-            try:
-                system_prompt = """You are an empathetic emotional intelligence coach. Analyze the journal entry and provide:
+    def _mood_analysis_prompt(self, content: str) -> str:
+        system_prompt = """You are an empathetic emotional intelligence coach. Analyze the journal entry and provide:
 
 1. The primary emotion/mood (choose one: happy, sad, anxious, calm, reflective, excited, grateful)
 2. 2-3 deep insights about what this reveals
@@ -275,52 +306,66 @@ Respond with ONE gentle question that feels like a soft invitation to explore mo
 
 Respond in JSON format with keys: mood, insights, summary, nextQuestions"""
 
-                user_prompt = f"""Analyze the following journal entry for emotional insights and provide gentle guidance:
+        user_prompt = f"""Analyze the following journal entry for emotional insights and provide gentle guidance:
 
 {content}"""
 
-                response = self.gemini_model.generate_content(f"{system_prompt}\n\n{user_prompt}")
+        return f"{system_prompt}\n\n{user_prompt}"
+
+    def _parse_mood_analysis(self, response_text: str, content: str) -> dict:
+        """Validate the schema-constrained analysis; raises StructuredOutputError if even the repair pass fails"""
+        analysis = parse_structured("mood_analysis", response_text, MOOD_ANALYSIS_SCHEMA, "gemini")
+
+        # Empty lists/strings pass the schema but leave the reflection blank
+        if not analysis['insights']:
+            analysis['insights'] = ['Journaling helps you process your experiences.']
+        if not analysis['summary'].strip():
+            analysis['summary'] = content[:100] + "..." if len(content) > 100 else content
+        if not analysis['nextQuestions']:
+            analysis['nextQuestions'] = ['What would you like to explore further?']
+
+        # Add flower mapping - matches frontend exactly
+        flower_mapping = {
+            "happy": "happy",
+            "sad": "sad", 
+            "anxious": "anxious",
+            "calm": "calm",
+            "reflective": "reflective",
+            "excited": "excited",
+            "grateful": "grateful"
+        }
+        analysis['flower_type'] = flower_mapping.get(analysis['mood'], 'calm')
+
+        return analysis
+
+    def analyze_mood(self, content: str, session_id: Optional[str] = None) -> dict:
+        """Classify locally; only entries the classifier is unsure about go to Gemini"""
+        mood, confidence = mood_classifier.predict(content)
+        if confidence >= mood_classifier.confidence_threshold:
+            print(f"⚡ Local mood classifier: {mood} ({confidence:.2f})")
+            return self._analyze_mood_advanced(content, mood=mood)
+        
+        print(f"🤔 Local mood classifier unsure ({mood} {confidence:.2f}), escalating")
+        return self.analyze_mood_with_gemini(content, session_id)
+
+    def analyze_mood_with_gemini(self, content: str, session_id: Optional[str] = None) -> dict:
+        """Use Gemini for advanced mood analysis and reflection"""
+        if self.gemini_model:
+            print("🧠 Analyzing mood with Gemini...")
+            try:
+                prompt = self._mood_analysis_prompt(self._prompt_context(content, session_id))
+                response = inference_service.call("gemini", self.gemini_model.generate_content, prompt,
+                                                  generation_config=gemini_json_config(MOOD_ANALYSIS_SCHEMA),
+                                                  request_options={"timeout": request_deadline.timeout()})
                 response_text = response.text.strip()
                 
                 try:
-                    import json
-                    # Clean up response text to extract JSON
-                    if "```json" in response_text:
-                        json_start = response_text.find("```json") + 7
-                        json_end = response_text.find("```", json_start)
-                        json_text = response_text[json_start:json_end].strip()
-                    elif "{" in response_text and "}" in response_text:
-                        json_start = response_text.find("{")
-                        json_end = response_text.rfind("}") + 1
-                        json_text = response_text[json_start:json_end]
-                    else:
-                        json_text = response_text
-                    
-                    analysis = json.loads(json_text)
-                    
-                    # Ensure required fields
-                    analysis.setdefault('mood', 'reflective')
-                    analysis.setdefault('insights', ['Journaling helps you process your experiences.'])
-                    analysis.setdefault('summary', content[:100] + "..." if len(content) > 100 else content)
-                    analysis.setdefault('nextQuestions', ['What would you like to explore further?'])
-                    
-                    # Add flower mapping - matches frontend exactly
-                    flower_mapping = {
-                        "happy": "happy",
-                        "sad": "sad", 
-                        "anxious": "anxious",
-                        "calm": "calm",
-                        "reflective": "reflective",
-                        "excited": "excited",
-                        "grateful": "grateful"
-                    }
-                    analysis['flower_type'] = flower_mapping.get(analysis['mood'], 'calm')
-                    
+                    analysis = self._parse_mood_analysis(response_text, content)
                     print(f"✅ Gemini analysis: {analysis['mood']} mood")
                     return analysis
                     
-                except json.JSONDecodeError as e:
-                    print(f"⚠️ Gemini response not valid JSON: {e}")
+                except ValueError as e:
+                    print(f"⚠️ Gemini response did not match the analysis schema: {e}")
                     return self._analyze_mood_advanced(content)
                     
             except Exception as e:
@@ -386,25 +431,115 @@ Respond in JSON format with keys: mood, insights, summary, nextQuestions"""
         if not free_journal:
             raise ValueError("Free Journal session not found.")
         
-        free_journal.content = content
+        self._set_content(free_journal, content)
         db.add(free_journal)
         db.commit()
         db.refresh(free_journal)
+        personalization_service.record_entry(user_id, session_id, "free", content,
+                                             word_count=free_journal.word_count)
         return free_journal
 
-    def generate_hints(self, session_id: str, current_content: str, user_id: str, db: Session = Depends(get_session)) -> Hint:
-        """Generate AI-powered writing hints"""
+    def _set_content(self, free_journal: FreeJournal, content: str):
+        """Replace journal content and update its text stats from the changed tail only"""
+        stats = update_text_stats(free_journal.content, free_journal.word_count, content)
+        free_journal.content = content
+        free_journal.word_count = stats["word_count"]
+        free_journal.char_count = stats["char_count"]
+        free_journal.reading_time_seconds = stats["reading_time_seconds"]
+        free_journal.updated_at = datetime.utcnow()
+
+    def generate_hints(self, session_id: str, current_content: str, user_id: str,
+                       db: Session = Depends(get_session), another: bool = False) -> Hint:
+        """Generate AI-powered writing hints; near-identical content reuses the last hint unless `another` is asked for"""
+        cached = None if another else self._cached_hint(session_id, current_content, user_id, db)
+        if cached:
+            return cached
+        
         print(f"💡 Generating hint for session {session_id}")
         
         # Generate unique hint
-        hint_text = self.generate_real_hint(current_content)
+        hint_text = self.generate_real_hint(current_content, session_id)
         
         # Store the hint
+        return self._save_hint(session_id, user_id, hint_text, db, current_content)
+
+    def _cached_hint(self, session_id: str, current_content: str, user_id: str, db: Session) -> Optional[Hint]:
+        """The session's recent hint for near-identical content, if still stored"""
+        # Empty pages rotate through the starter pool instead
+        if not current_content.strip():
+            return None
+        hint_id = hint_cache.lookup(session_id, current_content)
+        if hint_id is None:
+            return None
+        hint = db.get(Hint, hint_id)
+        if not hint or hint.user_id != user_id or hint.session_id != session_id:
+            return None
+        print(f"♻️ Reusing hint {hint_id} for near-identical content")
+        return hint
+
+    def stream_hints(self, session_id: str, current_content: str, user_id: str,
+                     db: Session = Depends(get_session), another: bool = False) -> Iterator[str]:
+        """
+        Server-sent events for a hint: 'token' events as text arrives, then 'done' with the saved Hint.
+        Whatever was streamed is saved even if the client disconnects early.
+        """
+        parts = []
+        source = None
+        hint = None if another else self._cached_hint(session_id, current_content, user_id, db)
+        if hint:
+            yield sse_event("token", {"text": hint.hint_text})
+            yield sse_event("done", {"id": hint.id, "hint_text": hint.hint_text, "source": "cache"})
+            return
+        try:
+            if not current_content:
+                parts.append(starter_hint_pool.take(session_id, self._generate_starter_hint))
+                source = "starter_pool"
+                yield sse_event("token", {"text": parts[0]})
+            else:
+                for provider, stream in self._hint_streams(self._prompt_context(current_content, session_id)):
+                    try:
+                        for chunk in stream():
+                            parts.append(chunk)
+                            yield sse_event("token", {"text": chunk})
+                    except Exception as e:
+                        print(f"❌ {provider} hint stream failed: {e}")
+                    if parts:
+                        # Keep a partial answer rather than restarting on another provider
+                        source = provider
+                        break
+
+                if not parts:
+                    parts.append(self._generate_intelligent_fallback_hint(current_content, session_id))
+                    source = "intelligent_fallback"
+                    yield sse_event("token", {"text": parts[0]})
+
+            hint = self._save_hint(session_id, user_id, "".join(parts).strip(), db, current_content)
+            yield sse_event("done", {"id": hint.id, "hint_text": hint.hint_text, "source": source})
+        finally:
+            if hint is None and "".join(parts).strip():
+                self._save_hint(session_id, user_id, "".join(parts).strip(), db)
+
+    def _hint_streams(self, current_content: str):
+        """(provider, stream factory) pairs in preference order, skipping open circuits"""
+        system_prompt, user_prompt = self._hint_prompts(current_content)
+        streams = []
+        if self.gemini_model and circuit_breakers.is_available("gemini"):
+            streams.append(("gemini", lambda: stream_gemini(self.gemini_model, f"{system_prompt}\n\n{user_prompt}")))
+        if self.openai_client and circuit_breakers.is_available("openai"):
+            streams.append(("openai", lambda: stream_openai(
+                self.openai_client,
+                [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_prompt}],
+                model="gpt-3.5-turbo", max_tokens=100, temperature=0.7
+            )))
+        return streams
+
+    def _save_hint(self, session_id: str, user_id: str, hint_text: str, db: Session, current_content: str = "") -> Hint:
         hint = Hint(user_id=user_id, session_id=session_id, hint_text=hint_text)
         db.add(hint)
         db.commit()
         db.refresh(hint)
-        
+        if current_content.strip():
+            hint_cache.store(session_id, current_content, hint.id)
         return hint
 
     def get_hints_for_session(self, session_id: str, user_id: str, db: Session = Depends(get_session)) -> List[Hint]:
@@ -457,9 +592,13 @@ Respond in JSON format with keys: mood, insights, summary, nextQuestions"""
                 # Create a file-like object from bytes
                 audio_file_obj = BytesIO(audio_file)
                 
-                response = self.elevenlabs_client.speech_to_text.convert(
+                response = inference_service.call(
+                    "elevenlabs",
+                    self.elevenlabs_client.speech_to_text.convert,
                     model_id="scribe_v1",
-                    file=audio_file_obj
+                    file=audio_file_obj,
+                    request_options={"timeout_in_seconds": max(1, int(request_deadline.timeout()))},
+                    priority=INTERACTIVE
                 )
                 transcribed_text = response.text
                 print(f"✅ Transcription successful: {len(transcribed_text)} characters")
@@ -478,20 +617,22 @@ Respond in JSON format with keys: mood, insights, summary, nextQuestions"""
             # Append transcribed text
             if transcribed_text and transcribed_text != "[Audio recorded but transcription failed]":
                 if free_journal.content:
-                    free_journal.content += "\n" + transcribed_text
+                    self._set_content(free_journal, free_journal.content + "\n" + transcribed_text)
                 else:
-                    free_journal.content = transcribed_text
+                    self._set_content(free_journal, transcribed_text)
             else:
                 # Add a placeholder if transcription failed
                 placeholder = "\n[Voice recording - transcription unavailable]"
                 if free_journal.content:
-                    free_journal.content += placeholder
+                    self._set_content(free_journal, free_journal.content + placeholder)
                 else:
-                    free_journal.content = placeholder
+                    self._set_content(free_journal, placeholder)
 
             db.add(free_journal)
             db.commit()
             db.refresh(free_journal)
+            personalization_service.record_entry(user_id, session_id, "free", free_journal.content,
+                                                 word_count=free_journal.word_count)
 
             print(f"✅ Journal updated successfully with transcription")
             return free_journal
@@ -500,37 +641,26 @@ Respond in JSON format with keys: mood, insights, summary, nextQuestions"""
             print(f"❌ Critical error in transcribe_audio: {e}")
             raise
 
-    def _analyze_mood_advanced(self, content: str) -> dict:
-        """Advanced mood analysis with keyword patterns"""
-        content_lower = content.lower()
-        
-        # Enhanced mood analysis
-        mood_keywords = {
-            "happy": ["happy", "joy", "excited", "grateful", "optimistic", "cheerful", "wonderful", "amazing", "delighted", "pleased", "thrilled", "blessed"],
-            "sad": ["sad", "disappointed", "grief", "melancholy", "blue", "down", "upset", "hurt", "sorrowful", "depressed", "mournful"],
-            "anxious": ["anxious", "worried", "stressed", "nervous", "tense", "overwhelmed", "afraid", "fearful", "restless", "uneasy"],
-            "calm": ["calm", "peaceful", "relaxed", "serene", "tranquil", "centered", "balanced", "still", "quiet", "content"],
-            "reflective": ["reflective", "thoughtful", "contemplative", "pensive", "introspective", "curious", "wondering", "considering"],
-            "excited": ["excited", "thrilled", "enthusiastic", "eager", "energetic", "enthusiastic", "pumped", "stoked", "jazzed", "exhilarated"],
-            "grateful": ["grateful", "thankful", "appreciate", "blessed", "gratitude", "thankful", "appreciative", "indebted", "obliged"]
-        }
-        
-        mood_scores = {}
-        for mood, keywords in mood_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in content_lower)
-            mood_scores[mood] = score
+    def _analyze_mood_advanced(self, content: str, mood: Optional[str] = None) -> dict:
+        """Advanced mood analysis with keyword patterns; `mood` overrides the keyword pick (e.g. from the classifier)"""
+        hits = CONTENT_KEYWORDS.scan(content)
         
-        primary_mood = max(mood_scores, key=mood_scores.get) if any(mood_scores.values()) else "reflective"
+        if mood:
+            primary_mood = mood
+        else:
+            # Enhanced mood analysis: one point per distinct mood keyword present
+            mood_scores = {name: len(hits.get(f"mood:{name}", ())) for name in MOOD_KEYWORDS}
+            primary_mood = max(mood_scores, key=mood_scores.get) if any(mood_scores.values()) else "reflective"
         
         # Generate insights
         insights = []
         if len(content) > 200:
             insights.append("You've expressed yourself with depth and clarity.")
-        if any(word in content_lower for word in ["feel", "feeling", "emotion"]):
+        if "insight:feeling" in hits:
             insights.append("You're in touch with your emotional landscape.")
-        if any(word in content_lower for word in ["think", "realize", "understand"]):
+        if "insight:thinking" in hits:
             insights.append("You're gaining valuable insights through reflection.")
-        if any(word in content_lower for word in ["grateful", "thankful", "appreciate"]):
+        if "insight:gratitude" in hits:
             insights.append("Gratitude is bringing positive energy to your awareness.")
         
         if not insights:
@@ -578,88 +708,160 @@ Respond in JSON format with keys: mood, insights, summary, nextQuestions"""
         if not free_journal.content:
             raise ValueError("No content to analyze")
         
-        # Use AI for mood analysis
-        analysis = self.analyze_mood_with_gemini(free_journal.content)
+        # Local classifier first, AI for the entries it is unsure about
+        with request_deadline.stage("mood_analysis"):
+            analysis = self.analyze_mood(free_journal.content, session_id)
         
         # Generate a short, personal note for the garden
         garden_note = self._generate_garden_note(free_journal.content, analysis["mood"])
         
         # Create garden entry with flower mapping
+        with request_deadline.stage("garden_entry"):
+            garden_service.create_garden_entry(
+                user_id=user_id,
+                mood=analysis["mood"],
+                note=garden_note,
+                flower_type=analysis["flower_type"],
+                db=db
+            )
+        personalization_service.record_mood(user_id, analysis["mood"])
+
+        return analysis
+
+    def stream_reflection(self, session_id: str, user_id: str, db: Session = Depends(get_session)) -> Iterator[str]:
+        """
+        Validate the session, then return server-sent events for reflect_with_ai: 'status' as soon as
+        analysis starts, 'insight' per sentence when Gemini reflects, then 'reflection' with the
+        analysis once the garden entry is saved
+        """
+        free_journal = self.get_free_journal_by_session_id(session_id, user_id, db)
+        if not free_journal:
+            raise ValueError("Free Journal session not found.")
+        
+        if not free_journal.content:
+            raise ValueError("No content to analyze")
+        
+        return self._reflection_events(free_journal.content, user_id, db, session_id)
+
+    def _reflection_events(self, content: str, user_id: str, db: Session,
+                           session_id: Optional[str] = None) -> Iterator[str]:
+        yield sse_event("status", {"stage": "analyzing"})
+        mood, confidence = mood_classifier.predict(content)
+        if confidence >= mood_classifier.confidence_threshold:
+            print(f"⚡ Local mood classifier: {mood} ({confidence:.2f})")
+            analysis = self._analyze_mood_advanced(content, mood=mood)
+        else:
+            print(f"🤔 Local mood classifier unsure ({mood} {confidence:.2f}), streaming a reflection")
+            analysis = yield from self._streamed_reflection(content, session_id)
+        
         garden_service.create_garden_entry(
             user_id=user_id,
             mood=analysis["mood"],
-            note=garden_note,
+            note=self._generate_garden_note(content, analysis["mood"]),
             flower_type=analysis["flower_type"],
             db=db
         )
+        personalization_service.record_mood(user_id, analysis["mood"])
+        yield sse_event("reflection", analysis)
 
+    def _streamed_reflection(self, content: str, session_id: Optional[str] = None):
+        """
+        Stream Gemini's reflection as 'insight' events, one sentence each, and return the analysis
+        with the mood it names on its last line (keyword analysis fills in whatever is missing)
+        """
+        insights = []
+        mood = None
+        if self.gemini_model and circuit_breakers.is_available("gemini"):
+            prompt = self._reflection_prompt(self._prompt_context(content, session_id))
+            try:
+                for sentence in sentences(stream_gemini(self.gemini_model, prompt)):
+                    mood_line = REFLECTION_MOOD_LINE.search(sentence)
+                    if mood_line:
+                        sentence = sentence[:mood_line.start()].strip()
+                        mood = mood_line.group(1).lower() if mood_line.group(1).lower() in MOODS else mood
+                    if sentence:
+                        insights.append(sentence)
+                        yield sse_event("insight", {"text": sentence})
+            except Exception as e:
+                # Keep whatever was streamed; the keyword analysis covers the rest
+                print(f"❌ Gemini reflection stream failed: {e}")
+        
+        analysis = self._analyze_mood_advanced(content, mood=mood)
+        if insights:
+            analysis["insights"] = insights
         return analysis
 
+    def _reflection_prompt(self, content: str) -> str:
+        return f"""You are an empathetic emotional intelligence coach. Reflect on the journal entry below in 2-3 short sentences, speaking directly to the writer about what it reveals.
+On a last line of its own, write MOOD: followed by the primary emotion (choose one: {", ".join(MOODS)}).
+
+{content}"""
+
     def _generate_garden_note(self, content: str, mood: str) -> str:
         """Generate a short, personal note for the garden based on journal content"""
-        content_lower = content.lower()
+        hits = CONTENT_KEYWORDS.scan(content)
         
         # Extract key activities and events
         activities = []
         
         # Meeting people
-        if any(word in content_lower for word in ["met", "meet", "friend", "talked", "conversation", "chat"]):
+        if "note:friend" in hits:
             activities.append("met a friend")
-        elif any(word in content_lower for word in ["family", "mom", "dad", "brother", "sister"]):
+        elif "note:family" in hits:
             activities.append("connected with family")
-        elif any(word in content_lower for word in ["call", "phone", "texted"]):
+        elif "note:reach_out" in hits:
             activities.append("reached out to someone")
         
         # Self-care activities
-        if any(word in content_lower for word in ["shower", "bath", "clean"]):
+        if "note:shower" in hits:
             activities.append("had a shower")
-        elif any(word in content_lower for word in ["walk", "exercise", "gym", "workout"]):
+        elif "note:movement" in hits:
             activities.append("moved your body")
-        elif any(word in content_lower for word in ["sleep", "rest", "nap"]):
+        elif "note:rest" in hits:
             activities.append("got some rest")
-        elif any(word in content_lower for word in ["meditate", "breathe", "quiet"]):
+        elif "note:breathe" in hits:
             activities.append("took time to breathe")
         
         # Work/productivity
-        if any(word in content_lower for word in ["work", "job", "office", "meeting"]):
+        if "note:work" in hits:
             activities.append("worked on projects")
-        elif any(word in content_lower for word in ["study", "learn", "read", "book"]):
+        elif "note:learning" in hits:
             activities.append("learned something new")
-        elif any(word in content_lower for word in ["create", "write", "make", "build"]):
+        elif "note:creating" in hits:
             activities.append("created something")
         
         # Food/meal activities
-        if any(word in content_lower for word in ["cook", "cooked", "meal", "food", "eat", "dinner", "lunch", "breakfast"]):
+        if "note:meal" in hits:
             activities.append("enjoyed a meal")
-        elif any(word in content_lower for word in ["coffee", "tea", "drink"]):
+        elif "note:drink" in hits:
             activities.append("had a warm drink")
         
         # Leisure/fun
-        if any(word in content_lower for word in ["movie", "show", "watch", "netflix"]):
+        if "note:watching" in hits:
             activities.append("watched something")
-        elif any(word in content_lower for word in ["music", "song", "listen"]):
+        elif "note:music" in hits:
             activities.append("enjoyed music")
-        elif any(word in content_lower for word in ["game", "play"]):
+        elif "note:play" in hits:
             activities.append("had some fun")
         
         # Nature/outdoors
-        if any(word in content_lower for word in ["park", "nature", "outside", "sun", "rain"]):
+        if "note:outdoors" in hits:
             activities.append("spent time outdoors")
         
         # Shopping/errands
-        if any(word in content_lower for word in ["shop", "buy", "store", "grocery"]):
+        if "note:errands" in hits:
             activities.append("ran errands")
         
         # Emotions/feelings summary
-        if mood == "happy" or any(word in content_lower for word in ["happy", "joy", "excited", "great"]):
+        if mood == "happy" or "emotion:happy" in hits:
             emotion_desc = "felt happy"
-        elif mood == "sad" or any(word in content_lower for word in ["sad", "cry", "down", "hurt"]):
+        elif mood == "sad" or "emotion:sad" in hits:
             emotion_desc = "processed emotions"
-        elif mood == "anxious" or any(word in content_lower for word in ["anxious", "worry", "stress", "nervous"]):
+        elif mood == "anxious" or "emotion:anxious" in hits:
             emotion_desc = "managed stress"
-        elif mood == "grateful" or any(word in content_lower for word in ["grateful", "thankful", "blessed"]):
+        elif mood == "grateful" or "emotion:grateful" in hits:
             emotion_desc = "felt grateful"
-        elif mood == "calm" or any(word in content_lower for word in ["calm", "peace", "relax"]):
+        elif mood == "calm" or "emotion:calm" in hits:
             emotion_desc = "found peace"
         else:
             emotion_desc = "reflected on your day"
@@ -677,8 +879,13 @@ Respond in JSON format with keys: mood, insights, summary, nextQuestions"""
         
         return note
 
-    def export_to_pdf(self, session_id: str, user_id: str, db: Session = Depends(get_session)) -> str:
-        """Export a free journal to PDF using Vultr S3"""
+    def export_to_pdf(self, session_id: str, user_id: str, db: Session = Depends(get_session)) -> tuple[Optional[str], bytes]:
+        """
+        Export a free journal to PDF using Vultr S3: (URL, PDF bytes), with no URL when the
+        request's budget ran out before the upload finished and the PDF should be sent inline
+        """
+        from app.services.storage_service import storage_service
+
         free_journal = self.get_free_journal_by_session_id(session_id, user_id, db)
         if not free_journal:
             raise ValueError("Free Journal session not found.")
@@ -687,26 +894,8 @@ Respond in JSON format with keys: mood, insights, summary, nextQuestions"""
         
         pdf_bytes = pdf_generator.generate_pdf_free_journal(free_journal, hints)
         
-        # Upload to Vultr S3 directly - NO FALLBACKS
-        import boto3
-        vultr_access_key = os.getenv("VULTR_ACCESS_KEY")
-        vultr_secret_key = os.getenv("VULTR_SECRET_KEY")
-        vultr_region = os.getenv("VULTR_REGION")
-        vultr_bucket_name = os.getenv("VULTR_BUCKET_NAME")
-        
-        if not all([vultr_access_key, vultr_secret_key, vultr_region, vultr_bucket_name]):
-            raise ValueError("Vultr S3 credentials required for PDF export")
-        
-        s3 = boto3.client('s3',
-                         aws_access_key_id=vultr_access_key,
-                         aws_secret_access_key=vultr_secret_key,
-                         region_name=vultr_region,
-                         endpoint_url=f'https://{vultr_region}.vultrobjects.com')
-        
-        file_name = f"free_journal_{session_id}.pdf"
-        s3.put_object(Bucket=vultr_bucket_name, Key=file_name, Body=pdf_bytes, ACL='public-read')
-        
-        pdf_url = f"https://{vultr_bucket_name}.{vultr_region}.vultrobjects.com/{file_name}"
-        return pdf_url
+        # Upload to Vultr S3 directly; the PDF only goes back inline when time runs out
+        pdf_url = storage_service.upload_pdf(f"free_journal_{session_id}.pdf", pdf_bytes)
+        return pdf_url, pdf_bytes
 
 free_journal_service = FreeJournalService()
\ No newline at end of file
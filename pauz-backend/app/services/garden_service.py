@@ -1,13 +1,44 @@
-from typing import List, Optional
-from sqlmodel import Session, select
+import calendar
+from datetime import date, datetime, time, timedelta
+from typing import List, Optional, Tuple
+from sqlmodel import Session, select, func
 from app.models import Garden
 from app.database import get_session
 from fastapi import Depends
+from app.services.garden_trends_service import garden_trends_service
+
+CALENDAR_GRANULARITIES = ("week", "month", "year")
+
 
 class GardenService:
     def __init__(self):
         pass
 
+    @staticmethod
+    def _period_bounds(day: date, granularity: str) -> Tuple[date, date]:
+        """First and last day of the week/month/year containing day"""
+        if granularity == "week":
+            first = day - timedelta(days=day.weekday())
+            return first, first + timedelta(days=6)
+        if granularity == "month":
+            return day.replace(day=1), day.replace(day=calendar.monthrange(day.year, day.month)[1])
+        return date(day.year, 1, 1), date(day.year, 12, 31)
+
+    @staticmethod
+    def _period_key(day: date, granularity: str) -> str:
+        if granularity == "week":
+            return (day - timedelta(days=day.weekday())).isoformat()
+        if granularity == "month":
+            return day.strftime("%Y-%m")
+        return str(day.year)
+
+    @staticmethod
+    def _dominant(mood_counts: dict) -> Optional[str]:
+        """Most frequent mood, ties broken alphabetically"""
+        if not mood_counts:
+            return None
+        return min(mood_counts, key=lambda mood: (-mood_counts[mood], mood))
+
     def create_garden_entry(self, user_id: str, mood: str, note: Optional[str], flower_type: str, db: Session = Depends(get_session)) -> Garden:
         """
         Creates a new Garden entry and saves it to the database.
@@ -16,6 +47,7 @@ class GardenService:
         db.add(garden_entry)
         db.commit()
         db.refresh(garden_entry)
+        garden_trends_service.record_entry(garden_entry)
         return garden_entry
 
     def get_garden_entries(self, user_id: str, db: Session = Depends(get_session)) -> List[Garden]:
@@ -24,6 +56,65 @@ class GardenService:
         """
         return db.exec(select(Garden).where(Garden.user_id == user_id)).all()
 
+    def get_calendar(self, user_id: str, start: Optional[date], end: Optional[date],
+                     granularity: str = "month", db: Session = Depends(get_session)) -> dict:
+        """
+        Per-day flower counts and dominant mood for a date range, aggregated in SQL
+        with a single GROUP BY date(created_at), mood query.
+        Missing bounds default to the week/month/year containing the other bound (or today).
+        """
+        if granularity not in CALENDAR_GRANULARITIES:
+            raise ValueError(f"Invalid granularity. Choose from: {', '.join(CALENDAR_GRANULARITIES)}")
+
+        if start is None:
+            start = self._period_bounds(end or date.today(), granularity)[0]
+        if end is None:
+            end = self._period_bounds(start, granularity)[1]
+        if start > end:
+            raise ValueError("'from' must be on or before 'to'")
+
+        day_column = func.date(Garden.created_at).label("day")
+        rows = db.exec(
+            select(day_column, Garden.mood, func.count().label("count"))
+            .where(
+                Garden.user_id == user_id,
+                Garden.created_at >= datetime.combine(start, time.min),
+                Garden.created_at < datetime.combine(end + timedelta(days=1), time.min)
+            )
+            .group_by(day_column, Garden.mood)
+        ).all()
+
+        days = {}
+        periods = {}
+        for day_value, mood, count in rows:
+            day = day_value if isinstance(day_value, date) else date.fromisoformat(str(day_value))
+            days.setdefault(day, {})[mood] = count
+            period = periods.setdefault(self._period_key(day, granularity), {})
+            period[mood] = period.get(mood, 0) + count
+
+        return {
+            "from": start.isoformat(),
+            "to": end.isoformat(),
+            "granularity": granularity,
+            "days": [
+                {
+                    "date": day.isoformat(),
+                    "count": sum(moods.values()),
+                    "dominant_mood": self._dominant(moods),
+                    "moods": moods
+                }
+                for day, moods in sorted(days.items())
+            ],
+            "periods": [
+                {
+                    "period": key,
+                    "count": sum(moods.values()),
+                    "dominant_mood": self._dominant(moods)
+                }
+                for key, moods in sorted(periods.items())
+            ]
+        }
+
     def delete_garden_entry(self, flower_id: int, user_id: str, db: Session = Depends(get_session)) -> bool:
         """
         Deletes a garden entry for a user.
@@ -33,6 +124,7 @@ class GardenService:
         if garden_entry:
             db.delete(garden_entry)
             db.commit()
+            garden_trends_service.invalidate_user_cache(user_id)
             return True
         return False
 
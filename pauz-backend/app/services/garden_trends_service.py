@@ -0,0 +1,215 @@
+"""
+Garden Trends Service
+Vectorized mood analytics over a user's garden history (NumPy)
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from sqlmodel import Session, select
+
+from app.models import Garden
+
+# Flower moods produced by reflections; anything else lands in "other"
+MOODS = ["happy", "sad", "anxious", "calm", "reflective", "excited", "grateful", "other"]
+MOOD_INDEX = {mood: i for i, mood in enumerate(MOODS)}
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Arrays are sized by the requested range, so it is capped (about three years by default)
+MAX_RANGE_DAYS = int(os.getenv("GARDEN_TRENDS_MAX_DAYS", "1096"))
+# Computed results kept per user, least recently used dropped first
+MAX_CACHED_RESULTS = 16
+
+
+def _mood_code(mood: str) -> int:
+    return MOOD_INDEX.get((mood or "").lower(), MOOD_INDEX["other"])
+
+
+class GardenTrendsService:
+    def __init__(self):
+        # Per-user columnar history: {'days': datetime64[D] array, 'moods': int8 array}
+        self.columns: Dict[str, Dict[str, np.ndarray]] = {}
+        # Per-user computed results keyed by (from, to, window), LRU-bounded
+        self.results: Dict[str, "OrderedDict[Tuple[str, str, int], dict]"] = {}
+        self.cache_ttl = 300  # 5 minutes, same as stats
+        self._loaded_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _load_columns(self, user_id: str, db: Session) -> Dict[str, np.ndarray]:
+        """Pull (created_at, mood) for the user in one query and keep it as arrays"""
+        with self._lock:
+            cached = self.columns.get(user_id)
+            if cached is not None and (time.time() - self._loaded_at[user_id]) < self.cache_ttl:
+                return cached
+
+        rows = db.exec(
+            select(Garden.created_at, Garden.mood)
+            .where(Garden.user_id == user_id)
+            .order_by(Garden.created_at)
+        ).all()
+
+        days = np.array([row[0] for row in rows], dtype="datetime64[D]")
+        moods = np.fromiter((_mood_code(row[1]) for row in rows), dtype=np.int8, count=len(rows))
+
+        with self._lock:
+            self.columns[user_id] = {"days": days, "moods": moods}
+            self._loaded_at[user_id] = time.time()
+            self.results.pop(user_id, None)
+            return self.columns[user_id]
+
+    def record_entry(self, entry: Garden):
+        """Append a newly planted flower to the cached columns instead of reloading"""
+        with self._lock:
+            cached = self.columns.get(entry.user_id)
+            if cached is None:
+                return
+
+            day = np.datetime64(entry.created_at, "D")
+            code = np.int8(_mood_code(entry.mood))
+            position = np.searchsorted(cached["days"], day, side="right")
+            cached["days"] = np.insert(cached["days"], position, day)
+            cached["moods"] = np.insert(cached["moods"], position, code)
+            self.results.pop(entry.user_id, None)
+
+    def invalidate_user_cache(self, user_id: str):
+        """Drop cached history for a user (call this when flowers are deleted)"""
+        with self._lock:
+            self.columns.pop(user_id, None)
+            self.results.pop(user_id, None)
+            self._loaded_at.pop(user_id, None)
+
+    def get_trends(self, user_id: str, db: Session,
+                   start: Optional[date] = None,
+                   end: Optional[date] = None,
+                   window: int = 7) -> dict:
+        """
+        Mood trends for [start, end]: rolling distributions, streaks,
+        weekday patterns and mood-transition matrix
+        """
+        end = end or date.today()
+        start = start or (end - timedelta(days=89))
+        if start > end:
+            raise ValueError("'from' must be on or before 'to'")
+        if (end - start).days + 1 > MAX_RANGE_DAYS:
+            raise ValueError(f"Range must be at most {MAX_RANGE_DAYS} days")
+        window = max(1, window)
+
+        columns = self._load_columns(user_id, db)
+        key = (start.isoformat(), end.isoformat(), window)
+        with self._lock:
+            user_results = self.results.get(user_id)
+            cached = user_results.get(key) if user_results else None
+            if cached is not None:
+                user_results.move_to_end(key)
+        if cached is not None:
+            print(f"📋 Using cached garden trends for user: {user_id}")
+            return cached
+
+        start_time = time.time()
+        result = self._compute(columns["days"], columns["moods"], np.datetime64(start, "D"),
+                               np.datetime64(end, "D"), window)
+
+        with self._lock:
+            user_results = self.results.setdefault(user_id, OrderedDict())
+            user_results[key] = result
+            while len(user_results) > MAX_CACHED_RESULTS:
+                user_results.popitem(last=False)
+        print(f"✅ Garden trends computed in {time.time() - start_time:.3f}s for user {user_id}")
+        return result
+
+    def _compute(self, days: np.ndarray, moods: np.ndarray,
+                 start: np.datetime64, end: np.datetime64, window: int) -> dict:
+        n_moods = len(MOODS)
+        n_days = int((end - start).astype(int)) + 1
+
+        # Rows are sorted by day, so the range is a contiguous slice
+        lo = np.searchsorted(days, start, side="left")
+        hi = np.searchsorted(days, end, side="right")
+        range_days, range_moods = days[lo:hi], moods[lo:hi].astype(np.int64)
+
+        # Day x mood count matrix; the rolling window also needs the days before start
+        history_lo = np.searchsorted(days, start - np.timedelta64(window - 1, "D"), side="left")
+        history_offsets = (days[history_lo:hi] - start).astype(np.int64) + (window - 1)
+        padded = np.bincount(
+            history_offsets * n_moods + moods[history_lo:hi].astype(np.int64),
+            minlength=(n_days + window - 1) * n_moods
+        ).reshape(n_days + window - 1, n_moods)
+        daily = padded[window - 1:]
+
+        cumulative = np.vstack([np.zeros((1, n_moods), dtype=np.int64), np.cumsum(padded, axis=0)])
+        rolling = cumulative[window:] - cumulative[:-window]
+        totals = rolling.sum(axis=1, keepdims=True)
+        distribution = np.divide(rolling, totals, out=np.zeros(rolling.shape), where=totals > 0)
+
+        dates = (start + np.arange(n_days)).astype(str).tolist()
+
+        return {
+            "range": {"from": str(start), "to": str(end), "days": n_days},
+            "moods": MOODS,
+            "total_entries": int(len(range_moods)),
+            "mood_totals": dict(zip(MOODS, daily.sum(axis=0).tolist())),
+            "rolling": {
+                "window_days": window,
+                "dates": dates,
+                "distribution": {
+                    mood: np.round(distribution[:, i], 4).tolist() for i, mood in enumerate(MOODS)
+                }
+            },
+            "streaks": self._streaks(daily.sum(axis=1) > 0),
+            "weekday": self._weekday_patterns(range_days, range_moods),
+            "transitions": self._transitions(range_moods)
+        }
+
+    def _streaks(self, active: np.ndarray) -> dict:
+        """Longest and current run of consecutive days with at least one flower"""
+        if not active.any():
+            return {"current": 0, "longest": 0, "active_days": 0}
+
+        # Run boundaries of the boolean series
+        padded = np.concatenate([[False], active, [False]]).astype(np.int8)
+        edges = np.flatnonzero(np.diff(padded))
+        run_starts, run_ends = edges[::2], edges[1::2]
+        lengths = run_ends - run_starts
+
+        # The current streak may end today or yesterday (today not written yet)
+        last_end = run_ends[-1]
+        current = int(lengths[-1]) if last_end >= len(active) - 1 else 0
+
+        return {
+            "current": current,
+            "longest": int(lengths.max()),
+            "active_days": int(active.sum())
+        }
+
+    def _weekday_patterns(self, range_days: np.ndarray, range_moods: np.ndarray) -> Dict[str, Dict[str, int]]:
+        n_moods = len(MOODS)
+        # 1970-01-01 was a Thursday (weekday index 3)
+        weekdays = (range_days.astype(np.int64) + 3) % 7
+        counts = np.bincount(weekdays * n_moods + range_moods, minlength=7 * n_moods).reshape(7, n_moods)
+        return {
+            WEEKDAYS[d]: {mood: int(counts[d, i]) for i, mood in enumerate(MOODS) if counts[d, i]}
+            for d in range(7)
+        }
+
+    def _transitions(self, range_moods: np.ndarray) -> Dict[str, Dict[str, float]]:
+        """Row-normalised probability of moving from one flower's mood to the next"""
+        n_moods = len(MOODS)
+        if len(range_moods) < 2:
+            return {}
+
+        counts = np.bincount(range_moods[:-1] * n_moods + range_moods[1:],
+                             minlength=n_moods * n_moods).reshape(n_moods, n_moods)
+        row_totals = counts.sum(axis=1, keepdims=True)
+        probabilities = np.divide(counts, row_totals, out=np.zeros(counts.shape), where=row_totals > 0)
+        return {
+            MOODS[i]: {MOODS[j]: round(float(probabilities[i, j]), 4) for j in range(n_moods) if counts[i, j]}
+            for i in range(n_moods) if row_totals[i, 0]
+        }
+
+
+# Create singleton instance
+garden_trends_service = GardenTrendsService()
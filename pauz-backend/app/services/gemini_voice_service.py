@@ -4,39 +4,37 @@ Replaces rule-based responses with intelligent Gemini AI generation
 Optimized for speed with caching and fast responses
 """
 
-import os
 import json
 from typing import Optional, Dict, Any
-import google.generativeai as genai
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from app.services.voice_cache import response_cache, FAST_RESPONSES
+from app.services.inference_service import inference_service
+from app.services.request_deadline import request_deadline
+from app.services.ai_providers import ai_providers
+from app.utils.keyword_matcher import KeywordMatcher
+
+# Cues for the emergency fallback replies, matched in one pass over the input
+FALLBACK_KEYWORDS = KeywordMatcher({
+    "question": ["what", "help", "features", "do"],
+    "stuck": ["stuck", "blocked", "don't know"],
+    "getting_started": ["start", "begin", "how"]
+})
 
 class GeminiVoiceService:
     """Intelligent voice assistant service powered by Google Gemini"""
     
     def __init__(self):
         # Initialize Gemini
-        self.gemini_api_key = os.getenv('GEMINI_API_KEY')
-        if not self.gemini_api_key or self.gemini_api_key == 'your-gemini-api-key-here':
+        if not ai_providers.available("gemini"):
             raise ValueError("GEMINI_API_KEY not configured. Please set up your Gemini API key.")
         
-        try:
-            genai.configure(api_key=self.gemini_api_key)
-            # Use gemini-2.5-flash for fast, intelligent responses
-            self.model = genai.GenerativeModel(
-                'gemini-2.5-flash',
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.7,
-                    max_output_tokens=150,  # Shorter responses for voice
-                    candidate_count=1,
-                )
-            )
-            print("✅ Gemini Voice Assistant initialized (optimized for speed)")
-        except Exception as e:
-            raise ValueError(f"Failed to initialize Gemini: {e}")
+        # Shared gemini-2.5-flash with short replies for voice, created on first use; the app
+        # description is its system instruction rather than part of every prompt
+        self.model = ai_providers.model("voice", system_instruction=self.get_app_context_description())
+        print("✅ Gemini Voice Assistant initialized (optimized for speed)")
     
     def get_app_context_description(self) -> str:
         """Get comprehensive description of PAUZ app for context"""
@@ -100,8 +98,6 @@ class GeminiVoiceService:
         try:
             # Build the full prompt (optimized for speed)
             full_prompt = f"""
-            {self.get_app_context_description()}
-            
             {"**User Context:** Returning user with progress" if user_context and user_context.get('is_returning_user') else "**User Context:** New user"}
             
             User: "{user_input}"
@@ -109,7 +105,8 @@ class GeminiVoiceService:
             Respond warmly and helpfully in 1-2 sentences. Be specific about PAUZ features.
             """
             
-            response = self.model.generate_content(full_prompt)
+            response = inference_service.call("gemini", self.model.generate_content, full_prompt,
+                                              request_options={"timeout": request_deadline.timeout()})
             response_text = response.text.strip()
             
             # Cache the response
@@ -160,8 +157,6 @@ class GeminiVoiceService:
             context_parts.append(context_info)
         
         welcome_prompt = f"""
-        {self.get_app_context_description()}
-        
         **User:** {user_context.get('name', 'Friend')} - {'Returning user' if user_context.get('is_returning_user') else 'New user'}
         **Time:** {time_greeting}
         
@@ -169,7 +164,8 @@ class GeminiVoiceService:
         """
         
         try:
-            response = self.model.generate_content(welcome_prompt)
+            response = inference_service.call("gemini", self.model.generate_content, welcome_prompt,
+                                              request_options={"timeout": request_deadline.timeout()})
             welcome_text = response.text.strip()
             
             print(f"✅ Gemini Welcome: {welcome_text}")
@@ -182,15 +178,15 @@ class GeminiVoiceService:
     def _get_emergency_fallback_response(self, user_input: str) -> str:
         """Emergency fallback if Gemini fails"""
         
-        user_lower = user_input.lower()
+        hits = FALLBACK_KEYWORDS.scan(user_input)
         
-        if any(word in user_lower for word in ["what", "help", "features", "do"]):
+        if "question" in hits:
             return "I'm here to help you explore journaling through guided prompts, free writing, or gentle hints. What feels most appealing to you right now?"
         
-        elif any(word in user_lower for word in ["stuck", "blocked", "don't know"]):
+        elif "stuck" in hits:
             return "It's okay to feel stuck. Let's start with something gentle - what's present in your awareness right now?"
         
-        elif any(word in user_lower for word in ["start", "begin", "how"]):
+        elif "getting_started" in hits:
             return "I'd love to help you begin. You could try guided journaling for structure, free writing to express freely, or hints for inspiration. What calls to you?"
         
         else:
@@ -6,10 +6,24 @@ import os
 from dotenv import load_dotenv
 
 from app.services.storage_service import storage_service
+from app.services.inference_service import inference_service, BACKGROUND
+from app.services.ai_providers import ai_providers
+from app.services.structured_output import (
+    OPENAI_JSON_MODE,
+    PROMPT_SECTIONS,
+    PROMPT_SET_SCHEMA,
+    gemini_json_config,
+    parse_structured,
+)
+from app.services.prompt_pool_service import prompt_pool_service
+from app.services.prompt_prefetch_service import prompt_prefetch_service
+from app.services.personalization_service import personalization_service
+from app.services.request_deadline import request_deadline
 
 load_dotenv()
 from typing import List, Optional
 from sqlmodel import Session, select
+import re
 import uuid
 import base64
 import json
@@ -19,20 +33,6 @@ from fastapi import HTTPException
 from app.models import GuidedJournal, Prompt, GuidedJournalEntry
 from app.database import get_session
 
-# Import Google Gemini for FREE AI generation
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except ImportError:
-    GEMINI_AVAILABLE = False
-
-# Import OpenAI as backup
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-
 # Raindrop for storage - NO FALLBACKS
 try:
     from raindrop import Raindrop
@@ -100,33 +100,21 @@ class GuidedJournalService:
         
         print(f"✅ Raindrop SmartBucket client initialized for guided journals: {self.application_name}")
         
-        # Try Gemini first (FREE)
-        self.gemini_api_key = os.getenv('GEMINI_API_KEY')
-        if self.gemini_api_key and GEMINI_AVAILABLE and self.gemini_api_key != 'your-gemini-api-key-here':
-            try:
-                genai.configure(api_key=self.gemini_api_key)
-                # Use gemini-2.5-flash which is available and powerful
-                self.gemini_model = genai.GenerativeModel('gemini-2.5-flash')
-                print("✅ Google Gemini client initialized for FREE AI generation")
-            except Exception as e:
-                print(f"⚠️ Gemini initialization failed: {e}")
-                self.gemini_model = None
+        # Try Gemini first (FREE); the model is shared and created on first use
+        if ai_providers.available("gemini"):
+            self.gemini_model = ai_providers.model("text")
+            print("✅ Google Gemini client ready for FREE AI generation")
         else:
             self.gemini_model = None
-            if not self.gemini_api_key:
+            if not os.getenv('GEMINI_API_KEY'):
                 print("⚠️ GEMINI_API_KEY not found")
-            elif self.gemini_api_key == 'your-gemini-api-key-here':
+            elif os.getenv('GEMINI_API_KEY') == 'your-gemini-api-key-here':
                 print("⚠️ Please add your Gemini API key to .env")
         
         # Fallback to OpenAI
-        self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        if self.openai_api_key and OPENAI_AVAILABLE and self.openai_api_key != 'your-openai-api-key-here':
-            try:
-                self.openai_client = openai.OpenAI(api_key=self.openai_api_key)
-                print("✅ OpenAI client initialized as backup")
-            except Exception as e:
-                print(f"⚠️ OpenAI initialization failed: {e}")
-                self.openai_client = None
+        if ai_providers.available("openai"):
+            self.openai_client = ai_providers.openai_client()
+            print("✅ OpenAI client ready as backup")
         else:
             self.openai_client = None
 
@@ -134,9 +122,56 @@ class GuidedJournalService:
         """Return all available life categories with their aspects"""
         return self.life_categories
     
-    def generate_prompts(self, category: str, count: int = 9, user_context: str = "") -> list[dict]:
-        """Main method - generate category-specific prompts"""
+    def generate_prompts(self, category: str, count: int = 9, user_context: str = "",
+                         user_id: Optional[str] = None) -> list[dict]:
+        """Main method - generate category-specific prompts, personalised ones first when prefetched for user_id"""
+        if user_id:
+            prompts = prompt_prefetch_service.take(user_id, category)
+            # Whether that was a hit or a miss, warm the user's next likely categories
+            self.prefetch_prompts(user_id)
+            if prompts and len(prompts) >= count:
+                return prompts[:count]
+            # Prefetch miss: serve from the pool now; the prefetch above personalises the next set
         return self.generate_real_prompts(category, count, user_context)
+
+    def prefetch_prompts(self, user_id: str):
+        """Speculatively warm personalised prompt sets for the user's most-used categories (non-blocking)"""
+        prompt_prefetch_service.prefetch(user_id, self._prefetch_plan, self._generate_personal_prompt_set)
+
+    def _prefetch_plan(self, user_id: str) -> list[tuple[str, str]]:
+        """(category, personal context) for the categories the user journals about most, most used first"""
+        from app.services.journal_loading_service import journal_loading_service
+
+        usage = {}
+        for journal in journal_loading_service.get_user_guided_journals_preview(user_id):
+            category = self._category_key(journal.get("topic"))
+            if not category:
+                continue
+            count, latest = usage.get(category, (0, None))
+            # Previews are sorted newest first, so the first seen is the latest
+            usage[category] = (count + 1, latest or journal)
+
+        profile = personalization_service.context_block(user_id)
+        plan = []
+        for category, (count, latest) in sorted(usage.items(), key=lambda item: -item[1][0]):
+            user_context = f"They have written {count} {self.life_categories[category]['title']} journals before."
+            if latest.get("has_content"):
+                user_context += f' Last time they wrote: "{latest.get("preview_text")}"'
+            if profile:
+                user_context += f"\n{profile}"
+            plan.append((category, user_context))
+        return plan
+
+    def _category_key(self, topic: Optional[str]) -> Optional[str]:
+        """Life category key for a journal topic saved as either the key ("mind") or the title ("Mind")"""
+        topic = (topic or "").strip().lower()
+        if topic in self.life_categories:
+            return topic
+        return next((key for key, info in self.life_categories.items() if info["title"].lower() == topic), None)
+
+    def _generate_personal_prompt_set(self, category: str, user_context: str) -> Optional[list[dict]]:
+        """Generator used by the prefetcher for one user's category"""
+        return self._generate_category_prompts_with_ai(category, self.life_categories[category], 9, user_context)
     
     def generate_real_prompts(self, category: str, count: int = 9, user_context: str = "") -> list[dict]:
         """
@@ -151,6 +186,21 @@ class GuidedJournalService:
         category_info = self.life_categories[category]
         print(f"🌱 Generating {count} prompts for {category_info['title']} category")
         
+        # Generic prompts come from the pre-generated pool; only personalised ones go to the LLM inline
+        if not user_context:
+            prompts = prompt_pool_service.take(category, self._generate_pooled_prompt_set)
+            if prompts and len(prompts) >= count:
+                return prompts[:count]
+        
+        prompts = self._generate_category_prompts_with_ai(category, category_info, count, user_context)
+        if prompts:
+            return prompts
+        
+        # Ultimate fallback - intelligent category-specific prompts
+        return self._generate_category_fallbacks(category, category_info, count)
+
+    def _generate_category_prompts_with_ai(self, category: str, category_info: dict, count: int, user_context: str) -> Optional[list[dict]]:
+        """Gemini first, then OpenAI; None when neither produced prompts"""
         # Try Gemini first (FREE and excellent)
         if self.gemini_model:
             try:
@@ -169,8 +219,16 @@ class GuidedJournalService:
             except Exception as e:
                 print(f"❌ OpenAI generation failed: {e}")
         
-        # Ultimate fallback - intelligent category-specific prompts
-        return self._generate_category_fallbacks(category, category_info, count)
+        return None
+
+    def _generate_pooled_prompt_set(self, category: str) -> Optional[list[dict]]:
+        """Generator used by the prompt pool to refill a category in the background"""
+        with inference_service.on_behalf_of(priority=BACKGROUND):
+            return self._generate_category_prompts_with_ai(category, self.life_categories[category], 9, "")
+
+    def warm_prompt_pools(self):
+        """Pre-generate prompt sets for every life category in the background"""
+        prompt_pool_service.warm(self.life_categories.keys(), self._generate_pooled_prompt_set)
 
     def _generate_category_prompts_with_gemini(self, category: str, category_info: dict, count: int, user_context: str) -> list[dict]:
         """Generate category-specific prompts using Google Gemini"""
@@ -199,7 +257,9 @@ Create exactly 9 prompts that follow this structure:
 
 Aspects to consider: {', '.join(aspects)}
 
-Your voice should be warm, encouraging, and insight-oriented. Use gentle language and create a safe space for honest self-reflection. Each prompt should be 1-2 sentences maximum."""
+Your voice should be warm, encouraging, and insight-oriented. Use gentle language and create a safe space for honest self-reflection. Each prompt should be 1-2 sentences maximum.
+
+Return JSON: {{"prompts": [{{"section": "going_well" | "needs_improvement" | "boundaries", "text": "..."}}]}}"""
 
         user_prompt = f"""Generate exactly 9 journal prompts for the {category_info['title']} category.
 
@@ -214,7 +274,9 @@ Structure exactly as:
 
 Make each prompt specific to {category_info['title']} and its aspects."""
 
-        response = self.gemini_model.generate_content(f"{system_prompt}\n\n{user_prompt}")
+        response = inference_service.call("gemini", self.gemini_model.generate_content, f"{system_prompt}\n\n{user_prompt}",
+                                          generation_config=gemini_json_config(PROMPT_SET_SCHEMA),
+                                          request_options={"timeout": request_deadline.timeout()})
         prompts_text = response.text
         
         print(f"✅ Gemini generated {category_info['title']} prompts: {prompts_text[:100]}...")
@@ -231,7 +293,7 @@ Make each prompt specific to {category_info['title']} and its aspects."""
         
         aspects = category_info["aspects"]
         
-        system_prompt = f"""Create thoughtful journal prompts for the "{category_info['Title']}" area of life. Generate 9 prompts focused on holistic reflection.
+        system_prompt = f"""Create thoughtful journal prompts for the "{category_info['title']}" area of life. Generate 9 prompts focused on holistic reflection.
 
 Structure:
 1-3: What's going well (celebrating strengths and successes)
@@ -240,7 +302,9 @@ Structure:
 
 Aspects to consider: {', '.join(aspects)}
 
-Use warm, encouraging language. Maximum 1-2 sentences per prompt."""
+Use warm, encouraging language. Maximum 1-2 sentences per prompt.
+
+Return JSON: {{"prompts": [{{"section": "going_well" | "needs_improvement" | "boundaries", "text": "..."}}]}}"""
 
         user_prompt = f"""Generate exactly 9 journal prompts for {category_info['title']}.
 
@@ -250,14 +314,18 @@ Focus on aspects: {', '.join(aspects)}
 
 Follow structure: 1-3 celebrate wins, 4-6 explore challenges, 7-9 focus on boundaries/commitments."""
 
-        response = self.openai_client.chat.completions.create(
+        response = inference_service.call(
+            "openai",
+            self.openai_client.chat.completions.create,
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
             ],
-            max_tokens=500,
-            temperature=0.8
+            max_tokens=700,
+            temperature=0.8,
+            response_format=OPENAI_JSON_MODE,
+            timeout=request_deadline.timeout()
         )
 
         prompts_text = response.choices[0].message.content
@@ -501,49 +569,24 @@ Follow structure: 1-3 celebrate wins, 4-6 explore challenges, 7-9 focus on bound
         
         return prompts[:count]
 
-    def generate_prompts(self, topic: str, count: int = 9) -> list[dict]:
-        """Main method - generate real AI prompts"""
-        return self.generate_real_prompts(topic, count)
-
     def _parse_ai_prompts(self, response_text: str, count: int, topic: str, ai_type: str) -> list[dict]:
-        """Parse AI response into structured prompts"""
-        import re
+        """Validate the schema-constrained prompt set; raises StructuredOutputError if even the repair pass fails"""
+        data = parse_structured("prompt_set", response_text, PROMPT_SET_SCHEMA, ai_type,
+                                salvage=self._salvage_numbered_prompts)
         
         prompts = []
-        
-        # Try to extract numbered list first
-        numbered_pattern = r'(?:\d+\.|\d+\))\s*(.+?)(?=\n(?:\d+\.|\d+\))|\n\n|$)'
-        matches = re.findall(numbered_pattern, response_text, re.DOTALL)
-        
-        for i, match in enumerate(matches):
-            prompt_text = match.strip()
-            if prompt_text and len(prompt_text) > 10:
+        for item in data["prompts"]:
+            prompt_text = item["text"].strip()
+            if len(prompt_text) > 10:
                 prompts.append({
-                    "id": i + 1,
+                    "id": len(prompts) + 1,
                     "text": prompt_text,
                     "topic": topic,
+                    "section": item["section"],
                     "generated_at": str(uuid.uuid4()),
                     "type": f"{ai_type}_generated"
                 })
         
-        # Alternative parsing if needed
-        if len(prompts) < count:
-            lines = response_text.split('\n')
-            for line in lines:
-                line = line.strip()
-                if (line and len(line) > 15 and 
-                    not line.startswith('Generate') and 
-                    not line.startswith('You are') and
-                    ('?' in line or 'your' in line or 'what' in line.lower() or 'how' in line.lower())):
-                    
-                    prompts.append({
-                        "id": len(prompts) + 1,
-                        "text": line,
-                        "topic": topic,
-                        "generated_at": str(uuid.uuid4()),
-                        "type": f"{ai_type}_generated"
-                    })
-        
         # Ensure we have enough prompts
         while len(prompts) < count:
             fallback_prompts = [
@@ -556,15 +599,28 @@ Follow structure: 1-3 celebrate wins, 4-6 explore challenges, 7-9 focus on bound
                 "id": len(prompts) + 1,
                 "text": fallback_prompts[len(prompts) % len(fallback_prompts)],
                 "topic": topic,
+                "section": PROMPT_SECTIONS[min(len(prompts) // 3, 2)],
                 "generated_at": str(uuid.uuid4()),
                 "type": "fallback"
             })
         
         return prompts[:count]
 
+    @staticmethod
+    def _salvage_numbered_prompts(response_text: str) -> Optional[dict]:
+        """Repair pass for a plain numbered list: 1-3 going well, 4-6 needs improvement, 7-9 boundaries"""
+        matches = re.findall(r'(?:^|\n)\s*(\d+)[.)]\s*(.+)', response_text)
+        if not matches:
+            return None
+        return {"prompts": [
+            {"section": PROMPT_SECTIONS[min(max(int(number) - 1, 0) // 3, 2)], "text": text.strip().strip('"*')}
+            for number, text in matches
+        ]}
+
     def _store_generated_prompts(self, prompts: list, topic: str):
         """Store AI-generated prompts in Raindrop for tracking"""
-        if not self.client:
+        # Tracking only: not worth delaying the prompts past their deadline
+        if not self.client or request_deadline.nearly_spent("prompt_store"):
             return
         
         try:
@@ -586,7 +642,8 @@ Follow structure: 1-3 celebrate wins, 4-6 explore challenges, 7-9 focus on bound
                     },
                     key=prompt_data["id"],
                     content=base64.b64encode(json.dumps(prompt_data).encode()).decode(),
-                    content_type="application/json"
+                    content_type="application/json",
+                    timeout=request_deadline.timeout()
                 )
             
             print(f"✅ Stored {len(prompts)} unique AI prompts in Raindrop")
@@ -637,6 +694,7 @@ Follow structure: 1-3 celebrate wins, 4-6 explore challenges, 7-9 focus on bound
         
         import base64
         
+        request_deadline.check("storage")
         try:
             # Try guided-journals bucket first (preferred)
             self.client.bucket.put(
@@ -648,9 +706,11 @@ Follow structure: 1-3 celebrate wins, 4-6 explore challenges, 7-9 focus on bound
                 },
                 key=f"journal_{journal_id}",
                 content=base64.b64encode(json.dumps(journal_data).encode()).decode(),
-                content_type="application/json"
+                content_type="application/json",
+                timeout=request_deadline.timeout()
             )
             print(f"✅ Created guided journal in guided-journals SmartBucket: {journal_id}")
+            self._record_in_profile(user_id, journal_data)
             
             return journal_data
             
@@ -669,9 +729,11 @@ Follow structure: 1-3 celebrate wins, 4-6 explore challenges, 7-9 focus on bound
                     },
                     key=f"guided_journal_{journal_id}",
                     content=base64.b64encode(json.dumps(journal_data).encode()).decode(),
-                    content_type="application/json"
+                    content_type="application/json",
+                    timeout=request_deadline.timeout()
                 )
                 print(f"✅ Created guided journal in hints SmartBucket: {journal_id}")
+                self._record_in_profile(user_id, journal_data)
                 
                 return journal_data
                 
@@ -682,6 +744,14 @@ Follow structure: 1-3 celebrate wins, 4-6 explore challenges, 7-9 focus on bound
                     detail=f"SmartBucket storage failed. Hints bucket error: {str(hints_error)}"
                 )
 
+    def _record_in_profile(self, user_id: str, journal_data: dict):
+        """Fold a saved guided journal's answers and category into the user's personalization profile"""
+        answers = "\n".join(str(entry.get("response", "")) for entry in journal_data.get("entries") or [])
+        personalization_service.record_entry(
+            user_id, journal_data.get("id"), "guided", answers,
+            category=self._category_key(journal_data.get("topic"))
+        )
+
     def get_user_guided_journals(self, user_id: str) -> list[dict]:
         """Retrieve all guided journals for a user from SmartBucket ONLY"""
         journals = []
@@ -1020,6 +1090,7 @@ Follow structure: 1-3 celebrate wins, 4-6 explore challenges, 7-9 focus on bound
             })
 
             storage_service.save_guided_journal_data(user_id, journal_id, journal_data)
+            self._record_in_profile(user_id, journal_data)
             
             print(f"✅ Added entry to journal: {journal_id}")
             return entry
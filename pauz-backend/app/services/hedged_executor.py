@@ -0,0 +1,113 @@
+"""
+Hedged Executor
+Races AI providers under a deadline: start the primary, hedge to the next provider
+once the primary is slower than its recent p95, and take the first good answer.
+"""
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+# A provider attempt gets the seconds it has left and returns text (empty/None = no answer)
+ProviderCall = Callable[[float], Optional[str]]
+
+
+class HedgedExecutor:
+    def __init__(self, max_workers: int = 8, window_size: int = 200):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedged")
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self.window_size = window_size
+        # Hedge delay used until a provider has enough samples for a p95
+        self.default_hedge_delay = float(os.getenv("HEDGE_DEFAULT_DELAY_SECONDS", "1.5"))
+        self.min_hedge_delay = float(os.getenv("HEDGE_MIN_DELAY_SECONDS", "0.2"))
+        self.min_samples = 20
+
+    def record_latency(self, provider: str, seconds: float):
+        with self._lock:
+            self._latencies.setdefault(provider, deque(maxlen=self.window_size)).append(seconds)
+
+    def record_censored_latency(self, provider: str, seconds: float):
+        """
+        Record an attempt that ran for seconds without answering (it lost the race or hit the
+        deadline). Its latency is at least that, so it is only kept when it lengthens the tail:
+        a quick loser cut off early says nothing about the p95.
+        """
+        if seconds >= self.hedge_delay(provider):
+            self.record_latency(provider, seconds)
+
+    def hedge_delay(self, provider: str) -> float:
+        """p95 of the provider's recent latencies, counting slow attempts that never answered"""
+        with self._lock:
+            samples = sorted(self._latencies.get(provider, ()))
+        if len(samples) < self.min_samples:
+            return self.default_hedge_delay
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        return max(self.min_hedge_delay, p95)
+
+    def race(self, providers: List[Tuple[str, ProviderCall]], deadline_seconds: float) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Returns (provider_name, text) for the first good answer, or (None, None) if every
+        provider failed or the deadline passed. Providers are hedged in list order.
+        """
+        deadline = time.monotonic() + deadline_seconds
+        pending = {}
+        remaining_providers = list(providers)
+
+        def launch():
+            name, call = remaining_providers.pop(0)
+            started = time.monotonic()
+            # Run in a copy of the caller's context so the dispatcher still knows who asked
+            future = self._pool.submit(contextvars.copy_context().run, call, max(0.0, deadline - started))
+            pending[future] = (name, started)
+            print(f"🏁 Started {name} ({deadline - started:.2f}s left)")
+            return name
+
+        try:
+            if remaining_providers:
+                next_hedge_at = time.monotonic() + self.hedge_delay(launch())
+
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    print(f"⏰ Provider race hit the {deadline_seconds:.2f}s deadline")
+                    return None, None
+
+                # Wake up for whichever comes first: a result, the hedge point, or the deadline
+                wake_at = deadline
+                if remaining_providers:
+                    wake_at = min(wake_at, next_hedge_at)
+                done, _ = wait(list(pending), timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name, started = pending.pop(future)
+                    try:
+                        text = future.result()
+                    except Exception as e:
+                        print(f"❌ {name} failed in race: {e}")
+                        text = None
+                    if text:
+                        self.record_latency(name, time.monotonic() - started)
+                        return name, text
+                    # A failed attempt hedges to the next provider right away
+                    next_hedge_at = time.monotonic()
+
+                if remaining_providers and time.monotonic() >= next_hedge_at:
+                    next_hedge_at = time.monotonic() + self.hedge_delay(launch())
+
+            return None, None
+        finally:
+            # Losers that have not started are cancelled; running ones are bounded by
+            # the timeout they were given and their results are discarded
+            now = time.monotonic()
+            for future, (name, started) in pending.items():
+                if not future.cancel():
+                    # Leaving these out would make the p95 only ever see the fast answers
+                    self.record_censored_latency(name, now - started)
+
+
+# Create singleton instance
+hedged_executor = HedgedExecutor()
@@ -0,0 +1,72 @@
+"""
+Hint Similarity Cache
+Per-session cache of recent hints keyed by SimHash fingerprints of the tail of
+the journal. Autosaves, re-clicks and small edits produce near-identical
+fingerprints, so the previous hint is reused instead of calling an LLM again.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.simhash import simhash, similarity
+
+
+class HintSimilarityCache:
+    def __init__(self, max_sessions: int = 5000, hints_per_session: int = 5):
+        self.window_words = int(os.getenv("HINT_CACHE_WINDOW_WORDS", "200"))
+        self.threshold = float(os.getenv("HINT_CACHE_SIMILARITY", "0.88"))
+        self.ttl_seconds = int(os.getenv("HINT_CACHE_TTL_SECONDS", "900"))
+        self.max_sessions = max_sessions
+        self.hints_per_session = hints_per_session
+        # session_id -> [(fingerprint, hint_id, stored_at)], newest last (sessions LRU-bounded)
+        self.sessions: "OrderedDict[str, List[Tuple[int, int, float]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def fingerprint(self, content: str) -> int:
+        return simhash(content, self.window_words)
+
+    def lookup(self, session_id: str, content: str) -> Optional[int]:
+        """Id of a recent hint for near-identical content in this session, if any"""
+        fingerprint = self.fingerprint(content)
+        now = time.time()
+        with self._lock:
+            entries = [e for e in self.sessions.get(session_id, []) if now - e[2] < self.ttl_seconds]
+            # Newest first, so after "another" the fresh hint is the one reused
+            best = max(reversed(entries), key=lambda e: similarity(fingerprint, e[0]), default=None)
+            if best and similarity(fingerprint, best[0]) >= self.threshold:
+                self.sessions.move_to_end(session_id)
+                self.hits += 1
+                return best[1]
+            self.misses += 1
+            return None
+
+    def store(self, session_id: str, content: str, hint_id: int):
+        fingerprint = self.fingerprint(content)
+        with self._lock:
+            entries = self.sessions.pop(session_id, [])
+            entries.append((fingerprint, hint_id, time.time()))
+            self.sessions[session_id] = entries[-self.hints_per_session:]
+            while len(self.sessions) > self.max_sessions:
+                self.sessions.popitem(last=False)
+
+    def forget(self, session_id: str):
+        with self._lock:
+            self.sessions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                "sessions": len(self.sessions)
+            }
+
+
+# Create singleton instance
+hint_cache = HintSimilarityCache()
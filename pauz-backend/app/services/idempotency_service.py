@@ -0,0 +1,195 @@
+"""
+Idempotent Requests
+Guards the AI endpoints against double-clicks and client retries. Concurrent
+identical requests from a user share one in-flight call (single-flight): the
+duplicates wait for the first call's result instead of spending provider
+capacity or inserting duplicate rows. When the client sends an Idempotency-Key,
+the result is also kept for a short while, so a retry after the response was
+lost replays it instead of running again. A duplicate that outlives its own
+deadline while the first call is still running is told to retry later (409)
+rather than calling the provider a second time. Streamed responses get the same
+treatment: duplicates receive the first request's events once it has finished.
+"""
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from app.services.request_deadline import request_deadline
+
+
+class IdempotencyKeyReused(Exception):
+    """An Idempotency-Key was sent again with a different request"""
+
+    def __init__(self, scope: str):
+        super().__init__(f"Idempotency-Key already used for a different {scope} request")
+        self.scope = scope
+
+
+class IdempotentRequestInProgress(Exception):
+    """A duplicate gave up waiting on the identical request still in flight"""
+
+    def __init__(self, scope: str, retry_after: int):
+        super().__init__(f"An identical {scope} request is still in progress; retry in {retry_after}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+# Most results kept per scope; welcome results carry base64 audio, so far fewer of them
+DEFAULT_MAX_STORED_RESULTS = 1000
+MAX_STORED_RESULTS = {"welcome": 50}
+
+
+class _Flight:
+    def __init__(self, fingerprint: str, expected_end: float):
+        self.fingerprint = fingerprint
+        # When the first call's own deadline runs out (monotonic clock)
+        self.expected_end = expected_end
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class IdempotencyService:
+    def __init__(self):
+        self.ttl_seconds = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "300"))
+        # scope -> (user, request key) -> (request fingerprint, result, stored_at), oldest first
+        self.results: Dict[str, "OrderedDict[Tuple[str, str], Tuple[str, Any, float]]"] = {}
+        self.in_flight: Dict[Tuple[str, str, str], _Flight] = {}
+        self.executed = 0
+        self.coalesced = 0
+        self.replayed = 0
+        self._lock = threading.Lock()
+
+    def run(self, scope: str, user_id: Any, fn: Callable[[], Any],
+            idempotency_key: Optional[str] = None, fingerprint: str = "") -> Any:
+        """
+        Result of fn for this request, running it at most once for concurrent duplicates
+        (same user, scope and fingerprint, or same Idempotency-Key) and replaying it for
+        retries with the same Idempotency-Key within the TTL. Failures are not stored.
+        Raises IdempotentRequestInProgress when a duplicate's deadline runs out first.
+        """
+        key, digest, flight, leader = self._join(scope, user_id, idempotency_key, fingerprint)
+        if not leader:
+            return self._wait(scope, flight)
+
+        try:
+            flight.result = fn()
+            if idempotency_key:
+                self._store(key, digest, flight.result)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._land(key, flight)
+
+    def stream(self, scope: str, user_id: Any, events: Iterator[str],
+               idempotency_key: Optional[str] = None, fingerprint: str = "") -> Iterator[str]:
+        """
+        Like run for a stream of server-sent events: the first request streams them as they
+        are produced, and duplicates get the same events once it has finished (events is then
+        never started). Raises like run before anything is streamed.
+        """
+        key, digest, flight, leader = self._join(scope, user_id, idempotency_key, fingerprint)
+        if not leader:
+            return iter(self._wait(scope, flight))
+        return self._lead_stream(key, digest, flight, events, idempotency_key)
+
+    def _lead_stream(self, key: Tuple[str, str, str], digest: str, flight: _Flight,
+                     events: Iterator[str], idempotency_key: Optional[str]) -> Iterator[str]:
+        sent = []
+        try:
+            for event in events:
+                sent.append(event)
+                yield event
+            flight.result = sent
+            if idempotency_key:
+                self._store(key, digest, sent)
+        except GeneratorExit:
+            # The client went away mid-stream; duplicates retry rather than get half a stream
+            flight.error = IdempotentRequestInProgress(key[0], 1)
+            raise
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._land(key, flight)
+
+    def _join(self, scope: str, user_id: Any, idempotency_key: Optional[str],
+              fingerprint: str) -> Tuple[Tuple[str, str, str], str, _Flight, bool]:
+        """(key, request digest, flight, whether this request leads it); a stored result comes back as a landed flight"""
+        digest = hashlib.sha256(fingerprint.encode()).hexdigest()
+        key = (scope, str(user_id), f"key:{idempotency_key}" if idempotency_key else f"request:{digest}")
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            stored = self.results.get(scope, {}).get(key[1:])
+            if stored:
+                if stored[0] != digest:
+                    raise IdempotencyKeyReused(scope)
+                self.replayed += 1
+                print(f"🔁 Replaying {scope} result for a retried request")
+                flight = _Flight(digest, now)
+                flight.result = stored[1]
+                flight.done.set()
+                return key, digest, flight, False
+            flight = self.in_flight.get(key)
+            if flight is None:
+                remaining = request_deadline.remaining()
+                flight = self.in_flight[key] = _Flight(digest, now + (remaining if remaining is not None
+                                                                     else request_deadline.call_timeout))
+                self.executed += 1
+                return key, digest, flight, True
+            if flight.fingerprint != digest:
+                raise IdempotencyKeyReused(scope)
+            self.coalesced += 1
+            print(f"🔗 Duplicate {scope} request waiting on the one in flight")
+            return key, digest, flight, False
+
+    def _wait(self, scope: str, flight: _Flight) -> Any:
+        if flight.done.wait(request_deadline.timeout()):
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+        # Running it again would repeat the provider call and the rows it saves
+        retry_after = max(1, math.ceil(flight.expected_end - time.monotonic()))
+        print(f"⏳ {scope} request still in flight, asking the duplicate to retry in {retry_after}s")
+        raise IdempotentRequestInProgress(scope, retry_after)
+
+    def _store(self, key: Tuple[str, str, str], digest: str, result: Any):
+        with self._lock:
+            results = self.results.setdefault(key[0], OrderedDict())
+            results[key[1:]] = (digest, result, time.monotonic())
+            while len(results) > MAX_STORED_RESULTS.get(key[0], DEFAULT_MAX_STORED_RESULTS):
+                results.popitem(last=False)
+
+    def _land(self, key: Tuple[str, str, str], flight: _Flight):
+        with self._lock:
+            self.in_flight.pop(key, None)
+        flight.done.set()
+
+    def _expire(self, now: float):
+        for results in self.results.values():
+            while results:
+                stored_at = next(iter(results.values()))[2]
+                if now - stored_at < self.ttl_seconds:
+                    break
+                results.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "replayed": self.replayed,
+                "stored_results": {scope: len(results) for scope, results in self.results.items()},
+                "in_flight": len(self.in_flight)
+            }
+
+
+# Create singleton instance
+idempotency_service = IdempotencyService()
@@ -1,9 +1,74 @@
+"""
+Inference Service
+Dispatch layer every LLM and speech call goes through. Each provider has a global
+concurrency cap; calls beyond it wait in a queue ordered by priority class
+(interactive hints and voice before reflections, reflections before background
+summaries and pool refills) and, within a class, by weighted fair queuing per
+user, so one heavy user cannot starve everyone else. Signed-in users weigh 1 by
+default; anonymous traffic and any per-user overrides are configured by env. Time spent queued is kept
+in latency histograms per provider and priority class.
+"""
+import contextvars
+import itertools
+import json
 import os
+import threading
+import time
 import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
 from dotenv import load_dotenv
 
+from app.services.circuit_breaker import circuit_breakers
+from app.services.llm_telemetry import call_site, prompt_type_for
+from app.services.request_deadline import request_deadline
+from app.utils.latency_histogram import LatencyHistogram
+
 load_dotenv()
 
+INTERACTIVE = "interactive"
+STANDARD = "standard"
+BACKGROUND = "background"
+
+# Lower rank is served first
+PRIORITY_RANK = {INTERACTIVE: 0, STANDARD: 1, BACKGROUND: 2}
+
+# Priority class for calls that do not set one, by the prompt type of their call site
+PROMPT_TYPE_PRIORITY = {
+    "hint": INTERACTIVE,
+    "voice_welcome": INTERACTIVE,
+    "voice_response": INTERACTIVE,
+    "reflection": STANDARD,
+    "guided_prompts": STANDARD,
+    "session_summary": BACKGROUND,
+}
+
+DEFAULT_CONCURRENCY = {"gemini": 8, "openai": 8, "elevenlabs": 4}
+
+# Longest a call waits for a slot before giving up, so callers fall back instead of piling up
+DEFAULT_MAX_WAIT_SECONDS = {INTERACTIVE: 5.0, STANDARD: 20.0, BACKGROUND: 60.0}
+
+ANONYMOUS = "anonymous"
+
+# Fair-queuing weight of anonymous traffic; a weight of 2 gets twice the share of a weight of 1
+DEFAULT_ANONYMOUS_WEIGHT = 0.5
+
+# Who the current request is for and, optionally, its priority class
+_requester: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("inference_requester", default=None)
+_priority: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("inference_priority", default=None)
+
+
+class InferenceQueueTimeout(Exception):
+    """Raised when a call waited longer than its priority class allows for a provider slot"""
+
+    def __init__(self, provider: str, priority: str, waited: float):
+        super().__init__(f"{provider} queue wait exceeded {waited:.1f}s for {priority} call")
+        self.provider = provider
+        self.priority = priority
+        self.waited = waited
+
+
 # In a real Raindrop environment, you would import the SmartInference client.
 # from mcp import smart_inference
 
@@ -22,25 +87,259 @@ class MockSmartInference:
 smart_inference = MockSmartInference()
 
 
+class _Waiter:
+    def __init__(self, requester: str, priority: str, start_tag: float, finish_tag: float, seq: int):
+        self.requester = requester
+        self.priority = priority
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.seq = seq
+        self.queued_at = time.monotonic()
+        self.granted = threading.Event()
+
+    def order(self) -> Tuple[int, float, int]:
+        return PRIORITY_RANK[self.priority], self.finish_tag, self.seq
+
+
+class Lease:
+    """A held provider slot; released exactly once, explicitly or on leaving a with block"""
+
+    def __init__(self, queue: "ProviderQueue", priority: str):
+        self._queue = queue
+        self.priority = priority
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._queue.release(self.priority)
+
+    def __enter__(self) -> "Lease":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class ProviderQueue:
+    def __init__(self, provider: str, limit: int, background_share: float = 0.5):
+        self.provider = provider
+        self.limit = max(1, limit)
+        # Background work never takes every slot, so interactive calls always find room soon
+        self.background_limit = max(1, int(self.limit * background_share))
+        self.in_flight = 0
+        self.background_in_flight = 0
+
+        # Start-time fair queuing: each call gets a finish tag of max(virtual time, the
+        # requester's last finish tag) + 1/weight, and waiters are served in tag order
+        self.virtual_time = 0.0
+        self._finish_tags: Dict[str, float] = {}
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+        # Reentrant: a dropped stream's lease can be released by garbage collection while
+        # this thread is already inside the queue
+        self._lock = threading.RLock()
+
+        self.wait_ms: Dict[str, LatencyHistogram] = {}
+        self.dispatched: Dict[str, int] = {}
+        self.timed_out: Dict[str, int] = {}
+        self.max_queued = 0
+
+    def _tag(self, requester: str, priority: str, weight: float) -> _Waiter:
+        start = max(self.virtual_time, self._finish_tags.get(requester, 0.0))
+        finish = start + 1.0 / weight
+        self._finish_tags[requester] = finish
+        return _Waiter(requester, priority, start, finish, next(self._seq))
+
+    def _untag(self, waiter: _Waiter):
+        """Give back the virtual time a waiter that was never served had charged its requester"""
+        cost = waiter.finish_tag - waiter.start_tag
+        for later in self._waiting:
+            if later.requester == waiter.requester and later.seq > waiter.seq:
+                length = later.finish_tag - later.start_tag
+                later.start_tag = max(self.virtual_time, later.start_tag - cost)
+                later.finish_tag = later.start_tag + length
+        if waiter.requester in self._finish_tags:
+            self._finish_tags[waiter.requester] = max(self.virtual_time,
+                                                      self._finish_tags[waiter.requester] - cost)
+
+    def _has_room(self, priority: str) -> bool:
+        if self.in_flight >= self.limit:
+            return False
+        return priority != BACKGROUND or self.background_in_flight < self.background_limit
+
+    def _start(self, waiter: _Waiter, waited: float):
+        self.in_flight += 1
+        if waiter.priority == BACKGROUND:
+            self.background_in_flight += 1
+        self.virtual_time = max(self.virtual_time, waiter.start_tag)
+        self.wait_ms.setdefault(waiter.priority, LatencyHistogram()).record(waited * 1000)
+        self.dispatched[waiter.priority] = self.dispatched.get(waiter.priority, 0) + 1
+        if len(self._finish_tags) > 1024:
+            # Requesters with nothing ahead of the virtual clock have no backlog left to remember
+            self._finish_tags = {user: tag for user, tag in self._finish_tags.items() if tag > self.virtual_time}
+
+    def acquire(self, requester: str, priority: str, max_wait: float, weight: float = 1.0) -> Lease:
+        with self._lock:
+            waiter = self._tag(requester, priority, max(weight, 0.01))
+            if not self._waiting and self._has_room(priority):
+                self._start(waiter, 0.0)
+                return Lease(self, priority)
+            self._waiting.append(waiter)
+            self.max_queued = max(self.max_queued, len(self._waiting))
+            # Slots may be free while only background waiters (held back by their share) are queued
+            self._dispatch()
+
+        if not waiter.granted.wait(max_wait):
+            with self._lock:
+                # The slot may have been handed over just as the wait timed out
+                if not waiter.granted.is_set():
+                    self._waiting.remove(waiter)
+                    self._untag(waiter)
+                    self.timed_out[priority] = self.timed_out.get(priority, 0) + 1
+                    waited = time.monotonic() - waiter.queued_at
+                    print(f"⏳ {self.provider} {priority} call gave up after {waited:.1f}s in queue")
+                    raise InferenceQueueTimeout(self.provider, priority, waited)
+        return Lease(self, priority)
+
+    def _dispatch(self):
+        """Hand free slots to the best eligible waiters (caller holds the lock)"""
+        now = time.monotonic()
+        while self._waiting and self.in_flight < self.limit:
+            eligible = [waiter for waiter in self._waiting if self._has_room(waiter.priority)]
+            if not eligible:
+                return
+            waiter = min(eligible, key=_Waiter.order)
+            self._waiting.remove(waiter)
+            self._start(waiter, now - waiter.queued_at)
+            waiter.granted.set()
+
+    def release(self, priority: str):
+        with self._lock:
+            self.in_flight -= 1
+            if priority == BACKGROUND:
+                self.background_in_flight -= 1
+            self._dispatch()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            queued = {}
+            for waiter in self._waiting:
+                queued[waiter.priority] = queued.get(waiter.priority, 0) + 1
+            return [{
+                "provider": self.provider,
+                "priority": priority,
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "queued": queued.get(priority, 0),
+                "max_queued": self.max_queued,
+                "dispatched": self.dispatched.get(priority, 0),
+                "timed_out": self.timed_out.get(priority, 0),
+                "wait_p50_ms": self.wait_ms[priority].percentile(50) if priority in self.wait_ms else 0.0,
+                "wait_p95_ms": self.wait_ms[priority].percentile(95) if priority in self.wait_ms else 0.0,
+                "wait_p99_ms": self.wait_ms[priority].percentile(99) if priority in self.wait_ms else 0.0
+            } for priority in PRIORITY_RANK if priority in self.dispatched or priority in queued
+                or priority in self.timed_out]
+
+
 class InferenceService:
     def __init__(self):
-        # In a real implementation, you might initialize your connection
-        # to the SmartInference service here.
-        pass
+        self.background_share = float(os.getenv("INFERENCE_BACKGROUND_SHARE", "0.5"))
+        self.max_wait_seconds = {
+            priority: float(os.getenv(f"INFERENCE_MAX_WAIT_{priority.upper()}_SECONDS", str(seconds)))
+            for priority, seconds in DEFAULT_MAX_WAIT_SECONDS.items()
+        }
+        # requester -> fair-queuing weight; everyone else weighs 1
+        self.weights: Dict[str, float] = {
+            ANONYMOUS: float(os.getenv("INFERENCE_ANONYMOUS_WEIGHT", str(DEFAULT_ANONYMOUS_WEIGHT))),
+            **{user: float(weight) for user, weight in json.loads(os.getenv("INFERENCE_USER_WEIGHTS", "{}")).items()}
+        }
+        self._queues: Dict[str, ProviderQueue] = {}
+        self._lock = threading.Lock()
+
+    def queue(self, provider: str) -> ProviderQueue:
+        with self._lock:
+            if provider not in self._queues:
+                limit = int(os.getenv(f"INFERENCE_CONCURRENCY_{provider.upper()}",
+                                      str(DEFAULT_CONCURRENCY.get(provider, 8))))
+                self._queues[provider] = ProviderQueue(provider, limit, self.background_share)
+            return self._queues[provider]
+
+    @contextmanager
+    def on_behalf_of(self, requester: Optional[str] = None, priority: Optional[str] = None):
+        """Attribute the calls made inside the block to requester and/or run them at priority"""
+        requester_token = _requester.set(requester) if requester is not None else None
+        priority_token = _priority.set(priority) if priority is not None else None
+        try:
+            yield
+        finally:
+            if priority_token is not None:
+                _priority.reset(priority_token)
+            if requester_token is not None:
+                _requester.reset(requester_token)
+
+    def _priority_for_caller(self) -> str:
+        return _priority.get() or PROMPT_TYPE_PRIORITY.get(prompt_type_for(call_site()), STANDARD)
+
+    def acquire(self, provider: str, priority: Optional[str] = None, max_wait: Optional[float] = None) -> Lease:
+        """
+        Wait for a slot on provider; raises InferenceQueueTimeout when the wait runs out,
+        or DeadlineExceeded without queueing when the request's budget is nearly spent
+        """
+        request_deadline.check(provider)
+        priority = priority or self._priority_for_caller()
+        limit = self.max_wait_seconds[priority]
+        # Never queue past the request's deadline
+        wait = request_deadline.timeout(min(limit, max_wait) if max_wait is not None else limit)
+        requester = _requester.get() or ANONYMOUS
+        return self.queue(provider).acquire(requester, priority, wait, self.weights.get(requester, 1.0))
+
+    def call(self, provider: str, fn: Callable[..., Any], *args,
+             priority: Optional[str] = None, max_wait: Optional[float] = None, **kwargs) -> Any:
+        """Run fn through provider's queue and circuit breaker, holding a slot while it runs"""
+        with self.acquire(provider, priority, max_wait):
+            # Time spent queued came out of the budget: timeouts are capped at what is left now
+            with request_deadline.stage(provider):
+                return circuit_breakers.call(provider, fn, *args, **request_deadline.cap_timeouts(kwargs))
+
+    def stream(self, provider: str, fn: Callable[..., Iterable[Any]], *args,
+               priority: Optional[str] = None, max_wait: Optional[float] = None, **kwargs) -> Iterator[Any]:
+        """Like call for a streaming response; the slot is held until the stream ends or is dropped"""
+        lease = self.acquire(provider, priority, max_wait)
+        try:
+            # The circuit records the outcome when the stream ends, not when it opens
+            chunks = circuit_breakers.stream(provider, fn, *args, **request_deadline.cap_timeouts(kwargs))
+        except Exception:
+            lease.release()
+            raise
+        return self._leased(chunks, lease)
+
+    @staticmethod
+    def _leased(chunks: Iterable[Any], lease: Lease) -> Iterator[Any]:
+        try:
+            yield from chunks
+        finally:
+            lease.release()
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Concurrency, queue depth and queue-wait percentiles per provider and priority class"""
+        with self._lock:
+            queues = list(self._queues.values())
+        return [row for queue in queues for row in queue.snapshot()]
 
     def get_completion_with_smart_inference(self, prompt: str, model: str = "openai/gpt-3.5-turbo") -> dict:
         """
         Gets a completion from an external model using SmartInference as a wrapper.
-        
+
         This demonstrates how to use SmartInference to stay compliant with Raindrop
         while still having the flexibility to use different external models.
         """
         print(f"Requesting completion from SmartInference for model: {model}")
-        
+
         # In the actual Raindrop environment, this call would be something like:
         # response = smart_inference.run(model=model, prompt=prompt)
-        # For local development, we use our mock.
-        response = smart_inference.run(model=model, prompt=prompt)
+        # For local development, we use our mock. It shares the upstream provider's slots.
+        response = self.call(model.split("/", 1)[0], smart_inference.run, model=model, prompt=prompt)
 
         return response
 
@@ -3,6 +3,7 @@ Optimized Journal Loading Service
 Provides fast journal listing with previews and caching
 """
 import time
+from collections import OrderedDict
 from typing import List, Dict, Optional
 from sqlmodel import Session, select, func
 from datetime import datetime
@@ -12,25 +13,43 @@ from app.services.guided_journal_service import guided_journal_service
 class JournalLoadingService:
     def __init__(self):
         # Cache for journal listings (5 minute TTL like stats)
-        self.cache = {}
+        # Keys embed a per-user generation, so invalidation is a single increment
+        # and stale generations age out through TTL / LRU eviction
+        self.cache = OrderedDict()
         self.cache_ttl = 300  # 5 minutes
+        self.max_cache_entries = 1000
+        self.generations = {}
     
-    def _is_cache_valid(self, user_id: str, cache_key: str) -> bool:
-        """Check if cached data is still valid"""
-        full_key = f"{user_id}:{cache_key}"
-        if full_key not in self.cache:
-            return False
+    def _full_key(self, user_id: str, cache_key: str) -> str:
+        """Cache key for the user's current generation"""
+        return f"{user_id}:{self.generations.get(user_id, 0)}:{cache_key}"
+    
+    def _get_cached(self, user_id: str, cache_key: str) -> Optional[any]:
+        """Return cached data if still valid, otherwise None"""
+        full_key = self._full_key(user_id, cache_key)
+        entry = self.cache.get(full_key)
+        if entry is None:
+            return None
+        
+        if (time.time() - entry['timestamp']) >= self.cache_ttl:
+            self.cache.pop(full_key, None)
+            return None
         
-        cached_time = self.cache[full_key].get('timestamp', 0)
-        return (time.time() - cached_time) < self.cache_ttl
+        self.cache.move_to_end(full_key)
+        return entry['data']
     
     def _update_cache(self, user_id: str, cache_key: str, data: any):
         """Update cache with fresh data"""
-        full_key = f"{user_id}:{cache_key}"
+        full_key = self._full_key(user_id, cache_key)
         self.cache[full_key] = {
             'data': data,
             'timestamp': time.time()
         }
+        self.cache.move_to_end(full_key)
+        
+        # Evict least recently used entries (including stale generations)
+        while len(self.cache) > self.max_cache_entries:
+            self.cache.popitem(last=False)
     
     def get_user_guided_journals_preview(self, user_id: str) -> List[Dict]:
         """
@@ -40,9 +59,10 @@ class JournalLoadingService:
         cache_key = "guided_journals_preview"
         
         # Check cache first
-        if self._is_cache_valid(user_id, cache_key):
+        cached = self._get_cached(user_id, cache_key)
+        if cached is not None:
             print(f"📋 Using cached guided journal preview for user: {user_id}")
-            return self.cache[f"{user_id}:{cache_key}"]['data']
+            return cached
         
         print(f"🔄 Computing guided journal preview for user: {user_id}")
         start_time = time.time()
@@ -118,9 +138,10 @@ class JournalLoadingService:
         cache_key = "_".join(cache_parts)
         
         # Check cache first
-        if self._is_cache_valid(user_id, cache_key):
+        cached = self._get_cached(user_id, cache_key)
+        if cached is not None:
             print(f"📋 Using cached free journal preview for user: {user_id}")
-            return self.cache[f"{user_id}:{cache_key}"]['data']
+            return cached
         
         print(f"🔄 Computing free journal preview for user: {user_id}")
         start_time = time.time()
@@ -132,6 +153,9 @@ class JournalLoadingService:
                 FreeJournal.session_id,
                 FreeJournal.created_at,
                 FreeJournal.updated_at,
+                FreeJournal.word_count,
+                FreeJournal.char_count,
+                FreeJournal.reading_time_seconds,
                 # Only get first 100 characters of content for preview
                 func.substring(FreeJournal.content, 1, 100).label("content_preview")
             ).where(
@@ -183,7 +207,9 @@ class JournalLoadingService:
                     "created_at": result.created_at,
                     "updated_at": result.updated_at,
                     "content_preview": content_preview,
-                    "word_count": len(content_preview.split()) if content_preview else 0
+                    "word_count": result.word_count,
+                    "char_count": result.char_count,
+                    "reading_time_seconds": result.reading_time_seconds
                 }
                 previews.append(preview)
             
@@ -200,16 +226,9 @@ class JournalLoadingService:
             return []
     
     def invalidate_user_cache(self, user_id: str):
-        """Invalidate all cache for a specific user"""
-        keys_to_remove = []
-        for key in self.cache.keys():
-            if key.startswith(f"{user_id}:"):
-                keys_to_remove.append(key)
-        
-        for key in keys_to_remove:
-            del self.cache[key]
-        
-        print(f"🗑️ Invalidated {len(keys_to_remove)} journal cache entries for user: {user_id}")
+        """Invalidate all cache for a specific user by bumping their generation"""
+        self.generations[user_id] = self.generations.get(user_id, 0) + 1
+        print(f"🗑️ Invalidated journal cache for user: {user_id} (generation {self.generations[user_id]})")
 
 # Create singleton instance
 journal_loading_service = JournalLoadingService()
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+LLM Streaming
+Token streams from Gemini and OpenAI, sentence re-chunking and SSE framing
+"""
+import json
+import re
+from typing import Any, Iterable, Iterator, List
+
+from app.services.inference_service import inference_service
+from app.services.request_deadline import request_deadline
+
+# Sentence end followed by whitespace; the whitespace stays with the next sentence
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _texts(chunks: Iterable[Any], extract) -> Iterator[str]:
+    """Yield the non-empty text of each provider stream chunk"""
+    for chunk in chunks:
+        text = extract(chunk)
+        if text:
+            yield text
+
+
+def _gemini_text(chunk) -> str:
+    try:
+        return chunk.text
+    except ValueError:
+        # Chunks without text parts (e.g. safety metadata) raise on .text
+        return ""
+
+
+def stream_gemini(model, prompt: str, **kwargs) -> Iterator[str]:
+    """Stream text chunks from a Gemini GenerativeModel"""
+    kwargs.setdefault("request_options", {"timeout": request_deadline.timeout()})
+    response = inference_service.stream("gemini", model.generate_content, prompt, stream=True, **kwargs)
+    return _texts(response, _gemini_text)
+
+
+def stream_openai(client, messages: List[dict], **kwargs) -> Iterator[str]:
+    """Stream text deltas from an OpenAI chat completion"""
+    kwargs.setdefault("timeout", request_deadline.timeout())
+    response = inference_service.stream("openai", client.chat.completions.create,
+                                        messages=messages, stream=True, **kwargs)
+    return _texts(response, lambda chunk: chunk.choices[0].delta.content if chunk.choices else "")
+
+
+def sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """Re-chunk a token stream into whole sentences (for voice, which needs complete phrases)"""
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        parts = SENTENCE_END.split(buffer)
+        for sentence in parts[:-1]:
+            if sentence.strip():
+                yield sentence.strip()
+        buffer = parts[-1]
+    if buffer.strip():
+        yield buffer.strip()
@@ -0,0 +1,325 @@
+"""
+LLM Telemetry
+Times every generate_content and chat.completions.create call made through the AI
+provider registry. Latency, prompt/response size, outcome, provider and call site
+go into in-memory latency histograms that are flushed to ai_performance every
+LLM_TELEMETRY_FLUSH_SECONDS, so p50/p95/p99 per provider and prompt type can be
+queried without logging every call.
+"""
+import atexit
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.utils.latency_histogram import LatencyHistogram
+
+# Frames in these modules are plumbing, not the code that asked for the completion
+PLUMBING_MODULES = {
+    __name__,
+    "app.services.ai_providers",
+    "app.services.circuit_breaker",
+    "app.services.llm_streaming",
+    "app.services.hedged_executor",
+    "app.services.inference_service",
+    "concurrent.futures.thread",
+    "threading",
+}
+
+# Call site function -> prompt type reported by the percentile endpoint
+PROMPT_TYPES = {
+    "_generate_hint_with_gemini": "hint",
+    "_generate_hint_with_openai": "hint",
+    "_hint_streams": "hint",
+    "analyze_mood_with_gemini": "reflection",
+    "_streamed_reflection": "reflection",
+    "_fold_session_summary": "session_summary",
+    "_generate_category_prompts_with_gemini": "guided_prompts",
+    "_generate_category_prompts_with_openai": "guided_prompts",
+    "generate_personalized_welcome": "voice_welcome",
+    "generate_intelligent_response": "voice_response",
+    "generate_response": "voice_response",
+    "stream_response": "voice_response",
+    "_ask_gemini_casually": "voice_response",
+}
+
+# (provider, model_name, prompt_type, call_site)
+WindowKey = Tuple[str, str, str, str]
+
+
+def call_site() -> str:
+    """module.function of the nearest caller outside the telemetry and provider plumbing"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if module not in PLUMBING_MODULES:
+            name = frame.f_code.co_name
+            if name == "<lambda>":
+                # Report provider factories built as lambdas under the function that built them
+                name = getattr(frame.f_code, "co_qualname", name).rsplit(".<locals>", 1)[0].rsplit(".", 1)[-1]
+            return f"{module.rsplit('.', 1)[-1]}.{name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def prompt_type_for(site: str) -> str:
+    return PROMPT_TYPES.get(site.rsplit(".", 1)[-1], "other")
+
+
+def _gemini_text(response) -> str:
+    try:
+        return response.text or ""
+    except (ValueError, AttributeError):
+        # Blocked or empty candidates raise on .text
+        return ""
+
+
+def _openai_text(response) -> str:
+    try:
+        return response.choices[0].message.content or ""
+    except (IndexError, AttributeError):
+        return ""
+
+
+def _openai_delta(chunk) -> str:
+    try:
+        return chunk.choices[0].delta.content or ""
+    except (IndexError, AttributeError):
+        return ""
+
+
+def _openai_prompt_chars(messages) -> int:
+    return sum(len(str(message.get("content", ""))) for message in messages or [])
+
+
+class WindowStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.calls = 0
+        self.failures = 0
+        self.prompt_chars = 0
+        self.response_chars = 0
+
+
+class LLMTelemetry:
+    def __init__(self):
+        self.enabled = os.getenv("LLM_TELEMETRY", "on").lower() != "off"
+        self.flush_seconds = float(os.getenv("LLM_TELEMETRY_FLUSH_SECONDS", "60"))
+        self.window_start = datetime.utcnow()
+        self._windows: Dict[WindowKey, WindowStats] = {}
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+
+    def record(self, provider: str, model_name: str, site: str, prompt_chars: int,
+               response_chars: int, latency_ms: float, succeeded: bool):
+        if not self.enabled:
+            return
+        key = (provider, model_name, prompt_type_for(site), site)
+        with self._lock:
+            stats = self._windows.get(key)
+            if stats is None:
+                stats = self._windows[key] = WindowStats()
+            stats.histogram.record(latency_ms)
+            stats.calls += 1
+            stats.failures += 0 if succeeded else 1
+            stats.prompt_chars += prompt_chars
+            stats.response_chars += response_chars
+        self._ensure_flusher()
+
+    def _timed(self, provider: str, model_name: str, prompt_chars: int, send: Callable[[], Any],
+               extract: Callable[[Any], str], stream: bool, chunk_text: Callable[[Any], str]):
+        site = call_site()
+        started = time.monotonic()
+        try:
+            response = send()
+        except Exception:
+            self.record(provider, model_name, site, prompt_chars, 0, (time.monotonic() - started) * 1000, False)
+            raise
+        if stream:
+            return self._timed_stream(provider, model_name, site, prompt_chars, started, response, chunk_text)
+        self.record(provider, model_name, site, prompt_chars, len(extract(response)),
+                    (time.monotonic() - started) * 1000, True)
+        return response
+
+    def _timed_stream(self, provider: str, model_name: str, site: str, prompt_chars: int,
+                      started: float, chunks, chunk_text: Callable[[Any], str]) -> Iterator[Any]:
+        """Pass chunks through; the call is recorded once the stream ends, fails or is abandoned"""
+        response_chars = 0
+        succeeded = False
+        try:
+            for chunk in chunks:
+                response_chars += len(chunk_text(chunk))
+                yield chunk
+            succeeded = True
+        except GeneratorExit:
+            # Abandoned by the caller (e.g. a hedged race it lost), not a provider failure
+            succeeded = True
+            raise
+        finally:
+            self.record(provider, model_name, site, prompt_chars, response_chars,
+                        (time.monotonic() - started) * 1000, succeeded)
+
+    def instrument_gemini(self, model, model_name: str):
+        return _InstrumentedGeminiModel(model, model_name, self) if self.enabled else model
+
+    def instrument_openai(self, client):
+        return _InstrumentedOpenAIClient(client, self) if self.enabled else client
+
+    def _ensure_flusher(self):
+        if self._flusher is not None:
+            return
+        with self._lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="llm-telemetry", daemon=True)
+                self._flusher.start()
+                atexit.register(self.flush)
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    def _drain(self) -> Tuple[datetime, Dict[WindowKey, WindowStats]]:
+        with self._lock:
+            windows, self._windows = self._windows, {}
+            window_start, self.window_start = self.window_start, datetime.utcnow()
+        return window_start, windows
+
+    def flush(self) -> int:
+        """Write the current window to ai_performance; returns the number of rows written"""
+        window_start, windows = self._drain()
+        if not windows:
+            return 0
+        from app.services.smart_sql_service import smart_sql_service
+
+        rows = []
+        for (provider, model_name, prompt_type, site), stats in windows.items():
+            rows.append({
+                "provider": provider,
+                "model_name": model_name,
+                "prompt_type": prompt_type,
+                "call_site": site,
+                "calls": stats.calls,
+                "failures": stats.failures,
+                "success_rate": round(1 - stats.failures / stats.calls, 4),
+                "response_time_ms": int(round(stats.histogram.mean)),
+                "p50_ms": stats.histogram.percentile(50),
+                "p95_ms": stats.histogram.percentile(95),
+                "p99_ms": stats.histogram.percentile(99),
+                "prompt_chars": stats.prompt_chars,
+                "response_chars": stats.response_chars,
+                "histogram": stats.histogram.to_dict(),
+                "window_start": window_start.isoformat()
+            })
+        if not smart_sql_service.record_ai_performance(rows):
+            # Keep the window for the next flush rather than losing it
+            with self._lock:
+                for key, stats in windows.items():
+                    current = self._windows.setdefault(key, WindowStats())
+                    current.histogram.merge(stats.histogram)
+                    current.calls += stats.calls
+                    current.failures += stats.failures
+                    current.prompt_chars += stats.prompt_chars
+                    current.response_chars += stats.response_chars
+            return 0
+        return len(rows)
+
+    def percentiles(self, hours: int = 24) -> List[Dict[str, Any]]:
+        """p50/p95/p99 per provider and prompt type over the last hours, unflushed calls included"""
+        from app.services.smart_sql_service import smart_sql_service
+
+        windows = smart_sql_service.get_ai_performance(datetime.utcnow() - timedelta(hours=hours))
+        with self._lock:
+            for (provider, model_name, prompt_type, site), stats in self._windows.items():
+                windows.append({
+                    "provider": provider,
+                    "prompt_type": prompt_type,
+                    "calls": stats.calls,
+                    "failures": stats.failures,
+                    "prompt_chars": stats.prompt_chars,
+                    "response_chars": stats.response_chars,
+                    "histogram": stats.histogram.to_dict()
+                })
+
+        groups: Dict[Tuple[str, str], WindowStats] = {}
+        for window in windows:
+            group = groups.setdefault((window["provider"], window["prompt_type"]), WindowStats())
+            group.histogram.merge(LatencyHistogram.from_dict(window["histogram"]))
+            group.calls += window["calls"]
+            group.failures += window["failures"]
+            group.prompt_chars += window["prompt_chars"]
+            group.response_chars += window["response_chars"]
+
+        return [{
+            "provider": provider,
+            "prompt_type": prompt_type,
+            "calls": stats.calls,
+            "success_rate": round(1 - stats.failures / stats.calls, 4) if stats.calls else 0.0,
+            "p50_ms": stats.histogram.percentile(50),
+            "p95_ms": stats.histogram.percentile(95),
+            "p99_ms": stats.histogram.percentile(99),
+            "mean_ms": round(stats.histogram.mean, 1),
+            "avg_prompt_chars": stats.prompt_chars // stats.calls if stats.calls else 0,
+            "avg_response_chars": stats.response_chars // stats.calls if stats.calls else 0
+        } for (provider, prompt_type), stats in sorted(groups.items())]
+
+
+class _InstrumentedGeminiModel:
+    """GenerativeModel whose generate_content calls are timed; everything else passes through"""
+
+    def __init__(self, model, model_name: str, telemetry: LLMTelemetry):
+        self._model = model
+        self._model_name = model_name
+        self._telemetry = telemetry
+
+    def generate_content(self, prompt, *args, stream: bool = False, **kwargs):
+        return self._telemetry._timed(
+            "gemini", self._model_name, len(str(prompt)),
+            lambda: self._model.generate_content(prompt, *args, stream=stream, **kwargs),
+            _gemini_text, stream, _gemini_text
+        )
+
+    def __getattr__(self, name):
+        return getattr(self._model, name)
+
+
+class _InstrumentedCompletions:
+    def __init__(self, completions, telemetry: LLMTelemetry):
+        self._completions = completions
+        self._telemetry = telemetry
+
+    def create(self, *args, messages=None, stream: bool = False, **kwargs):
+        return self._telemetry._timed(
+            "openai", kwargs.get("model", ""), _openai_prompt_chars(messages),
+            lambda: self._completions.create(*args, messages=messages, stream=stream, **kwargs),
+            _openai_text, stream, _openai_delta
+        )
+
+    def __getattr__(self, name):
+        return getattr(self._completions, name)
+
+
+class _InstrumentedChat:
+    def __init__(self, chat, telemetry: LLMTelemetry):
+        self._chat = chat
+        self.completions = _InstrumentedCompletions(chat.completions, telemetry)
+
+    def __getattr__(self, name):
+        return getattr(self._chat, name)
+
+
+class _InstrumentedOpenAIClient:
+    """OpenAI client whose chat completions are timed; everything else passes through"""
+
+    def __init__(self, client, telemetry: LLMTelemetry):
+        self._client = client
+        self.chat = _InstrumentedChat(client.chat, telemetry)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+# Create singleton instance
+llm_telemetry = LLMTelemetry()
@@ -0,0 +1,127 @@
+"""
+Mood Classifier
+Local multinomial naive Bayes over hashed word unigrams and bigrams (NumPy).
+Classifies a journal entry into the seven flower moods in well under a
+millisecond; only low-confidence entries need to go to the LLM.
+"""
+import os
+import re
+import zlib
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from app.services.mood_samples import MOOD_KEYWORDS, MOOD_SAMPLES
+
+MOODS = ["happy", "sad", "anxious", "calm", "reflective", "excited", "grateful"]
+N_FEATURES = 2 ** 15
+TOKEN_RE = re.compile(r"[a-z']+")
+
+# Words that say nothing about mood; with a small training set they only add noise
+STOPWORDS = frozenset(
+    "i me my myself we our you he she it they them his her the a an and or but so to of in on at "
+    "for with is am are was were be been have has had do did this that these those just really very "
+    "all about from as by it's i'm i've up out what how when then there than too".split()
+)
+# Crude suffix stripping so "worried", "worrying" and "worries" share a feature
+SUFFIXES = ("ingly", "ness", "ful", "ing", "ed", "ly", "es", "s", "y")
+
+
+def _stem(word: str) -> str:
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def featurize(text: str) -> np.ndarray:
+    """Hashed feature indices (with repeats) for the words and word pairs of a text"""
+    words = [_stem(word) for word in TOKEN_RE.findall((text or "").lower().replace("’", "'"))
+             if word not in STOPWORDS]
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    return np.fromiter((zlib.crc32(gram.encode()) % N_FEATURES for gram in grams),
+                       dtype=np.int64, count=len(grams))
+
+
+def default_samples() -> List[Tuple[str, str]]:
+    """Bundled labelled snippets plus each mood's keyword list as one extra document"""
+    return list(MOOD_SAMPLES) + [(" ".join(keywords), mood) for mood, keywords in MOOD_KEYWORDS.items()]
+
+
+class MoodClassifier:
+    def __init__(self, alpha: float = 0.1):
+        self.alpha = alpha
+        self.confidence_threshold = float(os.getenv("MOOD_CONFIDENCE_THRESHOLD", "0.75"))
+        self.log_prior = np.full(len(MOODS), -np.log(len(MOODS)))
+        self.feature_log_prob = np.zeros((len(MOODS), N_FEATURES))
+        self.known = np.zeros(N_FEATURES, dtype=bool)
+
+    def fit(self, samples: Iterable[Tuple[str, str]]) -> "MoodClassifier":
+        counts = np.zeros((len(MOODS), N_FEATURES))
+        docs = np.zeros(len(MOODS))
+        for text, mood in samples:
+            row = MOODS.index(mood)
+            np.add.at(counts[row], featurize(text), 1)
+            docs[row] += 1
+
+        self.known = counts.sum(axis=0) > 0
+        self.log_prior = np.log((docs + 1) / (docs.sum() + len(MOODS)))
+        # Smooth over the features seen in training only; unseen buckets are ignored at predict time
+        totals = counts.sum(axis=1, keepdims=True) + self.alpha * self.known.sum()
+        self.feature_log_prob = np.log((counts + self.alpha) / totals)
+        return self
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        features = featurize(text)
+        features = features[self.known[features]]
+        scores = self.log_prior + self.feature_log_prob[:, features].sum(axis=1)
+        scores -= scores.max()
+        probs = np.exp(scores)
+        return probs / probs.sum()
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Most likely mood and its probability"""
+        probs = self.predict_proba(text)
+        best = int(probs.argmax())
+        return MOODS[best], float(probs[best])
+
+    def evaluate(self, samples: List[Tuple[str, str]]) -> Dict[str, float]:
+        """Accuracy overall, and the share and accuracy of entries confident enough to stay local"""
+        results = [(self.predict(text), mood) for text, mood in samples]
+        local = [predicted == mood for (predicted, confidence), mood in results
+                 if confidence >= self.confidence_threshold]
+        return {
+            "accuracy": sum(predicted == mood for (predicted, _), mood in results) / max(1, len(results)),
+            "local_share": len(local) / max(1, len(results)),
+            "local_accuracy": sum(local) / max(1, len(local))
+        }
+
+    def save(self, path: str):
+        np.savez_compressed(path, log_prior=self.log_prior,
+                            feature_log_prob=self.feature_log_prob, known=self.known)
+
+    @classmethod
+    def load(cls, path: str) -> "MoodClassifier":
+        data = np.load(path)
+        classifier = cls()
+        classifier.log_prior = data["log_prior"]
+        classifier.feature_log_prob = data["feature_log_prob"]
+        classifier.known = data["known"]
+        return classifier
+
+
+def _load_default() -> MoodClassifier:
+    """Use the trained model file if present, otherwise fit on the bundled samples (a few ms)"""
+    path = os.getenv("MOOD_CLASSIFIER_PATH", "mood_classifier.npz")
+    if os.path.exists(path):
+        try:
+            classifier = MoodClassifier.load(path)
+            print(f"✅ Mood classifier loaded from {path}")
+            return classifier
+        except Exception as e:
+            print(f"❌ Mood classifier load failed, using bundled samples: {e}")
+    return MoodClassifier().fit(default_samples())
+
+
+# Create singleton instance
+mood_classifier = _load_default()
@@ -0,0 +1,243 @@
+"""
+Mood Training Samples
+Hand-labelled journal snippets the local mood classifier is trained on.
+Extra samples (e.g. exported LLM-labelled reflections) can be passed to
+scripts/train_mood_classifier.py as JSONL lines of {"text": ..., "mood": ...}.
+"""
+
+# Mood vocabulary; used by the keyword-based analysis and as extra training documents
+MOOD_KEYWORDS = {
+    "happy": ["happy", "joy", "excited", "grateful", "optimistic", "cheerful", "wonderful", "amazing", "delighted", "pleased", "thrilled", "blessed"],
+    "sad": ["sad", "disappointed", "grief", "melancholy", "blue", "down", "upset", "hurt", "sorrowful", "depressed", "mournful"],
+    "anxious": ["anxious", "worried", "stressed", "nervous", "tense", "overwhelmed", "afraid", "fearful", "restless", "uneasy"],
+    "calm": ["calm", "peaceful", "relaxed", "serene", "tranquil", "centered", "balanced", "still", "quiet", "content"],
+    "reflective": ["reflective", "thoughtful", "contemplative", "pensive", "introspective", "curious", "wondering", "considering"],
+    "excited": ["excited", "thrilled", "enthusiastic", "eager", "energetic", "pumped", "stoked", "jazzed", "exhilarated"],
+    "grateful": ["grateful", "thankful", "appreciate", "blessed", "gratitude", "appreciative", "indebted", "obliged"]
+}
+
+MOOD_SAMPLES = [
+    # Happy
+    ("Today was such a good day, I laughed so much with everyone at lunch", "happy"),
+    ("I feel really happy right now, everything just clicked", "happy"),
+    ("We spent the afternoon at the beach and I was smiling the whole time", "happy"),
+    ("Such a wonderful evening, I felt light and joyful and completely myself", "happy"),
+    ("I got good news this morning and I have been in a great mood ever since", "happy"),
+    ("The sun was out, the coffee was perfect and I felt cheerful all day", "happy"),
+    ("Dinner with my friends was amazing, I love these people so much", "happy"),
+    ("I am pleased with how today went, it felt easy and fun", "happy"),
+    ("My heart feels full, it was a delightful day with lots of laughter", "happy"),
+    ("Finally finished the project and I feel so good about it", "happy"),
+    ("Played with the kids in the park and felt pure joy", "happy"),
+    ("Everything went right today and I could not stop grinning", "happy"),
+    ("I danced in the kitchen tonight, life feels good", "happy"),
+    ("Honestly one of the best days I have had in a long time", "happy"),
+    ("Had the best brunch with my sister, we could not stop laughing", "happy"),
+    ("I feel cheerful and light, like nothing can bring me down today", "happy"),
+    ("The weather was beautiful and I felt genuinely happy walking home", "happy"),
+    ("My friend surprised me with flowers and it made my whole week", "happy"),
+    ("I smiled at strangers all day, I'm in such a good place", "happy"),
+    ("Today felt like a celebration, good food, good music, good people", "happy"),
+    ("I'm really content and happy with how my life looks right now", "happy"),
+    ("We won the game tonight and I'm still on a high", "happy"),
+    ("It was a fun, silly, lovely day and I enjoyed every minute", "happy"),
+    ("I laughed until my stomach hurt at the comedy show", "happy"),
+    ("Feeling good about myself for the first time in a while", "happy"),
+    ("My garden finally bloomed and it made me so happy", "happy"),
+    ("I had a delightful afternoon baking cookies with my niece", "happy"),
+    ("Life is sweet today, I feel glad to be alive", "happy"),
+    ("Everyone was in a good mood at work and it was contagious", "happy"),
+    ("Got a compliment from my boss and I'm beaming", "happy"),
+
+    # Sad
+    ("I feel so sad today and I don't really know why", "sad"),
+    ("I miss her so much, the house feels empty without her", "sad"),
+    ("I cried in the car after work, everything feels heavy", "sad"),
+    ("I'm disappointed in how things turned out, I really hoped it would work", "sad"),
+    ("Feeling down and lonely tonight, nobody called", "sad"),
+    ("The grief comes in waves and today it hit hard", "sad"),
+    ("I feel hurt by what he said and I can't stop thinking about it", "sad"),
+    ("It has been a gray, empty kind of day and I feel blue", "sad"),
+    ("I lost the job I cared about and I feel hopeless", "sad"),
+    ("Everything feels pointless lately and I'm tired of feeling this way", "sad"),
+    ("We broke up last night and I feel heartbroken", "sad"),
+    ("I feel like I let everyone down and I'm so upset with myself", "sad"),
+    ("My dog passed away this week and I keep crying", "sad"),
+    ("I don't feel like myself, I just feel sad and numb", "sad"),
+    ("I feel empty and alone even when people are around", "sad"),
+    ("Today was hard, I kept thinking about what I lost", "sad"),
+    ("I'm heartbroken that we didn't get to say goodbye", "sad"),
+    ("I spent the day in bed, I just feel so low", "sad"),
+    ("Nothing went right and I feel defeated and sad", "sad"),
+    ("I miss my old friends and the way things used to be", "sad"),
+    ("Rejected again, I feel worthless and disappointed", "sad"),
+    ("The anniversary of his death is this week and I feel the sadness everywhere", "sad"),
+    ("I'm sad that my best friend is moving away", "sad"),
+    ("I feel unloved and invisible lately", "sad"),
+    ("Tears came out of nowhere during dinner tonight", "sad"),
+    ("I'm grieving the version of my life I thought I'd have", "sad"),
+    ("My heart aches and I don't know how to make it stop", "sad"),
+    ("Another lonely weekend, I feel so down", "sad"),
+    ("I'm upset and hurt that nobody remembered my birthday", "sad"),
+    ("Everything feels dark and heavy and I can't shake it", "sad"),
+
+    # Anxious
+    ("I'm so anxious about the presentation tomorrow, my stomach is in knots", "anxious"),
+    ("I can't stop worrying about money, the bills keep piling up", "anxious"),
+    ("My mind keeps racing and I can't sleep, what if everything goes wrong", "anxious"),
+    ("I feel overwhelmed by everything on my plate and I'm panicking", "anxious"),
+    ("I'm nervous about the doctor's results and keep checking my phone", "anxious"),
+    ("Work is so stressful right now, I feel tense all the time", "anxious"),
+    ("I'm afraid I'll mess up the interview and embarrass myself", "anxious"),
+    ("My heart was pounding all day and I felt on edge", "anxious"),
+    ("I keep overthinking every conversation and worrying what people think of me", "anxious"),
+    ("Deadlines everywhere and I feel like I'm drowning in stress", "anxious"),
+    ("I had a panic attack on the train this morning", "anxious"),
+    ("I feel restless and uneasy, something feels wrong but I can't name it", "anxious"),
+    ("So worried about my mom's health, I can't focus on anything", "anxious"),
+    ("The exam is next week and I'm scared I haven't studied enough", "anxious"),
+    ("I'm stressed about the deadline and my chest feels tight", "anxious"),
+    ("I can't stop thinking about everything that could go wrong", "anxious"),
+    ("I feel jittery and on edge, my hands won't stop shaking", "anxious"),
+    ("The uncertainty about my job is making me really anxious", "anxious"),
+    ("I lay awake worrying about the future for hours", "anxious"),
+    ("I'm terrified of flying tomorrow and can't calm down", "anxious"),
+    ("Too many things to do and I feel like I'm falling behind", "anxious"),
+    ("I'm worried my friend is angry with me and I keep replaying it", "anxious"),
+    ("Social events make me so nervous, I dread tonight", "anxious"),
+    ("My thoughts are spiraling and I feel panicky", "anxious"),
+    ("I'm scared about the test results and can't focus", "anxious"),
+    ("Money stress is keeping me up at night", "anxious"),
+    ("I feel pressure from every direction and I'm overwhelmed", "anxious"),
+    ("What if I fail, what if they find out I'm not good enough", "anxious"),
+    ("My anxiety was through the roof at the meeting today", "anxious"),
+    ("I keep checking my email, nervous about their reply", "anxious"),
+
+    # Calm
+    ("I feel calm and settled tonight, the house is quiet", "calm"),
+    ("A slow, peaceful morning with tea and no plans", "calm"),
+    ("I took a long walk and came back feeling relaxed and centered", "calm"),
+    ("Meditated for twenty minutes and my mind feels still", "calm"),
+    ("Nothing special happened today and that felt nice and easy", "calm"),
+    ("I feel balanced, like things are exactly where they should be", "calm"),
+    ("Sat by the lake and just listened to the water, very serene", "calm"),
+    ("Took a warm bath and now I feel rested and content", "calm"),
+    ("The rain outside is soothing and I feel at peace", "calm"),
+    ("A quiet Sunday, reading on the couch, no rush at all", "calm"),
+    ("I breathed slowly and the tension melted away", "calm"),
+    ("Everything feels gentle and unhurried today", "calm"),
+    ("I feel grounded and steady after yoga", "calm"),
+    ("Tonight I feel relaxed and comfortable in my own skin", "calm"),
+    ("I feel peaceful after a long walk in the woods", "calm"),
+    ("A gentle evening, candles lit, soft music, total calm", "calm"),
+    ("I'm relaxed and unhurried, just enjoying the quiet", "calm"),
+    ("The day moved slowly and I felt at ease the whole time", "calm"),
+    ("Sitting on the porch watching the sunset, everything is still", "calm"),
+    ("I feel serene and clear after my morning meditation", "calm"),
+    ("A lazy afternoon nap left me feeling rested and calm", "calm"),
+    ("I drank tea and watched the snow fall, so tranquil", "calm"),
+    ("My breathing is slow and my body feels loose and relaxed", "calm"),
+    ("There's a stillness in me tonight that I really like", "calm"),
+    ("Nothing urgent, nothing pressing, just a calm steady day", "calm"),
+    ("I feel settled and content in this moment", "calm"),
+    ("The ocean sounds helped me unwind completely", "calm"),
+    ("I feel centered and peaceful after stretching", "calm"),
+    ("A quiet night in, cozy blanket, soft rain, at peace", "calm"),
+    ("I let go of the rush today and it felt calm and easy", "calm"),
+
+    # Reflective
+    ("I've been thinking about who I want to become over the next few years", "reflective"),
+    ("Looking back on this year, I realize how much I have changed", "reflective"),
+    ("I wonder why I always react this way when someone criticizes me", "reflective"),
+    ("I'm trying to understand what I really want from my career", "reflective"),
+    ("Today made me reflect on my relationship with my father", "reflective"),
+    ("I noticed a pattern in how I avoid difficult conversations", "reflective"),
+    ("What does a meaningful life look like for me, I keep asking myself", "reflective"),
+    ("I've been considering whether this path still fits who I am", "reflective"),
+    ("Writing this helps me see the situation from a different angle", "reflective"),
+    ("I'm curious about why certain memories keep coming back", "reflective"),
+    ("I realized that I often say yes when I mean no", "reflective"),
+    ("Thinking about my values and whether my days reflect them", "reflective"),
+    ("It's interesting how my perspective shifted after that talk", "reflective"),
+    ("I keep coming back to the question of what home means to me", "reflective"),
+    ("I've been wondering what really makes me feel fulfilled", "reflective"),
+    ("Thinking back on my childhood helps me understand my reactions now", "reflective"),
+    ("I'm questioning some beliefs I've held for a long time", "reflective"),
+    ("I realized my priorities have shifted over the past year", "reflective"),
+    ("I'm trying to figure out why that comment bothered me so much", "reflective"),
+    ("Looking at old photos made me think about how far I've come", "reflective"),
+    ("I'm considering what kind of friend I want to be", "reflective"),
+    ("I keep asking myself whether I'm living by my values", "reflective"),
+    ("Today I thought a lot about forgiveness and what it means", "reflective"),
+    ("I'm exploring why I find it so hard to ask for help", "reflective"),
+    ("It's strange how a small moment can change how you see things", "reflective"),
+    ("I'm thinking about the lessons this difficult year taught me", "reflective"),
+    ("I wonder what my life would look like if I chose differently", "reflective"),
+    ("Writing helps me untangle my thoughts about the future", "reflective"),
+    ("I noticed I judge myself much more harshly than others", "reflective"),
+    ("I've been contemplating what success actually means to me", "reflective"),
+
+    # Excited
+    ("I can't wait for the trip next week, I'm so excited", "excited"),
+    ("I got the job offer and I'm buzzing with energy", "excited"),
+    ("Tomorrow is the concert and I can barely sit still", "excited"),
+    ("Just signed up for the marathon and I'm thrilled", "excited"),
+    ("We're moving to a new city and I'm so eager to start", "excited"),
+    ("I have a new idea for a business and I'm pumped to build it", "excited"),
+    ("Counting down the days until the wedding, so much to look forward to", "excited"),
+    ("The first day of the new course is tomorrow and I'm really enthusiastic", "excited"),
+    ("I booked the tickets, this is happening, I'm so hyped", "excited"),
+    ("My band got a gig and I'm full of energy and anticipation", "excited"),
+    ("I'm starting my dream project on Monday and I can't wait", "excited"),
+    ("So much is about to change and I'm exhilarated", "excited"),
+    ("The puppy arrives this weekend and I am beyond excited", "excited"),
+    ("Launch day is almost here and I'm bursting with excitement", "excited"),
+    ("I can hardly wait for the weekend trip, it's going to be amazing", "excited"),
+    ("We found out we're having a baby and I'm thrilled", "excited"),
+    ("My new job starts Monday and I'm so eager to begin", "excited"),
+    ("I'm pumped about the race this weekend", "excited"),
+    ("The tickets just arrived and I'm jumping up and down", "excited"),
+    ("I'm so excited to see my best friend after two years", "excited"),
+    ("Big things are coming and I'm full of anticipation", "excited"),
+    ("Can't wait to show everyone what I've been building", "excited"),
+    ("I just got accepted into the program, I'm ecstatic", "excited"),
+    ("Tomorrow we leave for Japan and I'm buzzing", "excited"),
+    ("So excited for the holidays and seeing my family", "excited"),
+    ("The first show of the tour is tonight, I'm stoked", "excited"),
+    ("I'm eager to start this new chapter of my life", "excited"),
+    ("My book is getting published and I'm over the moon", "excited"),
+    ("The countdown is on and I can't contain my excitement", "excited"),
+    ("I have a date tomorrow and I'm nervous in the best excited way", "excited"),
+
+    # Grateful
+    ("I'm so grateful for my friends who showed up for me this week", "grateful"),
+    ("Thankful for a warm home and food on the table", "grateful"),
+    ("I appreciate how patient my partner has been with me lately", "grateful"),
+    ("Feeling blessed to have such a supportive family", "grateful"),
+    ("Grateful for my health and for the small things like morning coffee", "grateful"),
+    ("I'm thankful my mom called today, it meant a lot", "grateful"),
+    ("So much gratitude for the people who believed in me", "grateful"),
+    ("I appreciate my body for carrying me through a hard day", "grateful"),
+    ("Thank you to the stranger who helped me today, it restored my faith", "grateful"),
+    ("I feel lucky and thankful for the life I have", "grateful"),
+    ("Counting my blessings tonight, there are more than I thought", "grateful"),
+    ("Grateful for my teacher who pushed me to keep going", "grateful"),
+    ("I'm thankful for this quiet moment and for the people I love", "grateful"),
+    ("Deeply appreciative of the kindness my coworkers showed me", "grateful"),
+    ("Grateful for the friends who check on me without being asked", "grateful"),
+    ("I'm thankful for a quiet morning and a good cup of coffee", "grateful"),
+    ("I appreciate my parents more every year", "grateful"),
+    ("So thankful that my surgery went well", "grateful"),
+    ("I feel blessed to have work I enjoy", "grateful"),
+    ("Grateful for the small kindnesses people showed me today", "grateful"),
+    ("I want to remember how thankful I am for this home", "grateful"),
+    ("My heart is full of gratitude for my partner's support", "grateful"),
+    ("I appreciate the lessons even the hard days taught me", "grateful"),
+    ("Thankful for my dog who always makes me feel loved", "grateful"),
+    ("Grateful for another sunrise and another chance", "grateful"),
+    ("I'm so appreciative of my team for covering for me", "grateful"),
+    ("Counting the good things today: family, health, friends", "grateful"),
+    ("I feel thankful that we all got to be together for dinner", "grateful"),
+    ("Grateful that my sister forgave me", "grateful"),
+    ("Thank you life for this beautiful ordinary day", "grateful"),
+]
@@ -111,6 +111,29 @@ You are PAUZ, an intelligent voice assistant for a journaling and self-reflectio
 Remember: Users come to you for guidance on using the app effectively. Be clear, accurate, and helpful!
 """
 
+PAUZ_APP_KNOWLEDGE = """
+PAUZ is a journaling app with TWO main features, FreeJournal and GuidedJournal, plus a Garden for mood tracking.
+Users can view all saved journals anytime. The goal is to make journaling accessible and less intimidating.
+
+### 1. **FreeJournal** - Complete freedom:
+- Write freely about anything
+- Can't start? Click "Hint" for AI-generated starting ideas or continuation help
+- Afraid of writing? Record yourself talking - it transcribes automatically
+- After writing: "Reflect with AI" detects mood, insights, gives summary & follow-up questions
+- Mood detected plants a flower in your Garden (for motivation/tracking)
+- Can save journals or export as PDF
+
+### 2. **GuidedJournal** - Structured exploration:
+- Choose from 9 categories: Mind, Body, Heart, Friends, Family, Romance, Growth, Mission, Money, Joy
+- AI generates thoughtful prompts specific to that category
+- Journals are saved in-app or can export as PDF
+
+### **Garden Feature** - Mood tracking:
+- Flowers represent moods from your journal reflections
+- Click any flower to see the journal note that created it
+- Visual way to track your emotional journey over time
+"""
+
 # Enhanced prompt builder for Gemini
 def build_pauz_aware_prompt(user_input: str, user_context: dict = None, memory_context: dict = None) -> str:
     """Build a prompt that includes detailed PAUZ app knowledge"""
@@ -4,65 +4,53 @@ Knows the actual features: FreeJournal, GuidedJournal with categories, Garden, e
 Maintains ongoing conversation context
 """
 
-import os
 import json
-from typing import Optional, Dict, Any, List
-import google.generativeai as genai
+from typing import Optional, Dict, Any, Iterator, List
 from dotenv import load_dotenv
 
 load_dotenv()
 
+from app.services.circuit_breaker import circuit_breakers
+from app.services.inference_service import inference_service
+from app.services.request_deadline import request_deadline
+from app.services.ai_providers import ai_providers
+from app.services.llm_streaming import sentences, stream_gemini
+from app.services.app_knowledge import pauz_knowledge
+from app.services.personalization_service import personalization_service
+from app.services.pauz_app_context import PAUZ_APP_KNOWLEDGE
+from app.utils.keyword_matcher import KeywordMatcher
+
+# Cues for the offline fallback replies, matched in one pass over the input
+VOICE_KEYWORDS = KeywordMatcher({
+    "greeting": ["hi", "hello", "hey"],
+    "question": ["help", "what", "how"],
+    "free_journal": ["free journal", "free writing", "hints"],
+    "guided": ["guided", "categories", "prompts"],
+    "garden": ["garden", "flower", "mood"],
+    "stuck": ["stuck", "don't know", "blank"],
+    "getting_started": ["start", "begin", "how to"],
+    "voice": ["record", "voice", "talk"]
+})
+
 class PauzVoiceService:
     """Voice assistant that actually understands PAUZ app features"""
     
     def __init__(self):
         # Initialize Gemini
-        self.gemini_api_key = os.getenv('GEMINI_API_KEY')
-        if not self.gemini_api_key or self.gemini_api_key == 'your-gemini-api-key-here':
+        if not ai_providers.available("gemini"):
             raise ValueError("GEMINI_API_KEY not configured")
         
-        try:
-            genai.configure(api_key=self.gemini_api_key)
-            # Use gemini-pro model which should be available
-            self.model = genai.GenerativeModel('gemini-pro')
-            print("✅ PAUZ Voice Assistant initialized with proper app knowledge")
-        except Exception as e:
-            print(f"⚠️ Gemini pro failed, trying 1.5-flash: {e}")
-            try:
-                self.model = genai.GenerativeModel('gemini-1.5-flash')
-                print("✅ PAUZ Voice Assistant initialized with gemini-1.5-flash")
-            except Exception as e2:
-                print(f"⚠️ All Gemini models failed, using fallback only: {e2}")
-                self.model = None
+        # Shared conversational model, created on first use; the app overview is its system
+        # instruction, so each turn only sends the knowledge sections it needs
+        self.model = ai_providers.model("chat", system_instruction=pauz_knowledge.core)
+        print("✅ PAUZ Voice Assistant initialized with proper app knowledge")
         
         # Store conversation history per user
         self.conversations = {}
         
     def get_pauz_app_knowledge(self) -> str:
         """Accurate description of PAUZ app features"""
-        return """
-        PAUZ is a journaling app with TWO main features:
-
-        1. **FreeJournal** - Complete freedom:
-           - Write freely about anything
-           - Can't start? Click "Hint" for AI-generated starting ideas or continuation help
-           - Afraid of writing? Record yourself talking - it transcribes automatically
-           - After writing: "Reflect with AI" detects mood, insights, gives summary & follow-up questions
-           - Mood detected plants a flower in your Garden (for motivation/tracking)
-           - Can save journals or export as PDF
-
-        2. **GuidedJournal** - Structured exploration:
-           - Choose from 9 categories: Mind, Body, Heart, Friends, Family, Romance, Growth, Mission, Money, Joy
-           - AI generates thoughtful prompts specific to that category
-           - Journals are saved in-app or can export as PDF
-
-        **Garden Feature** - Mood tracking:
-           - Flowers represent moods from your journal reflections
-           - Click any flower to see the journal note that created it
-           - Visual way to track your emotional journey over time
-
-        Users can view all saved journals anytime. The goal is to make journaling accessible and less intimidating.
-        """
+        return PAUZ_APP_KNOWLEDGE
     
     def get_or_create_conversation(self, user_id: str) -> List[Dict]:
         """Get or create conversation history for user"""
@@ -87,7 +75,13 @@ class PauzVoiceService:
         """Build conversation context including history"""
         conversation = self.get_or_create_conversation(user_id)
         
-        context = f"{self.get_pauz_app_knowledge()}\n\n"
+        # Follow-ups ("tell me more") are about the previous question, so it is searched too
+        previous = next((msg["content"] for msg in reversed(conversation[:-1]) if msg["role"] == "user"), "")
+        knowledge = pauz_knowledge.context_for(f"{previous} {user_input}")
+        context = f"{knowledge}\n\n" if knowledge else ""
+        profile = personalization_service.context_block(user_id)
+        if profile:
+            context += f"{profile}\n\n"
         context += "CONVERSATION HISTORY:\n"
         
         for msg in conversation[-6:]:  # Last 6 messages for context
@@ -110,7 +104,8 @@ class PauzVoiceService:
         prompt = self.build_conversation_context(user_id, user_input)
         
         try:
-            response = self.model.generate_content(prompt)
+            response = inference_service.call("gemini", self.model.generate_content, prompt,
+                                              request_options={"timeout": request_deadline.timeout()})
             
             if response.text and response.text.strip():
                 assistant_response = response.text.strip()
@@ -128,39 +123,61 @@ class PauzVoiceService:
             print(f"❌ Gemini failed: {e}")
             return self.get_contextual_fallback(user_input, user_id)
     
+    def stream_response(self, user_input: str, user_id: str, user_context: Optional[Dict] = None) -> Iterator[str]:
+        """
+        Same as generate_response but yields whole sentences as Gemini produces them,
+        so speech can start before the full answer is written
+        """
+        self.add_to_conversation(user_id, "user", user_input)
+        prompt = self.build_conversation_context(user_id, user_input)
+        
+        spoken = []
+        try:
+            if self.model and circuit_breakers.is_available("gemini"):
+                for sentence in sentences(stream_gemini(self.model, prompt)):
+                    spoken.append(sentence)
+                    yield sentence
+        except Exception as e:
+            print(f"❌ Gemini stream failed: {e}")
+        
+        if spoken:
+            self.add_to_conversation(user_id, "assistant", " ".join(spoken))
+        else:
+            yield self.get_contextual_fallback(user_input, user_id)
+
     def get_contextual_fallback(self, user_input: str, user_id: str) -> str:
         """Smart fallback that considers conversation context"""
         conversation = self.get_or_create_conversation(user_id)
-        input_lower = user_input.lower()
+        hits = VOICE_KEYWORDS.scan(user_input)
         
         # Check if this is first message vs ongoing conversation
         is_first_message = len([msg for msg in conversation if msg["role"] == "user"]) <= 1
         
         if is_first_message:
             # First message - welcome and guide
-            if any(word in input_lower for word in ["hi", "hello", "hey"]):
+            if "greeting" in hits:
                 return "Hi! I'm your PAUZ journaling assistant. You can ask me about FreeJournal for free writing, GuidedJournal for category-based prompts, or anything about journaling!"
-            elif any(word in input_lower for word in ["help", "what", "how"]):
+            elif "question" in hits:
                 return "I can help you with both journaling options! FreeJournal lets you write freely with hints and voice recording, while GuidedJournal gives you structured prompts in categories like Mind, Body, Heart, etc. What interests you?"
         
         # Ongoing conversation responses
-        if any(word in input_lower for word in ["free journal", "free writing", "hints"]):
+        if "free_journal" in hits:
             return "FreeJournal is perfect for total freedom! You can write anything, get hints when stuck, or even record yourself talking. The 'Reflect with AI' feature is amazing for insights too!"
         
-        elif any(word in input_lower for word in ["guided", "categories", "prompts"]):
+        elif "guided" in hits:
             categories = "Mind, Body, Heart, Friends, Family, Romance, Growth, Mission, Money, Joy"
             return f"GuidedJournal helps you explore specific topics with thoughtful prompts. You can choose from: {categories}. Which category feels right for you today?"
         
-        elif any(word in input_lower for word in ["garden", "flower", "mood"]):
+        elif "garden" in hits:
             return "Your Garden shows your mood journey as flowers! Each flower represents a mood detected from your journal reflections. Click any flower to see what created it - it's a beautiful way to track your growth."
         
-        elif any(word in input_lower for word in ["stuck", "don't know", "blank"]):
+        elif "stuck" in hits:
             return "No worries! In FreeJournal, you can use the Hint button for ideas, or try GuidedJournal for structured prompts. You can also record yourself talking if typing feels hard. What feels easier?"
         
-        elif any(word in input_lower for word in ["start", "begin", "how to"]):
+        elif "getting_started" in hits:
             return "Great question! You could start with FreeJournal to write freely, or pick a GuidedJournal category that calls to you. Both ways are valid - what feels like your style?"
         
-        elif any(word in input_lower for word in ["record", "voice", "talk"]):
+        elif "voice" in hits:
             return "Yes! In FreeJournal you can record yourself talking instead of writing. It transcribes automatically - perfect for when writing feels overwhelming!"
         
         else:
@@ -0,0 +1,179 @@
+"""
+Personalization Service
+Keeps a compact profile per user (recent moods, frequent themes, preferred guided
+categories, typical entry length) in SQL, updated a little on every journal save
+and reflection instead of being rebuilt from whole journals. Prompt builders
+render it as a context block capped at PERSONALIZATION_CONTEXT_CHARS, so prompts
+get more personal without getting longer.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.utils.keyword_matcher import KeywordMatcher
+
+# Life themes picked out of journal text; one scan per save
+THEME_KEYWORDS = KeywordMatcher({
+    "work": ["work", "job", "boss", "office", "meeting", "deadline", "career", "coworker"],
+    "study": ["study", "exam", "school", "class", "university", "homework", "learn"],
+    "family": ["family", "mom", "dad", "mother", "father", "brother", "sister", "parents", "kids"],
+    "friends": ["friend", "friendship", "hang out", "party"],
+    "relationships": ["relationship", "partner", "boyfriend", "girlfriend", "husband", "wife", "dating"],
+    "health": ["health", "sick", "doctor", "pain", "exercise", "gym", "workout", "run"],
+    "sleep": ["sleep", "tired", "insomnia", "nap", "exhausted"],
+    "money": ["money", "rent", "bills", "salary", "debt", "budget", "spend"],
+    "creativity": ["create", "creative", "art", "music", "paint", "draw", "poem", "song"],
+    "nature": ["nature", "park", "walk", "outside", "garden", "beach", "hike"],
+    "self-worth": ["confidence", "worth", "enough", "failure", "proud", "insecure"],
+    "future": ["future", "plan", "goal", "dream", "change", "decision"],
+})
+
+# Entries and moods remembered per user; older ones age out of the profile
+MAX_RECENT_ENTRIES = 20
+MAX_RECENT_MOODS = 10
+
+
+def _top(counts: Dict[str, int], limit: int) -> List[str]:
+    return sorted(counts, key=lambda name: (-counts[name], name))[:limit]
+
+
+class PersonalizationService:
+    def __init__(self, db_path: str = "smart_analytics.db"):
+        self.db_path = db_path
+        # Size of the rendered profile block in prompts
+        self.context_chars = int(os.getenv("PERSONALIZATION_CONTEXT_CHARS", "400"))
+        self._lock = threading.Lock()
+        self.init_database()
+
+    def init_database(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS user_personalization (
+                user_id TEXT PRIMARY KEY,
+                recent_entries TEXT NOT NULL,  -- JSON [{id, type, words, themes}], newest last
+                recent_moods TEXT NOT NULL,  -- JSON [{mood, at}], newest last
+                categories TEXT NOT NULL,  -- JSON {category: guided journals written}
+                updated_at TEXT NOT NULL
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    def get(self, user_id: str) -> Dict[str, Any]:
+        """The user's stored profile, empty for users who have not written yet"""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute(
+            'SELECT recent_entries, recent_moods, categories FROM user_personalization WHERE user_id = ?',
+            (str(user_id),)
+        ).fetchone()
+        conn.close()
+        if not row:
+            return {"recent_entries": [], "recent_moods": [], "categories": {}}
+        return {
+            "recent_entries": json.loads(row[0]),
+            "recent_moods": json.loads(row[1]),
+            "categories": json.loads(row[2])
+        }
+
+    def _save(self, user_id: str, profile: Dict[str, Any]):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            'INSERT OR REPLACE INTO user_personalization '
+            '(user_id, recent_entries, recent_moods, categories, updated_at) VALUES (?, ?, ?, ?, ?)',
+            (str(user_id), json.dumps(profile["recent_entries"]), json.dumps(profile["recent_moods"]),
+             json.dumps(profile["categories"], sort_keys=True), datetime.utcnow().isoformat())
+        )
+        conn.commit()
+        conn.close()
+
+    def record_entry(self, user_id: str, entry_id: str, journal_type: str, content: str,
+                     category: Optional[str] = None, word_count: Optional[int] = None) -> bool:
+        """
+        Fold a saved journal into the profile. Saving the same entry again replaces
+        its earlier contribution, so autosaves are not counted twice.
+        Pass word_count when it is already stored with the entry to skip the scan.
+        """
+        try:
+            themes = sorted(THEME_KEYWORDS.scan(content))
+            if word_count is None:
+                word_count = len(content.split()) if content else 0
+            with self._lock:
+                profile = self.get(user_id)
+                entries = profile["recent_entries"]
+                is_new = not any(entry["id"] == entry_id for entry in entries)
+                entries = [entry for entry in entries if entry["id"] != entry_id]
+                entries.append({"id": entry_id, "type": journal_type, "words": word_count, "themes": themes})
+                profile["recent_entries"] = entries[-MAX_RECENT_ENTRIES:]
+                if category and is_new:
+                    profile["categories"][category] = profile["categories"].get(category, 0) + 1
+                self._save(user_id, profile)
+            return True
+        except Exception as e:
+            print(f"❌ Failed to update personalization profile: {e}")
+            return False
+
+    def record_mood(self, user_id: str, mood: str) -> bool:
+        """Add a reflection's mood to the profile"""
+        try:
+            with self._lock:
+                profile = self.get(user_id)
+                moods = profile["recent_moods"] + [{"mood": mood, "at": datetime.utcnow().isoformat()}]
+                profile["recent_moods"] = moods[-MAX_RECENT_MOODS:]
+                self._save(user_id, profile)
+            return True
+        except Exception as e:
+            print(f"❌ Failed to record mood in personalization profile: {e}")
+            return False
+
+    def summary(self, user_id: str) -> Dict[str, Any]:
+        """Recent moods (newest first), frequent themes, preferred categories and typical length"""
+        profile = self.get(user_id)
+        entries = profile["recent_entries"]
+        theme_counts: Dict[str, int] = {}
+        for entry in entries:
+            for theme in entry["themes"]:
+                theme_counts[theme] = theme_counts.get(theme, 0) + 1
+        return {
+            "recent_moods": [mood["mood"] for mood in reversed(profile["recent_moods"])],
+            "frequent_themes": _top(theme_counts, 5),
+            "preferred_categories": _top(profile["categories"], 3),
+            "typical_words": sum(entry["words"] for entry in entries) // len(entries) if entries else 0
+        }
+
+    def context_block(self, user_id: Optional[str], max_chars: Optional[int] = None) -> str:
+        """Profile rendered for a prompt, at most max_chars long ("" for unknown users)"""
+        if not user_id:
+            return ""
+        try:
+            summary = self.summary(user_id)
+        except Exception as e:
+            print(f"❌ Failed to read personalization profile: {e}")
+            return ""
+
+        lines = []
+        if summary["recent_moods"]:
+            lines.append(f"Recent moods (newest first): {', '.join(summary['recent_moods'][:5])}")
+        if summary["frequent_themes"]:
+            lines.append(f"Often writes about: {', '.join(summary['frequent_themes'])}")
+        if summary["preferred_categories"]:
+            lines.append(f"Favourite guided topics: {', '.join(summary['preferred_categories'])}")
+        if summary["typical_words"]:
+            lines.append(f"Usual entry length: about {summary['typical_words']} words")
+        if not lines:
+            return ""
+
+        # Whole lines only, most telling first, so the block never outgrows its budget
+        budget = max_chars or self.context_chars
+        block = "ABOUT THIS WRITER:"
+        for line in lines:
+            if len(block) + len(line) + 3 > budget:
+                break
+            block += f"\n- {line}"
+        return block if block != "ABOUT THIS WRITER:" else ""
+
+
+# Create singleton instance
+personalization_service = PersonalizationService()
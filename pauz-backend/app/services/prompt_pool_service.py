@@ -0,0 +1,147 @@
+"""
+Prompt Pool Service
+Keeps pre-generated guided prompt sets per life category in a local SQLite store,
+serves them instantly and refills in the background below a low-water mark.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional
+
+# Produces one fresh prompt set for a category, or None when no AI provider answered
+PromptSetGenerator = Callable[[str], Optional[List[dict]]]
+
+
+def _fingerprint(prompts: List[dict]) -> str:
+    """Order-insensitive fingerprint of a prompt set, used to reject duplicates"""
+    texts = sorted(" ".join(p["text"].lower().split()) for p in prompts)
+    return hashlib.sha1("\n".join(texts).encode()).hexdigest()
+
+
+class PromptPoolService:
+    def __init__(self, db_path: str = "prompt_pools.db"):
+        self.db_path = db_path
+        self.pool_size = int(os.getenv("PROMPT_POOL_SIZE", "5"))
+        self.low_water = int(os.getenv("PROMPT_POOL_LOW_WATER", "2"))
+        # Served fingerprints are kept this long so the same set is not pooled again
+        self.served_retention = timedelta(days=7)
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prompt-pool")
+        self._refilling = set()
+        self._lock = threading.Lock()
+        self.init_database()
+
+    def init_database(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS prompt_pool (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                category TEXT NOT NULL,
+                fingerprint TEXT NOT NULL UNIQUE,
+                prompts TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                served_at TEXT
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_prompt_pool_available ON prompt_pool (category, served_at, id)')
+        conn.commit()
+        conn.close()
+
+    def available(self, category: str) -> int:
+        conn = sqlite3.connect(self.db_path)
+        count = conn.execute(
+            'SELECT COUNT(*) FROM prompt_pool WHERE category = ? AND served_at IS NULL', (category,)
+        ).fetchone()[0]
+        conn.close()
+        return count
+
+    def add(self, category: str, prompts: List[dict]) -> bool:
+        """Store a generated set; returns False if an identical set was already pooled or served"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.execute(
+            'INSERT OR IGNORE INTO prompt_pool (category, fingerprint, prompts, created_at) VALUES (?, ?, ?, ?)',
+            (category, _fingerprint(prompts), json.dumps(prompts), datetime.utcnow().isoformat())
+        )
+        conn.commit()
+        conn.close()
+        return cursor.rowcount == 1
+
+    def take(self, category: str, generate: Optional[PromptSetGenerator] = None) -> Optional[List[dict]]:
+        """
+        Serve the oldest pooled set for the category (None if the pool is empty)
+        and schedule a background refill when the pool drops below the low-water mark
+        """
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT id, prompts FROM prompt_pool WHERE category = ? AND served_at IS NULL ORDER BY id LIMIT 1',
+                (category,)
+            ).fetchone()
+            if row:
+                conn.execute('UPDATE prompt_pool SET served_at = ? WHERE id = ?', (datetime.utcnow().isoformat(), row[0]))
+            remaining = conn.execute(
+                'SELECT COUNT(*) FROM prompt_pool WHERE category = ? AND served_at IS NULL', (category,)
+            ).fetchone()[0]
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+        if generate and remaining < self.low_water:
+            self.refill_async(category, generate)
+
+        if not row:
+            return None
+        prompts = json.loads(row[1])
+        # Each serve looks like a fresh generation to callers
+        for prompt in prompts:
+            prompt["generated_at"] = str(uuid.uuid4())
+        print(f"📦 Served pooled {category} prompts ({remaining} left)")
+        return prompts
+
+    def refill_async(self, category: str, generate: PromptSetGenerator):
+        with self._lock:
+            if category in self._refilling:
+                return
+            self._refilling.add(category)
+        self._executor.submit(self._refill, category, generate)
+
+    def _refill(self, category: str, generate: PromptSetGenerator):
+        try:
+            # Bounded attempts so a provider repeating itself cannot spin forever
+            attempts = 0
+            while self.available(category) < self.pool_size and attempts < self.pool_size * 2:
+                attempts += 1
+                prompts = generate(category)
+                if not prompts:
+                    break
+                if not self.add(category, prompts):
+                    print(f"♻️ Skipped duplicate {category} prompt set")
+            self._purge_served()
+            print(f"✅ Prompt pool for {category} refilled ({self.available(category)} sets)")
+        except Exception as e:
+            print(f"❌ Prompt pool refill failed for {category}: {e}")
+        finally:
+            with self._lock:
+                self._refilling.discard(category)
+
+    def warm(self, categories: Iterable[str], generate: PromptSetGenerator):
+        """Top up every category in the background (call at startup)"""
+        for category in categories:
+            if self.available(category) < self.pool_size:
+                self.refill_async(category, generate)
+
+    def _purge_served(self):
+        cutoff = (datetime.utcnow() - self.served_retention).isoformat()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('DELETE FROM prompt_pool WHERE served_at IS NOT NULL AND served_at < ?', (cutoff,))
+        conn.commit()
+        conn.close()
+
+
+# Create singleton instance
+prompt_pool_service = PromptPoolService()
@@ -0,0 +1,119 @@
+"""
+Prompt Prefetch Service
+Speculatively generates personalised guided prompt sets for the categories a user
+is likely to open next, in the background, so picking a category is usually a
+memory hit instead of an LLM round-trip. Each user gets a generation budget per
+window and prefetched sets expire after a TTL, so speculation stays cheap.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.inference_service import inference_service, BACKGROUND
+
+# (category, personal context) pairs worth warming for a user, most likely first
+PrefetchPlanner = Callable[[str], List[Tuple[str, str]]]
+# Produces one prompt set for a category and personal context, or None when no AI provider answered
+PersonalPromptGenerator = Callable[[str, str], Optional[List[dict]]]
+
+
+class PrefetchedSet:
+    def __init__(self, prompts: List[dict], expires_at: float):
+        self.prompts = prompts
+        self.expires_at = expires_at
+
+
+class PromptPrefetchService:
+    def __init__(self, max_users: int = 5000):
+        self.top_k = int(os.getenv("PROMPT_PREFETCH_TOP_K", "3"))
+        self.ttl_seconds = float(os.getenv("PROMPT_PREFETCH_TTL_SECONDS", "1800"))
+        # Generations allowed per user per budget window
+        self.budget = int(os.getenv("PROMPT_PREFETCH_BUDGET", "6"))
+        self.budget_window_seconds = float(os.getenv("PROMPT_PREFETCH_BUDGET_SECONDS", "3600"))
+        self.max_users = max_users
+        # user_id -> category -> prefetched set (LRU-bounded by user)
+        self.sets: "OrderedDict[str, Dict[str, PrefetchedSet]]" = OrderedDict()
+        # user_id -> monotonic times of generations inside the budget window
+        self._spent: Dict[str, List[float]] = {}
+        self._prefetching = set()
+        self.hits = 0
+        self.misses = 0
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prompt-prefetch")
+        self._lock = threading.Lock()
+
+    def take(self, user_id: str, category: str) -> Optional[List[dict]]:
+        """The user's prefetched set for category if still fresh; each set is served once"""
+        with self._lock:
+            prefetched = self.sets.get(user_id, {}).pop(category, None)
+            if prefetched and prefetched.expires_at > time.monotonic():
+                self.hits += 1
+                print(f"🎯 Prefetched {category} prompts hit for user {user_id}")
+                return prefetched.prompts
+            self.misses += 1
+            return None
+
+    def prefetch(self, user_id: str, plan: PrefetchPlanner, generate: PersonalPromptGenerator):
+        """Warm the user's likely categories in the background; returns immediately"""
+        with self._lock:
+            if user_id in self._prefetching:
+                return
+            self._prefetching.add(user_id)
+        self._executor.submit(self._prefetch, user_id, plan, generate)
+
+    def _fresh_categories(self, user_id: str) -> set:
+        now = time.monotonic()
+        with self._lock:
+            return {category for category, prefetched in self.sets.get(user_id, {}).items()
+                    if prefetched.expires_at > now}
+
+    def _spend(self, user_id: str) -> bool:
+        """Take one generation from the user's budget; False when it is used up"""
+        now = time.monotonic()
+        with self._lock:
+            spent = [at for at in self._spent.get(user_id, []) if now - at < self.budget_window_seconds]
+            if len(spent) >= self.budget:
+                self._spent[user_id] = spent
+                return False
+            spent.append(now)
+            self._spent[user_id] = spent
+            return True
+
+    def _store(self, user_id: str, category: str, prompts: List[dict]):
+        with self._lock:
+            user_sets = self.sets.setdefault(user_id, {})
+            self.sets.move_to_end(user_id)
+            user_sets[category] = PrefetchedSet(prompts, time.monotonic() + self.ttl_seconds)
+            while len(self.sets) > self.max_users:
+                evicted, _ = self.sets.popitem(last=False)
+                self._spent.pop(evicted, None)
+
+    def _prefetch(self, user_id: str, plan: PrefetchPlanner, generate: PersonalPromptGenerator):
+        warmed = 0
+        try:
+            # Speculative work: queued behind interactive calls and shared fairly with other users
+            with inference_service.on_behalf_of(user_id, priority=BACKGROUND):
+                fresh = self._fresh_categories(user_id)
+                for category, user_context in plan(user_id)[:self.top_k]:
+                    if category in fresh:
+                        continue
+                    if not self._spend(user_id):
+                        print(f"💸 Prompt prefetch budget used up for user {user_id}")
+                        break
+                    prompts = generate(category, user_context)
+                    if prompts:
+                        self._store(user_id, category, prompts)
+                        warmed += 1
+            if warmed:
+                print(f"✅ Prefetched {warmed} prompt sets for user {user_id}")
+        except Exception as e:
+            print(f"❌ Prompt prefetch failed for user {user_id}: {e}")
+        finally:
+            with self._lock:
+                self._prefetching.discard(user_id)
+
+
+# Create singleton instance
+prompt_prefetch_service = PromptPrefetchService()
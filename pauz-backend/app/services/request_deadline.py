@@ -0,0 +1,180 @@
+"""
+Request Deadline
+Request-scoped time budget. Middleware starts a deadline for each request from
+its route class (hints, reflections, voice, ...); every outbound call made while
+handling it uses the remaining budget as its timeout, and calls that would start
+with almost nothing left are skipped so the caller takes its degraded path
+instead. Stages that finish past the deadline, or are skipped for lack of
+budget, are counted per route class and stage.
+"""
+import contextvars
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.latency_histogram import LatencyHistogram
+
+# First matching pattern wins; everything else is "default"
+ROUTE_CLASSES: List[Tuple[str, "re.Pattern[str]"]] = [
+    ("hint", re.compile(r"^/freejournal/[^/]+/hints(/stream)?$")),
+    ("reflect", re.compile(r"^/freejournal/[^/]+/reflect(/stream)?$")),
+    ("voice", re.compile(r"^/voice-assistant/|^/freejournal/([^/]+/voice|text-to-voice|[^/]+/hints/[^/]+/voice)$")),
+    ("prompts", re.compile(r"^/guided_journal/prompts$")),
+    ("export", re.compile(r"/export$")),
+]
+
+DEFAULT_BUDGET_SECONDS = {
+    "hint": 6.0,
+    "reflect": 12.0,
+    "voice": 20.0,
+    "prompts": 15.0,
+    "export": 30.0,
+    "default": 30.0,
+}
+
+# Timeout for calls made outside any request (background folds, pool refills)
+DEFAULT_CALL_TIMEOUT_SECONDS = 30.0
+
+# (route class, monotonic time the budget runs out) for the request being handled
+_deadline: contextvars.ContextVar[Optional[Tuple[str, float]]] = contextvars.ContextVar(
+    "request_deadline", default=None
+)
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting a call when the request's budget is (nearly) spent"""
+
+    def __init__(self, route_class: str, stage: str, remaining: float):
+        super().__init__(f"{route_class} request budget spent before {stage} ({remaining * 1000:.0f} ms left)")
+        self.route_class = route_class
+        self.stage = stage
+        self.remaining = remaining
+
+
+class StageStats:
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.calls = 0
+        self.misses = 0
+        self.degraded = 0
+
+
+class RequestDeadlines:
+    def __init__(self):
+        self.budgets = {
+            route_class: float(os.getenv(f"DEADLINE_{route_class.upper()}_SECONDS", str(seconds)))
+            for route_class, seconds in DEFAULT_BUDGET_SECONDS.items()
+        }
+        self.call_timeout = float(os.getenv("DEADLINE_CALL_TIMEOUT_SECONDS", str(DEFAULT_CALL_TIMEOUT_SECONDS)))
+        # With less than this left, a call is not started: its degraded path is cheaper than a likely miss
+        self.reserve_seconds = float(os.getenv("DEADLINE_RESERVE_SECONDS", "0.5"))
+        # (route class, stage) -> timings and outcomes
+        self._stats: Dict[Tuple[str, str], StageStats] = {}
+        self._lock = threading.Lock()
+
+    def route_class(self, path: str) -> str:
+        return next((name for name, pattern in ROUTE_CLASSES if pattern.search(path)), "default")
+
+    @contextmanager
+    def start(self, route_class: str, budget: Optional[float] = None):
+        """Run the block under a deadline of budget seconds (the route class's budget by default)"""
+        budget = self.budgets.get(route_class, self.budgets["default"]) if budget is None else budget
+        token = _deadline.set((route_class, time.monotonic() + budget))
+        try:
+            yield
+        finally:
+            _deadline.reset(token)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the current request's budget (negative once missed), None outside a request"""
+        current = _deadline.get()
+        return current[1] - time.monotonic() if current else None
+
+    def timeout(self, default: Optional[float] = None) -> float:
+        """Timeout for an outbound call: default (or the call timeout) capped at the remaining budget"""
+        default = self.call_timeout if default is None else default
+        remaining = self.remaining()
+        if remaining is None:
+            return default
+        return max(0.001, min(default, remaining))
+
+    def nearly_spent(self, stage: str) -> bool:
+        """True when too little budget is left to start stage; the skip is counted as degraded"""
+        remaining = self.remaining()
+        if remaining is None or remaining >= self.reserve_seconds:
+            return False
+        self._stage_stats(stage).degraded += 1
+        print(f"⏱️ {_deadline.get()[0]} budget nearly spent, degrading {stage} ({remaining * 1000:.0f} ms left)")
+        return True
+
+    def check(self, stage: str):
+        """Raise DeadlineExceeded when too little budget is left to start stage"""
+        if self.nearly_spent(stage):
+            raise DeadlineExceeded(_deadline.get()[0], stage, self.remaining())
+
+    def cap_timeouts(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of call kwargs with any timeout they carry capped at the remaining budget"""
+        if self.remaining() is None:
+            return kwargs
+        kwargs = dict(kwargs)
+        if kwargs.get("timeout") is not None:
+            kwargs["timeout"] = self.timeout(kwargs["timeout"])
+        options = kwargs.get("request_options")
+        if isinstance(options, dict):
+            options = dict(options)
+            if options.get("timeout") is not None:
+                options["timeout"] = self.timeout(options["timeout"])
+            if options.get("timeout_in_seconds") is not None:
+                # ElevenLabs SDK option; whole seconds only
+                options["timeout_in_seconds"] = max(1, int(self.timeout(options["timeout_in_seconds"])))
+            kwargs["request_options"] = options
+        return kwargs
+
+    def _stage_stats(self, stage: str) -> StageStats:
+        current = _deadline.get()
+        key = (current[0] if current else "none", stage)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = StageStats()
+            return stats
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the block as a stage of the current request; finishing past the deadline is a miss"""
+        if _deadline.get() is None:
+            yield
+            return
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            stats = self._stage_stats(name)
+            with self._lock:
+                stats.histogram.record((time.monotonic() - started) * 1000)
+                stats.calls += 1
+                if self.remaining() < 0:
+                    stats.misses += 1
+                    print(f"⏰ {_deadline.get()[0]} request missed its deadline in {name}")
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Per route class and stage: calls, deadline misses, degraded skips and stage latency"""
+        with self._lock:
+            return [{
+                "route_class": route_class,
+                "stage": stage,
+                "budget_ms": self.budgets.get(route_class, self.budgets["default"]) * 1000,
+                "calls": stats.calls,
+                "misses": stats.misses,
+                "degraded": stats.degraded,
+                "p50_ms": stats.histogram.percentile(50),
+                "p95_ms": stats.histogram.percentile(95),
+                "p99_ms": stats.histogram.percentile(99)
+            } for (route_class, stage), stats in sorted(self._stats.items())]
+
+
+# Create singleton instance
+request_deadline = RequestDeadlines()
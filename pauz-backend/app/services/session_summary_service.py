@@ -0,0 +1,153 @@
+"""
+Session Summary Service
+Keeps a rolling summary per journal session so hint and reflection prompts send
+"summary + recent tail" under a fixed token budget instead of the whole entry.
+New writing is folded into the stored summary in the background once enough of
+it has accumulated; prompts never wait on a fold.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Optional, Tuple
+
+# Rough English average; good enough to keep prompts under a budget without a tokenizer
+CHARS_PER_TOKEN = 4
+
+# (previous summary, new passage) -> updated summary, or None when no AI provider answered
+SummaryFolder = Callable[[str, str], Optional[str]]
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def _tail(text: str, max_chars: int) -> str:
+    """Last max_chars of text, starting at a word boundary"""
+    if len(text) <= max_chars:
+        return text
+    tail = text[-max_chars:]
+    space = tail.find(" ")
+    return tail[space + 1:] if 0 <= space < 40 else tail
+
+
+class SessionSummaryService:
+    def __init__(self, db_path: str = "session_summaries.db"):
+        self.db_path = db_path
+        # Journal text per prompt, summary included
+        self.token_budget = int(os.getenv("PROMPT_CONTEXT_TOKENS", "1000"))
+        self.summary_tokens = int(os.getenv("SESSION_SUMMARY_TOKENS", "250"))
+        # Unsummarized writing allowed to pile up beyond the recent tail before a fold is scheduled
+        self.fold_threshold_chars = int(os.getenv("SESSION_SUMMARY_FOLD_CHARS", "2000"))
+        # Largest passage sent in one fold; bigger backlogs are folded in several steps
+        self.max_fold_chars = 12000
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="session-summary")
+        self._folding = set()
+        self._lock = threading.Lock()
+        self.init_database()
+
+    def init_database(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS session_summary (
+                session_id TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                covered_chars INTEGER NOT NULL,
+                covered_hash TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        ''')
+        conn.commit()
+        conn.close()
+
+    @property
+    def tail_chars(self) -> int:
+        return (self.token_budget - self.summary_tokens) * CHARS_PER_TOKEN
+
+    def get(self, session_id: str, content: str) -> Tuple[str, int]:
+        """Stored (summary, covered_chars) if it still describes the start of content, else ("", 0)"""
+        conn = sqlite3.connect(self.db_path)
+        row = conn.execute(
+            'SELECT summary, covered_chars, covered_hash FROM session_summary WHERE session_id = ?', (session_id,)
+        ).fetchone()
+        conn.close()
+        if not row:
+            return "", 0
+        summary, covered, covered_hash = row
+        # Earlier text was edited: the summary no longer matches and is rebuilt
+        if covered > len(content) or _digest(content[:covered]) != covered_hash:
+            return "", 0
+        return summary, covered
+
+    def save(self, session_id: str, summary: str, content: str, covered: int):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            'INSERT OR REPLACE INTO session_summary (session_id, summary, covered_chars, covered_hash, updated_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (session_id, summary, covered, _digest(content[:covered]), datetime.utcnow().isoformat())
+        )
+        conn.commit()
+        conn.close()
+
+    def forget(self, session_id: str):
+        conn = sqlite3.connect(self.db_path)
+        conn.execute('DELETE FROM session_summary WHERE session_id = ?', (session_id,))
+        conn.commit()
+        conn.close()
+
+    def prompt_context(self, content: str, session_id: Optional[str] = None,
+                       fold: Optional[SummaryFolder] = None) -> str:
+        """
+        Journal text to embed in a prompt, at most token_budget tokens: the entry itself
+        while it fits, otherwise the stored summary plus the most recent writing
+        """
+        budget_chars = self.token_budget * CHARS_PER_TOKEN
+        if len(content) <= budget_chars:
+            return content
+
+        summary, covered = self.get(session_id, content) if session_id else ("", 0)
+        if session_id and fold and len(content) - covered > self.tail_chars + self.fold_threshold_chars:
+            self.fold_async(session_id, content, fold)
+
+        summary = summary[:self.summary_tokens * CHARS_PER_TOKEN]
+        recent = _tail(content[covered:], budget_chars - len(summary))
+        if not summary:
+            return f"...{recent}"
+        return f"[Summary of earlier writing: {summary}]\n\n...{recent}"
+
+    def fold_async(self, session_id: str, content: str, fold: SummaryFolder):
+        with self._lock:
+            if session_id in self._folding:
+                return
+            self._folding.add(session_id)
+        self._executor.submit(self._fold, session_id, content, fold)
+
+    def _fold(self, session_id: str, content: str, fold: SummaryFolder):
+        """Fold everything except the recent tail into the summary, one bounded passage at a time"""
+        try:
+            summary, covered = self.get(session_id, content)
+            target = len(content) - self.tail_chars
+            while covered < target:
+                end = min(target, covered + self.max_fold_chars)
+                # Fold whole words so the next passage does not start mid-word
+                space = content.rfind(" ", covered, end)
+                if space > covered:
+                    end = space
+                updated = fold(summary, content[covered:end])
+                if not updated:
+                    break
+                summary = updated.strip()[:self.summary_tokens * CHARS_PER_TOKEN]
+                covered = end
+                self.save(session_id, summary, content, covered)
+            print(f"✅ Session summary for {session_id} covers {covered}/{len(content)} chars")
+        except Exception as e:
+            print(f"❌ Session summary fold failed for {session_id}: {e}")
+        finally:
+            with self._lock:
+                self._folding.discard(session_id)
+
+
+# Create singleton instance
+session_summary_service = SessionSummaryService()
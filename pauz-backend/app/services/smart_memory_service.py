@@ -6,6 +6,7 @@ import os
 import json
 import time
 import hashlib
+from collections import OrderedDict
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
@@ -19,16 +20,20 @@ class SmartMemoryService:
     """
     
     def __init__(self):
-        # In-memory cache
-        self.cache = {}
+        # In-memory cache (insertion-ordered so the oldest entries evict first)
+        self.cache = OrderedDict()
         self.cache_timestamps = {}
         self.cache_hit_count = {}
         self.cache_miss_count = 0
         
+        # Per-user generation numbers embedded in user-scoped keys
+        self.user_generations = {}
+        
         # Cache settings
         self.default_ttl = 3600  # 1 hour
         self.ai_response_ttl = 86400  # 24 hours for AI responses
         self.user_preference_ttl = 604800  # 1 week for preferences
+        self.max_cache_entries = 5000
         
         print("✅ SmartMemory initialized with in-memory caching")
     
@@ -43,6 +48,21 @@ class SmartMemoryService:
         # Use hash for consistent length keys
         return hashlib.md5(key_data.encode()).hexdigest()[:16]
     
+    def _user_identifier(self, user_id: str) -> str:
+        """Identifier for user-scoped keys, tied to the user's current generation"""
+        return f"{user_id}#{self.user_generations.get(user_id, 0)}"
+    
+    def _store(self, cache_key: str, cache_data: Dict[str, Any]):
+        """Store an entry and evict the oldest ones beyond max_cache_entries"""
+        self.cache[cache_key] = cache_data
+        self.cache.move_to_end(cache_key)
+        self.cache_timestamps[cache_key] = time.time()
+        
+        while len(self.cache) > self.max_cache_entries:
+            oldest_key, _ = self.cache.popitem(last=False)
+            self.cache_timestamps.pop(oldest_key, None)
+            self.cache_hit_count.pop(oldest_key, None)
+    
     def _is_cache_valid(self, key: str, ttl: Optional[int] = None) -> bool:
         """Check if cache entry is still valid"""
         if key not in self.cache_timestamps:
@@ -72,8 +92,7 @@ class SmartMemoryService:
                 "prompt": prompt
             }
             
-            self.cache[cache_key] = cache_data
-            self.cache_timestamps[cache_key] = time.time()
+            self._store(cache_key, cache_data)
             
             # Initialize hit counter
             if cache_key not in self.cache_hit_count:
@@ -116,7 +135,7 @@ class SmartMemoryService:
         """Cache user preference"""
         
         try:
-            cache_key = self._generate_cache_key("user_preference", user_id, {"type": preference_type})
+            cache_key = self._generate_cache_key("user_preference", self._user_identifier(user_id), {"type": preference_type})
             
             cache_data = {
                 "value": value,
@@ -125,8 +144,7 @@ class SmartMemoryService:
                 "updated_at": datetime.now().isoformat()
             }
             
-            self.cache[cache_key] = cache_data
-            self.cache_timestamps[cache_key] = time.time()
+            self._store(cache_key, cache_data)
             
             print(f"✅ Cached user preference: {preference_type} for {user_id}")
             return True
@@ -139,7 +157,7 @@ class SmartMemoryService:
         """Get cached user preference"""
         
         try:
-            cache_key = self._generate_cache_key("user_preference", user_id, {"type": preference_type})
+            cache_key = self._generate_cache_key("user_preference", self._user_identifier(user_id), {"type": preference_type})
             
             if not self._is_cache_valid(cache_key, self.user_preference_ttl):
                 return None
@@ -156,7 +174,7 @@ class SmartMemoryService:
         """Cache user personalization data"""
         
         try:
-            cache_key = self._generate_cache_key("personalization", user_id)
+            cache_key = self._generate_cache_key("personalization", self._user_identifier(user_id))
             
             cache_data = {
                 "user_id": user_id,
@@ -164,8 +182,7 @@ class SmartMemoryService:
                 "updated_at": datetime.now().isoformat()
             }
             
-            self.cache[cache_key] = cache_data
-            self.cache_timestamps[cache_key] = time.time()
+            self._store(cache_key, cache_data)
             
             print(f"✅ Cached personalization data for {user_id}")
             return True
@@ -178,7 +195,7 @@ class SmartMemoryService:
         """Get cached personalization data"""
         
         try:
-            cache_key = self._generate_cache_key("personalization", user_id)
+            cache_key = self._generate_cache_key("personalization", self._user_identifier(user_id))
             
             if not self._is_cache_valid(cache_key, self.user_preference_ttl):
                 return None
@@ -254,22 +271,18 @@ class SmartMemoryService:
         return len(expired_keys)
     
     def clear_user_cache(self, user_id: str) -> int:
-        """Clear all cache entries for a specific user"""
+        """
+        Invalidate all cache entries for a specific user.
+        Bumps the user's generation so old keys are never looked up again;
+        they age out through clear_expired_cache / size eviction.
+        Returns the new generation number.
+        """
         
-        user_keys = []
-        for key in self.cache:
-            if user_id in key or (self.cache[key].get("user_id") == user_id):
-                user_keys.append(key)
-        
-        for key in user_keys:
-            del self.cache[key]
-            if key in self.cache_timestamps:
-                del self.cache_timestamps[key]
-            if key in self.cache_hit_count:
-                del self.cache_hit_count[key]
+        generation = self.user_generations.get(user_id, 0) + 1
+        self.user_generations[user_id] = generation
         
-        print(f"🧹 Cleared {len(user_keys)} cache entries for user {user_id}")
-        return len(user_keys)
+        print(f"🧹 Invalidated cache for user {user_id} (generation {generation})")
+        return generation
 
 # Global instance
 smart_memory_service = SmartMemoryService()
\ No newline at end of file
@@ -4,10 +4,8 @@ Uses Raindrop's SmartMemory to remember conversations and learn user preferences
 With accurate PAUZ app knowledge
 """
 
-import os
 import json
 from typing import Optional, Dict, Any, List
-import google.generativeai as genai
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,48 +13,40 @@ load_dotenv()
 from app.services.smart_memory_service import smart_memory_service
 from app.services.voice_cache import response_cache, FAST_RESPONSES
 from app.services.casual_voice_service import casual_voice_service
+from app.services.inference_service import inference_service
+from app.services.request_deadline import request_deadline
+from app.services.ai_providers import ai_providers
+from app.services.app_knowledge import app_description
+from app.services.personalization_service import personalization_service
+from app.services.pauz_app_context import PAUZ_APP_DESCRIPTION
+from app.utils.keyword_matcher import KeywordMatcher
+
+# Topic and fallback cues, matched in one pass over the input
+VOICE_KEYWORDS = KeywordMatcher({
+    "topic:stuck": ["stuck", "block"],
+    "topic:guidance": ["help", "what", "features"],
+    "getting_started": ["start", "begin", "getting"],
+    "topic:encouragement": ["encourage", "motivate"],
+    "dynamic:question": ["what", "help", "features", "do", "how"],
+    "dynamic:stuck": ["stuck", "blocked", "don't know", "blank"],
+    "dynamic:emotion": ["sad", "happy", "angry", "anxious", "excited"],
+    "emergency:question": ["what", "help", "features", "do"],
+    "emergency:stuck": ["stuck", "blocked", "don't know"],
+    "emergency:getting_started": ["start", "begin", "how"]
+})
 
 class SmartMemoryVoiceService:
     """Voice assistant with memory and personalization using SmartMemory"""
     
     def __init__(self):
         # Initialize Gemini
-        self.gemini_api_key = os.getenv('GEMINI_API_KEY')
-        if not self.gemini_api_key or self.gemini_api_key == 'your-gemini-api-key-here':
+        if not ai_providers.available("gemini"):
             raise ValueError("GEMINI_API_KEY not configured")
         
-        try:
-            genai.configure(api_key=self.gemini_api_key)
-            # Use gemini-2.5-flash with relaxed safety settings
-            self.model = genai.GenerativeModel(
-                'gemini-2.5-flash',
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.7,
-                    max_output_tokens=150,
-                    candidate_count=1,
-                ),
-                safety_settings=[
-                    {
-                        "category": "HARM_CATEGORY_HARASSMENT",
-                        "threshold": "BLOCK_NONE"
-                    },
-                    {
-                        "category": "HARM_CATEGORY_HATE_SPEECH", 
-                        "threshold": "BLOCK_NONE"
-                    },
-                    {
-                        "category": "HARM_CATEGORY_SEXUALLY_EXPLICIT",
-                        "threshold": "BLOCK_NONE"
-                    },
-                    {
-                        "category": "HARM_CATEGORY_DANGEROUS_CONTENT",
-                        "threshold": "BLOCK_NONE"
-                    }
-                ]
-            )
-            print("✅ SmartMemory Voice Assistant initialized (relaxed safety)")
-        except Exception as e:
-            raise ValueError(f"Failed to initialize Gemini: {e}")
+        # Shared gemini-2.5-flash with relaxed safety settings, created on first use; the core of
+        # the app description is its system instruction and prompts add only the relevant details
+        self.model = ai_providers.model("voice_relaxed", system_instruction=app_description.core)
+        print("✅ SmartMemory Voice Assistant initialized (relaxed safety)")
     
     def get_app_context_description(self) -> str:
         """Get comprehensive and ACCURATE description of PAUZ app for context"""
@@ -184,7 +174,7 @@ class SmartMemoryVoiceService:
     ) -> str:
         """Build prompt enhanced with memory context"""
         
-        base_prompt = self.get_app_context_description()
+        base_prompt = app_description.context_for(user_input)
         
         # Add memory context if available
         memory_info = ""
@@ -193,6 +183,11 @@ class SmartMemoryVoiceService:
             if topics:
                 memory_info = f"\n\n**User Memory:** You've previously discussed: {', '.join(topics[-5:])}. Reference these if relevant."
         
+        # Add the user's journaling profile (bounded, so the prompt size stays flat)
+        profile = personalization_service.context_block(user_id)
+        if profile:
+            memory_info += f"\n\n{profile}"
+        
         # Add user context
         context_info = ""
         if user_context:
@@ -224,17 +219,17 @@ class SmartMemoryVoiceService:
             topics = smart_memory_service.get_user_preference(user_id, "topics_discussed") or []
             
             # Extract simple topics from user input
-            input_lower = user_input.lower()
-            if any(word in input_lower for word in ["stuck", "block", "stuck"]):
+            hits = VOICE_KEYWORDS.scan(user_input)
+            if "topic:stuck" in hits:
                 if "feeling_stuck" not in topics:
                     topics.append("feeling_stuck")
-            if any(word in input_lower for word in ["help", "what", "features"]):
+            if "topic:guidance" in hits:
                 if "app_guidance" not in topics:
                     topics.append("app_guidance")
-            if any(word in input_lower for word in ["start", "begin", "getting"]):
+            if "getting_started" in hits:
                 if "getting_started" not in topics:
                     topics.append("getting_started")
-            if any(word in input_lower for word in ["encourage", "motivate"]):
+            if "topic:encouragement" in hits:
                 if "encouragement" not in topics:
                     topics.append("encouragement")
             
@@ -316,7 +311,8 @@ class SmartMemoryVoiceService:
             
             Add something specific about journaling if it feels natural. Don't make it longer."""
             
-            response = self.model.generate_content(personal_prompt)
+            response = inference_service.call("gemini", self.model.generate_content, personal_prompt,
+                                              request_options={"timeout": request_deadline.timeout()})
             if response.text and response.text.strip():
                 enhanced_welcome = response.text.strip()
                 if len(enhanced_welcome) < 200:  # Keep it reasonable
@@ -335,10 +331,10 @@ class SmartMemoryVoiceService:
         """Emergency fallback with more variety and natural language"""
         
         import random
-        user_lower = user_input.lower()
+        hits = VOICE_KEYWORDS.scan(user_input)
         
         # Help/guidance requests
-        if any(word in user_lower for word in ["what", "help", "features", "do", "how"]):
+        if "dynamic:question" in hits:
             responses = [
                 "I'm here to help you explore journaling through guided prompts, free writing, or gentle hints. What feels most appealing to you right now?",
                 "Hey! So you can either free write about whatever's on your mind, try some guided prompts, or get hints for inspiration. What sounds good?",
@@ -347,7 +343,7 @@ class SmartMemoryVoiceService:
             return random.choice(responses)
         
         # Feeling stuck
-        elif any(word in user_lower for word in ["stuck", "blocked", "don't know", "blank"]):
+        elif "dynamic:stuck" in hits:
             responses = [
                 "It's okay to feel stuck. Let's start with something gentle - what's present in your awareness right now?",
                 "Totally normal! Sometimes starting with 'I feel stuck because...' helps get the words flowing. Want to try?",
@@ -356,7 +352,7 @@ class SmartMemoryVoiceService:
             return random.choice(responses)
         
         # Getting started
-        elif any(word in user_lower for word in ["start", "begin", "getting"]):
+        elif "getting_started" in hits:
             responses = [
                 "I'd love to help you begin. You could try guided journaling for structure, free writing to express freely, or hints for inspiration. What calls to you?",
                 "Let's get you started! Want to try free writing, a guided prompt, or just write about whatever's happening today?",
@@ -365,7 +361,7 @@ class SmartMemoryVoiceService:
             return random.choice(responses)
         
         # Emotional content
-        elif any(word in user_lower for word in ["sad", "happy", "angry", "anxious", "excited"]):
+        elif "dynamic:emotion" in hits:
             responses = [
                 "I'm here for all your feelings. Writing them down can help you understand them better. What's coming up for you?",
                 "Thank you for sharing that. Want to explore this feeling more through writing?",
@@ -394,15 +390,15 @@ class SmartMemoryVoiceService:
         return "I'm here to help with your journaling journey. You can explore free writing with AI hints, structured prompts, or mood tracking. What interests you most?"
         """Emergency fallback if everything fails"""
         
-        user_lower = user_input.lower()
+        hits = VOICE_KEYWORDS.scan(user_input)
         
-        if any(word in user_lower for word in ["what", "help", "features", "do"]):
+        if "emergency:question" in hits:
             return "I'm here to help you explore journaling through guided prompts, free writing, or gentle hints. What feels most appealing to you right now?"
         
-        elif any(word in user_lower for word in ["stuck", "blocked", "don't know"]):
+        elif "emergency:stuck" in hits:
             return "It's okay to feel stuck. Let's start with something gentle - what's present in your awareness right now?"
         
-        elif any(word in user_lower for word in ["start", "begin", "how"]):
+        elif "emergency:getting_started" in hits:
             return "I'd love to help you begin. You could try guided journaling for structure, free writing to express freely, or hints for inspiration. What calls to you?"
         
         else:
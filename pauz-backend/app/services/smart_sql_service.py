@@ -5,8 +5,9 @@ SmartSQL Service - User Analytics for PAUZ Hackathon
 import os
 import sqlite3
 import json
-from typing import Dict, Any, List, Optional
-from datetime import datetime, date
+import threading
+from typing import Dict, Any, List, Optional, Iterable
+from datetime import datetime, date, timedelta
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -17,8 +18,13 @@ class SmartSQLService:
     Uses SQLite for hackathon (can be upgraded to distributed SQL later)
     """
     
-    def __init__(self):
-        self.db_path = "smart_analytics.db"
+    def __init__(self, db_path: str = "smart_analytics.db"):
+        self.db_path = db_path
+        # Seconds between background rollup runs; 0 leaves rollups to scripts/run_analytics_rollup.py
+        self.rollup_interval = float(os.getenv("ANALYTICS_ROLLUP_INTERVAL_SECONDS", "300"))
+        self._rollup_thread: Optional[threading.Thread] = None
+        self._rollup_lock = threading.Lock()
+        self._rollup_stop = threading.Event()
         self.init_database()
         print(f"✅ SmartSQL initialized: {self.db_path}")
     
@@ -85,6 +91,22 @@ class SmartSQLService:
             )
         ''')
         
+        # LLM call telemetry columns (one row per flush window and call site)
+        cursor.execute('PRAGMA table_info(ai_performance)')
+        existing_columns = {row[1] for row in cursor.fetchall()}
+        for column, column_type in [
+            ('provider', 'TEXT'), ('call_site', 'TEXT'), ('calls', 'INTEGER DEFAULT 0'),
+            ('failures', 'INTEGER DEFAULT 0'), ('p50_ms', 'REAL'), ('p95_ms', 'REAL'), ('p99_ms', 'REAL'),
+            ('prompt_chars', 'INTEGER DEFAULT 0'), ('response_chars', 'INTEGER DEFAULT 0'),
+            ('histogram', 'TEXT'),  # JSON bucket counts, merged for percentiles across windows
+            ('window_start', 'TIMESTAMP')
+        ]:
+            if column not in existing_columns:
+                cursor.execute(f'ALTER TABLE ai_performance ADD COLUMN {column} {column_type}')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_ai_performance_window ON ai_performance (window_start)
+        ''')
+        
         # Daily summary table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS daily_summary (
@@ -99,6 +121,37 @@ class SmartSQLService:
             )
         ''')
         
+        # Weekly summary table (week_start is the Monday of the ISO week)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS weekly_summary (
+                week_start DATE PRIMARY KEY,
+                total_users INTEGER DEFAULT 0,
+                total_journals INTEGER DEFAULT 0,
+                total_words INTEGER DEFAULT 0,
+                total_voice_sessions INTEGER DEFAULT 0,
+                avg_session_time REAL DEFAULT 0.0,
+                most_common_mood TEXT,
+                mood_counts TEXT,  -- JSON
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Days whose analytics changed since the last rollup run
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS rollup_queue (
+                date DATE PRIMARY KEY,
+                version INTEGER DEFAULT 1
+            )
+        ''')
+        
+        # Precomputed global counters (e.g. registered users)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS summary_totals (
+                metric TEXT PRIMARY KEY,
+                value INTEGER DEFAULT 0
+            )
+        ''')
+        
         conn.commit()
         conn.close()
     
@@ -130,14 +183,16 @@ class SmartSQLService:
     
     def record_journal_entry(self, user_id: str, entry_id: str, journal_type: str, 
                            session_id: str, content: str, has_audio: bool = False, 
-                           mood_score: Optional[Dict] = None) -> bool:
-        """Record journal entry metadata"""
+                           mood_score: Optional[Dict] = None,
+                           word_count: Optional[int] = None) -> bool:
+        """Record journal entry metadata (pass word_count when it is already known to skip the scan)"""
         
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            word_count = len(content.split()) if content else 0
+            if word_count is None:
+                word_count = len(content.split()) if content else 0
             mood_json = json.dumps(mood_score) if mood_score else None
             
             cursor.execute('''
@@ -199,6 +254,9 @@ class SmartSQLService:
                     VALUES (?, ?, 1, ?, ?, ?, ?, ?)
                 ''', (user_id, today, word_count, 1 if has_voice else 0, session_minutes, storage_bytes, mood))
             
+            # Queue today for the next rollup run
+            self._enqueue_rollup(cursor, today)
+            
             conn.commit()
             conn.close()
             return True
@@ -301,50 +359,284 @@ class SmartSQLService:
             print(f"❌ Failed to get user summary: {e}")
             return {}
     
+    def record_ai_performance(self, rows: List[Dict[str, Any]]) -> bool:
+        """Insert flushed LLM telemetry windows into ai_performance"""
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.executemany('''
+                INSERT INTO ai_performance
+                (model_name, prompt_type, success_rate, response_time_ms, date, provider, call_site,
+                 calls, failures, p50_ms, p95_ms, p99_ms, prompt_chars, response_chars, histogram, window_start)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', [(
+                row['model_name'], row['prompt_type'], row['success_rate'], row['response_time_ms'],
+                row['window_start'][:10], row['provider'], row['call_site'], row['calls'], row['failures'],
+                row['p50_ms'], row['p95_ms'], row['p99_ms'], row['prompt_chars'], row['response_chars'],
+                json.dumps(row['histogram']), row['window_start']
+            ) for row in rows])
+            
+            conn.commit()
+            conn.close()
+            return True
+            
+        except Exception as e:
+            print(f"❌ Failed to record AI performance: {e}")
+            return False
+    
+    def get_ai_performance(self, since: datetime) -> List[Dict[str, Any]]:
+        """Telemetry windows flushed since a point in time"""
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute('''
+                SELECT provider, model_name, prompt_type, call_site, calls, failures,
+                       prompt_chars, response_chars, histogram
+                FROM ai_performance
+                WHERE window_start >= ? AND histogram IS NOT NULL
+            ''', (since.isoformat(),))
+            
+            results = [{
+                'provider': row[0],
+                'model_name': row[1],
+                'prompt_type': row[2],
+                'call_site': row[3],
+                'calls': row[4] or 0,
+                'failures': row[5] or 0,
+                'prompt_chars': row[6] or 0,
+                'response_chars': row[7] or 0,
+                'histogram': json.loads(row[8])
+            } for row in cursor.fetchall()]
+            
+            conn.close()
+            return results
+            
+        except Exception as e:
+            print(f"❌ Failed to get AI performance: {e}")
+            return []
+    
+    def _enqueue_rollup(self, cursor, day: date):
+        """Mark a day as changed so the rollup job recomputes it"""
+        
+        cursor.execute('''
+            INSERT INTO rollup_queue (date, version) VALUES (?, 1)
+            ON CONFLICT(date) DO UPDATE SET version = version + 1
+        ''', (day.isoformat(),))
+    
+    @staticmethod
+    def _week_start(day: date) -> date:
+        """Monday of the ISO week containing the day"""
+        return day - timedelta(days=day.weekday())
+    
+    @staticmethod
+    def _dominant_mood(mood_counts: Dict[str, int]) -> Optional[str]:
+        """Most frequent mood, ties broken alphabetically so reruns are stable"""
+        if not mood_counts:
+            return None
+        return min(mood_counts, key=lambda mood: (-mood_counts[mood], mood))
+    
+    def _aggregate_range(self, cursor, first_day: date, last_day: date) -> Optional[Dict[str, Any]]:
+        """Aggregate user_analytics rows for an inclusive date range"""
+        
+        cursor.execute('''
+            SELECT COUNT(DISTINCT user_id), SUM(journals_written), SUM(total_words),
+                   SUM(voice_sessions), AVG(session_time_minutes), COUNT(*)
+            FROM user_analytics WHERE date BETWEEN ? AND ?
+        ''', (first_day.isoformat(), last_day.isoformat()))
+        users, journals, words, voices, avg_minutes, row_count = cursor.fetchone()
+        
+        if not row_count:
+            return None
+        
+        cursor.execute('''
+            SELECT dominant_mood, COUNT(*)
+            FROM user_analytics
+            WHERE date BETWEEN ? AND ? AND dominant_mood IS NOT NULL
+            GROUP BY dominant_mood
+        ''', (first_day.isoformat(), last_day.isoformat()))
+        mood_counts = {row[0]: row[1] for row in cursor.fetchall()}
+        
+        return {
+            'total_users': users or 0,
+            'total_journals': journals or 0,
+            'total_words': words or 0,
+            'total_voice_sessions': voices or 0,
+            'avg_session_time': round(avg_minutes or 0.0, 2),
+            'most_common_mood': self._dominant_mood(mood_counts),
+            'mood_counts': mood_counts
+        }
+    
+    def _rollup_day(self, cursor, day: date):
+        """Recompute the daily_summary row for one day from user_analytics"""
+        
+        summary = self._aggregate_range(cursor, day, day)
+        if summary is None:
+            cursor.execute('DELETE FROM daily_summary WHERE date = ?', (day.isoformat(),))
+            return
+        
+        cursor.execute('''
+            INSERT INTO daily_summary
+            (date, total_users, total_journals, total_words, total_voice_sessions,
+             avg_session_time, most_common_mood)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(date) DO UPDATE SET
+                total_users = excluded.total_users,
+                total_journals = excluded.total_journals,
+                total_words = excluded.total_words,
+                total_voice_sessions = excluded.total_voice_sessions,
+                avg_session_time = excluded.avg_session_time,
+                most_common_mood = excluded.most_common_mood
+        ''', (
+            day.isoformat(), summary['total_users'], summary['total_journals'],
+            summary['total_words'], summary['total_voice_sessions'],
+            summary['avg_session_time'], summary['most_common_mood']
+        ))
+    
+    def _rollup_week(self, cursor, week_start: date):
+        """Recompute the weekly_summary row for the week starting on week_start"""
+        
+        summary = self._aggregate_range(cursor, week_start, week_start + timedelta(days=6))
+        if summary is None:
+            cursor.execute('DELETE FROM weekly_summary WHERE week_start = ?', (week_start.isoformat(),))
+            return
+        
+        cursor.execute('''
+            INSERT INTO weekly_summary
+            (week_start, total_users, total_journals, total_words, total_voice_sessions,
+             avg_session_time, most_common_mood, mood_counts)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(week_start) DO UPDATE SET
+                total_users = excluded.total_users,
+                total_journals = excluded.total_journals,
+                total_words = excluded.total_words,
+                total_voice_sessions = excluded.total_voice_sessions,
+                avg_session_time = excluded.avg_session_time,
+                most_common_mood = excluded.most_common_mood,
+                mood_counts = excluded.mood_counts
+        ''', (
+            week_start.isoformat(), summary['total_users'], summary['total_journals'],
+            summary['total_words'], summary['total_voice_sessions'],
+            summary['avg_session_time'], summary['most_common_mood'],
+            json.dumps(summary['mood_counts'], sort_keys=True)
+        ))
+    
+    def run_rollups(self, days: Optional[Iterable[date]] = None) -> int:
+        """
+        Incrementally maintain daily_summary and weekly_summary.
+        
+        Only days queued by update_user_analytics are recomputed (or the explicit
+        `days` passed in, for backfills). Each day and week is rebuilt from
+        scratch, so rerunning a day always reproduces the same rows.
+        Returns the number of days rolled up.
+        """
+        
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            if days is None:
+                cursor.execute('SELECT date, version FROM rollup_queue')
+                queued = [(date.fromisoformat(row[0]), row[1]) for row in cursor.fetchall()]
+            else:
+                queued = [(day, None) for day in days]
+            
+            for day, _ in queued:
+                self._rollup_day(cursor, day)
+            
+            for week_start in sorted({self._week_start(day) for day, _ in queued}):
+                self._rollup_week(cursor, week_start)
+            
+            cursor.execute('SELECT COUNT(*) FROM user_profiles')
+            cursor.execute('''
+                INSERT INTO summary_totals (metric, value) VALUES ('registered_users', ?)
+                ON CONFLICT(metric) DO UPDATE SET value = excluded.value
+            ''', (cursor.fetchone()[0],))
+            
+            # Only dequeue days that were not re-queued while we were running
+            for day, version in queued:
+                if version is not None:
+                    cursor.execute(
+                        'DELETE FROM rollup_queue WHERE date = ? AND version = ?',
+                        (day.isoformat(), version)
+                    )
+            
+            conn.commit()
+            conn.close()
+            
+            print(f"✅ Rolled up analytics for {len(queued)} day(s)")
+            return len(queued)
+            
+        except Exception as e:
+            print(f"❌ Failed to run analytics rollups: {e}")
+            return 0
+    
+    def start_rollup_refresh(self) -> bool:
+        """Run queued rollups in a background thread every rollup_interval seconds (once per process)"""
+        if self.rollup_interval <= 0:
+            return False
+        with self._rollup_lock:
+            if self._rollup_thread is None:
+                self._rollup_stop.clear()
+                self._rollup_thread = threading.Thread(target=self._rollup_loop, name="analytics-rollup", daemon=True)
+                self._rollup_thread.start()
+                print(f"🔄 Analytics rollups scheduled every {self.rollup_interval:.0f}s")
+        return True
+    
+    def stop_rollup_refresh(self):
+        with self._rollup_lock:
+            thread, self._rollup_thread = self._rollup_thread, None
+        if thread is not None:
+            self._rollup_stop.set()
+            thread.join()
+    
+    def _rollup_loop(self):
+        # run_rollups logs and swallows its own errors, so the loop keeps going
+        while not self._rollup_stop.is_set():
+            self.run_rollups()
+            self._rollup_stop.wait(self.rollup_interval)
+    
     def get_dashboard_stats(self) -> Dict[str, Any]:
-        """Get dashboard statistics for all users"""
+        """
+        Get dashboard statistics for all users.
+        Reads only precomputed rollup rows, so cost does not grow with user count.
+        """
         
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
             # Total users
-            cursor.execute('SELECT COUNT(DISTINCT user_id) FROM user_profiles')
-            total_users = cursor.fetchone()[0]
+            cursor.execute("SELECT value FROM summary_totals WHERE metric = 'registered_users'")
+            total_users = cursor.fetchone()
             
             # Today's activity
             today = date.today()
             cursor.execute('''
-                SELECT COUNT(DISTINCT user_id), SUM(journals_written), 
-                       SUM(total_words), SUM(voice_sessions)
-                FROM user_analytics WHERE date = ?
-            ''', (today,))
-            today_stats = cursor.fetchone()
+                SELECT total_users, total_journals, total_words, total_voice_sessions
+                FROM daily_summary WHERE date = ?
+            ''', (today.isoformat(),))
+            today_stats = cursor.fetchone() or (0, 0, 0, 0)
             
             # This week's activity
+            week_start = self._week_start(today)
             cursor.execute('''
-                SELECT COUNT(DISTINCT user_id), SUM(journals_written), 
-                       SUM(total_words), SUM(voice_sessions)
-                FROM user_analytics WHERE date >= date('now', '-7 days')
-            ''')
-            week_stats = cursor.fetchone()
-            
-            # Most common moods
-            cursor.execute('''
-                SELECT dominant_mood, COUNT(*) as count
-                FROM user_analytics 
-                WHERE dominant_mood IS NOT NULL 
-                AND date >= date('now', '-7 days')
-                GROUP BY dominant_mood 
-                ORDER BY count DESC 
-                LIMIT 5
-            ''')
-            mood_stats = cursor.fetchall()
+                SELECT total_users, total_journals, total_words, total_voice_sessions, mood_counts
+                FROM weekly_summary WHERE week_start = ?
+            ''', (week_start.isoformat(),))
+            week_stats = cursor.fetchone() or (0, 0, 0, 0, None)
             
             conn.close()
             
+            # Most common moods
+            mood_counts = json.loads(week_stats[4]) if week_stats[4] else {}
+            mood_stats = sorted(mood_counts.items(), key=lambda item: (-item[1], item[0]))[:5]
+            
             return {
-                'total_users': total_users or 0,
+                'total_users': total_users[0] if total_users else 0,
                 'today': {
                     'active_users': today_stats[0] or 0,
                     'journals_written': today_stats[1] or 0,
@@ -352,13 +644,14 @@ class SmartSQLService:
                     'voice_sessions': today_stats[3] or 0
                 },
                 'week': {
+                    'week_start': week_start.isoformat(),
                     'active_users': week_stats[0] or 0,
                     'journals_written': week_stats[1] or 0,
                     'total_words': week_stats[2] or 0,
                     'voice_sessions': week_stats[3] or 0
                 },
                 'top_moods': [
-                    {'mood': row[0], 'count': row[1]} for row in mood_stats
+                    {'mood': mood, 'count': count} for mood, count in mood_stats
                 ]
             }
             
@@ -10,6 +10,8 @@ from typing import Optional, Dict, Any, List
 from datetime import datetime
 from dotenv import load_dotenv
 
+from app.services.request_deadline import request_deadline
+
 load_dotenv()
 
 class SmartStorageService:
@@ -47,7 +49,7 @@ class SmartStorageService:
     
     def store_user_profile(self, user_id: str, profile_data: Dict[str, Any]) -> bool:
         """Store user profile data"""
-        if not self.client:
+        if not self.client or request_deadline.nearly_spent("smart_storage"):
             return False
         
         try:
@@ -64,7 +66,8 @@ class SmartStorageService:
                 },
                 key=key,
                 content=encoded_content,
-                content_type="application/json"
+                content_type="application/json",
+                timeout=request_deadline.timeout()
             )
             print(f"✅ Stored user profile for {user_id}")
             return True
@@ -107,7 +110,7 @@ class SmartStorageService:
     
     def store_free_journal(self, user_id: str, session_id: str, content: str, metadata: Optional[Dict] = None) -> bool:
         """Store free journal entry"""
-        if not self.client:
+        if not self.client or request_deadline.nearly_spent("smart_storage"):
             return False
         
         try:
@@ -131,7 +134,8 @@ class SmartStorageService:
                 },
                 key=key,
                 content=encoded_content,
-                content_type="application/json"
+                content_type="application/json",
+                timeout=request_deadline.timeout()
             )
             print(f"✅ Stored free journal for {user_id}")
             return True
@@ -142,7 +146,7 @@ class SmartStorageService:
     
     def store_voice_recording(self, user_id: str, session_id: str, audio_data: bytes) -> bool:
         """Store voice recording"""
-        if not self.client:
+        if not self.client or request_deadline.nearly_spent("smart_storage"):
             return False
         
         try:
@@ -158,7 +162,8 @@ class SmartStorageService:
                 },
                 key=key,
                 content=encoded_audio,
-                content_type="audio/wav"
+                content_type="audio/wav",
+                timeout=request_deadline.timeout()
             )
             print(f"✅ Stored voice recording for {user_id}")
             return True
@@ -169,7 +174,7 @@ class SmartStorageService:
     
     def store_guided_journal(self, user_id: str, journal_id: str, journal_data: Dict[str, Any]) -> bool:
         """Store guided journal session"""
-        if not self.client:
+        if not self.client or request_deadline.nearly_spent("smart_storage"):
             return False
         
         try:
@@ -188,7 +193,8 @@ class SmartStorageService:
                 },
                 key=key,
                 content=encoded_content,
-                content_type="application/json"
+                content_type="application/json",
+                timeout=request_deadline.timeout()
             )
             print(f"✅ Stored guided journal for {user_id}")
             return True
@@ -199,7 +205,7 @@ class SmartStorageService:
     
     def store_ai_prompt(self, user_id: str, prompt_type: str, prompt_data: Dict[str, Any]) -> bool:
         """Store AI-generated prompt"""
-        if not self.client:
+        if not self.client or request_deadline.nearly_spent("smart_storage"):
             return False
         
         try:
@@ -218,7 +224,8 @@ class SmartStorageService:
                 },
                 key=key,
                 content=encoded_content,
-                content_type="application/json"
+                content_type="application/json",
+                timeout=request_deadline.timeout()
             )
             print(f"✅ Stored AI prompt for {user_id}")
             return True
@@ -229,7 +236,7 @@ class SmartStorageService:
     
     def store_garden_data(self, user_id: str, garden_data: Dict[str, Any]) -> bool:
         """Store garden visualization data"""
-        if not self.client:
+        if not self.client or request_deadline.nearly_spent("smart_storage"):
             return False
         
         try:
@@ -248,7 +255,8 @@ class SmartStorageService:
                 },
                 key=key,
                 content=encoded_content,
-                content_type="application/json"
+                content_type="application/json",
+                timeout=request_deadline.timeout()
             )
             print(f"✅ Stored garden data for {user_id}")
             return True
@@ -259,7 +267,7 @@ class SmartStorageService:
     
     def store_user_analytics(self, user_id: str, analytics_data: Dict[str, Any]) -> bool:
         """Store user analytics data"""
-        if not self.client:
+        if not self.client or request_deadline.nearly_spent("smart_storage"):
             return False
         
         try:
@@ -278,7 +286,8 @@ class SmartStorageService:
                 },
                 key=key,
                 content=encoded_content,
-                content_type="application/json"
+                content_type="application/json",
+                timeout=request_deadline.timeout()
             )
             print(f"✅ Stored analytics for {user_id}")
             return True
@@ -0,0 +1,110 @@
+"""
+Starter Hint Pool
+Rotating pool of AI-generated hints for empty journals. The prompt for an empty
+page is the same for everyone, so hints are generated in the background and
+served from memory, with a per-session seen set so nobody gets a repeat.
+"""
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Optional, Set
+
+# Hand-written starter hints; the pool starts from these and fresh AI hints push them out
+STARTER_HINTS = [
+    "Perhaps you might gently notice what's present in your heart right now?",
+    "What soft whisper is wanting to be heard through you today?",
+    "If your breath could share a story, what might it lovingly say?",
+    "What gentle emotion is gently asking for your warm attention?",
+    "What tender truth is softly waiting to be discovered here?",
+    "What part of you might benefit from a little extra compassion right now?",
+    "How might you meet this moment with gentle kindness?",
+    "What warm wisdom is your heart gently holding?",
+    "What does your soft intuition want you to know?",
+    "How are you really, beneath all the gentle shoulds and musts?"
+]
+
+# Produces one new starter hint, or None when no AI provider answered
+StarterHintGenerator = Callable[[], Optional[str]]
+
+
+def _normalize(hint: str) -> str:
+    return " ".join(hint.lower().split())
+
+
+class StarterHintPool:
+    def __init__(self, seed_hints: Iterable[str] = (), max_size: int = 40, max_sessions: int = 10000):
+        self.hints = deque(seed_hints, maxlen=max_size)
+        self.refresh_batch = int(os.getenv("STARTER_HINT_REFRESH_BATCH", "5"))
+        self.refresh_interval = float(os.getenv("STARTER_HINT_REFRESH_SECONDS", "600"))
+        self.max_sessions = max_sessions
+        # session_id -> normalized hints already shown in that session (LRU-bounded)
+        self.seen: "OrderedDict[str, Set[str]]" = OrderedDict()
+        self._last_refresh = 0.0
+        self._refreshing = False
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="starter-hints")
+        self._lock = threading.Lock()
+
+    def take(self, session_id: Optional[str] = None, generate: Optional[StarterHintGenerator] = None) -> str:
+        """Pick a hint this session has not seen yet; never blocks on a provider"""
+        with self._lock:
+            seen = self.seen.pop(session_id, set()) if session_id else set()
+            unseen = [hint for hint in self.hints if _normalize(hint) not in seen]
+            if not unseen:
+                # The session has seen the whole pool: start the rotation over
+                seen = set()
+                unseen = list(self.hints)
+            hint = random.choice(unseen)
+
+            if session_id:
+                seen.add(_normalize(hint))
+                self.seen[session_id] = seen
+                while len(self.seen) > self.max_sessions:
+                    self.seen.popitem(last=False)
+
+            running_low = len(unseen) <= 2
+            stale = time.monotonic() - self._last_refresh >= self.refresh_interval
+
+        if generate and (running_low or stale):
+            self.refresh_async(generate)
+        return hint
+
+    def add(self, hint: str) -> bool:
+        """Add a generated hint, skipping ones already in the pool"""
+        hint = hint.strip()
+        with self._lock:
+            if not hint or any(_normalize(existing) == _normalize(hint) for existing in self.hints):
+                return False
+            # Oldest hints fall off the other end once the pool is full
+            self.hints.append(hint)
+            return True
+
+    def refresh_async(self, generate: StarterHintGenerator):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+            self._last_refresh = time.monotonic()
+        self._executor.submit(self._refresh, generate)
+
+    def _refresh(self, generate: StarterHintGenerator):
+        added = 0
+        try:
+            for _ in range(self.refresh_batch):
+                hint = generate()
+                if not hint:
+                    break
+                if self.add(hint):
+                    added += 1
+            print(f"✅ Starter hint pool refreshed (+{added}, {len(self.hints)} total)")
+        except Exception as e:
+            print(f"❌ Starter hint refresh failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+
+# Create singleton instance
+starter_hint_pool = StarterHintPool(STARTER_HINTS)
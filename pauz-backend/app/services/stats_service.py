@@ -57,10 +57,14 @@ class StatsService:
         
         # Get all counts in parallel (optimized queries)
         try:
-            # Free journals count (fast DB query)
-            free_journal_count = db.scalar(
-                select(func.count()).where(FreeJournal.user_id == user_id)
-            ) or 0
+            # Free journals count and word totals from the save-time stats columns (fast DB query)
+            free_journal_count, total_words, total_reading_seconds = db.exec(
+                select(
+                    func.count(),
+                    func.coalesce(func.sum(FreeJournal.word_count), 0),
+                    func.coalesce(func.sum(FreeJournal.reading_time_seconds), 0)
+                ).where(FreeJournal.user_id == user_id)
+            ).one()
             
             # Garden flowers count (fast DB query)
             garden_count = db.scalar(
@@ -78,6 +82,8 @@ class StatsService:
                 "total_free_journals": free_journal_count,
                 "total_guided_journals": guided_journal_count,
                 "total_flowers": garden_count,
+                "total_words": total_words,
+                "total_reading_minutes": round(total_reading_seconds / 60),
                 "user_info": None  # Will be populated by route
             }
             
@@ -98,6 +104,8 @@ class StatsService:
                 "total_free_journals": 0,
                 "total_guided_journals": 0,
                 "total_flowers": 0,
+                "total_words": 0,
+                "total_reading_minutes": 0,
                 "user_info": None
             }
     
@@ -1,9 +1,12 @@
 import os
 import boto3
 import sys
+from botocore.config import Config
+from botocore.exceptions import ConnectTimeoutError, ReadTimeoutError
 from typing import List, Optional, Dict, Any
 
 from app.models import GuidedJournal
+from app.services.request_deadline import request_deadline
 
 # Add scripts directory to path to find mcp.py
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../scripts'))
@@ -30,15 +33,26 @@ class StorageService:
         self.vultr_secret_key = os.getenv("VULTR_SECRET_KEY")
         self.vultr_region = os.getenv("VULTR_REGION")
         self.vultr_bucket_name = os.getenv("VULTR_BUCKET_NAME")
-        
-        if self.vultr_access_key and self.vultr_secret_key and self.vultr_region and self.vultr_bucket_name:
-            self.s3 = boto3.client('s3',
-                                   aws_access_key_id=self.vultr_access_key,
-                                   aws_secret_access_key=self.vultr_secret_key,
-                                   region_name=self.vultr_region,
-                                   endpoint_url=f'https://{self.vultr_region}.vultrobjects.com')
-        else:
-            self.s3 = None
+        self.vultr_configured = all([self.vultr_access_key, self.vultr_secret_key,
+                                     self.vultr_region, self.vultr_bucket_name])
+        self.connect_timeout = float(os.getenv("STORAGE_CONNECT_TIMEOUT_SECONDS", "3"))
+
+    def _vultr_client(self):
+        """S3 client for Vultr that waits no longer than the request has left, without retrying"""
+        return boto3.client('s3',
+                            aws_access_key_id=self.vultr_access_key,
+                            aws_secret_access_key=self.vultr_secret_key,
+                            region_name=self.vultr_region,
+                            endpoint_url=f'https://{self.vultr_region}.vultrobjects.com',
+                            config=Config(connect_timeout=request_deadline.timeout(self.connect_timeout),
+                                          read_timeout=request_deadline.timeout(),
+                                          retries={"max_attempts": 1, "mode": "standard"}))
+
+    def _put_object(self, bucket_name: str, key: str, content: str):
+        """Raindrop put_object within the request's budget; raises DeadlineExceeded when it is spent"""
+        request_deadline.check("storage")
+        with request_deadline.stage("storage"):
+            put_object(bucket_name=bucket_name, key=key, content=content)
 
     def _get_journal_key(self, user_id: str, journal_id: str) -> str:
         """Generates the key for a specific journal."""
@@ -60,7 +74,7 @@ class StorageService:
         # Convert bytes to base64 string for storage
         import base64
         audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-        put_object(bucket_name=self.audio_bucket, key=key, content=audio_base64)
+        self._put_object(self.audio_bucket, key, audio_base64)
         return key
 
     def save_guided_journal_data(self, user_id: str, journal_id: str, journal_data: Dict[str, Any]):
@@ -76,7 +90,7 @@ class StorageService:
         print(f"💾 Entries count: {len(journal_data.get('entries', []))}")
         
         import json
-        put_object(bucket_name=self.guided_journal_bucket, key=key, content=json.dumps(journal_data))
+        self._put_object(self.guided_journal_bucket, key, json.dumps(journal_data))
         print(f"✅ Journal saved successfully to {key}")
 
     def get_guided_journal_data(self, user_id: str, journal_id: str) -> Optional[Dict[str, Any]]:
@@ -100,7 +114,7 @@ class StorageService:
             key = self._get_journal_key(user_id, journal_id)
             # For MCP environment, we'll implement delete by setting a tombstone or using delete if available
             # For now, we'll simulate delete by overwriting with empty data
-            put_object(bucket_name=self.guided_journal_bucket, key=key, content="DELETED")
+            self._put_object(self.guided_journal_bucket, key, "DELETED")
             return True
         except Exception as e:
             print(f"Error deleting journal data: {e}")
@@ -145,7 +159,7 @@ class StorageService:
         Saves a journal to the SmartBucket using a user-specific key.
         """
         key = self._get_journal_key(guided_journal.user_id, guided_journal.id)
-        put_object(bucket_name=self.guided_journal_bucket, key=key, content=guided_journal.model_dump_json())
+        self._put_object(self.guided_journal_bucket, key, guided_journal.model_dump_json())
 
     def get_guided_journal(self, user_id: str, journal_id: str) -> GuidedJournal:
         """
@@ -164,15 +178,23 @@ class StorageService:
         objects = list_objects(bucket_name=self.guided_journal_bucket, prefix=prefix)
         return [obj['key'] for obj in objects]
 
-    def upload_pdf(self, guided_journal_id: str, pdf_bytes: bytes) -> str:
+    def upload_pdf(self, file_name: str, pdf_bytes: bytes) -> Optional[str]:
         """
-        Uploads a PDF to Vultr Object Storage. (Unchanged)
+        Uploads a PDF to Vultr Object Storage and returns its public URL, or None when the
+        request's budget ran out before or during the upload (send the PDF inline instead).
         """
-        if not self.s3:
-            raise ValueError("Vultr credentials are not configured.")
-        file_name = f"guided_journal_{guided_journal_id}.pdf"
-        self.s3.put_object(Bucket=self.vultr_bucket_name, Key=file_name, Body=pdf_bytes, ACL='public-read')
-        
+        if not self.vultr_configured:
+            raise ValueError("Vultr S3 credentials required for PDF export")
+        if request_deadline.nearly_spent("storage"):
+            return None
+        try:
+            with request_deadline.stage("storage"):
+                self._vultr_client().put_object(Bucket=self.vultr_bucket_name, Key=file_name,
+                                                Body=pdf_bytes, ACL='public-read')
+        except (ConnectTimeoutError, ReadTimeoutError) as e:
+            print(f"⏰ PDF upload timed out, sending {file_name} inline: {e}")
+            return None
+
         url = f"https://{self.vultr_bucket_name}.{self.vultr_region}.vultrobjects.com/{file_name}"
         return url
 
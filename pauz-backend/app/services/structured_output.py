@@ -0,0 +1,189 @@
+"""
+Structured Output
+Schema-constrained JSON responses for prompt generation and mood analysis:
+request settings for Gemini (response_schema) and OpenAI (JSON mode), a
+validating parser with one local repair pass, and counters of how often
+responses parse cleanly, needed repair or failed. Repair never calls the model
+again, so a malformed response costs no extra round-trip.
+"""
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services.mood_classifier import MOODS
+
+PROMPT_SECTIONS = ["going_well", "needs_improvement", "boundaries"]
+
+MOOD_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "mood": {"type": "string", "enum": MOODS},
+        "insights": {"type": "array", "items": {"type": "string"}},
+        "summary": {"type": "string"},
+        "nextQuestions": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["mood", "insights", "summary", "nextQuestions"],
+}
+
+PROMPT_SET_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "prompts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "section": {"type": "string", "enum": PROMPT_SECTIONS},
+                    "text": {"type": "string"},
+                },
+                "required": ["section", "text"],
+            },
+        },
+    },
+    "required": ["prompts"],
+}
+
+# OpenAI JSON mode: guarantees syntactically valid JSON (the prompt must mention JSON)
+OPENAI_JSON_MODE = {"type": "json_object"}
+
+JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+}
+
+FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+class StructuredOutputError(ValueError):
+    """Response did not match its schema, even after the repair pass"""
+
+
+def _gemini_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Gemini takes an OpenAPI subset: upper-case types and only the keys it knows"""
+    converted = {"type": schema["type"].upper()}
+    if "enum" in schema:
+        converted["enum"] = list(schema["enum"])
+    if "properties" in schema:
+        converted["properties"] = {name: _gemini_schema(sub) for name, sub in schema["properties"].items()}
+    if "required" in schema:
+        converted["required"] = list(schema["required"])
+    if "items" in schema:
+        converted["items"] = _gemini_schema(schema["items"])
+    return converted
+
+
+def gemini_json_config(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """generation_config asking Gemini for JSON matching schema"""
+    return {"response_mime_type": "application/json", "response_schema": _gemini_schema(schema)}
+
+
+def validate(value: Any, schema: Dict[str, Any], path: str = "$") -> List[str]:
+    """Schema violations in value (empty when valid)"""
+    expected = JSON_TYPES[schema["type"]]
+    if not isinstance(value, expected) or (schema["type"] in ("integer", "number") and isinstance(value, bool)):
+        return [f"{path}: expected {schema['type']}"]
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} not one of {schema['enum']}")
+    if schema["type"] == "object":
+        for name in schema.get("required", []):
+            if name not in value:
+                errors.append(f"{path}.{name}: missing")
+        for name, sub in schema.get("properties", {}).items():
+            if name in value:
+                errors.extend(validate(value[name], sub, f"{path}.{name}"))
+    if schema["type"] == "array" and "items" in schema:
+        for i, item in enumerate(value):
+            errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+    return errors
+
+
+def _extract_json(text: str) -> Optional[Any]:
+    """JSON from inside markdown fences or surrounding prose, tolerating trailing commas"""
+    fenced = FENCE_RE.search(text)
+    candidate = fenced.group(1) if fenced else text
+    start, end = candidate.find("{"), candidate.rfind("}")
+    if start < 0 or end <= start:
+        return None
+    try:
+        return json.loads(TRAILING_COMMA_RE.sub(r"\1", candidate[start:end + 1]))
+    except json.JSONDecodeError:
+        return None
+
+
+def _coerce(value: Any, schema: Dict[str, Any]) -> Any:
+    """Fix near-misses models commonly make: enum case, lone strings for lists, numbers as strings"""
+    kind = schema["type"]
+    if kind == "object" and isinstance(value, dict):
+        properties = schema.get("properties", {})
+        return {name: _coerce(item, properties[name]) if name in properties else item
+                for name, item in value.items()}
+    if kind == "array":
+        if not isinstance(value, list):
+            value = [value]
+        return [_coerce(item, schema["items"]) for item in value] if "items" in schema else value
+    if kind == "string":
+        if not isinstance(value, str) and value is not None:
+            value = str(value)
+        if isinstance(value, str) and "enum" in schema:
+            normalized = value.strip().lower().replace(" ", "_")
+            return next((option for option in schema["enum"] if option.lower() == normalized), value)
+    return value
+
+
+class StructuredOutputStats:
+    def __init__(self):
+        # (schema name, provider) -> {"ok", "repaired", "failed"}
+        self._counts: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def count(self, name: str, provider: str, outcome: str):
+        with self._lock:
+            counts = self._counts.setdefault((name, provider), {"ok": 0, "repaired": 0, "failed": 0})
+            counts[outcome] += 1
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{"schema": name, "provider": provider, **counts}
+                    for (name, provider), counts in sorted(self._counts.items())]
+
+
+def parse_structured(name: str, text: str, schema: Dict[str, Any], provider: str = "",
+                     salvage: Optional[Callable[[str], Optional[Any]]] = None) -> Any:
+    """
+    Parse and validate a JSON response. On failure, one local repair pass extracts
+    the JSON from fences or prose, coerces near-misses, or lets salvage rebuild it
+    from plain text; raises StructuredOutputError if that does not validate either.
+    """
+    try:
+        data = json.loads(text)
+        errors = validate(data, schema)
+    except json.JSONDecodeError as e:
+        errors = [f"invalid JSON: {e}"]
+    if not errors:
+        structured_output_stats.count(name, provider, "ok")
+        return data
+
+    repaired = _extract_json(text)
+    if repaired is None and salvage:
+        repaired = salvage(text)
+    if repaired is not None:
+        repaired = _coerce(repaired, schema)
+        if not validate(repaired, schema):
+            structured_output_stats.count(name, provider, "repaired")
+            print(f"🔧 Repaired {provider} {name} response ({errors[0]})")
+            return repaired
+
+    structured_output_stats.count(name, provider, "failed")
+    print(f"❌ {provider} {name} response failed validation: {errors[0]}")
+    raise StructuredOutputError(f"{name}: {errors[0]}")
+
+
+# Create singleton instance
+structured_output_stats = StructuredOutputStats()
@@ -7,16 +7,26 @@ import os
 import json
 import uuid
 import base64
-import requests
 from typing import Optional, Dict, Any
 from io import BytesIO
 
+from app.services.inference_service import inference_service, INTERACTIVE
+from app.services.request_deadline import request_deadline
+from app.services.ai_providers import ai_providers
+
+
+def _is_provider_failure(response) -> bool:
+    """Server errors and rate limits count against the ElevenLabs circuit; client errors do not"""
+    return response.status_code >= 500 or response.status_code == 429
+
 class VoiceService:
     """Service for converting text to speech and speech to text using ElevenLabs API"""
     
     def __init__(self):
         self.api_key = os.getenv("ELEVENLABS_API_KEY")
         self.base_url = "https://api.elevenlabs.io/v1"
+        # requests, or the local stub when AI_PROVIDERS=stub
+        self.http = ai_providers.elevenlabs_http()
         
         # Default voice settings - can be customized
         self.default_voice_id = "21m00Tcm4TlvDq8ikWAM"  # Adam - warm, gentle voice perfect for journaling
@@ -49,7 +59,7 @@ class VoiceService:
     
     def is_available(self) -> bool:
         """Check if ElevenLabs API is configured and available"""
-        return self.api_key is not None and self.api_key.strip() != ""
+        return ai_providers.available("elevenlabs")
     
     def text_to_speech(
         self, 
@@ -98,7 +108,9 @@ class VoiceService:
         try:
             print(f"🎤 Converting text to speech: '{text[:50]}...'")
             
-            response = requests.post(url, headers=headers, json=payload)
+            response = inference_service.call("elevenlabs", self.http.post, url, headers=headers, json=payload,
+                                              timeout=request_deadline.timeout(), is_failure=_is_provider_failure,
+                                              priority=INTERACTIVE)
             
             if response.status_code == 200:
                 # Convert audio to base64 for easy transmission
@@ -147,7 +159,8 @@ class VoiceService:
                 "xi-api-key": self.api_key
             }
             
-            response = requests.get(url, headers=headers)
+            response = inference_service.call("elevenlabs", self.http.get, url, headers=headers,
+                                              timeout=request_deadline.timeout(), is_failure=_is_provider_failure)
             
             if response.status_code == 200:
                 voices_data = response.json()
@@ -224,7 +237,9 @@ class VoiceService:
                 "include_timestamps": False
             }
             
-            response = requests.post(url, headers=headers, files=files, data=data)
+            response = inference_service.call("elevenlabs", self.http.post, url, headers=headers, files=files, data=data,
+                                              timeout=request_deadline.timeout(), is_failure=_is_provider_failure,
+                                              priority=INTERACTIVE)
             
             if response.status_code == 200:
                 result = response.json()
@@ -273,7 +288,8 @@ class VoiceService:
         """
         try:
             # Step 1: Speech to text
-            transcription_result = self.speech_to_text(audio_data)
+            with request_deadline.stage("speech_to_text"):
+                transcription_result = self.speech_to_text(audio_data)
             
             if not transcription_result["success"]:
                 return {
@@ -286,22 +302,27 @@ class VoiceService:
             # Step 2: Generate response using PAUZ Voice Service with conversation memory
             try:
                 from app.services.pauz_voice_service import pauz_voice_service
-                response_text = pauz_voice_service.generate_response(
-                    user_input=user_text,
-                    user_id=str(user_context.get("user_id", "anonymous")) if user_context else "anonymous",
-                    user_context=user_context
-                )
+                with request_deadline.stage("response"):
+                    response_text = pauz_voice_service.generate_response(
+                        user_input=user_text,
+                        user_id=str(user_context.get("user_id", "anonymous")) if user_context else "anonymous",
+                        user_context=user_context
+                    )
             except Exception as e:
                 print(f"❌ PAUZ Voice response failed, using fallback: {e}")
                 # Fallback to basic response
                 from app.routes.voice_assistant import get_guidance_response
                 response_text = get_guidance_response(user_text, user_id=user_context.get("user_id") if user_context else None)
             
-            # Step 3: Text to speech
-            voice_result = self.text_to_speech(
-                text=response_text,
-                voice_profile="guide"
-            )
+            # Step 3: Text to speech; with the budget nearly spent, answer in text only
+            if request_deadline.nearly_spent("text_to_speech"):
+                voice_result = {"success": True, "audio_data": "", "content_type": None, "voice_profile": "guide"}
+            else:
+                with request_deadline.stage("text_to_speech"):
+                    voice_result = self.text_to_speech(
+                        text=response_text,
+                        voice_profile="guide"
+                    )
             
             if not voice_result["success"]:
                 return {
@@ -322,7 +343,8 @@ class VoiceService:
                     "conversation_type": "smart_memory_voice_to_voice",
                     "user_context": user_context,
                     "ai_model": "gemini-2.5-flash",
-                    "memory_enabled": True
+                    "memory_enabled": True,
+                    "audio_skipped": not voice_result["audio_data"]
                 }
             }
             
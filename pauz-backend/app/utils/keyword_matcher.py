@@ -0,0 +1,96 @@
+"""
+Keyword matcher
+Precompiles named keyword groups into lookup tables so a text is tokenized once
+and every group is resolved from that single pass, instead of one substring scan
+per keyword list.
+"""
+import re
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+TOKEN_RE = re.compile(r"[\w']+")
+
+# Keywords this short only match whole words plus these endings ("sad" -> "sadly");
+# one- and two-letter keywords take no endings at all ("hi" must not match "his")
+SHORT_KEYWORD_LENGTH = 3
+INFLECTIONS = ("s", "es", "d", "ed", "ing", "ful", "ly", "ness")
+
+# Resolved tokens kept per matcher; journal vocabulary repeats, so most words are one dict hit
+TOKEN_CACHE_SIZE = 50000
+
+
+class KeywordMatcher:
+    """
+    Matches keywords at the start of words, so stems keep matching their
+    inflections ("worry" -> "worrying") without matching inside other words
+    ("rest" no longer matches "interest"). Keywords of up to three letters
+    must be whole words (see INFLECTIONS). Multi-word keywords match across any whitespace.
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]]):
+        self.groups: Dict[str, List[str]] = {}
+        self._keyword_groups: Dict[str, Set[str]] = {}
+        for name, keywords in groups.items():
+            normalized = [" ".join(keyword.lower().split()) for keyword in keywords]
+            self.groups[name] = normalized
+            for keyword in normalized:
+                self._keyword_groups.setdefault(keyword, set()).add(name)
+
+        words = [k for k in self._keyword_groups if " " not in k]
+        # Long single words match as token prefixes, checked at each distinct keyword length
+        self._prefixes: Set[str] = {k for k in words if len(k) > SHORT_KEYWORD_LENGTH}
+        self._prefix_lengths: List[int] = sorted({len(k) for k in self._prefixes})
+        # Short words match exactly, or with an inflection when three letters long
+        self._short_forms: Dict[str, str] = {}
+        for keyword in (k for k in words if len(k) <= SHORT_KEYWORD_LENGTH):
+            self._short_forms[keyword] = keyword
+            if len(keyword) == SHORT_KEYWORD_LENGTH:
+                for ending in INFLECTIONS:
+                    self._short_forms.setdefault(keyword + ending, keyword)
+        # Phrases are only searched for when their first word is in the text
+        self._phrases: List[Tuple[str, str]] = [
+            (k.split()[0], k) for k in self._keyword_groups if " " in k
+        ]
+        self._token_cache: Dict[str, FrozenSet[str]] = {}
+
+    def _resolve(self, token: str) -> FrozenSet[str]:
+        """Single-word keywords matched by one token"""
+        cached = self._token_cache.get(token)
+        if cached is not None:
+            return cached
+        found = set()
+        short = self._short_forms.get(token)
+        if short:
+            found.add(short)
+        for length in self._prefix_lengths:
+            if length > len(token):
+                break
+            if token[:length] in self._prefixes:
+                found.add(token[:length])
+        result = frozenset(found)
+        if len(self._token_cache) >= TOKEN_CACHE_SIZE:
+            self._token_cache.clear()
+        self._token_cache[token] = result
+        return result
+
+    def scan(self, text: str) -> Dict[str, Set[str]]:
+        """One tokenizing pass over text; returns {group: keywords found} for groups with at least one hit"""
+        # str.split runs in C over the whole text; punctuation is only split off distinct words
+        words = (text or "").lower().replace("’", "'").split()
+        unique: Set[str] = set()
+        for word in set(words):
+            unique.update(TOKEN_RE.findall(word))
+
+        found: Set[str] = set()
+        for token in unique:
+            found.update(self._resolve(token))
+
+        candidates = [phrase for first, phrase in self._phrases if first in unique]
+        if candidates:
+            joined = " " + " ".join(words)
+            found.update(phrase for phrase in candidates if " " + phrase in joined)
+
+        hits: Dict[str, Set[str]] = {}
+        for keyword in found:
+            for name in self._keyword_groups[keyword]:
+                hits.setdefault(name, set()).add(keyword)
+        return hits
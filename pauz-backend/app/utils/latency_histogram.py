@@ -0,0 +1,74 @@
+"""
+Latency Histogram
+HdrHistogram-style log-linear buckets: exact below 128 ms, then 64 sub-buckets per
+power of two, so every recorded value is within ~1.6% of its bucket. Recording is
+O(1) and histograms merge by adding counts, which keeps percentiles exact across
+flush windows instead of averaging averages.
+"""
+from typing import Dict, Optional
+
+SUB_BUCKET_BITS = 6
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+
+def bucket_index(value_ms: int) -> int:
+    if value_ms < 2 * SUB_BUCKETS:
+        return max(0, value_ms)
+    shift = value_ms.bit_length() - (SUB_BUCKET_BITS + 1)
+    return (shift + 1) * SUB_BUCKETS + (value_ms >> shift) - SUB_BUCKETS
+
+
+def bucket_value(index: int) -> float:
+    """Midpoint of the values that land in a bucket"""
+    if index < 2 * SUB_BUCKETS:
+        return float(index)
+    shift = index // SUB_BUCKETS - 1
+    low = (index - shift * SUB_BUCKETS) << shift
+    return low + ((1 << shift) - 1) / 2
+
+
+class LatencyHistogram:
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        # bucket index -> count (sparse: a few dozen buckets in practice)
+        self.counts: Dict[int, int] = dict(counts or {})
+        self.total = sum(self.counts.values())
+        self.max_ms = max((bucket_value(i) for i in self.counts), default=0.0)
+        self.sum_ms = sum(bucket_value(i) * n for i, n in self.counts.items())
+
+    def record(self, value_ms: float):
+        index = bucket_index(int(round(value_ms)))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.sum_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.sum_ms += other.sum_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def percentile(self, q: float) -> float:
+        """Latency at percentile q (0-100); 0.0 when empty"""
+        if not self.total:
+            return 0.0
+        rank = max(1, -(-self.total * q // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return bucket_value(index)
+        return self.max_ms
+
+    @property
+    def mean(self) -> float:
+        return self.sum_ms / self.total if self.total else 0.0
+
+    def to_dict(self) -> Dict[str, int]:
+        """JSON-friendly bucket counts"""
+        return {str(index): count for index, count in sorted(self.counts.items())}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, int]) -> "LatencyHistogram":
+        return cls({int(index): count for index, count in (data or {}).items()})
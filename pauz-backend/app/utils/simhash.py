@@ -0,0 +1,36 @@
+"""
+SimHash
+64-bit locality-sensitive fingerprints of text: near-identical texts (autosaves,
+small edits) differ in only a few bits, so similarity is a Hamming distance.
+"""
+import hashlib
+import re
+
+import numpy as np
+
+SIMHASH_BITS = 64
+WORD_RE = re.compile(r"\w+")
+
+
+def _feature_hashes(words) -> np.ndarray:
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    digests = b"".join(hashlib.blake2b(gram.encode(), digest_size=8).digest() for gram in grams)
+    return np.frombuffer(digests, dtype=np.uint8).reshape(len(grams), 8)
+
+
+def simhash(text: str, window_words: int = 0) -> int:
+    """Fingerprint of the words (and word pairs) in text; only the last window_words words if set"""
+    words = WORD_RE.findall((text or "").lower())
+    if window_words:
+        words = words[-window_words:]
+    if not words:
+        return 0
+    bits = np.unpackbits(_feature_hashes(words), axis=1)
+    # Each bit is set when most features have it set
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 > len(bits)
+    return int("".join("1" if vote else "0" for vote in votes), 2)
+
+
+def similarity(a: int, b: int) -> float:
+    """1.0 for identical fingerprints, falling with each differing bit"""
+    return 1.0 - bin(a ^ b).count("1") / SIMHASH_BITS
@@ -0,0 +1,65 @@
+"""
+Text statistics for journal content
+Word/character counts and reading time, updated incrementally on edits
+"""
+import math
+from typing import Dict, Optional
+
+# Average silent reading speed
+WORDS_PER_MINUTE = 200
+
+
+def _reading_time_seconds(word_count: int) -> int:
+    return math.ceil(word_count * 60 / WORDS_PER_MINUTE)
+
+
+def compute_text_stats(content: Optional[str]) -> Dict[str, int]:
+    """Full scan of the content"""
+    content = content or ""
+    word_count = len(content.split())
+    return {
+        "word_count": word_count,
+        "char_count": len(content),
+        "reading_time_seconds": _reading_time_seconds(word_count)
+    }
+
+
+def _common_prefix_length(old: str, new: str) -> int:
+    """Length of the shared prefix, using slice comparisons instead of a per-character loop"""
+    if new.startswith(old):
+        return len(old)
+    lo, hi = 0, min(len(old), len(new))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[:mid] == new[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def update_text_stats(old_content: Optional[str], old_word_count: Optional[int],
+                      new_content: Optional[str]) -> Dict[str, int]:
+    """
+    Stats for new_content given the previous content and its word count.
+    Only the text after the last word boundary before the first change is re-tokenized,
+    so appends (typing, transcriptions) cost the size of the appended tail.
+    """
+    old_content = old_content or ""
+    new_content = new_content or ""
+    if old_word_count is None or (old_word_count == 0 and old_content.strip()):
+        return compute_text_stats(new_content)
+
+    # Back off to the start of the word the change falls in
+    boundary = _common_prefix_length(old_content, new_content)
+    while boundary > 0 and not old_content[boundary - 1].isspace():
+        boundary -= 1
+
+    word_count = (old_word_count
+                  - len(old_content[boundary:].split())
+                  + len(new_content[boundary:].split()))
+    return {
+        "word_count": word_count,
+        "char_count": len(new_content),
+        "reading_time_seconds": _reading_time_seconds(word_count)
+    }
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Backfill free journal text stats
+Fills word_count / char_count / reading_time_seconds for journals saved before
+the columns existed. New saves keep them up to date incrementally.
+
+Usage:
+    python scripts/backfill_journal_stats.py
+    python scripts/backfill_journal_stats.py --batch-size 200
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmodel import Session, select
+from app.database import engine, create_db_and_tables
+from app.models import FreeJournal
+from app.utils.text_stats import compute_text_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill text stats for existing free journals")
+    parser.add_argument("--batch-size", type=int, default=500,
+                        help="Journals to update per commit")
+    args = parser.parse_args()
+
+    create_db_and_tables()
+    updated = 0
+    last_id = 0
+    with Session(engine) as db:
+        while True:
+            journals = db.exec(
+                select(FreeJournal)
+                .where(FreeJournal.id > last_id, FreeJournal.char_count == 0, FreeJournal.content != "")
+                .order_by(FreeJournal.id)
+                .limit(args.batch_size)
+            ).all()
+            if not journals:
+                break
+
+            for journal in journals:
+                stats = compute_text_stats(journal.content)
+                journal.word_count = stats["word_count"]
+                journal.char_count = stats["char_count"]
+                journal.reading_time_seconds = stats["reading_time_seconds"]
+                db.add(journal)
+            db.commit()
+            updated += len(journals)
+            last_id = journals[-1].id
+
+    print(f"✅ Backfilled text stats for {updated} free journals")
+
+
+if __name__ == "__main__":
+    main()
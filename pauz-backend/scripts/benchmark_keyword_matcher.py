@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Keyword matcher microbenchmark
+Compares the old per-list substring scans (one any(...) pass per keyword list)
+with the single precompiled KeywordMatcher pass over the journal keyword groups.
+
+Usage:
+    python scripts/benchmark_keyword_matcher.py
+    python scripts/benchmark_keyword_matcher.py --sizes 10000 100000 --repeat 20
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.free_journal_service import CONTENT_KEYWORDS
+
+FILLER = ("today i went to the office and then came home and thought about everything "
+          "that happened with the people around me while the evening got quieter").split()
+
+
+def make_entry(size: int, density: float, seed: int = 7) -> str:
+    """Journal-like text of roughly `size` characters with `density` of its words drawn from the keywords"""
+    rng = random.Random(seed)
+    keywords = [keyword for group in CONTENT_KEYWORDS.groups.values() for keyword in group]
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(keywords) if rng.random() < density else rng.choice(FILLER)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def substring_scan(text: str) -> set:
+    """The previous approach: lowercase once, then one substring scan per keyword list"""
+    content_lower = text.lower()
+    return {name for name, keywords in CONTENT_KEYWORDS.groups.items()
+            if any(word in content_lower for word in keywords)}
+
+
+def compiled_scan(text: str) -> set:
+    return set(CONTENT_KEYWORDS.scan(text))
+
+
+def timed(fn, text: str, repeat: int) -> float:
+    """Best-of-repeat milliseconds per call"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark keyword scanning on large journal entries")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000],
+                        help="Entry sizes in characters")
+    parser.add_argument("--density", type=float, nargs="+", default=[0.0, 0.02],
+                        help="Share of words that are keywords (0 is the worst case for substring scans)")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    print(f"🔎 {len(CONTENT_KEYWORDS.groups)} keyword groups")
+    for size in args.sizes:
+        for density in args.density:
+            text = make_entry(size, density)
+            substring_ms = timed(substring_scan, text, args.repeat)
+            compiled_ms = timed(compiled_scan, text, args.repeat)
+            print(f"📏 {size // 1000} KB, {density:.0%} keywords: substring scans {substring_ms:.2f} ms, "
+                  f"compiled matcher {compiled_ms:.2f} ms ({substring_ms / compiled_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
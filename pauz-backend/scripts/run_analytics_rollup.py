@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Analytics rollup job
+Folds new user_analytics rows into daily_summary / weekly_summary.
+
+Usage:
+    python scripts/run_analytics_rollup.py                 # process queued days once
+    python scripts/run_analytics_rollup.py --loop 300      # keep running every 5 minutes
+    python scripts/run_analytics_rollup.py --date 2025-11-20 --date 2025-11-21   # rebuild days
+
+The API runs queued rollups itself every ANALYTICS_ROLLUP_INTERVAL_SECONDS (default 300).
+With that set to 0, schedule this script instead, e.g. from cron:
+    */5 * * * * cd /path/to/pauz-backend && python scripts/run_analytics_rollup.py
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.smart_sql_service import smart_sql_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roll up PAUZ analytics into summary tables")
+    parser.add_argument("--date", action="append", default=None,
+                        help="Rebuild a specific day (YYYY-MM-DD); can be repeated")
+    parser.add_argument("--loop", type=int, default=0,
+                        help="Run continuously, sleeping this many seconds between runs")
+    args = parser.parse_args()
+
+    days = [date.fromisoformat(value) for value in args.date] if args.date else None
+
+    while True:
+        smart_sql_service.run_rollups(days)
+        if not args.loop or days:
+            break
+        time.sleep(args.loop)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Train the local mood classifier
+Fits the naive Bayes mood model on the bundled samples plus any extra labelled
+JSONL files ({"text": ..., "mood": ...} per line), reports cross-validated
+accuracy and how many entries would stay local, then saves the model file the
+app loads at startup (MOOD_CLASSIFIER_PATH, default mood_classifier.npz).
+
+Usage:
+    python scripts/train_mood_classifier.py
+    python scripts/train_mood_classifier.py --samples labelled_reflections.jsonl --output mood_classifier.npz
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.mood_classifier import MOODS, MoodClassifier, default_samples
+
+
+def load_samples(paths):
+    samples = []
+    for path in paths:
+        with open(path) as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                mood = str(row.get("mood", "")).lower()
+                if mood not in MOODS or not row.get("text"):
+                    print(f"⚠️ Skipping {path}:{line_number} (mood must be one of {', '.join(MOODS)})")
+                    continue
+                samples.append((row["text"], mood))
+    return samples
+
+
+def cross_validate(samples, folds, alpha):
+    shuffled = list(samples)
+    random.Random(0).shuffle(shuffled)
+    totals = {"accuracy": 0.0, "local_share": 0.0, "local_accuracy": 0.0}
+    for fold in range(folds):
+        held_out = shuffled[fold::folds]
+        training = [sample for i, sample in enumerate(shuffled) if i % folds != fold]
+        scores = MoodClassifier(alpha=alpha).fit(training).evaluate(held_out)
+        for key in totals:
+            totals[key] += scores[key] / folds
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local mood classifier")
+    parser.add_argument("--samples", nargs="*", default=[], help="Extra labelled JSONL files")
+    parser.add_argument("--output", default=os.getenv("MOOD_CLASSIFIER_PATH", "mood_classifier.npz"))
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--alpha", type=float, default=0.1, help="Additive smoothing")
+    args = parser.parse_args()
+
+    samples = default_samples() + load_samples(args.samples)
+    print(f"📚 {len(samples)} labelled samples")
+
+    scores = cross_validate(samples, args.folds, args.alpha)
+    print(f"📊 {args.folds}-fold accuracy {scores['accuracy']:.1%}; "
+          f"{scores['local_share']:.1%} confident enough to stay local at {scores['local_accuracy']:.1%} accuracy")
+
+    started = time.perf_counter()
+    classifier = MoodClassifier(alpha=args.alpha).fit(samples)
+    print(f"⏱️ Trained in {(time.perf_counter() - started) * 1000:.0f} ms")
+    classifier.save(args.output)
+    print(f"✅ Saved mood classifier to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.services.ai_providers import (
+    AIProviderRegistry,
+    LatencyProfile,
+    StubProviderError,
+    canned_text,
+)
+
+FAST_PROFILE = json.dumps({
+    "gemini": {"median_ms": 1, "p95_ms": 2, "error_rate": 0, "chunk_ms": 0},
+    "openai": {"median_ms": 1, "p95_ms": 2, "error_rate": 0, "chunk_ms": 0},
+    "elevenlabs": {"median_ms": 1, "p95_ms": 2, "error_rate": 0},
+})
+
+
+def _stub_registry(profile: str = FAST_PROFILE) -> AIProviderRegistry:
+    with patch.dict("os.environ", {"AI_PROVIDERS": "stub", "AI_STUB_PROFILE": profile, "AI_STUB_SEED": "7"}):
+        return AIProviderRegistry()
+
+
+def test_stub_mode_needs_no_keys():
+    """
+    Tests AI_PROVIDERS=stub makes every provider available without API keys
+    """
+    with patch.dict("os.environ", {"AI_PROVIDERS": "live", "GEMINI_API_KEY": "", "OPENAI_API_KEY": "",
+                                   "ELEVENLABS_API_KEY": ""}):
+        live = AIProviderRegistry()
+        providers = _stub_registry()
+        assert not live.available("gemini")
+        assert all(providers.available(name) for name in ("gemini", "openai", "elevenlabs"))
+
+
+def test_stub_text_is_deterministic_and_shaped():
+    """
+    Tests canned responses depend only on the prompt and match what the services parse
+    """
+    providers = _stub_registry()
+    model = providers.model("text")
+    assert model.generate_content("one gentle question").text == model.generate_content("one gentle question").text
+
+    mood = json.loads(canned_text("Respond in JSON format with keys: mood, insights, summary, nextQuestions"))
+    assert {"mood", "insights", "summary", "nextQuestions"} <= set(mood)
+    assert len(canned_text("Generate exactly 9 journal prompts for Mind.").splitlines()) == 9
+
+    client = providers.openai_client()
+    response = client.chat.completions.create(model="gpt-3.5-turbo", messages=[{"role": "user", "content": "hint"}])
+    streamed = "".join(chunk.choices[0].delta.content for chunk in
+                       client.chat.completions.create(messages=[{"role": "user", "content": "hint"}], stream=True))
+    assert streamed == response.choices[0].message.content
+
+
+def test_stub_audio_and_transcripts():
+    """
+    Tests the ElevenLabs stubs return audio bytes and transcripts through both client shapes
+    """
+    providers = _stub_registry()
+    transcript = providers.elevenlabs_client().speech_to_text.convert(model_id="scribe_v1", file=io.BytesIO(b"abc"))
+    assert transcript.text
+
+    http = providers.elevenlabs_http()
+    audio = http.post("https://api.elevenlabs.io/v1/text-to-speech/voice", json={"text": "Take a deep breath"})
+    assert audio.status_code == 200 and audio.content.startswith(b"\xff\xfb")
+    assert http.post("https://api.elevenlabs.io/v1/speech-to-text", files={"file": ("a.webm", b"abc", "audio/webm")}).json()["text"]
+
+
+def test_latency_profile_matches_median_and_p95():
+    """
+    Tests sampled latencies follow the configured median and p95, and the error rate
+    """
+    profile = LatencyProfile("gemini", median_ms=100, p95_ms=400, error_rate=0.1, seed=3)
+    samples = [profile.sample() for _ in range(4000)]
+    latencies = sorted(latency for latency, _ in samples)
+    assert 0.09 < latencies[2000] < 0.11
+    assert 0.35 < latencies[3800] < 0.45
+    assert 300 < sum(fails for _, fails in samples) < 500
+
+    again = LatencyProfile("gemini", median_ms=100, p95_ms=400, error_rate=0.1, seed=3)
+    assert [again.sample() for _ in range(10)] == samples[:10]
+
+
+def test_injected_errors_and_timeouts():
+    """
+    Tests injected failures raise, and slow calls honour the caller's timeout
+    """
+    providers = _stub_registry(json.dumps({"gemini": {"median_ms": 1, "p95_ms": 1, "error_rate": 1}}))
+    with pytest.raises(StubProviderError):
+        providers.model("text").generate_content("hint")
+
+    slow = _stub_registry(json.dumps({"openai": {"median_ms": 5000, "p95_ms": 5000, "error_rate": 0}}))
+    with pytest.raises(TimeoutError):
+        slow.openai_client().chat.completions.create(messages=[{"role": "user", "content": "hint"}], timeout=0.01)
+
+    slow_voice = _stub_registry(json.dumps({"elevenlabs": {"median_ms": 5000, "p95_ms": 5000, "error_rate": 0}}))
+    with pytest.raises(TimeoutError):
+        slow_voice.elevenlabs_http().post("https://stub/v1/text-to-speech/voice", json={"text": "hi"}, timeout=0.01)
+
+
+def test_clients_are_lazy_and_shared():
+    """
+    Tests clients are built on first use, once, and shared per capability
+    """
+    providers = _stub_registry()
+    voice = providers.model("voice")
+    assert not voice.ready
+    assert providers.model("voice") is voice
+    assert providers.model("text") is not voice
+    assert providers.openai_client() is providers.openai_client()
+
+    voice.generate_content("hint")
+    assert voice.ready
+    assert voice.get()._model.model_name == "gemini-2.5-flash"
+
+    with patch.dict("os.environ", {"GEMINI_MODEL_CHAT": "gemini-2.5-flash-lite"}):
+        assert providers.model_name("chat") == "gemini-2.5-flash-lite"
@@ -0,0 +1,91 @@
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from app.services.smart_sql_service import SmartSQLService
+
+
+def _service(tmp_path):
+    return SmartSQLService(db_path=str(tmp_path / "analytics.db"))
+
+
+def _rows(service, table):
+    conn = sqlite3.connect(service.db_path)
+    rows = conn.execute(f"SELECT * FROM {table} ORDER BY 1").fetchall()
+    conn.close()
+    return rows
+
+
+def test_rollup_populates_daily_and_weekly_summary(tmp_path):
+    """
+    Tests that queued analytics rows are folded into the summary tables
+    """
+    service = _service(tmp_path)
+    service.upsert_user_profile("user-1", {"name": "One"})
+    service.upsert_user_profile("user-2", {"name": "Two"})
+    service.update_user_analytics("user-1", word_count=100, mood="happy")
+    service.update_user_analytics("user-1", word_count=50, has_voice=True)
+    service.update_user_analytics("user-2", word_count=20, mood="calm")
+
+    assert service.run_rollups() == 1
+    assert _rows(service, "rollup_queue") == []
+
+    stats = service.get_dashboard_stats()
+    assert stats["total_users"] == 2
+    assert stats["today"] == {"active_users": 2, "journals_written": 3, "total_words": 170, "voice_sessions": 1}
+    assert stats["week"]["journals_written"] == 3
+    assert {m["mood"] for m in stats["top_moods"]} == {"happy", "calm"}
+
+
+def test_rerunning_a_day_reproduces_the_same_rows(tmp_path):
+    """
+    Tests that rebuilding an already rolled-up day is idempotent
+    """
+    service = _service(tmp_path)
+    service.update_user_analytics("user-1", word_count=10, mood="sad")
+    service.run_rollups()
+    daily, weekly = _rows(service, "daily_summary"), _rows(service, "weekly_summary")
+
+    service.run_rollups([date.today()])
+
+    assert _rows(service, "daily_summary") == daily
+    assert _rows(service, "weekly_summary") == weekly
+
+
+def test_dashboard_reads_only_rollups(tmp_path):
+    """
+    Tests that analytics written after the last rollup are not visible until the next run
+    """
+    service = _service(tmp_path)
+    service.update_user_analytics("user-1", word_count=10)
+    service.run_rollups()
+    service.update_user_analytics("user-2", word_count=10)
+
+    assert service.get_dashboard_stats()["today"]["active_users"] == 1
+    service.run_rollups()
+    assert service.get_dashboard_stats()["today"]["active_users"] == 2
+
+
+def test_week_start_is_monday():
+    wednesday = date(2025, 11, 19)
+    assert SmartSQLService._week_start(wednesday) == wednesday - timedelta(days=2)
+
+
+def test_background_refresh_keeps_rollups_current(tmp_path):
+    """
+    Tests the in-app refresh folds queued days without the script, and can be turned off
+    """
+    service = _service(tmp_path)
+    service.rollup_interval = 0.01
+    service.update_user_analytics("user-1", word_count=10, mood="happy")
+    assert service.start_rollup_refresh()
+    deadline = time.monotonic() + 2
+    while _rows(service, "rollup_queue") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _rows(service, "rollup_queue") == []
+    assert len(_rows(service, "daily_summary")) == 1
+    service.stop_rollup_refresh()
+
+    disabled = _service(tmp_path)
+    disabled.rollup_interval = 0
+    assert not disabled.start_rollup_refresh()
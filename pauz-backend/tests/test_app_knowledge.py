@@ -0,0 +1,52 @@
+import json
+from unittest.mock import patch
+
+from app.services.ai_providers import AIProviderRegistry
+from app.services.app_knowledge import AppKnowledge, app_description, pauz_knowledge
+from app.services.pauz_app_context import PAUZ_APP_DESCRIPTION
+
+
+def test_core_holds_rules_and_sections_are_indexed():
+    """
+    Tests the always-sent core keeps the role and mix-up rules while feature details are retrieved
+    """
+    assert "Garden is NOT for hints" in app_description.core
+    assert "YOUR ROLE" in app_description.core
+    assert not any("DO NOT Confuse" in title for title, _ in app_description.sections)
+    assert len(app_description.core) < len(PAUZ_APP_DESCRIPTION) / 3
+
+
+def test_relevant_sections_follow_the_question():
+    """
+    Tests everyday wording finds the matching feature section, and small talk retrieves nothing
+    """
+    assert app_description.relevant("how do the flowers work?")[0].startswith("3. Hints Garden")
+    assert any("Guided" in section for section in app_description.relevant("what categories are there"))
+    assert pauz_knowledge.relevant("I'm stuck and don't know what to write")[0].startswith("1. FreeJournal")
+    assert pauz_knowledge.context_for("tell me a joke") == ""
+
+
+def test_index_over_custom_text():
+    """
+    Tests group headings are skipped and titles outweigh passing mentions
+    """
+    knowledge = AppKnowledge(
+        "Intro line.\n## Group\n### Garden\nFlowers for moods.\n### Export\nSave as PDF, even garden notes.\n",
+        overview="Two features."
+    )
+    assert knowledge.core == "Intro line.\n\nTwo features."
+    assert [title for title, _ in knowledge.sections] == ["Garden", "Export"]
+    assert knowledge.relevant("garden")[0].startswith("Garden:")
+
+
+def test_system_instruction_models_are_shared_per_instruction():
+    """
+    Tests a system instruction is set on a shared model instead of a new model per call
+    """
+    profile = json.dumps({"gemini": {"median_ms": 1, "p95_ms": 1, "error_rate": 0}})
+    with patch.dict("os.environ", {"AI_PROVIDERS": "stub", "AI_STUB_PROFILE": profile}):
+        providers = AIProviderRegistry()
+    guide = providers.model("chat", system_instruction=pauz_knowledge.core)
+    assert providers.model("chat", system_instruction=pauz_knowledge.core) is guide
+    assert providers.model("chat") is not guide
+    assert guide.get()._model.system_instruction == pauz_knowledge.core
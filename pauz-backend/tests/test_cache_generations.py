@@ -0,0 +1,49 @@
+from app.services.journal_loading_service import JournalLoadingService
+from app.services.smart_memory_service import SmartMemoryService
+
+
+def test_journal_cache_invalidation_bumps_generation():
+    """
+    Tests that invalidating a user hides their entries without touching other users
+    """
+    service = JournalLoadingService()
+    service._update_cache("user-1", "free_journals_preview", ["a"])
+    service._update_cache("user-2", "free_journals_preview", ["b"])
+
+    service.invalidate_user_cache("user-1")
+
+    assert service._get_cached("user-1", "free_journals_preview") is None
+    assert service._get_cached("user-2", "free_journals_preview") == ["b"]
+    service._update_cache("user-1", "free_journals_preview", ["c"])
+    assert service._get_cached("user-1", "free_journals_preview") == ["c"]
+
+
+def test_journal_cache_stale_generations_are_evicted():
+    """
+    Tests that stale generations age out through LRU eviction
+    """
+    service = JournalLoadingService()
+    service.max_cache_entries = 2
+    service._update_cache("user-1", "preview", ["old"])
+    service.invalidate_user_cache("user-1")
+    service._update_cache("user-1", "preview", ["new"])
+    service._update_cache("user-2", "preview", ["other"])
+
+    assert len(service.cache) == 2
+    assert "user-1:0:preview" not in service.cache
+
+
+def test_smart_memory_clear_user_cache():
+    """
+    Tests that clearing a user's SmartMemory cache is a generation bump
+    """
+    service = SmartMemoryService()
+    service.cache_user_preference("user-1", "topics_discussed", ["anxiety"])
+    service.cache_personalization_data("user-1", {"conversation_count": 3})
+    service.cache_user_preference("user-2", "topics_discussed", ["work_stress"])
+
+    assert service.clear_user_cache("user-1") == 1
+
+    assert service.get_user_preference("user-1", "topics_discussed") is None
+    assert service.get_personalization_data("user-1") is None
+    assert service.get_user_preference("user-2", "topics_discussed") == ["work_stress"]
@@ -0,0 +1,100 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+
+
+def _fail():
+    raise RuntimeError("provider down")
+
+
+def test_breaker_opens_on_error_rate():
+    """
+    Tests the circuit opens once the windowed error rate crosses the threshold and then short-circuits
+    """
+    breaker = CircuitBreaker("gemini", min_calls=4, error_rate_threshold=0.5, open_seconds=60)
+    breaker.call(lambda: "ok")
+    breaker.call(lambda: "ok")
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            breaker.call(_fail)
+    assert breaker.state == OPEN
+
+    calls = []
+    start = time.monotonic()
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: calls.append(1))
+    assert calls == []
+    assert time.monotonic() - start < 0.01
+    assert breaker.snapshot()["health_score"] == 0.0
+
+
+def test_breaker_half_open_probe():
+    """
+    Tests a single half-open probe closes the circuit on success and reopens it on failure
+    """
+    breaker = CircuitBreaker("openai", min_calls=1, open_seconds=0.05)
+    with pytest.raises(RuntimeError):
+        breaker.call(_fail)
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.snapshot()["state"] == HALF_OPEN
+    with pytest.raises(RuntimeError):
+        breaker.call(_fail)
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()  # only one probe at a time
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+
+
+def test_breaker_counts_failed_responses():
+    """
+    Tests returned values flagged by is_failure count against the circuit
+    """
+    breaker = CircuitBreaker("elevenlabs", min_calls=2, open_seconds=60)
+    for _ in range(2):
+        assert breaker.call(lambda: 503, is_failure=lambda status: status >= 500) == 503
+    assert breaker.state == OPEN
+
+
+def test_stream_outcome_is_recorded_when_it_ends():
+    """
+    Tests a stream counts only once it finishes, a mid-stream error counts as a failure and a dropped stream frees the probe
+    """
+    def chunks(fail=False):
+        yield "a"
+        if fail:
+            raise RuntimeError("stream broke")
+        yield "b"
+
+    breaker = CircuitBreaker("gemini", min_calls=1, open_seconds=0.05)
+    stream = breaker.stream(chunks, fail=True)
+    assert breaker.snapshot()["calls_in_window"] == 0
+    with pytest.raises(RuntimeError):
+        list(stream)
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    dropped = breaker.stream(chunks)
+    next(dropped)
+    dropped.close()
+    assert breaker.state == HALF_OPEN and breaker.allow()
+    breaker.abandon()
+
+    assert list(breaker.stream(chunks)) == ["a", "b"]
+    assert breaker.state == CLOSED
+
+
+def test_provider_health_route(client_with_db: TestClient):
+    """
+    Tests GET /health/providers
+    """
+    response = client_with_db.get("/health/providers")
+    assert response.status_code == 200
+    assert {"gemini", "openai", "elevenlabs"} <= set(response.json()["providers"])
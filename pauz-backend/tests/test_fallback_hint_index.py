@@ -0,0 +1,53 @@
+import time
+
+from app.services.fallback_hint_index import FallbackHintIndex, fallback_hint_index
+from app.services.fallback_hints import FALLBACK_HINTS
+
+BANK = {
+    "work": {"keywords": ["work", "boss", "deadline"], "hints": ["Work hint one?", "Work hint two?"]},
+    "sleep": {"keywords": ["sleep", "tired"], "hints": ["Sleep hint?"]},
+    "general": {"keywords": [], "hints": ["General hint?"]},
+}
+
+
+def test_best_hint_follows_the_content():
+    """
+    Tests the bundled bank has several hundred hints and picks one from the theme being written about
+    """
+    assert len(fallback_hint_index.hints) >= 300
+    picks = {
+        "My boss moved the deadline again and the meeting ran late": "work",
+        "I'm exhausted, I couldn't sleep at all last night": "sleep",
+        "Grandma passed away and I keep thinking about her": "grief",
+    }
+    for text, theme in picks.items():
+        hint = fallback_hint_index.best(text)
+        assert hint in FALLBACK_HINTS[theme]["hints"], (text, hint)
+
+
+def test_session_gets_unseen_hints_then_general_ones():
+    """
+    Tests a session is not shown the same hint twice and unmatched text gets a general hint
+    """
+    index = FallbackHintIndex(BANK)
+    first = index.best("my boss and this deadline", "s1")
+    second = index.best("my boss and this deadline", "s1")
+    assert {first, second} == {"Work hint one?", "Work hint two?"}
+    assert index.best("my boss and this deadline", "s2") == first
+    assert index.best("lovely weather for ducks", "s3") == "General hint?"
+
+    for _ in range(len(index.hints)):
+        index.best("work", "s4")
+    assert index.best("work", "s4") in ("Work hint one?", "Work hint two?")
+
+
+def test_pick_stays_under_a_millisecond():
+    """
+    Tests a pick over a long entry is sub-millisecond
+    """
+    content = "Work was a lot today and my manager kept changing the plan for the project. " * 300
+    fallback_hint_index.best(content)
+    started = time.perf_counter()
+    for _ in range(200):
+        fallback_hint_index.best(content)
+    assert (time.perf_counter() - started) / 200 < 0.001
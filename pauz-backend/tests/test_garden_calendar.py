@@ -0,0 +1,57 @@
+from fastapi.testclient import TestClient
+from datetime import date, datetime
+
+from app.models import Garden
+from app.services.garden_service import garden_service
+
+
+def _plant(db_session, mood, created_at):
+    entry = Garden(user_id="test-user-id", mood=mood, flower_type=mood, created_at=created_at)
+    db_session.add(entry)
+    db_session.commit()
+
+
+def test_garden_calendar_counts_and_dominant_mood(db_session):
+    """
+    Tests per-day counts and dominant mood aggregated by the calendar query
+    """
+    _plant(db_session, "happy", datetime(2025, 3, 3, 9, 0))
+    _plant(db_session, "sad", datetime(2025, 3, 3, 21, 0))
+    _plant(db_session, "sad", datetime(2025, 3, 3, 22, 0))
+    _plant(db_session, "calm", datetime(2025, 3, 20, 8, 0))
+    _plant(db_session, "calm", datetime(2025, 4, 1, 8, 0))
+
+    calendar_data = garden_service.get_calendar("test-user-id", date(2025, 3, 10), None, "month", db_session)
+    assert calendar_data["from"] == "2025-03-10"
+    assert calendar_data["to"] == "2025-03-31"
+    assert [d["date"] for d in calendar_data["days"]] == ["2025-03-20"]
+
+    calendar_data = garden_service.get_calendar("test-user-id", date(2025, 3, 1), date(2025, 3, 31), "week", db_session)
+    first_day = calendar_data["days"][0]
+    assert first_day == {"date": "2025-03-03", "count": 3, "dominant_mood": "sad", "moods": {"happy": 1, "sad": 2}}
+    assert [p["period"] for p in calendar_data["periods"]] == ["2025-03-03", "2025-03-17"]
+
+    calendar_data = garden_service.get_calendar("test-user-id", None, date(2025, 6, 1), "year", db_session)
+    assert calendar_data["from"] == "2025-01-01"
+    assert calendar_data["periods"] == [{"period": "2025", "count": 5, "dominant_mood": "calm"}]
+
+
+def test_garden_calendar_route_etag(client_with_db: TestClient):
+    """
+    Tests GET /garden/calendar returns an ETag and honours If-None-Match
+    """
+    response = client_with_db.get("/garden/calendar?from=2025-01-01&to=2025-01-31")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.json()["granularity"] == "month"
+
+    response = client_with_db.get("/garden/calendar?from=2025-01-01&to=2025-01-31", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_garden_calendar_invalid_granularity(client_with_db: TestClient):
+    """
+    Tests GET /garden/calendar with an unknown granularity
+    """
+    response = client_with_db.get("/garden/calendar?granularity=decade")
+    assert response.status_code == 400
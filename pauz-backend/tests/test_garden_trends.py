@@ -0,0 +1,88 @@
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from datetime import date, datetime, timedelta
+
+from app.models import Garden
+from app.services.garden_trends_service import GardenTrendsService, MAX_CACHED_RESULTS, MAX_RANGE_DAYS
+
+
+def _plant(db_session, mood, days_ago):
+    day = datetime.combine(date.today() - timedelta(days=days_ago), datetime.min.time())
+    entry = Garden(user_id="test-user-id", mood=mood, flower_type=mood, created_at=day)
+    db_session.add(entry)
+    db_session.commit()
+    db_session.refresh(entry)
+    return entry
+
+
+def test_get_garden_trends_route(client_with_db: TestClient):
+    """
+    Tests GET /garden/trends
+    """
+    mock_trends = {"total_entries": 0, "streaks": {"current": 0, "longest": 0, "active_days": 0}}
+    with patch('app.services.garden_trends_service.garden_trends_service.get_trends', return_value=mock_trends) as mock_get:
+        response = client_with_db.get("/garden/trends?from=2025-01-01&to=2025-01-31&window=3")
+        assert response.status_code == 200
+        assert response.json() == mock_trends
+        _, kwargs = mock_get.call_args
+        assert kwargs["start"] == date(2025, 1, 1)
+        assert kwargs["end"] == date(2025, 1, 31)
+        assert kwargs["window"] == 3
+
+
+def test_garden_trends_invalid_range(client_with_db: TestClient):
+    """
+    Tests GET /garden/trends with 'from' after 'to'
+    """
+    response = client_with_db.get("/garden/trends?from=2025-02-01&to=2025-01-01")
+    assert response.status_code == 400
+
+
+def test_garden_trends_computation(db_session):
+    """
+    Tests streaks, distributions and transitions computed over garden history
+    """
+    service = GardenTrendsService()
+    for days_ago, mood in [(4, "happy"), (3, "sad"), (2, "happy"), (1, "calm")]:
+        _plant(db_session, mood, days_ago)
+
+    trends = service.get_trends("test-user-id", db_session, start=date.today() - timedelta(days=6), window=2)
+
+    assert trends["total_entries"] == 4
+    assert trends["mood_totals"]["happy"] == 2
+    assert trends["streaks"] == {"current": 4, "longest": 4, "active_days": 4}
+    assert trends["transitions"]["happy"] == {"sad": 0.5, "calm": 0.5}
+    assert trends["rolling"]["distribution"]["happy"][-1] == 0.0
+    assert trends["rolling"]["distribution"]["calm"][-1] == 1.0
+
+
+def test_garden_trends_incremental_update(db_session):
+    """
+    Tests that a new flower is folded into cached history without reloading
+    """
+    service = GardenTrendsService()
+    _plant(db_session, "happy", 1)
+    assert service.get_trends("test-user-id", db_session)["total_entries"] == 1
+
+    service.record_entry(_plant(db_session, "grateful", 0))
+
+    with patch.object(db_session, "exec", side_effect=AssertionError("should not query")):
+        trends = service.get_trends("test-user-id", db_session)
+    assert trends["total_entries"] == 2
+    assert trends["streaks"]["current"] == 2
+
+
+def test_garden_trends_bounds(db_session):
+    """
+    Tests overlong ranges are rejected and cached results per user stay bounded
+    """
+    service = GardenTrendsService()
+    today = date.today()
+    with pytest.raises(ValueError):
+        service.get_trends("test-user-id", db_session, start=today - timedelta(days=MAX_RANGE_DAYS), end=today)
+
+    for window in range(1, MAX_CACHED_RESULTS + 5):
+        service.get_trends("test-user-id", db_session, window=window)
+    assert len(service.results["test-user-id"]) == MAX_CACHED_RESULTS
+    assert ((today - timedelta(days=89)).isoformat(), today.isoformat(), 1) not in service.results["test-user-id"]
@@ -0,0 +1,84 @@
+import time
+
+from app.services.hedged_executor import HedgedExecutor
+
+
+def _provider(text, delay=0.0, error=None):
+    def call(timeout):
+        time.sleep(min(delay, timeout))
+        if error:
+            raise error
+        return text if delay <= timeout else None
+    return call
+
+
+def test_race_uses_primary_when_fast():
+    """
+    Tests the primary answer is used without hedging when it is fast
+    """
+    executor = HedgedExecutor()
+    executor.default_hedge_delay = 0.5
+    assert executor.race([("gemini", _provider("g")), ("openai", _provider("o"))], 1.0) == ("gemini", "g")
+
+
+def test_race_hedges_slow_primary():
+    """
+    Tests a hedged request wins when the primary is slower than the hedge delay
+    """
+    executor = HedgedExecutor()
+    executor.default_hedge_delay = 0.05
+    start = time.monotonic()
+    result = executor.race([("gemini", _provider("g", delay=0.5)), ("openai", _provider("o", delay=0.05))], 1.0)
+    assert result == ("openai", "o")
+    assert time.monotonic() - start < 0.4
+
+
+def test_race_hedges_immediately_on_failure():
+    """
+    Tests a failed primary starts the next provider without waiting for the hedge delay
+    """
+    executor = HedgedExecutor()
+    executor.default_hedge_delay = 5.0
+    result = executor.race([("gemini", _provider("g", error=RuntimeError("quota"))), ("openai", _provider("o"))], 1.0)
+    assert result == ("openai", "o")
+
+
+def test_race_respects_deadline():
+    """
+    Tests the race gives up at the deadline so callers can fall back
+    """
+    executor = HedgedExecutor()
+    executor.default_hedge_delay = 0.05
+    start = time.monotonic()
+    result = executor.race([("gemini", _provider("g", delay=1.0)), ("openai", _provider("o", delay=1.0))], 0.2)
+    assert result == (None, None)
+    assert time.monotonic() - start < 0.4
+
+
+def test_hedge_delay_tracks_p95():
+    """
+    Tests the hedge delay follows recent provider latency
+    """
+    executor = HedgedExecutor()
+    for i in range(100):
+        executor.record_latency("gemini", 1.0 if i < 95 else 3.0)
+    assert executor.hedge_delay("gemini") == 3.0
+    assert executor.hedge_delay("openai") == executor.default_hedge_delay
+
+
+def test_unanswered_attempts_count_towards_p95():
+    """
+    Tests attempts cut off by the deadline still lengthen the hedge delay, while quick losers do not
+    """
+    executor = HedgedExecutor()
+    executor.default_hedge_delay = 0.05
+    executor.race([("gemini", _provider("g", delay=1.0)), ("openai", _provider("o", delay=1.0))], 0.2)
+    assert len(executor._latencies["gemini"]) == 1 and executor._latencies["gemini"][0] >= 0.2
+    assert len(executor._latencies["openai"]) == 1
+
+    for _ in range(executor.min_samples):
+        executor.record_latency("openai", 1.0)
+    # openai is hedged to and loses long before its own p95
+    assert executor.race([("gemini", _provider("g", delay=0.1)), ("openai", _provider("o", delay=1.0))],
+                         1.0) == ("gemini", "g")
+    assert len(executor._latencies["openai"]) == executor.min_samples + 1
@@ -0,0 +1,41 @@
+from app.services.hint_cache import HintSimilarityCache
+from app.utils.simhash import simhash, similarity
+
+ENTRY = ("Today I finally talked to my manager about the project deadline. I was nervous going in "
+         "but she listened and we agreed to move the launch by a week. On the way home I kept "
+         "thinking about why I always expect the worst before these conversations.")
+
+
+def test_simhash_near_duplicates():
+    """
+    Tests small edits keep fingerprints close while different text does not
+    """
+    assert similarity(simhash(ENTRY), simhash(ENTRY)) == 1.0
+    assert similarity(simhash(ENTRY), simhash(ENTRY + " Anyway.")) >= 0.88
+    assert similarity(simhash(ENTRY), simhash("We went hiking in the mountains and saw a bear near the lake")) < 0.88
+    assert simhash("") == 0
+
+
+def test_cache_reuses_hint_per_session():
+    """
+    Tests near-identical content in the same session returns the stored hint id
+    """
+    cache = HintSimilarityCache()
+    cache.store("s1", ENTRY, 42)
+    assert cache.lookup("s1", ENTRY + " Anyway.") == 42
+    assert cache.lookup("s2", ENTRY) is None
+    assert cache.lookup("s1", "We went hiking in the mountains and saw a bear near the lake") is None
+    assert cache.stats()["hits"] == 1
+
+    cache.forget("s1")
+    assert cache.lookup("s1", ENTRY) is None
+
+
+def test_cache_entries_expire():
+    """
+    Tests hints older than the TTL are not reused
+    """
+    cache = HintSimilarityCache()
+    cache.ttl_seconds = 0
+    cache.store("s1", ENTRY, 42)
+    assert cache.lookup("s1", ENTRY) is None
@@ -0,0 +1,172 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.idempotency_service import (
+    MAX_STORED_RESULTS,
+    IdempotencyKeyReused,
+    IdempotencyService,
+    IdempotentRequestInProgress,
+)
+from app.services.request_deadline import request_deadline
+
+
+def test_concurrent_duplicates_share_one_call():
+    """
+    Tests identical requests in flight together run once, while other users and payloads run separately
+    """
+    service = IdempotencyService()
+    calls = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"hint": len(calls)}
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        same = [pool.submit(service.run, "hints", "user-1", generate, None, "s1 my day") for _ in range(4)]
+        other_user = pool.submit(service.run, "hints", "user-2", generate, None, "s1 my day")
+        other_text = pool.submit(service.run, "hints", "user-1", generate, None, "s1 my night")
+        results = [future.result() for future in same]
+
+    assert all(result is results[0] for result in results)
+    assert other_user.result() is not results[0] and other_text.result() is not results[0]
+    assert len(calls) == 3
+    assert service.stats()["coalesced"] == 3
+    assert service.stats()["stored_results"] == {}
+
+
+def test_idempotency_key_replays_the_result():
+    """
+    Tests a retry with the same key replays the stored result, until it expires or is used for another request
+    """
+    service = IdempotencyService()
+    calls = []
+
+    def reflect():
+        calls.append(1)
+        return {"mood": "calm", "call": len(calls)}
+
+    first = service.run("reflect", "user-1", reflect, "key-1", "session-1")
+    assert service.run("reflect", "user-1", reflect, "key-1", "session-1") is first
+    assert service.run("reflect", "user-2", reflect, "key-1", "session-1") is not first
+    with pytest.raises(IdempotencyKeyReused):
+        service.run("reflect", "user-1", reflect, "key-1", "session-2")
+
+    service.ttl_seconds = 0
+    assert service.run("reflect", "user-1", reflect, "key-1", "session-1")["call"] == 3
+    assert service.stats()["replayed"] == 1
+
+
+def test_failures_reach_waiters_but_are_not_stored():
+    """
+    Tests duplicates of a failing call get its error and a later retry runs again
+    """
+    service = IdempotencyService()
+    started = threading.Event()
+
+    def failing():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("provider down")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(service.run, "welcome", "user-1", failing, "key-1")
+        started.wait()
+        duplicate = pool.submit(service.run, "welcome", "user-1", failing, "key-1")
+        for future in (first, duplicate):
+            with pytest.raises(RuntimeError):
+                future.result()
+
+    assert service.run("welcome", "user-1", lambda: "hello", "key-1") == "hello"
+
+
+def test_duplicate_past_its_deadline_is_told_to_retry():
+    """
+    Tests a duplicate that runs out of time gets a retry hint instead of calling the provider again
+    """
+    service = IdempotencyService()
+    started, finish = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        finish.wait(2)
+        return "hint"
+
+    def first():
+        with request_deadline.start("hint", budget=3.0):
+            return service.run("hints", "user-1", slow, None, "s1")
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(first)
+        started.wait()
+        with request_deadline.start("hint", budget=0.05):
+            with pytest.raises(IdempotentRequestInProgress) as raised:
+                service.run("hints", "user-1", slow, None, "s1")
+        finish.set()
+        assert leader.result() == "hint"
+
+    assert calls == [1]
+    assert 1 <= raised.value.retry_after <= 3
+
+
+def test_stored_results_are_capped_per_scope():
+    """
+    Tests audio-heavy welcome results are kept in far smaller numbers than other scopes
+    """
+    service = IdempotencyService()
+    for i in range(MAX_STORED_RESULTS["welcome"] + 10):
+        service.run("welcome", "user-1", lambda: {"audio_data": "x" * 100}, f"key-{i}")
+        service.run("reflect", "user-1", lambda: {"mood": "calm"}, f"key-{i}")
+    stored = service.stats()["stored_results"]
+    assert stored["welcome"] == MAX_STORED_RESULTS["welcome"]
+    assert stored["reflect"] == MAX_STORED_RESULTS["welcome"] + 10
+
+
+
+def test_stream_duplicates_replay_the_first_stream():
+    """
+    Tests a duplicate stream waits for the first and gets its events without starting its own
+    """
+    service = IdempotencyService()
+    produced = []
+
+    def events(name):
+        produced.append(name)
+        yield "token"
+        yield "done"
+
+    leader = service.stream("reflect_stream", "user-1", events("first"), fingerprint="s1")
+    assert next(leader) == "token"
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        duplicate = pool.submit(service.stream, "reflect_stream", "user-1", events("second"), None, "s1")
+        while service.stats()["coalesced"] == 0:
+            time.sleep(0.001)
+        assert list(leader) == ["done"]
+        assert list(duplicate.result()) == ["token", "done"]
+
+    assert produced == ["first"]
+    assert service.stats()["stored_results"] == {}
+
+
+def test_abandoned_stream_asks_duplicates_to_retry():
+    """
+    Tests duplicates of a stream the client dropped are told to retry instead of getting half of it
+    """
+    service = IdempotencyService()
+    leader = service.stream("hints_stream", "user-1", iter(["token", "done"]), "key-1", "s1")
+    next(leader)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        duplicate = pool.submit(service.stream, "hints_stream", "user-1", iter([]), "key-1", "s1")
+        while service.stats()["coalesced"] == 0:
+            time.sleep(0.001)
+        leader.close()
+        with pytest.raises(IdempotentRequestInProgress):
+            duplicate.result()
+
+    assert list(service.stream("hints_stream", "user-1", iter(["token", "done"]), "key-1", "s1")) == ["token", "done"]
+    assert list(service.stream("hints_stream", "user-1", iter([]), "key-1", "s1")) == ["token", "done"]
@@ -0,0 +1,173 @@
+import threading
+import time
+
+import pytest
+
+from app.services.inference_service import (
+    BACKGROUND,
+    INTERACTIVE,
+    STANDARD,
+    InferenceQueueTimeout,
+    InferenceService,
+    ProviderQueue,
+)
+
+
+def _hold_all_slots(queue: ProviderQueue):
+    return [queue.acquire("holder", STANDARD, 1.0) for _ in range(queue.limit)]
+
+
+def _queue_in_order(queue: ProviderQueue, requests, served):
+    """Start each (requester, priority) waiter and wait until it is queued, so arrival order is fixed"""
+    threads = []
+    for requester, priority in requests:
+        def run(requester=requester, priority=priority):
+            lease = queue.acquire(requester, priority, 5.0)
+            served.append((requester, priority))
+            lease.release()
+        thread = threading.Thread(target=run)
+        queued = len(queue._waiting)
+        thread.start()
+        while len(queue._waiting) == queued:
+            time.sleep(0.001)
+        threads.append(thread)
+    return threads
+
+
+def test_concurrency_cap_and_release():
+    """
+    Tests a provider never runs more calls than its cap and frees slots on release
+    """
+    service = InferenceService()
+    queue = service.queue("gemini")
+    queue.limit = 2
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow():
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        time.sleep(0.02)
+        with lock:
+            running.pop()
+        return "ok"
+
+    threads = [threading.Thread(target=service.call, args=("gemini", slow), kwargs={"priority": STANDARD})
+               for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 2
+    assert queue.in_flight == 0
+    assert sum(row["dispatched"] for row in service.snapshot()) == 6
+
+
+def test_interactive_calls_jump_the_queue():
+    """
+    Tests waiting interactive calls are served before standard and background ones
+    """
+    queue = ProviderQueue("gemini", limit=1)
+    held = _hold_all_slots(queue)
+    served = []
+    threads = _queue_in_order(queue, [("a", BACKGROUND), ("b", STANDARD), ("c", INTERACTIVE)], served)
+    held[0].release()
+    for thread in threads:
+        thread.join()
+    assert [priority for _, priority in served] == [INTERACTIVE, STANDARD, BACKGROUND]
+
+
+def test_heavy_user_cannot_starve_others():
+    """
+    Tests fair queuing interleaves a burst from one user with a later request from another
+    """
+    queue = ProviderQueue("gemini", limit=1)
+    held = _hold_all_slots(queue)
+    served = []
+    threads = _queue_in_order(queue, [("heavy", STANDARD)] * 4 + [("light", STANDARD)], served)
+    held[0].release()
+    for thread in threads:
+        thread.join()
+    assert [requester for requester, _ in served].index("light") <= 1
+
+
+def test_background_share_and_queue_timeout():
+    """
+    Tests background work keeps slots free for interactive calls and gives up after its wait limit
+    """
+    queue = ProviderQueue("gemini", limit=2, background_share=0.5)
+    background = queue.acquire("summaries", BACKGROUND, 1.0)
+    with pytest.raises(InferenceQueueTimeout):
+        queue.acquire("summaries", BACKGROUND, 0.02)
+    interactive = queue.acquire("user", INTERACTIVE, 0.02)
+
+    stats = {row["priority"]: row for row in queue.snapshot()}
+    assert stats[BACKGROUND]["timed_out"] == 1
+    assert stats[INTERACTIVE]["dispatched"] == 1
+    interactive.release()
+    background.release()
+    assert queue.in_flight == 0
+
+
+def test_priority_follows_call_site_and_context():
+    """
+    Tests calls get their priority class from the calling function unless the caller sets one
+    """
+    service = InferenceService()
+
+    def _fold_session_summary():
+        return service.call("openai", lambda: "summary")
+
+    def _generate_hint_with_gemini():
+        return service.call("openai", lambda: "hint")
+
+    _fold_session_summary()
+    _generate_hint_with_gemini()
+    with service.on_behalf_of("someone", priority=INTERACTIVE):
+        _fold_session_summary()
+
+    stats = {row["priority"]: row["dispatched"] for row in service.snapshot()}
+    assert stats == {INTERACTIVE: 2, BACKGROUND: 1}
+
+
+def test_weighted_users_get_a_larger_share():
+    """
+    Tests a requester with twice the weight is served about twice as often, and anonymous traffic weighs less
+    """
+    service = InferenceService()
+    assert service.weights["anonymous"] < 1.0
+
+    queue = ProviderQueue("gemini", limit=1)
+    held = _hold_all_slots(queue)
+    served = []
+    threads = []
+    for requester, weight in [("heavy", 2.0)] * 4 + [("light", 1.0)] * 4:
+        def run(requester=requester, weight=weight):
+            with queue.acquire(requester, STANDARD, 5.0, weight):
+                served.append(requester)
+        thread = threading.Thread(target=run)
+        queued = len(queue._waiting)
+        thread.start()
+        while len(queue._waiting) == queued:
+            time.sleep(0.001)
+        threads.append(thread)
+    held[0].release()
+    for thread in threads:
+        thread.join()
+    assert served[:6].count("heavy") == 4
+
+
+def test_timed_out_waiter_gives_back_its_turn():
+    """
+    Tests a request that times out in the queue does not push its user's later requests back
+    """
+    queue = ProviderQueue("gemini", limit=1)
+    held = _hold_all_slots(queue)
+    before = queue._finish_tags.get("user", 0.0)
+    with pytest.raises(InferenceQueueTimeout):
+        queue.acquire("user", STANDARD, 0.02)
+    assert queue._finish_tags["user"] == before
+    held[0].release()
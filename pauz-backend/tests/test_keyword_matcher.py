@@ -0,0 +1,29 @@
+from app.utils.keyword_matcher import KeywordMatcher
+
+
+def test_scan_returns_every_group_in_one_pass():
+    """
+    Tests that all groups hit by a text are reported with the keywords found
+    """
+    matcher = KeywordMatcher({
+        "happy": ["happy", "joy", "joyful"],
+        "work": ["work", "job"],
+        "stuck": ["don't know", "blank"]
+    })
+    hits = matcher.scan("Joyful day at WORK, but I don't   know what to write")
+    assert hits == {"happy": {"joy", "joyful"}, "work": {"work"}, "stuck": {"don't know"}}
+    assert matcher.scan("") == {}
+
+
+def test_word_start_matching():
+    """
+    Tests stems match their inflections but not the inside of other words
+    """
+    matcher = KeywordMatcher({"rest": ["rest"], "greet": ["hi"], "sad": ["sad"], "worry": ["worry"]})
+    assert "rest" in matcher.scan("I rested well")
+    assert "rest" not in matcher.scan("an interesting day")
+    assert matcher.scan("his notebook") == {}
+    assert "greet" in matcher.scan("hi!")
+    assert "sad" in matcher.scan("sadly it rained")
+    assert "sad" not in matcher.scan("a sadistic plot")
+    assert "worry" in matcher.scan("worrying again")
@@ -0,0 +1,75 @@
+import json
+import random
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.services.ai_providers import LatencyProfile, StubGeminiModel
+from app.services.llm_telemetry import LLMTelemetry, call_site, prompt_type_for
+from app.services.smart_sql_service import SmartSQLService
+from app.utils.latency_histogram import LatencyHistogram
+
+def test_histogram_percentiles_within_bucket_error():
+    """
+    Tests percentiles stay within the ~1.6% bucket error and survive a JSON round trip
+    """
+    values = [random.Random(1).lognormvariate(6, 1) for _ in range(5000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    exact = sorted(values)
+    for q in (50, 95, 99):
+        expected = exact[int(len(exact) * q / 100) - 1]
+        assert abs(histogram.percentile(q) - expected) <= expected * 0.02 + 1
+
+    restored = LatencyHistogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+    assert restored.percentile(95) == histogram.percentile(95)
+    assert LatencyHistogram().percentile(50) == 0.0
+
+
+def _generate_hint_with_gemini(model):
+    return model.generate_content("one gentle question").text
+
+
+def test_calls_are_recorded_and_flushed(tmp_path):
+    """
+    Tests instrumented calls land in ai_performance with call site and prompt type
+    """
+    telemetry = LLMTelemetry()
+    telemetry._ensure_flusher = lambda: None
+    stub = StubGeminiModel("gemini-2.5-flash", LatencyProfile("gemini", median_ms=1, p95_ms=2))
+    model = telemetry.instrument_gemini(stub, "gemini-2.5-flash")
+    for _ in range(3):
+        _generate_hint_with_gemini(model)
+    assert "".join(chunk.text for chunk in model.generate_content("hint", stream=True))
+
+    analytics = SmartSQLService(db_path=str(tmp_path / "analytics.db"))
+    with patch("app.services.smart_sql_service.smart_sql_service", analytics):
+        assert telemetry.flush() == 2
+        latency = {row["prompt_type"]: row for row in telemetry.percentiles(hours=1)}
+
+    assert latency["hint"]["calls"] == 3
+    assert latency["hint"]["success_rate"] == 1.0
+    assert latency["hint"]["p99_ms"] >= latency["hint"]["p50_ms"]
+    assert latency["other"]["avg_response_chars"] > 0
+
+
+def test_call_site_and_prompt_type():
+    """
+    Tests the call site is the calling function and maps to its prompt type
+    """
+    def analyze_mood_with_gemini():
+        return call_site()
+
+    assert analyze_mood_with_gemini().endswith(".analyze_mood_with_gemini")
+    assert prompt_type_for("free_journal_service.analyze_mood_with_gemini") == "reflection"
+    assert prompt_type_for("somewhere.unknown") == "other"
+
+
+def test_ai_latency_route(client_with_db: TestClient):
+    """
+    Tests GET /health/ai-latency
+    """
+    response = client_with_db.get("/health/ai-latency?hours=1")
+    assert response.status_code == 200
+    assert isinstance(response.json()["latency"], list)
@@ -0,0 +1,47 @@
+from app.services.mood_classifier import MOODS, MoodClassifier, default_samples, featurize
+
+
+def test_featurize_is_stable_and_stems():
+    """
+    Tests hashed features are deterministic and inflections share a feature
+    """
+    assert list(featurize("so worried")) == list(featurize("so worried"))
+    assert set(featurize("worried")) == set(featurize("worries"))
+    assert len(featurize("")) == 0
+
+
+def test_classifier_confident_on_clear_entries():
+    """
+    Tests clear entries are classified locally with high confidence
+    """
+    classifier = MoodClassifier().fit(default_samples())
+    for text, mood in [
+        ("I'm so worried about the exam, I can't sleep and my chest feels tight", "anxious"),
+        ("Feeling thankful for my family and grateful for this quiet evening together", "grateful"),
+        ("I can't wait for the trip next week, I'm so excited and eager to go", "excited"),
+    ]:
+        predicted, confidence = classifier.predict(text)
+        assert predicted == mood
+        assert confidence >= classifier.confidence_threshold
+
+
+def test_classifier_unsure_without_evidence():
+    """
+    Tests text with no mood evidence falls back to the prior and escalates
+    """
+    classifier = MoodClassifier().fit(default_samples())
+    mood, confidence = classifier.predict("zzz qqq")
+    assert mood in MOODS
+    assert confidence < classifier.confidence_threshold
+
+
+def test_save_and_load_round_trip(tmp_path):
+    """
+    Tests a trained model file gives the same predictions after loading
+    """
+    classifier = MoodClassifier().fit(default_samples())
+    path = str(tmp_path / "mood_classifier.npz")
+    classifier.save(path)
+    loaded = MoodClassifier.load(path)
+    text = "A slow, peaceful morning with tea"
+    assert loaded.predict(text) == classifier.predict(text)
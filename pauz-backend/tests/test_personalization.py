@@ -0,0 +1,64 @@
+from app.services.personalization_service import MAX_RECENT_ENTRIES, PersonalizationService
+
+
+def _service(tmp_path):
+    return PersonalizationService(db_path=str(tmp_path / "profiles.db"))
+
+
+def test_resaving_an_entry_replaces_its_contribution(tmp_path):
+    """
+    Tests autosaves of one entry count once, while new guided journals add to the category counts
+    """
+    service = _service(tmp_path)
+    service.record_entry("user-1", "s1", "free", "Work was long")
+    service.record_entry("user-1", "s1", "free", "Work was long and my boss kept adding deadlines to it")
+    service.record_entry("user-1", "g1", "guided", "I miss my sister", category="family")
+    service.record_entry("user-1", "g1", "guided", "I miss my sister and my mom", category="family")
+    service.record_entry("user-1", "g2", "guided", "Sleeping badly again", category="body")
+
+    summary = service.summary("user-1")
+    assert len(service.get("user-1")["recent_entries"]) == 3
+    assert summary["frequent_themes"] == ["family", "sleep", "work"]
+    assert service.get("user-1")["categories"] == {"family": 1, "body": 1}
+    assert summary["typical_words"] == (11 + 7 + 3) // 3
+
+
+def test_profile_stays_bounded(tmp_path):
+    """
+    Tests old entries and moods age out and the rendered block never exceeds its budget
+    """
+    service = _service(tmp_path)
+    for i in range(MAX_RECENT_ENTRIES + 5):
+        service.record_entry("user-1", f"s{i}", "free", "work " * (i + 1))
+    for mood in ["sad", "anxious", "calm", "happy"] * 5:
+        service.record_mood("user-1", mood)
+
+    profile = service.get("user-1")
+    assert len(profile["recent_entries"]) == MAX_RECENT_ENTRIES
+    assert profile["recent_entries"][0]["id"] == "s5"
+    assert service.summary("user-1")["recent_moods"][:2] == ["happy", "calm"]
+
+    block = service.context_block("user-1")
+    assert block.startswith("ABOUT THIS WRITER:") and "work" in block
+    assert len(block) <= service.context_chars
+    short = service.context_block("user-1", max_chars=90)
+    assert len(short) <= 90 and short.count("\n- ") == 1
+
+
+def test_unknown_users_get_no_block(tmp_path):
+    """
+    Tests anonymous and new users add nothing to prompts
+    """
+    service = _service(tmp_path)
+    assert service.context_block(None) == ""
+    assert service.context_block("user-2") == ""
+
+
+def test_stored_word_count_is_used(tmp_path):
+    """
+    Tests a word count already stored with the entry is used instead of re-counting the content
+    """
+    service = _service(tmp_path)
+    service.record_entry("user-1", "s1", "free", "Work was long", word_count=250)
+    assert service.get("user-1")["recent_entries"][0]["words"] == 250
+    assert service.summary("user-1")["typical_words"] == 250
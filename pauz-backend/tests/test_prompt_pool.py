@@ -0,0 +1,52 @@
+import itertools
+import time
+
+from app.services.prompt_pool_service import PromptPoolService
+
+
+def _prompt_set(n):
+    return [{"id": i + 1, "text": f"Prompt {n}-{i} about your mind", "topic": "mind",
+             "generated_at": "x", "type": "gemini_generated"} for i in range(9)]
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and not condition():
+        time.sleep(0.01)
+    return condition()
+
+
+def test_pool_rejects_duplicate_sets(tmp_path):
+    """
+    Tests identical prompt sets (in any order) are only pooled once
+    """
+    pool = PromptPoolService(db_path=str(tmp_path / "pools.db"))
+    assert pool.add("mind", _prompt_set(1))
+    assert not pool.add("mind", list(reversed(_prompt_set(1))))
+    assert pool.available("mind") == 1
+
+
+def test_take_serves_oldest_and_refills_below_low_water(tmp_path):
+    """
+    Tests a pooled set is served once and the pool is topped up in the background
+    """
+    pool = PromptPoolService(db_path=str(tmp_path / "pools.db"))
+    pool.pool_size, pool.low_water = 3, 2
+    pool.add("mind", _prompt_set(1))
+    pool.add("mind", _prompt_set(2))
+
+    counter = itertools.count(3)
+    prompts = pool.take("mind", lambda category: _prompt_set(next(counter)))
+    assert prompts[0]["text"] == "Prompt 1-0 about your mind"
+    assert _wait_for(lambda: pool.available("mind") == 3)
+
+    # A served set is not pooled again
+    assert not pool.add("mind", _prompt_set(1))
+
+
+def test_take_from_empty_pool(tmp_path):
+    """
+    Tests an empty pool returns None so callers can generate inline
+    """
+    pool = PromptPoolService(db_path=str(tmp_path / "pools.db"))
+    assert pool.take("joy", lambda category: None) is None
@@ -0,0 +1,78 @@
+import time
+
+from app.services.prompt_prefetch_service import PromptPrefetchService
+
+
+def _prompt_set(category, user_context=""):
+    return [{"id": i + 1, "text": f"{category} prompt {i} ({user_context})", "topic": category,
+             "generated_at": "x", "type": "gemini_generated"} for i in range(9)]
+
+
+def _wait_idle(prefetcher, user_id, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and user_id in prefetcher._prefetching:
+        time.sleep(0.01)
+
+
+def test_prefetch_warms_top_categories_for_a_later_hit():
+    """
+    Tests the user's top-k categories are generated in the background and served once from memory
+    """
+    prefetcher = PromptPrefetchService()
+    prefetcher.top_k = 2
+
+    def plan(user_id):
+        return [("mind", "Writes about focus"), ("heart", ""), ("body", "")]
+
+    prefetcher.prefetch("user-1", plan, _prompt_set)
+    _wait_idle(prefetcher, "user-1")
+
+    assert set(prefetcher.sets["user-1"]) == {"mind", "heart"}
+    prompts = prefetcher.take("user-1", "mind")
+    assert prompts[0]["text"] == "mind prompt 0 (Writes about focus)"
+    assert prefetcher.take("user-1", "mind") is None
+    assert prefetcher.take("user-1", "body") is None
+    assert (prefetcher.hits, prefetcher.misses) == (1, 2)
+
+
+def test_budget_limits_generations_per_user():
+    """
+    Tests repeated triggers stop generating once the user's budget for the window is spent
+    """
+    prefetcher = PromptPrefetchService()
+    prefetcher.budget = 3
+    generated = []
+
+    def generate(category, user_context):
+        generated.append(category)
+        return _prompt_set(category)
+
+    def plan(user_id):
+        return [("mind", ""), ("heart", "")]
+
+    for _ in range(3):
+        prefetcher.prefetch("user-1", plan, generate)
+        _wait_idle(prefetcher, "user-1")
+        prefetcher.take("user-1", "mind")
+        prefetcher.take("user-1", "heart")
+
+    assert len(generated) == 3
+    prefetcher.prefetch("user-2", plan, generate)
+    _wait_idle(prefetcher, "user-2")
+    assert len(generated) == 5
+
+
+def test_prefetched_sets_expire():
+    """
+    Tests sets older than the TTL are not served and are generated again on the next prefetch
+    """
+    prefetcher = PromptPrefetchService()
+    prefetcher.ttl_seconds = 0.01
+
+    def plan(user_id):
+        return [("mind", "")]
+
+    prefetcher.prefetch("user-1", plan, _prompt_set)
+    _wait_idle(prefetcher, "user-1")
+    time.sleep(0.02)
+    assert prefetcher.take("user-1", "mind") is None
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from app.services.request_deadline import DeadlineExceeded, RequestDeadlines
+
+
+def test_paths_map_to_route_classes():
+    """
+    Tests each route class is recognised from its path and gets its own budget
+    """
+    deadlines = RequestDeadlines()
+    assert deadlines.route_class("/freejournal/abc/hints") == "hint"
+    assert deadlines.route_class("/freejournal/abc/hints/stream") == "hint"
+    assert deadlines.route_class("/freejournal/abc/reflect") == "reflect"
+    assert deadlines.route_class("/freejournal/abc/hints/h1/voice") == "voice"
+    assert deadlines.route_class("/voice-assistant/welcome") == "voice"
+    assert deadlines.route_class("/guided_journal/prompts") == "prompts"
+    assert deadlines.route_class("/garden/") == "default"
+    assert deadlines.budgets["hint"] < deadlines.budgets["reflect"] < deadlines.budgets["default"]
+
+
+def test_timeouts_are_capped_at_the_remaining_budget():
+    """
+    Tests call timeouts shrink to what is left of the request and are untouched outside one
+    """
+    deadlines = RequestDeadlines()
+    kwargs = {"timeout": 10, "request_options": {"timeout": 10}}
+    assert deadlines.cap_timeouts(kwargs) is kwargs
+    assert deadlines.timeout() == deadlines.call_timeout
+
+    with deadlines.start("hint", budget=2.0):
+        capped = deadlines.cap_timeouts(kwargs)
+        assert capped["timeout"] <= 2.0 and capped["request_options"]["timeout"] <= 2.0
+        assert deadlines.timeout(0.5) == 0.5
+    assert kwargs == {"timeout": 10, "request_options": {"timeout": 10}}
+    assert deadlines.remaining() is None
+
+
+def test_spent_budget_degrades_and_late_stages_are_misses():
+    """
+    Tests calls are refused once the budget is nearly spent and overrunning stages are counted as misses
+    """
+    deadlines = RequestDeadlines()
+    with deadlines.start("reflect", budget=0.05):
+        with deadlines.stage("mood_analysis"):
+            time.sleep(0.06)
+        with pytest.raises(DeadlineExceeded):
+            deadlines.check("gemini")
+        assert deadlines.nearly_spent("garden_entry")
+
+    stats = {row["stage"]: row for row in deadlines.snapshot()}
+    assert stats["mood_analysis"]["calls"] == 1 and stats["mood_analysis"]["misses"] == 1
+    assert stats["gemini"]["degraded"] == 1 and stats["garden_entry"]["degraded"] == 1
+    assert all(row["route_class"] == "reflect" for row in stats.values())
@@ -0,0 +1,59 @@
+from app.services.session_summary_service import CHARS_PER_TOKEN, SessionSummaryService
+
+
+def _service(tmp_path):
+    service = SessionSummaryService(db_path=str(tmp_path / "summaries.db"))
+    service.token_budget = 100
+    service.summary_tokens = 25
+    service.fold_threshold_chars = 100
+    return service
+
+
+def test_short_entries_are_sent_whole(tmp_path):
+    """
+    Tests entries within the budget are embedded verbatim
+    """
+    service = _service(tmp_path)
+    assert service.prompt_context("Today I walked in the park.", "s1") == "Today I walked in the park."
+
+
+def test_long_entries_stay_within_budget(tmp_path):
+    """
+    Tests long entries are cut to the budget and schedule a fold
+    """
+    service = _service(tmp_path)
+    folds = []
+    content = " ".join(f"word{i}" for i in range(2000))
+    context = service.prompt_context(content, "s1", lambda summary, passage: folds.append(passage) or "summary")
+    service._executor.shutdown(wait=True)
+    assert len(context) <= service.token_budget * CHARS_PER_TOKEN + 3
+    assert context.endswith("word1999")
+    assert folds
+
+
+def test_fold_then_summary_plus_tail(tmp_path):
+    """
+    Tests the stored summary is used with the unsummarized tail, and dropped after earlier text changes
+    """
+    service = _service(tmp_path)
+    content = " ".join(f"word{i}" for i in range(2000))
+    passages = []
+
+    def fold(summary, passage):
+        passages.append(passage)
+        return f"summary of {len(passages)} passages"
+
+    service._fold("s1", content, fold)
+    summary, covered = service.get("s1", content)
+    assert summary == f"summary of {len(passages)} passages"
+    assert covered >= len(content) - service.tail_chars - 10
+    assert "".join(passages) == content[:covered]
+
+    context = service.prompt_context(content + " word2000", "s1")
+    assert context.startswith("[Summary of earlier writing: summary of")
+    assert context.endswith("word2000")
+    assert len(context) <= service.token_budget * CHARS_PER_TOKEN + 40
+
+    assert service.get("s1", "edited " + content) == ("", 0)
+    service.forget("s1")
+    assert service.get("s1", content) == ("", 0)
@@ -0,0 +1,44 @@
+import time
+
+from app.services.starter_hint_pool import StarterHintPool
+
+
+def test_take_avoids_repeats_within_a_session():
+    """
+    Tests a session sees every pooled hint once before any repeats
+    """
+    pool = StarterHintPool(["a?", "b?", "c?"])
+    pool.refresh_interval = 3600
+    pool._last_refresh = time.monotonic()
+
+    served = {pool.take("session-1") for _ in range(3)}
+    assert served == {"a?", "b?", "c?"}
+    assert pool.take("session-1") in served
+    assert pool.take("session-2") in served
+
+
+def test_take_is_fast_and_refreshes_in_background():
+    """
+    Tests empty-content hints come from memory and fresh AI hints join the pool asynchronously
+    """
+    pool = StarterHintPool(["a?", "b?"])
+    generated = iter(["fresh one?", "fresh two?", "A?"])
+
+    start = time.perf_counter()
+    pool.take("session-1", lambda: next(generated, None))
+    assert time.perf_counter() - start < 0.005
+
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline and pool._refreshing:
+        time.sleep(0.01)
+    # Duplicates (case-insensitive) are skipped
+    assert list(pool.hints) == ["a?", "b?", "fresh one?", "fresh two?"]
+
+
+def test_pool_drops_oldest_when_full():
+    """
+    Tests the pool rotates out the oldest hints once it reaches its size limit
+    """
+    pool = StarterHintPool(["a?", "b?"], max_size=2)
+    assert pool.add("c?")
+    assert list(pool.hints) == ["b?", "c?"]
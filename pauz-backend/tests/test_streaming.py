@@ -0,0 +1,87 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from fastapi.testclient import TestClient
+
+from app.services.llm_streaming import sentences, sse_event, stream_gemini
+
+
+class FakeGeminiModel:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        assert stream and request_options["timeout"] > 0
+        return iter(SimpleNamespace(text=chunk) for chunk in self.chunks)
+
+
+def _events(body: str):
+    frames = [frame for frame in body.split("\n\n") if frame]
+    return [(f.split("\n")[0][len("event: "):], json.loads(f.split("\n")[1][len("data: "):])) for f in frames]
+
+
+def test_sentences_rechunks_token_stream():
+    """
+    Tests tokens are regrouped into complete sentences
+    """
+    chunks = ["Hi the", "re! How are", " you? I'm here", " to help"]
+    assert list(sentences(chunks)) == ["Hi there!", "How are you?", "I'm here to help"]
+
+
+def test_stream_gemini_yields_chunks():
+    """
+    Tests Gemini stream chunks are passed through as text
+    """
+    assert list(stream_gemini(FakeGeminiModel(["What ", "might ", "help?"]), "prompt")) == ["What ", "might ", "help?"]
+
+
+def test_sse_event_format():
+    """
+    Tests server-sent event framing
+    """
+    assert sse_event("token", {"text": "hi"}) == 'event: token\ndata: {"text": "hi"}\n\n'
+
+
+def test_streamed_reflection_sends_sentences_then_mood():
+    """
+    Tests a reflection is streamed sentence by sentence and its mood is read from the last line
+    """
+    from app.services.free_journal_service import FreeJournalService
+
+    service = FreeJournalService.__new__(FreeJournalService)
+    service.gemini_model = FakeGeminiModel(["You carried a lot to", "day. Rest is earned.\nMOOD: ca", "lm"])
+    events = service._streamed_reflection("Long day at work, finally home.")
+    frames = []
+    try:
+        while True:
+            frames.append(next(events))
+    except StopIteration as done:
+        analysis = done.value
+
+    assert _events("".join(frames)) == [("insight", {"text": "You carried a lot today."}),
+                                        ("insight", {"text": "Rest is earned."})]
+    assert analysis["mood"] == "calm" and analysis["flower_type"] == "calm"
+    assert analysis["insights"] == ["You carried a lot today.", "Rest is earned."]
+
+
+def test_stream_hints_route(client_with_db: TestClient):
+    """
+    Tests POST /freejournal/{session_id}/hints/stream returns an event stream
+    """
+    frames = iter([sse_event("token", {"text": "What "}), sse_event("done", {"id": 1, "hint_text": "What now?", "source": "gemini"})])
+    with patch('app.services.free_journal_service.free_journal_service.stream_hints', return_value=frames):
+        response = client_with_db.post("/freejournal/test-session-id/hints/stream", json={"current_content": "today"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert _events(response.text)[-1] == ("done", {"id": 1, "hint_text": "What now?", "source": "gemini"})
+
+
+def test_stream_reflection_route_missing_session(client_with_db: TestClient):
+    """
+    Tests the reflection stream returns 404 before streaming when the session does not exist
+    """
+    with patch('app.services.free_journal_service.free_journal_service.stream_reflection',
+               side_effect=ValueError("Free Journal session not found.")):
+        response = client_with_db.post("/freejournal/missing/reflect/stream")
+        assert response.status_code == 404
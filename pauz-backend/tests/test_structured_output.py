@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from app.services.structured_output import (
+    MOOD_ANALYSIS_SCHEMA,
+    PROMPT_SET_SCHEMA,
+    StructuredOutputError,
+    gemini_json_config,
+    parse_structured,
+    structured_output_stats,
+    validate,
+)
+
+ANALYSIS = {
+    "mood": "grateful",
+    "insights": ["You notice small kindnesses."],
+    "summary": "A quiet day with a friend.",
+    "nextQuestions": ["What made that moment feel safe?"]
+}
+
+
+def _counts(name: str, provider: str) -> dict:
+    return next((row for row in structured_output_stats.snapshot()
+                 if row["schema"] == name and row["provider"] == provider), {"ok": 0, "repaired": 0, "failed": 0})
+
+
+def test_valid_json_parses_without_repair():
+    """
+    Tests schema-valid responses are returned as-is and counted as ok
+    """
+    assert parse_structured("mood_analysis", json.dumps(ANALYSIS), MOOD_ANALYSIS_SCHEMA, "test-ok") == ANALYSIS
+    assert _counts("mood_analysis", "test-ok")["ok"] == 1
+    assert validate({"mood": "elated"}, MOOD_ANALYSIS_SCHEMA)
+
+
+def test_repair_pass_fixes_common_mistakes():
+    """
+    Tests fenced JSON, trailing commas, enum casing and lone strings are repaired locally
+    """
+    response = '```json\n{"mood": "Grateful", "insights": "You notice small kindnesses.", ' \
+               '"summary": "A quiet day.", "nextQuestions": ["Why?"],}\n```'
+    analysis = parse_structured("mood_analysis", response, MOOD_ANALYSIS_SCHEMA, "test-repair")
+    assert analysis["mood"] == "grateful"
+    assert analysis["insights"] == ["You notice small kindnesses."]
+    assert _counts("mood_analysis", "test-repair")["repaired"] == 1
+
+
+def test_salvage_and_failure():
+    """
+    Tests the salvage hook rebuilds plain text, and unusable responses raise and are counted
+    """
+    def salvage(text):
+        return {"prompts": [{"section": "going_well", "text": line} for line in text.splitlines()]}
+
+    data = parse_structured("prompt_set", "What went well today?", PROMPT_SET_SCHEMA, "test-salvage", salvage)
+    assert data["prompts"][0]["text"] == "What went well today?"
+
+    with pytest.raises(StructuredOutputError):
+        parse_structured("mood_analysis", "I cannot help with that.", MOOD_ANALYSIS_SCHEMA, "test-fail")
+    assert _counts("mood_analysis", "test-fail")["failed"] == 1
+
+
+def test_gemini_config_uses_openapi_types():
+    """
+    Tests the Gemini response_schema uses upper-case types and keeps enums
+    """
+    config = gemini_json_config(MOOD_ANALYSIS_SCHEMA)
+    assert config["response_mime_type"] == "application/json"
+    assert config["response_schema"]["type"] == "OBJECT"
+    assert config["response_schema"]["properties"]["mood"]["enum"][0] == "happy"
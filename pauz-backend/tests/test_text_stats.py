@@ -0,0 +1,48 @@
+from app.models import FreeJournal
+from app.utils.text_stats import compute_text_stats, update_text_stats
+
+
+def test_compute_text_stats():
+    """
+    Tests word, character and reading-time counts
+    """
+    assert compute_text_stats("") == {"word_count": 0, "char_count": 0, "reading_time_seconds": 0}
+    stats = compute_text_stats("one two  three\nfour")
+    assert stats["word_count"] == 4
+    assert stats["char_count"] == 19
+    assert stats["reading_time_seconds"] == 2
+
+
+def test_update_text_stats_matches_full_scan():
+    """
+    Tests incremental updates against a full re-count for appends and edits
+    """
+    edits = [
+        ("", "Today I"),
+        ("Today I", "Today I walked"),          # word continues without a space
+        ("Today I walked", "Today I walked\nto the park"),
+        ("Today I walked\nto the park", "Today I ran\nto the park"),
+        ("Today I ran\nto the park", "Today"),
+        ("Today", "  "),
+    ]
+    for old, new in edits:
+        old_stats = compute_text_stats(old)
+        assert update_text_stats(old, old_stats["word_count"], new) == compute_text_stats(new)
+
+
+def test_journal_preview_reads_stats_columns(db_session):
+    """
+    Tests the free journal preview returns the stored stats rather than counting the preview text
+    """
+    from app.services.journal_loading_service import JournalLoadingService
+
+    content = "word " * 150
+    stats = compute_text_stats(content)
+    db_session.add(FreeJournal(user_id="test-user-id", session_id="stats-session", content=content, **stats))
+    db_session.commit()
+
+    previews = JournalLoadingService().get_user_free_journals_preview("test-user-id", db_session)
+    preview = next(p for p in previews if p["session_id"] == "stats-session")
+    assert preview["word_count"] == 150
+    assert preview["char_count"] == 750
+    assert preview["reading_time_seconds"] == 45